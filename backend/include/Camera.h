@@ -18,9 +18,11 @@ public:
     void zoom(float deltaRadius);
     void setAspectRatio(float aspect);
     void setAngles(float azimuthDeg, float elevationDeg);
+    float getAzimuth() const { return m_azimuth; }
+    float getElevation() const { return m_elevation; }
 
-    // Position the camera to frame an axis-aligned box of size w x h x d centered at the origin
-    void frameBox(float w, float h, float d);
+    // Position the camera to frame an axis-aligned box of size w x h x d centered at `center`
+    void frameBox(float w, float h, float d, const glm::vec3& center = glm::vec3(0.0f));
 
     glm::mat4 getViewMatrix() const;
     glm::mat4 getProjectionMatrix() const;
@@ -0,0 +1,125 @@
+// backend/include/ChunkStore.h
+
+#ifndef CHUNKSTORE_H
+#define CHUNKSTORE_H
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+#include "VolumeData.h"
+#include "LoadStats.h"
+
+// Chunked, compressed multiscale volume store (.mvrc).
+//
+// The volume is cut into fixed-size 3D chunks (edge chunks are cropped). Each chunk is
+// byte-shuffled (all low bytes, then all high bytes) and zlib-compressed on its own,
+// so any chunk can be read and inflated without touching the others. Optional pyramid
+// levels halve every dimension (2x2x2 mean) until the volume fits in one chunk.
+//
+// File layout (little-endian):
+//   header    "MVRCHUNK", version, chunk size, level count, codec, width, height,
+//             depth, spacing x/y/z (f64), index offset (u64)
+//   chunks    stored payloads, level by level, x fastest then y then z
+//   index     per level: width, height, depth, spacing x/y/z, chunk counts x/y/z,
+//             then per chunk: offset (u64), stored size (u32), flags (u32, bit 0 = zlib)
+//
+// A slice or region read touches only the chunks it intersects; a full read inflates
+// all chunks in parallel, each worker reading its own chunks from the file.
+namespace ChunkStore {
+
+    constexpr const char* kExtension = ".mvrc";
+
+    struct WriteOptions {
+        unsigned int chunkSize = 64;    // chunk edge length in voxels
+        unsigned int levels = 0;        // pyramid levels including full resolution (0 = until one chunk, 1 = none)
+        int compression = 1;            // zlib level (0 = store raw, 1 = fastest, 9 = smallest)
+        unsigned int threads = 0;       // compression threads (0 = all cores)
+    };
+
+    struct LevelInfo {
+        unsigned int width = 0;
+        unsigned int height = 0;
+        unsigned int depth = 0;
+        double spacing_x = 1.0;
+        double spacing_y = 1.0;
+        double spacing_z = 1.0;
+        unsigned int chunksX = 0;
+        unsigned int chunksY = 0;
+        unsigned int chunksZ = 0;
+        size_t firstChunk = 0;          // index of the level's first chunk in the chunk table
+    };
+
+    /**
+     * @brief Writes a volume as a chunk store (see the file layout above).
+     *
+     * Chunks are compressed in parallel in bounded batches and written in order, so
+     * peak extra memory is one pyramid level plus a batch of compressed chunks. The file
+     * is written next to `path` and renamed into place when complete.
+     *
+     * @return true on success, false on I/O errors or an empty volume.
+     */
+    bool write(const std::string& path, const VolumeData& volume, const WriteOptions& options = WriteOptions());
+
+    /**
+     * @brief Random-access reader for a chunk store.
+     *
+     * open() reads only the header and the chunk index. Reads are thread-safe: every
+     * read opens its own file handles and the counters are atomic.
+     */
+    class Reader {
+    public:
+        bool open(const std::string& path);
+        void close();
+        bool isOpen() const { return !m_levels.empty(); }
+
+        const std::string& path() const { return m_path; }
+        unsigned int chunkSize() const { return m_chunkSize; }
+        unsigned int levelCount() const { return static_cast<unsigned int>(m_levels.size()); }
+        const LevelInfo& level(unsigned int level) const { return m_levels[level]; }
+        // Sum of the stored chunk payloads
+        uint64_t storedBytes() const;
+
+        /**
+         * @brief Reads the box [x0, x0+w) x [y0, y0+h) x [z0, z0+d) of a level.
+         *
+         * Only the chunks the box intersects are read and inflated (in parallel).
+         * @param dst w*h*d voxels, x fastest.
+         * @return false if the box is outside the level or a chunk cannot be read.
+         */
+        bool readRegion(unsigned int level, unsigned int x0, unsigned int y0, unsigned int z0,
+                        unsigned int w, unsigned int h, unsigned int d, uint16_t* dst,
+                        unsigned int threads = 0) const;
+
+        /**
+         * @brief Reads a whole level into a VolumeData (dimensions and spacing of that level).
+         * @param stats Optional; receives decode time and byte counts.
+         */
+        bool readVolume(unsigned int level, VolumeData& volume, unsigned int threads = 0,
+                        LoadStats* stats = nullptr) const;
+
+        // Chunks inflated and payload bytes read since open() or resetCounters()
+        uint64_t chunksRead() const { return m_chunksRead.load(); }
+        uint64_t bytesRead() const { return m_bytesRead.load(); }
+        void resetCounters();
+
+    private:
+        struct ChunkEntry {
+            uint64_t offset = 0;
+            uint32_t size = 0;
+            uint32_t flags = 0;
+        };
+
+        std::string m_path;
+        unsigned int m_chunkSize = 0;
+        std::vector<LevelInfo> m_levels;
+        std::vector<ChunkEntry> m_chunks;
+        mutable std::atomic<uint64_t> m_chunksRead{0};
+        mutable std::atomic<uint64_t> m_bytesRead{0};
+    };
+
+} // namespace ChunkStore
+
+#endif // CHUNKSTORE_H
@@ -8,22 +8,157 @@
 #define DATALOADER_H
 
 #include <string>
+#include <vector>
+#include <cstdint>
 #include "../include/VolumeData.h"
+#include "../include/LoadStats.h"
+#include "../include/VolumeOps.h"
+#include "../include/LabelMap.h"
 
 namespace DataLoader {
 
+    // Log verbosity for the loaders. Errors are always printed.
+    enum Verbosity : int {
+        VerbosityQuiet   = 0, // errors only
+        VerbositySummary = 1, // one summary line per load (default)
+        VerbosityPerFile = 2  // additionally one line per file (slow on large series)
+    };
+
+    /**
+     * @brief Sets the loader log verbosity (see Verbosity). Thread-safe.
+     */
+    void setVerbosity(int level);
+
+    /**
+     * @brief Returns the current loader log verbosity.
+     */
+    int getVerbosity();
+
+    // Tuning knobs for the loaders.
+    struct LoadOptions {
+        bool parallelGzip = true;   // multi-threaded .gz inflation for NIfTI (falls back to znzlib if false)
+        unsigned int threads = 0;   // worker threads for CPU-side loading (0 = all cores)
+        // DICOM stacking: slices with mismatched size/spacing and uneven gaps are always
+        // resampled onto a regular grid; these pick the filter and cubic voxels.
+        VolumeOps::Interpolation interpolation = VolumeOps::Interpolation::Linear;
+        bool isotropic = false;
+        // Box-filter NIfTI and DICOM volumes by a power of two while decoding when the
+        // full resolution would not fit the host memory budget (see MemoryBudget.h), and
+        // refuse the load when no reduction fits. Off: loaded at full resolution.
+        bool fitHostBudget = false;
+    };
+
+    // Header fields of one file, as cached in the persistent DICOM index.
+    struct DicomFileHeader {
+        std::string path;
+        int64_t mtime = 0;            // last write time (filesystem clock ticks)
+        uint64_t size = 0;            // file size in bytes
+        bool valid = false;           // false for non-DICOM / non-image files (cached so they are not re-parsed)
+        std::string seriesUID;
+        std::string orientation;      // ImageOrientationPatient rounded to 1e-3, "" if absent
+        bool hasPosition = false;
+        double position[3] = {0.0, 0.0, 0.0}; // ImagePositionPatient (mm)
+        double sortKey = 0.0;         // position along the slice normal, else SliceLocation / InstanceNumber
+        unsigned int rows = 0;
+        unsigned int cols = 0;
+        double spacingX = 1.0;        // PixelSpacing column spacing (mm)
+        double spacingY = 1.0;        // PixelSpacing row spacing (mm)
+        double sliceThickness = 0.0;
+    };
+
+    // One series: files sharing a SeriesInstanceUID and orientation, sorted by position.
+    struct DicomSeriesInfo {
+        std::string key;              // "<SeriesInstanceUID>|<orientation>", used to select a series
+        std::string seriesUID;
+        std::string orientation;
+        std::string directory;        // directory containing the first slice
+        unsigned int width = 0;       // dimensions of the first slice
+        unsigned int height = 0;
+        std::vector<DicomFileHeader> slices;
+    };
+
+    /**
+     * @brief Reads the header of a single DICOM file (pixel data is not read).
+     *
+     * @param filePath Path of the file.
+     * @param header Populated on success; `valid` is false for non-image files.
+     * @return true if the file could be parsed as DICOM, false otherwise.
+     */
+    bool readDICOMHeader(const std::string& filePath, DicomFileHeader& header);
+
+    /**
+     * @brief Decodes the pixels of one DICOM slice.
+     *
+     * Fills the image's size, pixel spacing and position (the header's sort key);
+     * offsetX/offsetY are left at zero.
+     *
+     * @param header The slice's header, as returned by readDICOMHeader or scanDICOMSeries.
+     * @param image Populated on success.
+     * @param stats Optional; its dataType is set from the decoded pixel representation.
+     * @return false (with a warning) if the file cannot be decoded.
+     */
+    bool decodeDICOMSlice(const DicomFileHeader& header, VolumeOps::SliceImage& image, LoadStats* stats = nullptr);
+
+    /**
+     * @brief Recursively discovers DICOM series under a directory.
+     *
+     * Files are grouped by SeriesInstanceUID and orientation and sorted along the
+     * slice normal. If indexDir is non-empty, a persistent header index for this root
+     * is read from and written to that directory, so unchanged files (same mtime and
+     * size) are not parsed again: re-opening a study is a stat() sweep plus a lookup.
+     *
+     * @param rootDir Directory to search recursively.
+     * @param indexDir Directory holding the header index (e.g. ".mvr"); empty disables it.
+     * @param stats Optional; receives scan/header timings and file/byte counts.
+     * @param signature Optional; receives dicomTreeSignature of the tree as swept.
+     * @return The series found, largest first.
+     */
+    std::vector<DicomSeriesInfo> scanDICOMSeries(const std::string& rootDir, const std::string& indexDir = "",
+                                                 LoadStats* stats = nullptr, uint64_t* signature = nullptr);
+
+    /**
+     * @brief Hash of the paths, mtimes and sizes of the files under a directory.
+     *
+     * Costs only the stat() sweep of scanDICOMSeries (no file is opened), so a caller
+     * holding a listing can check whether it is still current before reusing it.
+     *
+     * @param rootDir Directory to sweep recursively; hidden entries are skipped.
+     * @return The signature; 0 if the directory cannot be read.
+     */
+    uint64_t dicomTreeSignature(const std::string& rootDir);
+
+    /**
+     * @brief Decodes and stacks the slices of one series into a volume.
+     *
+     * Slices whose size, pixel spacing or in-plane position differ from the first slice
+     * are resampled onto its grid, and uneven slice gaps are resampled to the median gap
+     * (see VolumeOps::stackSlices), so spacing_z is right for the whole stack.
+     *
+     * @param series A series returned by scanDICOMSeries.
+     * @param volumeData A reference to a VolumeData object to be populated.
+     * @param stats Optional; receives decode and resample timings.
+     * @param options Interpolation, isotropic resampling and thread count.
+     * @return true if loading was successful, false otherwise.
+     */
+    bool loadDICOMSeries(const DicomSeriesInfo& series, VolumeData& volumeData, LoadStats* stats = nullptr,
+                         const LoadOptions& options = LoadOptions());
+
     /**
      * @brief Loads a series of DICOM slices from a directory.
      *
-     * This function scans the specified directory for DICOM files, sorts them based on
-     * their spatial position (Image Position Patient tag), and stacks them into a
-     * 3D volume.
+     * This function recursively scans the specified directory for DICOM files, groups
+     * them into series, and stacks the largest series into a 3D volume, sorted by
+     * their spatial position (Image Position Patient tag).
      *
      * @param directoryPath The path to the directory containing DICOM (.dcm) files.
      * @param volumeData A reference to a VolumeData object to be populated.
+     * @param stats Optional; receives per-phase timings and file/byte counts.
+     * @param indexDir Optional directory for the persistent header index (see scanDICOMSeries).
+     * @param options Stacking options (see loadDICOMSeries).
      * @return true if loading was successful, false otherwise.
      */
-    bool loadDICOM(const std::string& directoryPath, VolumeData& volumeData);
+    bool loadDICOM(const std::string& directoryPath, VolumeData& volumeData, LoadStats* stats = nullptr,
+                   const std::string& indexDir = "", const LoadOptions& options = LoadOptions());
 
     /**
      * @brief Loads a NIfTI file.
@@ -33,9 +168,45 @@ namespace DataLoader {
      *
      * @param filePath The path to the NIfTI file.
      * @param volumeData A reference to a VolumeData object to be populated.
+     * Compressed files are inflated on all cores when options.parallelGzip is set
+     * (block-parallel for BGZF, pipelined with the conversion otherwise) and converted
+     * to uint16 as the data streams in.
+     *
+     * @param stats Optional; receives per-phase timings and byte counts.
+     * @param options Decompression settings.
+     * @return true if loading was successful, false otherwise.
+     */
+    bool loadNIFTI(const std::string& filePath, VolumeData& volumeData, LoadStats* stats = nullptr,
+                   const LoadOptions& options = LoadOptions());
+
+    // Lower-case name of a NIfTI datatype code ("uint8", "int16", "float32", ...), "" if unknown
+    const char* niftiDataTypeName(int datatype);
+
+    /**
+     * @brief Loads a chunk store (.mvrc, see ChunkStore.h): full resolution, or the finest
+     *        pyramid level that fits the host memory budget (see MemoryBudget.h).
+     *
+     * Chunks are read and inflated in parallel on options.threads, each straight into
+     * its place in the volume.
+     *
+     * @return true if loading was successful, false otherwise.
+     */
+    bool loadChunkStore(const std::string& filePath, VolumeData& volumeData, LoadStats* stats = nullptr,
+                        const LoadOptions& options = LoadOptions());
+
+    /**
+     * @brief Loads a NIfTI segmentation mask as a run-length encoded label map.
+     *
+     * Raw voxel values (after scl_slope/scl_inter, rounded) are kept as labels 0..255
+     * instead of being rescaled like loadNIFTI does; values outside that range are
+     * clamped with a warning. Slices are converted and encoded in parallel, so only the
+     * file's own data blob exists densely, and only while loading.
+     *
+     * @param labels Receives the encoded labels and dimensions.
      * @return true if loading was successful, false otherwise.
      */
-    bool loadNIFTI(const std::string& filePath, VolumeData& volumeData);
+    bool loadNIFTILabels(const std::string& filePath, LabelMap& labels, LoadStats* stats = nullptr,
+                         const LoadOptions& options = LoadOptions());
 
 } // namespace DataLoader
 
@@ -0,0 +1,98 @@
+// backend/include/DicomWatch.h
+
+#ifndef DICOMWATCH_H
+#define DICOMWATCH_H
+
+#include <atomic>
+#include <condition_variable>
+#include <cstdint>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <unordered_map>
+#include <vector>
+
+#include "DataLoader.h"
+#include "MemoryBudget.h"
+#include "VolumeOps.h"
+
+// Follows a directory that a scanner is writing a DICOM series into.
+//
+// A background thread notices new files, through inotify on Linux (a file counts once
+// it is closed after writing or moved in) or, elsewhere or on request, by listing the
+// directory every interval (a file counts once its size is unchanged between two
+// listings). It reads each file's header, decodes the slices of the followed series and
+// queues them; the owner takes them with takeSlices() on its own thread. Only the new
+// files are read, so the work per slice does not grow with the series.
+//
+// The followed series is the largest one already in the directory when the watch
+// starts, or the series of the first slice to arrive. Subdirectories are not watched.
+class DicomWatch {
+public:
+    struct Slice {
+        DataLoader::DicomFileHeader header;
+        VolumeOps::SliceImage image;      // position = header.sortKey
+    };
+
+    DicomWatch() = default;
+    ~DicomWatch();
+    DicomWatch(const DicomWatch&) = delete;
+    DicomWatch& operator=(const DicomWatch&) = delete;
+
+    /**
+     * @brief Starts watching a directory. Files already in it are queued first, sorted
+     *        along the slice normal.
+     *
+     * @param directoryPath Directory the series is written into.
+     * @param polling List the directory every pollIntervalMs instead of using inotify.
+     * @return false if the directory cannot be read.
+     */
+    bool start(const std::string& directoryPath, bool polling = false, int pollIntervalMs = 250);
+    void stop();
+
+    bool isRunning() const { return m_worker.joinable(); }
+    bool isPolling() const { return m_polling; }
+    const std::string& directory() const { return m_directory; }
+    // "<SeriesInstanceUID>|<orientation>" of the followed series, "" until known
+    std::string seriesKey() const;
+
+    // Appends the decoded slices queued since the last call to out, in decode order
+    size_t takeSlices(std::vector<Slice>& out);
+    // Files seen so far, including non-DICOM files and other series
+    size_t filesSeen() const { return m_filesSeen.load(); }
+
+private:
+    void watchLoop();
+    bool initInotify();
+    void closeInotify();
+    bool readInotify(std::vector<std::string>& paths, bool& overflow);
+    std::vector<std::string> listDirectory(bool stableOnly);
+    void process(std::vector<std::string> paths, bool chooseSeries);
+    void enqueue(Slice&& slice);
+
+    std::string m_directory;
+    std::atomic<bool> m_polling{false};
+    int m_pollIntervalMs = 250;
+    int m_inotifyFd = -1;
+
+    // Per-file state (watch thread only)
+    struct FileState {
+        int64_t size = -1;    // at the previous listing (polling) or the failed read
+        bool done = false;    // read; only a new inotify event reads it again
+        bool failed = false;  // not a slice: read again only once its size changes
+    };
+    std::unordered_map<std::string, FileState> m_files;
+
+    // Decoded slices (guarded by m_mutex)
+    mutable std::mutex m_mutex;
+    std::vector<Slice> m_queue;
+    std::string m_seriesKey;
+    MemoryBudget::Allocation m_queueMemory{MemoryBudget::Category::LoadTemporary};
+
+    std::thread m_worker;
+    std::condition_variable m_stopCv;
+    bool m_stop = false;             // guarded by m_mutex
+    std::atomic<size_t> m_filesSeen{0};
+};
+
+#endif // DICOMWATCH_H
@@ -0,0 +1,141 @@
+// backend/include/FrameProfiler.h
+
+#ifndef FRAMEPROFILER_H
+#define FRAMEPROFILER_H
+
+#include <array>
+#include <chrono>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+// Phases of Renderer::render() that are timed individually.
+enum class FramePhase : int {
+    DeferredSetup = 0,
+    UniformSetup,
+    VolumeDraw,
+    SliceDraw,
+    BBoxDraw,
+    MeshDraw,
+    Count
+};
+
+constexpr int kFramePhaseCount = static_cast<int>(FramePhase::Count);
+
+// Percentiles of a per-frame timing series, in milliseconds.
+struct FrameTimePercentiles {
+    double p50 = 0.0;
+    double p95 = 0.0;
+    double p99 = 0.0;
+};
+
+// Aggregated statistics over the frames currently held in the ring buffer.
+struct FrameStats {
+    size_t frameCount = 0;     // frames with CPU timings
+    size_t gpuFrameCount = 0;  // frames whose GPU queries have resolved
+    FrameTimePercentiles cpu;
+    FrameTimePercentiles gpu;
+    std::array<double, kFramePhaseCount> phaseCpuMeanMs{};
+    std::array<double, kFramePhaseCount> phaseGpuMeanMs{};
+};
+
+// Records CPU (steady clock) and GPU (GL_TIME_ELAPSED) time per render phase
+// for the most recent frames. GPU results are read back a few frames late so
+// the profiler never stalls the pipeline waiting on a query.
+// Query objects are not shared between GL contexts, so a profiler belongs to one
+// context: the one current at the first beginFrame(). All methods that touch GL
+// must be called with that context current.
+class FrameProfiler {
+public:
+    static constexpr size_t kRingSize = 240;      // ~4 seconds at 60 FPS
+    static constexpr size_t kQuerySlots = 4;      // frames in flight before reading back
+
+    FrameProfiler() = default;
+    ~FrameProfiler() = default;
+    FrameProfiler(const FrameProfiler&) = delete;
+    FrameProfiler& operator=(const FrameProfiler&) = delete;
+
+    void setEnabled(bool enabled);
+    bool isEnabled() const { return m_enabled; }
+
+    void beginFrame();
+    void endFrame();
+    void beginPhase(FramePhase phase);
+    void endPhase(FramePhase phase);
+
+    FrameStats getStats() const;
+    void reset();
+    // Deletes the GL queries (context current); the next frame creates new ones
+    void releaseQueries();
+
+    // Writes the buffered frames as Chrome trace-event JSON (chrome://tracing, Perfetto).
+    bool writeChromeTrace(const std::string& path) const;
+
+    static const char* phaseName(FramePhase phase);
+
+private:
+    using Clock = std::chrono::steady_clock;
+
+    struct FrameRecord {
+        uint64_t frameIndex = 0;
+        double startUs = 0.0;                                  // relative to profiler epoch
+        double cpuTotalMs = 0.0;
+        double gpuTotalMs = -1.0;                              // < 0 until resolved
+        std::array<double, kFramePhaseCount> phaseStartUs{};
+        std::array<double, kFramePhaseCount> phaseCpuMs{};
+        std::array<double, kFramePhaseCount> phaseGpuMs{};
+        std::array<bool, kFramePhaseCount> phaseUsed{};
+    };
+
+    struct QuerySlot {
+        std::array<unsigned int, kFramePhaseCount> queries{};
+        std::array<bool, kFramePhaseCount> issued{};
+        uint64_t frameIndex = 0;
+        bool pending = false;
+    };
+
+    double nowUs() const;
+    void ensureQueries();
+    void resolveSlot(QuerySlot& slot);
+    FrameRecord* findRecord(uint64_t frameIndex);
+
+    bool m_enabled = true;
+    bool m_inFrame = false;
+    bool m_queriesReady = false;
+    int  m_activeGpuPhase = -1;
+    uint64_t m_frameIndex = 0;
+    Clock::time_point m_epoch = Clock::now();
+    Clock::time_point m_frameStart;
+    std::array<Clock::time_point, kFramePhaseCount> m_phaseStart{};
+
+    FrameRecord m_current;
+    std::vector<FrameRecord> m_ring;  // circular, capacity kRingSize
+    size_t m_ringHead = 0;            // next write position
+    std::array<QuerySlot, kQuerySlots> m_slots{};
+};
+
+// RAII helper: times a phase for the lifetime of the scope.
+class ScopedFramePhase {
+public:
+    ScopedFramePhase(FrameProfiler& profiler, FramePhase phase)
+        : m_profiler(profiler), m_phase(phase) { m_profiler.beginPhase(m_phase); }
+    ~ScopedFramePhase() { m_profiler.endPhase(m_phase); }
+    ScopedFramePhase(const ScopedFramePhase&) = delete;
+    ScopedFramePhase& operator=(const ScopedFramePhase&) = delete;
+private:
+    FrameProfiler& m_profiler;
+    FramePhase m_phase;
+};
+
+// RAII helper: brackets a whole frame so early returns still close it.
+class ScopedFrame {
+public:
+    explicit ScopedFrame(FrameProfiler& profiler) : m_profiler(profiler) { m_profiler.beginFrame(); }
+    ~ScopedFrame() { m_profiler.endFrame(); }
+    ScopedFrame(const ScopedFrame&) = delete;
+    ScopedFrame& operator=(const ScopedFrame&) = delete;
+private:
+    FrameProfiler& m_profiler;
+};
+
+#endif // FRAMEPROFILER_H
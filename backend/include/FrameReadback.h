@@ -0,0 +1,69 @@
+// backend/include/FrameReadback.h
+
+#ifndef FRAMEREADBACK_H
+#define FRAMEREADBACK_H
+
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+/**
+ * @brief Asynchronous pixel readback through a ring of pixel-pack buffers (PBOs).
+ *
+ * submit() queues a glReadPixels of the bound read framebuffer into the next buffer
+ * and fences it; the copy runs on the GPU while the caller renders the next frame.
+ * retrieve() maps the oldest buffer once its fence has signalled (waiting only if
+ * it has not), so with two or more buffers a frame is read back while the next one
+ * renders instead of stalling the pipeline like a synchronous glReadPixels.
+ * Memory is bounded by slots x width x height x 4 bytes of buffer storage.
+ * All methods that touch GL must be called with the render context current.
+ */
+class FrameReadback {
+public:
+    static constexpr size_t kDefaultSlots = 2;
+
+    FrameReadback() = default;
+    ~FrameReadback() = default;  // GL objects need a current context: call release()
+    FrameReadback(const FrameReadback&) = delete;
+    FrameReadback& operator=(const FrameReadback&) = delete;
+
+    // (Re)allocates the buffers for RGBA8 frames of the given size; drops pending frames
+    bool configure(int width, int height, size_t slots = kDefaultSlots);
+    void release();
+
+    /**
+     * @brief Starts reading the bound read framebuffer into the next free buffer.
+     * @param tag Caller's frame id, returned by retrieve().
+     * @return false if the ring is full (retrieve() first) or not configured.
+     */
+    bool submit(int64_t tag);
+    /**
+     * @brief Copies the oldest pending frame to `dst` (width*height*4 bytes, RGBA8,
+     * rows top-down) and frees its buffer.
+     * @return false if nothing is pending.
+     */
+    bool retrieve(uint8_t* dst, int64_t& tag);
+    // True if the oldest pending frame can be retrieved without waiting
+    bool oldestReady();
+
+    int width() const { return m_width; }
+    int height() const { return m_height; }
+    size_t slots() const { return m_slots.size(); }
+    size_t pending() const { return m_pending; }
+    bool full() const { return !m_slots.empty() && m_pending == m_slots.size(); }
+    size_t frameBytes() const { return static_cast<size_t>(m_width) * m_height * 4; }
+
+private:
+    struct Slot {
+        unsigned int pbo = 0;
+        void* fence = nullptr;  // GLsync
+        int64_t tag = 0;
+    };
+    std::vector<Slot> m_slots;
+    size_t m_head = 0;      // oldest pending slot
+    size_t m_pending = 0;
+    int m_width = 0;
+    int m_height = 0;
+};
+
+#endif // FRAMEREADBACK_H
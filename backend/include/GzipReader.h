@@ -0,0 +1,44 @@
+// backend/include/GzipReader.h
+
+#ifndef GZIPREADER_H
+#define GZIPREADER_H
+
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <string>
+
+// Multi-threaded gzip decompression that streams the output, in order, to a consumer.
+//
+// - BGZF files (blocked gzip, e.g. written by bgzip; every member carries its
+//   compressed size in a "BC" extra field) are inflated block-parallel on all cores.
+// - Any other gzip file (including plain multi-member files) is inflated on one
+//   background thread while the caller consumes the previous chunks, so
+//   decompression and conversion overlap.
+//
+// In both cases only a bounded window of decompressed chunks is held in memory.
+namespace GzipReader {
+
+    // Receives consecutive decompressed bytes on the calling thread.
+    // Return false to stop reading early (e.g. once all needed bytes arrived).
+    using ChunkConsumer = std::function<bool(const uint8_t* data, size_t size)>;
+
+    /**
+     * @brief Returns true if the file starts with a BGZF member header.
+     */
+    bool isBGZF(const std::string& path);
+
+    /**
+     * @brief Decompresses a gzip file and passes the output to consumer in stream order.
+     *
+     * @param path Path to a .gz file.
+     * @param consumer Called with consecutive output chunks on the calling thread.
+     * @param threads Worker threads for BGZF inflation (0 = Parallel::threadCount()).
+     * @return true if the stream was read completely (or the consumer stopped early),
+     *         false on I/O or format errors.
+     */
+    bool readStream(const std::string& path, const ChunkConsumer& consumer, unsigned int threads = 0);
+
+} // namespace GzipReader
+
+#endif // GZIPREADER_H
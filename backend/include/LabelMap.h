@@ -0,0 +1,86 @@
+// backend/include/LabelMap.h
+
+#ifndef LABELMAP_H
+#define LABELMAP_H
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+#include "Parallel.h"
+
+/**
+ * @brief Segmentation label volume (uint8 labels) stored run-length encoded.
+ *
+ * Runs are kept per z-slice (a run never crosses a slice boundary), so any slab of
+ * slices can be decoded on its own for upload and slices can be encoded in parallel.
+ * A mask with a few organs is mostly long background runs: a 512^3 volume with a
+ * handful of structures takes on the order of a few MB instead of 128 MB raw.
+ */
+class LabelMap {
+public:
+    static constexpr int kLabelCount = 256;
+
+    void clear();
+    bool empty() const { return m_depth == 0; }
+    unsigned int width() const { return m_width; }
+    unsigned int height() const { return m_height; }
+    unsigned int depth() const { return m_depth; }
+
+    // Encodes width*height*depth labels, x fastest (threads: 0 = all cores)
+    void encode(const uint8_t* labels, unsigned int width, unsigned int height, unsigned int depth,
+                unsigned int threads = 0);
+    /**
+     * @brief Encodes slice by slice from a producer, without a dense copy of the volume.
+     * @param fillSlice Called as fillSlice(z, dst) to write the width*height labels of
+     *        slice z; called concurrently for different slices.
+     */
+    template <typename FillSlice>
+    void encodeSlices(unsigned int width, unsigned int height, unsigned int depth, FillSlice&& fillSlice,
+                      unsigned int threads = 0);
+
+    // Decodes slices [firstZ, firstZ + count) into dst (count*width*height bytes)
+    void decodeSlices(unsigned int firstZ, unsigned int count, uint8_t* dst) const;
+    uint8_t at(unsigned int x, unsigned int y, unsigned int z) const;
+
+    size_t runCount() const { return m_runValues.size(); }
+    // Host memory held by the encoded runs and slice index
+    size_t memoryBytes() const;
+    // Voxels per label value
+    std::array<uint64_t, kLabelCount> histogram() const;
+
+private:
+    static void encodeSlice(const uint8_t* src, size_t count, std::vector<uint32_t>& lengths,
+                            std::vector<uint8_t>& values);
+    // Concatenates per-slice runs and builds the slice index
+    void assemble(std::vector<std::vector<uint32_t>>& lengths, std::vector<std::vector<uint8_t>>& values);
+
+    unsigned int m_width = 0;
+    unsigned int m_height = 0;
+    unsigned int m_depth = 0;
+    std::vector<uint32_t> m_runLengths;
+    std::vector<uint8_t> m_runValues;
+    std::vector<size_t> m_sliceRuns;  // depth + 1 entries: first run of each slice
+};
+
+template <typename FillSlice>
+void LabelMap::encodeSlices(unsigned int width, unsigned int height, unsigned int depth, FillSlice&& fillSlice,
+                            unsigned int threads) {
+    const size_t sliceSize = static_cast<size_t>(width) * height;
+    std::vector<std::vector<uint32_t>> lengths(depth);
+    std::vector<std::vector<uint8_t>> values(depth);
+    Parallel::parallelFor(0, depth, [&](size_t first, size_t last) {
+        std::vector<uint8_t> slice(sliceSize);
+        for (size_t z = first; z < last; ++z) {
+            fillSlice(static_cast<unsigned int>(z), slice.data());
+            encodeSlice(slice.data(), sliceSize, lengths[z], values[z]);
+        }
+    }, 1, threads);
+    m_width = width;
+    m_height = height;
+    m_depth = depth;
+    assemble(lengths, values);
+}
+
+#endif // LABELMAP_H
@@ -0,0 +1,73 @@
+// backend/include/LoadStats.h
+
+#ifndef LOADSTATS_H
+#define LOADSTATS_H
+
+#include <array>
+#include <chrono>
+#include <cstdint>
+#include <string>
+
+// Phases of a volume load. Not every loader uses every phase
+// (e.g. NIfTI has no sort, DICOM has no normalize).
+enum class LoadPhase : int {
+    Scan = 0,      // directory listing / stat
+    HeaderParse,   // reading headers / metadata
+    Sort,          // ordering slices
+    Decode,        // reading and decompressing pixel data
+    Resample,      // regridding uneven/mismatched DICOM slices (and isotropic resampling)
+    Normalize,     // converting to the uint16 working format
+    Gradient,      // gradient volume for shading (only when shading is enabled)
+    Projection,    // axis MIP images for the aligned views
+    Upload,        // GL texture upload (filled on the first frame after a load)
+    Count
+};
+
+constexpr int kLoadPhaseCount = static_cast<int>(LoadPhase::Count);
+
+// Structured timing and counters for the most recent load.
+struct LoadStats {
+    std::string path;
+    std::string format;            // "nifti", "dicom", ...
+    std::string dataType;          // voxel type of the source ("int16", "float32", ...), "" if unknown
+    bool success = false;
+    double totalMs = 0.0;
+    std::array<double, kLoadPhaseCount> phaseMs{};
+    uint64_t filesScanned = 0;     // directory entries considered
+    uint64_t filesParsed = 0;      // files whose header was read successfully
+    uint64_t filesSkipped = 0;     // files rejected (not DICOM, unreadable, ...)
+    uint64_t filesCached = 0;      // headers served from the persistent index instead of parsed
+    uint64_t bytesRead = 0;        // bytes read from disk (compressed size for .gz)
+    uint64_t bytesOutput = 0;      // bytes in the resulting VolumeData buffer
+    unsigned int reduction = 1;    // box filter applied while decoding to fit the host budget (1 = none)
+
+    void clear() { *this = LoadStats{}; }
+
+    static const char* phaseName(LoadPhase phase);
+};
+
+// Adds the elapsed wall time of its scope to a LoadStats phase.
+// A null stats pointer turns it into a no-op, so loaders can be called without stats.
+class ScopedLoadPhase {
+public:
+    ScopedLoadPhase(LoadStats* stats, LoadPhase phase)
+        : m_stats(stats), m_phase(phase), m_start(std::chrono::steady_clock::now()) {}
+    ~ScopedLoadPhase() { stop(); }
+    ScopedLoadPhase(const ScopedLoadPhase&) = delete;
+    ScopedLoadPhase& operator=(const ScopedLoadPhase&) = delete;
+
+    // Ends the phase early (idempotent).
+    void stop() {
+        if (!m_stats) return;
+        auto elapsed = std::chrono::steady_clock::now() - m_start;
+        m_stats->phaseMs[static_cast<int>(m_phase)] += std::chrono::duration<double, std::milli>(elapsed).count();
+        m_stats = nullptr;
+    }
+
+private:
+    LoadStats* m_stats;
+    LoadPhase m_phase;
+    std::chrono::steady_clock::time_point m_start;
+};
+
+#endif // LOADSTATS_H
@@ -0,0 +1,92 @@
+// backend/include/MemoryBudget.h
+
+#ifndef MEMORYBUDGET_H
+#define MEMORYBUDGET_H
+
+#include <array>
+#include <cstdint>
+
+// Process-wide accounting of the large allocations: voxel buffers, loader temporaries,
+// caches and GL textures. Owners register their bytes through Allocation objects, so
+// the counters stay right with several renderers or loads in one process. Budgets are
+// advisory: the Renderer checks them before it allocates and degrades (evicts caches,
+// downsamples, stores textures at 8 bits) instead of running out of memory.
+namespace MemoryBudget {
+
+    enum class Pool : int { Host = 0, Device = 1, Count };
+
+    constexpr int kPoolCount = static_cast<int>(Pool::Count);
+
+    enum class Category : int {
+        Volume = 0,         // VolumeData voxels
+        LoadTemporary,      // loader staging and conversion buffers, resampling copies
+        TimeFrames,         // decoded 4D frames in the ring cache
+        Gradients,          // CPU gradient volume (until uploaded)
+        Projections,        // axis MIP images
+        BlockIndex,         // isosurface min/max blocks
+        Labels,             // run-length encoded label map
+        Mesh,               // isosurface mesh
+        FusionVolume,       // second volume drawn fused with the first
+        VolumeTexture,      // GPU from here on
+        GradientTexture,
+        LabelTexture,
+        ProjectionTexture,
+        MeshBuffers,
+        TransferTexture,    // colormap LUTs and pre-integration table
+        FusionTexture,
+        Count
+    };
+
+    constexpr int kCategoryCount = static_cast<int>(Category::Count);
+
+    Pool poolOf(Category category);
+    const char* poolName(Pool pool);         // "host", "device"
+    const char* categoryName(Category category);
+
+    // Budget of a pool in bytes; 0 = unlimited (the default)
+    void setBudget(Pool pool, uint64_t bytes);
+    uint64_t budget(Pool pool);
+    uint64_t used(Pool pool);
+    uint64_t used(Category category);
+    // Highest usage since the last resetPeak
+    uint64_t peak(Pool pool);
+    void resetPeak(Pool pool);
+    // True if `bytes` more (minus `freed` released first) stay within the pool's budget
+    bool fits(Pool pool, uint64_t bytes, uint64_t freed = 0);
+    // Size of an axis of `size` samples after a box reduction by `factor` (partial blocks kept)
+    inline uint64_t reducedSize(uint64_t size, unsigned int factor) { return (size + factor - 1) / factor; }
+    // Smallest power-of-two factor f for which a width x height x depth grid reduced by f
+    // on every axis, at `bytesPerVoxel` per reduced voxel plus `fixedBytes`, fits the
+    // pool (`freed` bytes released first); 0 if not even a single voxel does.
+    unsigned int reductionFactor(Pool pool, uint64_t width, uint64_t height, uint64_t depth,
+                                 uint64_t bytesPerVoxel, uint64_t fixedBytes = 0, uint64_t freed = 0);
+
+    struct Usage {
+        std::array<uint64_t, kCategoryCount> bytes{};
+        std::array<uint64_t, kPoolCount> used{};
+        std::array<uint64_t, kPoolCount> peak{};
+        std::array<uint64_t, kPoolCount> budget{};
+    };
+    Usage snapshot();
+
+    // Bytes one owner holds in a category. The destructor releases them, so a local
+    // Allocation brackets a temporary the way ScopedLoadPhase brackets a phase.
+    class Allocation {
+    public:
+        explicit Allocation(Category category, uint64_t bytes = 0);
+        ~Allocation();
+        Allocation(const Allocation&) = delete;
+        Allocation& operator=(const Allocation&) = delete;
+
+        void resize(uint64_t bytes);
+        void release() { resize(0); }
+        uint64_t bytes() const { return m_bytes; }
+
+    private:
+        Category m_category;
+        uint64_t m_bytes = 0;
+    };
+
+} // namespace MemoryBudget
+
+#endif // MEMORYBUDGET_H
@@ -0,0 +1,131 @@
+// backend/include/NiftiTimeSeries.h
+
+#ifndef NIFTITIMESERIES_H
+#define NIFTITIMESERIES_H
+
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "MemoryBudget.h"
+#include "VolumeData.h"
+
+// Lazily decoded frames of a 4D (or higher) NIfTI file.
+//
+// Only a bounded ring of decoded uint16 frames is kept in memory:
+// - uncompressed .nii/.img data is memory-mapped and any frame is decoded directly,
+// - .gz data is decoded sequentially (seeking backwards rewinds the stream),
+// and a background thread decodes the next few frames ahead of playback.
+// The .gz stream is inflated with zlib on one thread. GzipReader's parallel inflate is
+// not used: it streams a file once from the start and cannot stop and resume at a
+// frame, so playback would re-inflate every earlier frame on each step.
+//
+// All frames are normalized with one range so intensities do not flicker during
+// playback: cal_min/cal_max if the header sets them, otherwise the range of frame 0
+// (values of later frames outside it are clamped; frame 0 is decoded once, while the
+// range is taken). uint8/uint16 data maps directly, exactly as in DataLoader::loadNIFTI.
+class NiftiTimeSeries {
+public:
+    using Frame = std::shared_ptr<const std::vector<uint16_t>>;
+
+    NiftiTimeSeries() = default;
+    ~NiftiTimeSeries();
+    NiftiTimeSeries(const NiftiTimeSeries&) = delete;
+    NiftiTimeSeries& operator=(const NiftiTimeSeries&) = delete;
+
+    /**
+     * @brief Reads the header of a NIfTI file and prepares frame access.
+     *
+     * Succeeds for 3D files too (frameCount() == 1); callers decide whether a
+     * time series is worth keeping.
+     *
+     * @param filePath Path to a .nii, .nii.gz or .hdr file.
+     * @param cacheFrames Number of decoded frames kept in the ring (>= 2).
+     * @return true if the header was read and the datatype is supported.
+     */
+    bool open(const std::string& filePath, size_t cacheFrames = 8);
+
+    // Number of frames from the header alone (0 if the file cannot be read).
+    static size_t probeFrameCount(const std::string& filePath);
+
+    void close();
+
+    bool isOpen() const { return m_frameCount > 0; }
+    size_t frameCount() const { return m_frameCount; }
+    double frameInterval() const { return m_frameInterval; } // pixdim[4], in the file's time units
+    int datatype() const { return m_datatype; }                // NIfTI datatype code of the file
+
+    // Fills dimensions and spacing of a single frame (no voxel data).
+    void describe(VolumeData& volumeData) const;
+
+    /**
+     * @brief Returns the decoded frame, decoding it on the calling thread if it is
+     * not cached, and schedules the following frames for background decoding.
+     * @return nullptr on read errors or an out-of-range index.
+     */
+    Frame acquire(size_t frame);
+
+    // Ring capacity in frames (clamped to >= 2); shrinking evicts the oldest frames.
+    void setCacheFrames(size_t frames);
+    size_t cacheFrames() const;
+
+private:
+    struct Slot {
+        size_t frame;
+        Frame data;
+    };
+
+    bool decode(size_t frame, std::vector<uint16_t>& out);
+    bool readRaw(size_t frame, uint8_t* dst);
+    void convert(const uint8_t* raw, std::vector<uint16_t>& out) const;
+    Frame lookup(size_t frame);
+    void insert(size_t frame, Frame data);
+    void prefetchLoop();
+
+    // Header
+    std::string m_dataPath;
+    bool m_compressed = false;
+    int m_datatype = 0;
+    size_t m_bytesPerVoxel = 0;
+    bool m_swap = false;
+    uint64_t m_dataOffset = 0;
+    unsigned int m_nx = 0, m_ny = 0, m_nz = 0;
+    double m_dx = 1.0, m_dy = 1.0, m_dz = 1.0;
+    size_t m_frameCount = 0;
+    double m_frameInterval = 0.0;
+    double m_slope = 1.0, m_inter = 0.0;
+    double m_rangeMin = 0.0, m_rangeMax = 0.0; // normalization range after slope/inter
+
+    size_t frameVoxels() const { return static_cast<size_t>(m_nx) * m_ny * m_nz; }
+    size_t frameBytes() const { return frameVoxels() * m_bytesPerVoxel; }
+
+    // Raw data access (guarded by m_ioMutex)
+    std::mutex m_ioMutex;
+    const uint8_t* m_map = nullptr;  // mmap of the uncompressed data file
+    size_t m_mapSize = 0;
+    void* m_gz = nullptr;            // gzFile of the compressed data file
+    uint64_t m_gzPos = 0;            // current decompressed offset
+    std::vector<uint8_t> m_rawBuffer;
+
+    // Decoded frame ring (guarded by m_ringMutex)
+    mutable std::mutex m_ringMutex;
+    std::vector<Slot> m_ring;
+    size_t m_ringNext = 0;
+    size_t m_ringCapacity = 8;
+    MemoryBudget::Allocation m_ringMemory{MemoryBudget::Category::TimeFrames};
+    void trackRing() { m_ringMemory.resize(m_ring.size() * frameVoxels() * sizeof(uint16_t)); }
+
+    // Prefetch worker
+    std::thread m_worker;
+    std::condition_variable m_workCv;
+    std::deque<size_t> m_pending;   // guarded by m_ringMutex
+    bool m_stopWorker = false;      // guarded by m_ringMutex
+};
+
+#endif // NIFTITIMESERIES_H
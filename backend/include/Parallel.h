@@ -0,0 +1,69 @@
+// backend/include/Parallel.h
+
+#ifndef PARALLEL_H
+#define PARALLEL_H
+
+#include <algorithm>
+#include <atomic>
+#include <cstddef>
+#include <thread>
+#include <vector>
+
+// Minimal fork-join helpers for the CPU-side volume kernels (loaders, resampling, ...).
+// No pool is kept alive between calls: the kernels are coarse (whole volumes), so
+// thread start-up cost is negligible next to the work.
+namespace Parallel {
+
+    // Worker count override; 0 means "use all hardware threads".
+    inline std::atomic<unsigned int> g_threadOverride{0};
+
+    inline void setThreadCount(unsigned int threads) { g_threadOverride.store(threads); }
+
+    inline unsigned int threadCount() {
+        unsigned int n = g_threadOverride.load();
+        if (n == 0) n = std::thread::hardware_concurrency();
+        return std::max(1u, n);
+    }
+
+    /**
+     * @brief Calls fn(begin, end) on disjoint sub-ranges of [first, last) across threads.
+     *
+     * The range is split into chunks of at least `grain` items that threads pull
+     * dynamically, so uneven work (e.g. empty slabs) still balances. The calling
+     * thread participates. Returns once every chunk has been processed.
+     */
+    template <typename Fn>
+    void parallelFor(size_t first, size_t last, Fn&& fn, size_t grain = 1, unsigned int threads = 0) {
+        if (last <= first) return;
+        const size_t count = last - first;
+        unsigned int workers = threads ? threads : threadCount();
+        grain = std::max<size_t>(1, grain);
+        // ~4 chunks per worker for load balancing
+        size_t chunk = std::max(grain, count / (static_cast<size_t>(workers) * 4));
+        const size_t numChunks = (count + chunk - 1) / chunk;
+        workers = static_cast<unsigned int>(std::min<size_t>(workers, numChunks));
+
+        if (workers <= 1) {
+            fn(first, last);
+            return;
+        }
+
+        std::atomic<size_t> next{0};
+        auto worker = [&]() {
+            for (size_t c = next.fetch_add(1); c < numChunks; c = next.fetch_add(1)) {
+                size_t b = first + c * chunk;
+                size_t e = std::min(last, b + chunk);
+                fn(b, e);
+            }
+        };
+
+        std::vector<std::thread> pool;
+        pool.reserve(workers - 1);
+        for (unsigned int t = 1; t < workers; ++t) pool.emplace_back(worker);
+        worker();
+        for (auto& th : pool) th.join();
+    }
+
+} // namespace Parallel
+
+#endif // PARALLEL_H
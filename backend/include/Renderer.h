@@ -7,8 +7,20 @@
 
 #include "VolumeData.h"
 #include "Camera.h"
+#include "FrameProfiler.h"
+#include "LoadStats.h"
+#include "NiftiTimeSeries.h"
+#include "DicomWatch.h"
+#include "TriangleMesh.h"
+#include "LabelMap.h"
+#include "MemoryBudget.h"
+#include "VolumeOps.h"
+#include <array>
 #include <string>
 #include <memory>
+#include <vector>
+#include <chrono>
+#include "DataLoader.h"
 #include "../glad/glad.hpp"
 
 class Renderer {
@@ -20,6 +32,69 @@ public:
     bool loadVolume(const std::string& path);
     VolumeData* getVolume();
 
+    // DICOM series discovery. Directories are searched recursively; series are grouped
+    // by SeriesInstanceUID and orientation, largest first. loadVolume() on a directory
+    // loads the largest series. loadDICOMSeries() reuses the last listing of the same
+    // directory unless a stat() sweep finds files added, removed or rewritten since.
+    const std::vector<DataLoader::DicomSeriesInfo>& listDICOMSeries(const std::string& directoryPath);
+    bool loadDICOMSeries(const std::string& directoryPath, const std::string& seriesKey);
+    // Directory for persistent caches (e.g. the DICOM header index); empty disables them.
+    void setCacheDirectory(const std::string& dir);
+    const std::string& getCacheDirectory() const;
+    // Writes the loaded volume (the displayed time frame) as a chunk store (.mvrc), which
+    // loadVolume() reads back; see ChunkStore.h. Compresses on the loader threads.
+    bool saveChunkStore(const std::string& path, unsigned int chunkSize = 64, unsigned int levels = 0,
+                        int compression = 1) const;
+
+    // Structured timings/counters of the most recent load. The "upload" phase is
+    // filled in on the first frame rendered after the load.
+    const LoadStats& getLoadStats() const;
+    // Loader log verbosity: 0=errors only, 1=summary (default), 2=per-file
+    void setLoadVerbosity(int level);
+    int getLoadVerbosity() const;
+    // Multi-threaded .nii.gz decompression (on by default) and the loader thread count (0 = all cores)
+    void setParallelGzip(bool enabled);
+    bool getParallelGzip() const;
+    void setLoadThreads(unsigned int threads);
+    unsigned int getLoadThreads() const;
+    // DICOM stacking: interpolation for regridded slices (0 = nearest, 1 = trilinear)
+    // and optional resampling to cubic voxels. Applies to the next load.
+    void setResampleInterpolation(int mode);
+    int getResampleInterpolation() const;
+    void setResampleIsotropic(bool enabled);
+    bool getResampleIsotropic() const;
+
+    // 4D NIfTI time series. Frames are decoded lazily into a bounded cache; switching
+    // frames re-uploads the 3D texture in place. A 3D volume has one frame.
+    int getTimeFrameCount() const;
+    int getTimeFrame() const;
+    bool setTimeFrame(int frame);
+    double getTimeFrameInterval() const;      // pixdim[4] of the file (0 if unknown)
+    void setTimeFrameCacheSize(int frames);   // decoded frames kept in memory (>= 2)
+    int getTimeFrameCacheSize() const;
+
+    // --- Live DICOM watch ---
+    /**
+     * @brief Shows a DICOM series while it is being written into a directory.
+     *
+     * Replaces the loaded volume. A DicomWatch thread decodes each new file of the
+     * series as it arrives (inotify, or listing the directory every pollIntervalMs when
+     * polling is set or inotify is unavailable). pollDicomWatch(), called from the GUI
+     * thread, inserts the decoded slices into the volume in order along the slice normal,
+     * and the next frame re-uploads only the Z-range from the first changed slice on.
+     * The volume and its texture grow by doubling, so a slice appended at the end costs
+     * one slice of copying and upload whatever the series length. Slices are assumed
+     * evenly spaced (spacing_z is the mean gap) and must match the first slice's size;
+     * others are skipped. Shading gradients and axis projections are rebuilt, and the
+     * texture trimmed, once the watch stops.
+     */
+    bool startDicomWatch(const std::string& directoryPath, bool polling = false, int pollIntervalMs = 250);
+    void stopDicomWatch();
+    bool isDicomWatching() const;
+    bool isDicomWatchPolling() const;
+    // Inserts the slices decoded since the last call; returns how many (0 if none)
+    int pollDicomWatch();
+
     // lightweight getters for metadata
     bool isVolumeLoaded() const;
     unsigned int getVolumeWidth() const;
@@ -29,55 +104,421 @@ public:
     double getVolumeSpacingY() const;
     double getVolumeSpacingZ() const;
 
+    // --- Views ---
+    // Several widgets can show the same volume at once (e.g. 3D + axial/coronal/sagittal).
+    // Each view has its own camera, slice state and viewport; the volume texture, LUT,
+    // shaders and vertex buffers exist once and are shared, so the GL contexts must be
+    // in one share group (Qt: AA_ShareOpenGLContexts). View 0 always exists and is
+    // what the methods below act on when no view is given.
+    int createView();
+    void destroyView(int view);          // call with the view's GL context current
+    int getViewCount() const;
+    // True if the view or the shared scene changed since the view was last rendered
+    bool needsRedraw(int view = 0) const;
+    // Lock a view's camera to look along an axis normal (0=Z,1=Y,2=X; -1 = free orbit)
+    void setViewOrientation(int axis, int view = 0);
+    // VRAM held by the shared textures (volume, LUT, gradients), independent of the view count
+    size_t getTextureMemoryBytes() const;
+
+    // --- Memory budgets ---
+    /**
+     * @brief Host and VRAM budgets in bytes (0 = unlimited), shared by the process.
+     *
+     * Every large buffer is counted in MemoryBudget (voxels, loader temporaries, frame
+     * and gradient caches, textures). NIfTI and DICOM loads pick a power-of-two reduction
+     * from the header and box-filter while decoding, or are refused when nothing fits. When
+     * a load still ends over the host budget, caches are evicted, then the volume is
+     * downsampled once by the factor that fits (3D volumes only). When the
+     * volume texture would exceed the VRAM budget, or the driver's reported free VRAM,
+     * or the allocation fails with GL_OUT_OF_MEMORY, it is stored at 8 bits, then at
+     * 1/2, 1/4, ... resolution. Gradients that do not fit turn shading off. Each step
+     * taken is listed in MemoryStatus::actions.
+     */
+    void setHostMemoryBudget(uint64_t bytes);
+    uint64_t getHostMemoryBudget() const;
+    void setDeviceMemoryBudget(uint64_t bytes);
+    uint64_t getDeviceMemoryBudget() const;
+    struct MemoryStatus {
+        MemoryBudget::Usage usage;
+        int64_t deviceTotalBytes = -1;      // as reported by the driver (NVX_gpu_memory_info), -1 if unknown
+        int64_t deviceAvailableBytes = -1;
+        int volumeTextureBits = 16;         // 8 when degraded
+        int volumeTextureFactor = 1;        // texture downsampling per axis
+        std::vector<std::string> actions;   // degradations applied since the last load
+    };
+    MemoryStatus getMemoryStatus();
+
     // --- Core OpenGL Methods ---
-    void init();
-    void render();
-    void resize(int width, int height);
+    void init(int view = 0);
+    void render(int view = 0);
+    void resize(int width, int height, int view = 0);
 
     // --- Camera Control ---
-    void camera_rotate(float dx, float dy);
-    void camera_zoom(float delta);
-    void set_camera_angles(float azimuthDeg, float elevationDeg);
+    void camera_rotate(float dx, float dy, int view = 0);
+    void camera_zoom(float delta, int view = 0);
+    void set_camera_angles(float azimuthDeg, float elevationDeg, int view = 0);
+    glm::vec2 get_camera_angles(int view = 0) const;  // (azimuth, elevation) in degrees
+    Camera getCamera(int view = 0) const;              // copy of the view's camera
 
 
     void setupBoundingBox();
+    void compileBoundingBoxShader();
     void setupVolumeTexture();
     void setupProxyCube();
     void setupFullscreenQuad();
     void setupColormapLUT();
+    void uploadColormap(unsigned int& texture, int preset);
+    void trackTransferTextures();
+    void uploadVolumeFrame();
+    void setupGradientTexture();
 
     // Controls
     void setShowBoundingBox(bool show);
     void setColormapPreset(int presetIndex);
     void setBackgroundColor(float r, float g, float b);
     void setBoundingBoxScale(float scale);
-    void frameCameraToBox();
+    void frameCameraToBox(int view = 0);
+    /**
+     * @brief Switches the 3D view between MIP and shaded compositing.
+     *
+     * Shading uses a gradient volume (VolumeOps::computeGradients) computed once per
+     * load, or per 4D frame, and uploaded as an RGB8 texture next to the scalar one.
+     */
+    void setShadingEnabled(bool enabled);
+    bool isShadingEnabled() const;
+    /**
+     * @brief Ray sampling rate relative to the default 256 samples across the volume
+     *        diagonal, clamped to 0.25..2. Lower is faster.
+     *
+     * With pre-integration on, the shaded mode takes each step's colour and opacity from a
+     * table over (front, back) sample pairs (VolumeOps::buildPreintegrationTable) instead
+     * of point-sampling the LUT, so colormaps with hard bands do not band at coarse steps.
+     * It is off by default: it treats the signal as linear between samples, which for the
+     * smooth built-in presets is less accurate than sampling at step centres (1.4x to
+     * 3.6x the RMS error at the same quality, see bench_preintegration.py). The table is
+     * rebuilt when the colormap or the quality changes. MIP is unaffected by
+     * pre-integration: the maximum of a linear segment is one of its samples.
+     */
+    void setRenderQuality(float quality);
+    float getRenderQuality() const;
+    void setPreintegrationEnabled(bool enabled);
+    bool isPreintegrationEnabled() const;
+
+    // --- Region of interest ---
+    /**
+     * @brief Restricts rendering to the voxel box [min, max) on each axis.
+     *
+     * Rays are clipped to the box in the shader, so frame time falls with the cropped
+     * volume. The bounding box, slices and camera framing (frameCameraToBox, Reset View)
+     * follow the crop. Bounds are clamped to the volume, and a box covering the whole
+     * volume clears the crop. The crop is cleared when a new volume is loaded.
+     */
+    void setCropBox(int minX, int minY, int minZ, int maxX, int maxY, int maxZ);
+    void clearCropBox();
+    bool hasCropBox() const;
+    // (minX, minY, minZ, maxX, maxY, maxZ); the whole volume when not cropped
+    std::array<int, 6> getCropBox() const;
+    /**
+     * @brief Keeps only the cropped sub-volume on the GPU.
+     *
+     * The volume and gradient textures are reallocated at the crop size. They are
+     * filled straight from the full CPU volume through the GL_UNPACK_* row/image
+     * strides, so no cropped copy is made. VRAM then scales with the crop. Changing
+     * the crop re-uploads the textures, and 4D frames upload only the crop.
+     */
+    void setCropUploadEnabled(bool enabled);
+    bool getCropUploadEnabled() const;
+
+    // --- Segmentation labels ---
+    /**
+     * @brief Loads a NIfTI mask as a label overlay on the current volume.
+     *
+     * The mask must have the volume's dimensions. Labels are kept run-length encoded
+     * in host memory (LabelMap) and uploaded as an 8-bit, nearest-sampled texture
+     * (decoded a slab at a time). The 3D view tints the nearest visible label along
+     * each ray, and the slices tint labelled pixels. Colours and visibility live in a
+     * 256-entry table, so toggling a label re-uploads 1 KB. Loading a new volume
+     * clears the labels.
+     */
+    bool loadLabelMap(const std::string& path);
+    void clearLabelMap();
+    bool hasLabelMap() const;
+    // (label, voxel count) for every label present, background (0) excluded
+    std::vector<std::pair<int, uint64_t>> getLabelCounts() const;
+    size_t getLabelMapMemoryBytes() const;  // host memory of the encoded labels
+    void setLabelColor(int label, float r, float g, float b);
+    glm::vec3 getLabelColor(int label) const;
+    void setLabelVisible(int label, bool visible);
+    bool getLabelVisible(int label) const;
+    void setLabelOpacity(float opacity);    // blend weight of label colours, 0..1
+    float getLabelOpacity() const;
+    void setShowLabels(bool show);
+    bool getShowLabels() const;
+
+    // --- Fusion (second volume) ---
+    /**
+     * @brief Loads a second volume (e.g. PET over CT) that is drawn fused with the current one.
+     *
+     * The fusion volume keeps its own dimensions and spacing. It is placed centred on the
+     * primary volume, shifted by setFusionOffset, and sampled through its own
+     * world-to-texture transform instead of being resampled onto the primary grid. Rays are
+     * marched once and read both volumes at every sample. Each layer (0 = primary, 1 = fusion)
+     * has a window and can be hidden; the fusion layer has its own colormap and an opacity.
+     * All of these are uniforms or a 1 KB LUT, so changing them re-uploads no volume.
+     * Loading a new primary volume clears the fusion volume.
+     */
+    bool loadFusionVolume(const std::string& path);
+    void clearFusionVolume();
+    bool hasFusionVolume() const;
+    std::array<unsigned int, 3> getFusionDimensions() const;  // (width, height, depth); zeros without one
+    glm::vec3 getFusionSpacing() const;
+    void setFusionOffset(float x, float y, float z);           // mm, fusion centre relative to the primary's
+    glm::vec3 getFusionOffset() const;
+    void setFusionColormapPreset(int presetIndex);
+    int getFusionColormapPreset() const;
+    void setFusionOpacity(float opacity);                      // blend weight of the fusion layer, 0..1
+    float getFusionOpacity() const;
+    // Window [low, high] in voxel units (0..65535) mapped onto the layer's colormap
+    void setLayerWindow(int layer, float low, float high);
+    glm::vec2 getLayerWindow(int layer) const;
+    void setLayerVisible(int layer, bool visible);
+    bool isLayerVisible(int layer) const;
+
+    // --- Axis projections ---
+    /**
+     * @brief Draws views at an exact axis pose from precomputed axis MIPs.
+     *
+     * The three axis MIP images (VolumeOps::computeAxisProjections) are computed once
+     * per load, or per 4D frame when first needed, and kept as 2D textures. While a 3D
+     * view looks straight along Z, Y or X (azimuth 0/90/180/270 at elevation 0, or
+     * elevation +-89 and beyond, as set by View Z/Y/X) in MIP mode with no crop or
+     * label overlay, the image is drawn as one quad through the volume centre instead
+     * of raymarching. Parallax inside the volume is not reproduced. Orbiting away
+     * returns to raymarching.
+     */
+    void setAxisProjectionsEnabled(bool enabled);
+    bool getAxisProjectionsEnabled() const;
+    // MIP image along axis 0 = Z, 1 = Y, 2 = X (see VolumeOps::AxisProjections); computed if needed
+    const std::vector<uint16_t>& getAxisProjection(int axis, unsigned int& width, unsigned int& height);
+    // True if the projections of the current volume (or frame) are already computed
+    bool hasAxisProjections() const;
+    // Axis drawn from the projections in the view's last frame, or -1 if it was raymarched
+    int getProjectedAxis(int view = 0) const;
+
+    // --- Oblique reformat (CPU) ---
+    /**
+     * @brief Resamples the loaded volume on oblique planes, without GL.
+     *
+     * Planes are in physical mm (see VolumeOps::ObliquePlane). Writes planes.size()
+     * images of width*height into out. Returns false if no volume is loaded.
+     */
+    bool reslice(const std::vector<VolumeOps::ObliquePlane>& planes, unsigned int width, unsigned int height,
+                 uint16_t* out, VolumeOps::Interpolation interpolation = VolumeOps::Interpolation::Linear,
+                 uint16_t background = 0) const;
+
+    // --- Isosurface ---
+    /**
+     * @brief Extracts the isosurface of the current volume (or 4D frame) with marching cubes.
+     *
+     * The result replaces the previous mesh and is drawn in the 3D views when shown.
+     * @param isoValue Threshold in voxel units (0..65535, as returned by get_volume_as_numpy).
+     * @param useBlockIndex Skip 8^3 blocks the threshold cannot cut (index built once per volume).
+     * @return Number of triangles.
+     */
+    size_t extractIsosurface(float isoValue, bool useBlockIndex = true);
+    const TriangleMesh& getMesh() const;
+    void clearMesh();
+    // Writes the mesh as binary .ply or .stl (by extension)
+    bool exportMesh(const std::string& path) const;
+    void setShowMesh(bool show);
+    bool getShowMesh() const;
     // Slicer controls
-    void setSliceMode(bool enabled);
-    void setSliceAxis(int axis);     // 0=Z,1=Y,2=X
-    void setSliceIndex(int index);
+    void setSliceMode(bool enabled, int view = 0);
+    void setSliceAxis(int axis, int view = 0);     // 0=Z,1=Y,2=X
+    void setSliceIndex(int index, int view = 0);
+    int getSliceIndex(int view = 0) const;
+    /**
+     * @brief Thick-slab projection in slice mode.
+     *
+     * With a thickness > 0 the slicer shows the max (0, MIP), min (1, MinIP) or mean (2)
+     * of the slices within thicknessMm centred on the slice index (see
+     * VolumeOps::slabRange), sampled only inside the slab. 0 mm shows the single slice.
+     */
+    void setSlabThickness(float thicknessMm, int view = 0);
+    float getSlabThickness(int view = 0) const;
+    void setSlabMode(int mode, int view = 0);
+    int getSlabMode(int view = 0) const;
+    // The view's current slab (or slice) computed on the CPU, laid out like getAxisProjection
+    bool getSlabProjection(int view, std::vector<uint16_t>& image, unsigned int& width, unsigned int& height) const;
+
+    // Frame profiler (CPU + GPU time per render phase over recent frames), one per view:
+    // its GPU queries live in the view's GL context and its frames are that view's draws
+    void setProfilingEnabled(bool enabled);
+    bool isProfilingEnabled() const;
+    FrameStats getFrameStats(int view = 0) const;
+    void resetFrameStats(int view = 0);
+    bool exportFrameTrace(const std::string& path, int view = 0) const;
 
 private:
+    // Per-view state. VAOs are container objects and are not shared between GL
+    // contexts, so each view builds its own over the shared buffers.
+    struct ViewState {
+        Camera camera;
+        int width = 0, height = 0;
+        bool sliceMode = false;
+        int sliceAxis = 0;     // 0=Z,1=Y,2=X
+        int sliceIndex = 0;
+        float slabThickness = 0.0f; // mm; 0 = single slice
+        int slabMode = 0;           // VolumeOps::SlabMode
+        int alignAxis = -1;    // see setViewOrientation
+        int projectedAxis = -1; // see getProjectedAxis
+        bool shouldFrameCamera = true;
+        bool dirty = true;
+        uint64_t drawnSceneRevision = 0;
+        unsigned int fullscreenQuadVAO = 0;
+        unsigned int boundingBoxVAO = 0;
+        unsigned int sliceVAO = 0;
+        unsigned int sliceVBO = 0;
+        unsigned int meshVAO = 0;
+        FrameProfiler profiler;
+    };
+    ViewState* getView(int view);
+    const ViewState* getView(int view) const;
+    void ensureViewObjects(ViewState& view);
+    void applyViewFraming(ViewState& view);
+    void touchScene() { ++m_sceneRevision; }
+
     std::unique_ptr<VolumeData> m_volumeData;
-    // Orbital Camera
-    Camera m_camera;
+    std::vector<std::unique_ptr<ViewState>> m_views; // index = view id; destroyed views are null
+    uint64_t m_sceneRevision = 1;  // bumped by changes that affect every view
+    bool m_glInitialized = false;
     // OpenGL handles
     unsigned int m_boundingBoxVBO = 0;
-    unsigned int m_boundingBoxVAO = 0;
     unsigned int m_shaderProgram = 0;
 
     // Volume rendering resources
     unsigned int m_volumeTex3D = 0;
     unsigned int m_proxyCubeVAO = 0;
     unsigned int m_proxyCubeVBO = 0;
-    unsigned int m_fullscreenQuadVAO = 0;
     unsigned int m_fullscreenQuadVBO = 0;
     unsigned int m_volumeShader = 0;
     unsigned int m_lutTex1D = 0;
+    // Shading resources (gradient volume, see setShadingEnabled)
+    unsigned int m_gradientTex3D = 0;
+    size_t m_gradientTexBytes = 0;
+    std::vector<uint8_t> m_gradientData;  // CPU copy, released after upload
+    bool m_gradientsValid = false;        // m_gradientData matches the current volume/frame
+    bool m_needsGradientUpload = false;
+    bool m_shadingEnabled = false;
+    void computeGradients(LoadStats* stats);
+    // Pre-integrated transfer function (see setRenderQuality)
+    unsigned int m_preintegrationTex2D = 0;
+    bool m_needsPreintegrationSetup = true;  // colormap or step changed
+    bool m_preintegrationEnabled = false;  // only pays off for banded colormaps
+    float m_renderQuality = 1.0f;
+    void setupPreintegrationTable();
+    // Isosurface mesh (shared VBO/EBO; each view has its own VAO)
+    TriangleMesh m_mesh;
+    VolumeOps::MinMaxBlocks m_minMaxBlocks;  // empty until first needed for the current data
+    unsigned int m_meshVBO = 0;
+    unsigned int m_meshEBO = 0;
+    unsigned int m_meshShader = 0;
+    size_t m_meshIndexCount = 0;
+    bool m_needsMeshUpload = false;
+    bool m_showMesh = true;
+    void uploadMesh();
     // Slicer resources
     unsigned int m_sliceShader = 0;
-    unsigned int m_sliceVAO = 0;
-    unsigned int m_sliceVBO = 0;
+    // Axis MIP images (see setAxisProjectionsEnabled)
+    VolumeOps::AxisProjections m_axisProjections;  // empty until computed for the current data
+    std::array<unsigned int, 3> m_axisProjectionTex{};
+    size_t m_axisProjectionTexBytes = 0;
+    unsigned int m_axisProjectionShader = 0;
+    bool m_axisProjectionsEnabled = true;
+    bool m_needsAxisProjectionUpload = false;
+    void computeAxisProjections(LoadStats* stats);
+    void setupAxisProjectionTextures();
+    int axisProjectionFor(const ViewState& view) const;
+    void drawAxisProjection(ViewState& view, int axis);
+
+    // Region of interest in voxels, [min, max) (see setCropBox)
+    bool m_cropEnabled = false;
+    bool m_cropUpload = false;
+    bool m_needsCropUpdate = false;
+    glm::ivec3 m_cropMin{0};
+    glm::ivec3 m_cropMax{0};
+    // Voxel region held by the volume and gradient textures (the crop or the whole volume)
+    glm::ivec3 m_texOrigin{0};
+    glm::ivec3 m_texSize{0};
+    glm::vec3 voxelSpacing() const;
+    void visibleRegion(glm::ivec3& lo, glm::ivec3& hi) const;
+    void textureRegion(glm::ivec3& lo, glm::ivec3& hi) const;
+    // World-space box of a voxel region; the whole volume is centered at the origin
+    void regionWorldBox(const glm::ivec3& lo, const glm::ivec3& hi, glm::vec3& boxMin, glm::vec3& boxMax) const;
+
+    // Segmentation overlay (see loadLabelMap). The label texture holds the same
+    // region as the volume texture.
+    LabelMap m_labels;
+    unsigned int m_labelTex3D = 0;
+    unsigned int m_labelTableTex1D = 0;
+    size_t m_labelTexBytes = 0;
+    std::array<glm::vec3, LabelMap::kLabelCount> m_labelColors;
+    std::array<bool, LabelMap::kLabelCount> m_labelVisible;
+    float m_labelOpacity = 0.5f;
+    bool m_showLabels = true;
+    bool m_needsLabelUpload = false;
+    bool m_needsLabelTableUpload = true;
+    void resetLabelTable();
+    void setupLabelTexture();
+    void uploadLabelTable();
+    void bindLabelUniforms(unsigned int program);
+    // Fusion volume (see loadFusionVolume); the texture always holds the whole volume
+    VolumeData m_fusionData;
+    unsigned int m_fusionTex3D = 0;
+    unsigned int m_fusionLutTex1D = 0;
+    glm::vec3 m_fusionOffset = glm::vec3(0.0f);
+    int m_fusionColormapPreset = 2;  // Hot
+    float m_fusionOpacity = 0.5f;
+    std::array<glm::vec2, 2> m_layerWindow{glm::vec2(0.0f, 65535.0f), glm::vec2(0.0f, 65535.0f)};
+    std::array<bool, 2> m_layerVisible{true, true};
+    bool m_needsFusionUpload = false;
+    bool m_needsFusionLutUpload = true;
+    bool fusionShown() const;
+    void setupFusionTexture();
+    void bindLayerUniforms(unsigned int program);
+
+    // Memory accounting (see setHostMemoryBudget). The host entries are re-synced from
+    // the buffers by trackMemory(); textures are counted where they are allocated.
+    MemoryBudget::Allocation m_volumeMemory{MemoryBudget::Category::Volume};
+    MemoryBudget::Allocation m_gradientMemory{MemoryBudget::Category::Gradients};
+    MemoryBudget::Allocation m_projectionMemory{MemoryBudget::Category::Projections};
+    MemoryBudget::Allocation m_blockIndexMemory{MemoryBudget::Category::BlockIndex};
+    MemoryBudget::Allocation m_labelMemory{MemoryBudget::Category::Labels};
+    MemoryBudget::Allocation m_fusionMemory{MemoryBudget::Category::FusionVolume};
+    MemoryBudget::Allocation m_meshMemory{MemoryBudget::Category::Mesh};
+    MemoryBudget::Allocation m_volumeTexMemory{MemoryBudget::Category::VolumeTexture};
+    MemoryBudget::Allocation m_gradientTexMemory{MemoryBudget::Category::GradientTexture};
+    MemoryBudget::Allocation m_labelTexMemory{MemoryBudget::Category::LabelTexture};
+    MemoryBudget::Allocation m_fusionTexMemory{MemoryBudget::Category::FusionTexture};
+    MemoryBudget::Allocation m_projectionTexMemory{MemoryBudget::Category::ProjectionTexture};
+    MemoryBudget::Allocation m_meshBufferMemory{MemoryBudget::Category::MeshBuffers};
+    MemoryBudget::Allocation m_transferTexMemory{MemoryBudget::Category::TransferTexture};
+    int m_volumeTexBits = 16;            // GL_R16, or GL_R8 to fit the VRAM budget
+    int m_volumeTexFactor = 1;           // volume texture downsampling per axis
+    bool m_needsVolumeTextureSetup = false;
+    int64_t m_deviceTotalBytes = -1;
+    int64_t m_deviceAvailableBytes = -1;
+    std::vector<std::string> m_memoryActions;
+    void trackMemory();
+    void noteMemoryAction(const std::string& action);
+    void evictCaches();
+    void enforceHostBudget();
+    void releaseVolumeState();
+    bool fitsDevice(uint64_t bytes, uint64_t freed) const;
+    void queryDeviceMemory();
+    glm::ivec3 volumeTextureDims() const;
+    uint64_t volumeTextureBytes() const;
+    bool uploadVolumeTexture(bool allocate);
 
     // Defer GL setup until a valid GL context is current (e.g., inside paintGL/render)
     bool m_needsGLSetup = false;
@@ -86,12 +527,36 @@ private:
     int  m_colormapPreset = 0; // 0..9
     glm::vec3 m_bgColor = glm::vec3(0.1f, 0.1f, 0.2f);
     float m_bboxScale = 1.0f;
-    bool  m_shouldFrameCameraNext = true;
 
-    // Slicer state
-    bool  m_sliceMode = false;
-    int   m_sliceAxis = 0; // 0=Z,1=Y,2=X
-    int   m_sliceIndex = 0;
+    bool m_profilingEnabled = true;  // applied to every view's profiler
+
+    LoadStats m_lastLoadStats;
+    DataLoader::LoadOptions m_loadOptions;
+    bool m_needsUploadTiming = false;
+    bool finishLoad(bool success, std::chrono::steady_clock::time_point loadStart);
+
+    // 4D NIfTI frames (null for 3D volumes)
+    std::unique_ptr<NiftiTimeSeries> m_timeSeries;
+    int m_timeFrame = 0;
+    int m_timeFrameCache = 8;
+    bool m_needsFrameUpload = false;
+    bool loadTimeSeries(const std::string& path);
+
+    // Live DICOM watch (null when not watching)
+    std::unique_ptr<DicomWatch> m_dicomWatch;
+    std::vector<double> m_watchPositions;  // slice positions along the normal, one per Z
+    double m_watchThickness = 0.0;         // SliceThickness of the first slice (spacing of a single slice)
+    bool m_watchPositioned = false;        // positions are ImagePositionPatient distances, not indices
+    int m_watchDirtyZ = -1;                // first Z slice changed since the last upload, -1 if none
+    int m_texDepthCapacity = 0;            // allocated depth of the volume texture (>= m_texSize.z)
+    glm::ivec3 textureExtent() const;
+    void uploadWatchSlices();
+
+    // Persistent cache directory and the last DICOM series listing
+    std::string m_cacheDir;
+    std::string m_seriesCacheRoot;
+    uint64_t m_seriesCacheSignature = 0;  // dicomTreeSignature of the root when it was listed
+    std::vector<DataLoader::DicomSeriesInfo> m_seriesCache;
 };
 
 #endif // RENDERER_H
\ No newline at end of file
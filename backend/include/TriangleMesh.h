@@ -0,0 +1,37 @@
+// backend/include/TriangleMesh.h
+
+#ifndef TRIANGLEMESH_H
+#define TRIANGLEMESH_H
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+// Indexed triangle mesh (e.g. an isosurface). Positions and normals are xyz triples,
+// indices are triangle corner triples with counter-clockwise winding seen from outside.
+struct TriangleMesh {
+    std::vector<float> vertices;
+    std::vector<float> normals;     // per vertex, unit length (may be empty)
+    std::vector<uint32_t> indices;
+
+    size_t vertexCount() const { return vertices.size() / 3; }
+    size_t triangleCount() const { return indices.size() / 3; }
+    bool empty() const { return indices.empty(); }
+    void clear() { vertices.clear(); normals.clear(); indices.clear(); }
+};
+
+namespace MeshIO {
+
+    // Binary little-endian PLY with float positions (and normals if present).
+    bool writePLY(const TriangleMesh& mesh, const std::string& path);
+
+    // Binary STL (unindexed; facet normals from the triangle winding).
+    bool writeSTL(const TriangleMesh& mesh, const std::string& path);
+
+    // Picks the writer from the extension (.ply / .stl, case-insensitive).
+    bool write(const TriangleMesh& mesh, const std::string& path);
+
+} // namespace MeshIO
+
+#endif // TRIANGLEMESH_H
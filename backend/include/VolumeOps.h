@@ -0,0 +1,266 @@
+// backend/include/VolumeOps.h
+
+#ifndef VOLUMEOPS_H
+#define VOLUMEOPS_H
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+#include <glm/glm.hpp>
+
+#include "TriangleMesh.h"
+#include "VolumeData.h"
+
+// CPU kernels over VolumeData::data (x fastest, then y, then z).
+// Kernels are multithreaded via Parallel::parallelFor; `threads` = 0 uses the global setting.
+namespace VolumeOps {
+
+    // Bytes per voxel of the packed gradient volume (see computeGradients).
+    constexpr size_t kGradientBytesPerVoxel = 3;
+
+    /**
+     * @brief Computes central-difference gradients and packs them as RGB8 per voxel.
+     *
+     * R,G hold the octahedral encoding of the unit normal (-gradient, i.e. pointing
+     * from dense to less dense tissue) in world orientation, with voxel spacing applied.
+     * B holds sqrt(|gradient| / maxGradient) so weak edges keep resolution; maxGradient is
+     * the largest possible central difference (full range over two of the smallest spacings).
+     * Border voxels use one-sided differences. Voxels with zero gradient get normal +Z, B = 0.
+     *
+     * The volume is processed in z-slices split into row tiles, so the three input
+     * slices a tile touches stay in cache.
+     *
+     * @param out Resized to width*height*depth*3 bytes.
+     */
+    void computeGradients(const VolumeData& volume, std::vector<uint8_t>& out, unsigned int threads = 0);
+
+    // Octahedral normal encoding helpers (exposed for tests/benchmarks).
+    void encodeOctahedral(float nx, float ny, float nz, uint8_t& u, uint8_t& v);
+    void decodeOctahedral(uint8_t u, uint8_t v, float& nx, float& ny, float& nz);
+
+    // Min/max of each block of cells, used to skip blocks a threshold cannot cut.
+    // Block (bx,by,bz) covers voxels [b*blockSize, (b+1)*blockSize] inclusive on each axis,
+    // i.e. every corner of the cells that start inside it.
+    struct MinMaxBlocks {
+        unsigned int blockSize = 0;
+        unsigned int blocksX = 0, blocksY = 0, blocksZ = 0;
+        std::vector<uint16_t> minValue;
+        std::vector<uint16_t> maxValue;
+
+        bool empty() const { return minValue.empty(); }
+        size_t index(unsigned int bx, unsigned int by, unsigned int bz) const {
+            return (static_cast<size_t>(bz) * blocksY + by) * blocksX + bx;
+        }
+    };
+
+    void buildMinMaxBlocks(const VolumeData& volume, MinMaxBlocks& blocks,
+                           unsigned int blockSize = 8, unsigned int threads = 0);
+
+    /**
+     * @brief Marching cubes isosurface at `isoValue` (in voxel units, 0..65535).
+     *
+     * Slabs of z are extracted in parallel. Vertices are shared through a per-slab hash
+     * keyed by the grid edge they lie on; edges on a slab's top plane belong to the next
+     * slab and are resolved when the slabs are merged, so the mesh has no duplicates.
+     * Voxels >= isoValue are inside; triangles face away from them. Positions are in the
+     * renderer's world space (millimetres, volume centered on the origin) and normals
+     * come from the interpolated volume gradient.
+     *
+     * @param blocks Optional min/max index (see buildMinMaxBlocks) to skip empty blocks.
+     */
+    void extractIsosurface(const VolumeData& volume, float isoValue, TriangleMesh& mesh,
+                           const MinMaxBlocks* blocks = nullptr, unsigned int threads = 0);
+
+    // Maximum intensity projections along the three volume axes. Axes follow the
+    // slicer's numbering: 0 = Z (width x height image), 1 = Y (width x depth),
+    // 2 = X (height x depth); images are row-major, first index fastest.
+    struct AxisProjections {
+        std::array<std::vector<uint16_t>, 3> image;
+        std::array<unsigned int, 3> width{};
+        std::array<unsigned int, 3> height{};
+
+        bool empty() const { return image[0].empty(); }
+        void clear() { *this = AxisProjections{}; }
+    };
+
+    /**
+     * @brief Computes all three axis MIPs in one pass over the volume.
+     *
+     * Z-slabs are reduced in parallel: the Y and X images get whole rows from each
+     * slab, the Z image is reduced per slab and merged, so the volume is read once.
+     */
+    void computeAxisProjections(const VolumeData& volume, AxisProjections& out, unsigned int threads = 0);
+
+    // Reduction across the slices of a thick slab
+    enum class SlabMode : int { Max = 0, Min = 1, Mean = 2 };
+
+    // Slices [first, first + count) of a slab thicknessMm thick centred on slice `index`
+    // of an axis with `size` slices `spacing` mm apart: round(thickness / spacing) slices
+    // (at least one), clipped to the volume. The slicer's slab mode uses the same range.
+    void slabRange(unsigned int size, double spacing, int index, double thicknessMm,
+                   unsigned int& first, unsigned int& count);
+
+    /**
+     * @brief Projects slices [first, first + count) along a slicer axis (0 = Z, 1 = Y,
+     *        2 = X) with max, min or mean (rounded), on the CPU.
+     *
+     * The image layout follows AxisProjections (axis 0: width x height, 1: width x depth,
+     * 2: height x depth). Only the slab is read.
+     */
+    void computeSlabProjection(const VolumeData& volume, int axis, unsigned int first, unsigned int count,
+                               SlabMode mode, std::vector<uint16_t>& out, unsigned int& width, unsigned int& height,
+                               unsigned int threads = 0);
+
+    // --- CPU MIP raycasting (RaycastMIP.cpp) ---
+
+    /**
+     * @brief Maximum intensity projection of the z-slab [zBegin, zEnd) on the CPU.
+     *
+     * Rays follow vol_fullscreen.frag: one ray per pixel centre through the full
+     * volume box (centred at the origin, voxel spacing applied), samples every
+     * diagonal/256 from the box entry, trilinear like GL_LINEAR with clamp-to-edge.
+     * Each sample belongs to the slab that contains its z texel coordinate. Slabs that
+     * split a volume therefore take disjoint sample sets, and their partial images
+     * combine with a per-pixel max into exactly the whole-volume image (sort-last).
+     *
+     * @param out width*height values, top row first: 0 where the slab has no sample on
+     *        the ray, otherwise 1 + the maximum (uint16 scale).
+     * @return false if the slab does not hold the slices its samples need.
+     */
+    struct MIPSlab {
+        const uint16_t* data = nullptr;     // slices [z0, z0 + depth), x fastest (not owned)
+        unsigned int width = 0, height = 0, depth = 0;
+        unsigned int z0 = 0;                // first slice held
+        unsigned int fullDepth = 0;         // slices in the whole volume
+        glm::vec3 spacing{1.0f};
+        // Slices rendered. The data must also hold one slice on each side where the
+        // volume has one, for interpolation.
+        unsigned int zBegin = 0, zEnd = 0;
+    };
+    bool raycastMIPSlab(const MIPSlab& slab, const glm::mat4& invViewProj, const glm::vec3& cameraPos,
+                        unsigned int width, unsigned int height, uint32_t* out, unsigned int threads = 0);
+
+    // --- Transfer function (TransferFunction.cpp) ---
+
+    /**
+     * @brief Pre-integrated table of the shaded mode's transfer function.
+     *
+     * The shaded mode maps a sample s in [0,1] to colour c(s) and to extinction
+     * extinction * s^2 per ray step. Entry (front, back) integrates that model over one step
+     * along which s goes linearly from front/(N-1) to back/(N-1), so a coarse step no longer
+     * misses what lies between its samples. The segment is composited front to back over
+     * |back - front| sub-steps, one per colormap cell crossed; segments of equal span share
+     * their sub-step opacities, which are computed once per span, in parallel. An entry with
+     * front == back equals a single point sample.
+     *
+     * @param colors N colours at s = i / (N-1) (the colormap LUT).
+     * @param extinction Optical depth of one step at s = 1 (density * step).
+     * @param out Resized to N*N*4 floats, front fastest: premultiplied RGB, then opacity.
+     */
+    void buildPreintegrationTable(const std::vector<glm::vec3>& colors, float extinction,
+                                  std::vector<float>& out, unsigned int threads = 0);
+
+    // --- Resampling (Resample.cpp) ---
+
+    enum class Interpolation : int { Nearest = 0, Linear = 1 };
+
+    // One decoded 2D slice and its geometry, as input to stackSlices.
+    struct SliceImage {
+        std::vector<uint16_t> pixels;     // width*height, x fastest
+        unsigned int width = 0;
+        unsigned int height = 0;
+        double spacingX = 1.0;            // mm between columns
+        double spacingY = 1.0;            // mm between rows
+        double offsetX = 0.0;             // in-plane position of pixel (0,0) relative to the
+        double offsetY = 0.0;             // first slice's pixel (0,0), along its row/column (mm)
+        double position = 0.0;            // position along the slice normal (mm), ascending
+    };
+
+    struct ResampleOptions {
+        Interpolation interpolation = Interpolation::Linear;
+        bool isotropic = false;           // resample to cubic voxels
+        double isotropicSpacing = 0.0;    // mm; 0 = finest of the in-plane and slice spacings
+        double uniformTolerance = 0.01;   // slice gaps within this fraction of the median count as uniform
+    };
+
+    /**
+     * @brief Stacks sorted slices into a volume on a regular grid.
+     *
+     * The grid is the first slice's (width, height, spacing) unless `isotropic` is set.
+     * Slices with another size, pixel spacing or in-plane offset are resampled onto it
+     * in physical coordinates (outside their extent is 0). If the gaps between slice
+     * positions are not uniform, the stack is resampled along z to the median gap (or
+     * the isotropic spacing). Every stage is separable and runs on all cores.
+     *
+     * Slice pixel buffers are consumed (moved or freed) to keep peak memory near one
+     * copy of the input plus the output.
+     */
+    bool stackSlices(std::vector<SliceImage>& slices, VolumeData& out,
+                     const ResampleOptions& options = ResampleOptions(), unsigned int threads = 0);
+
+    /**
+     * @brief Resamples a volume to new voxel spacing (same physical extent).
+     *
+     * Output dimensions are round(extent / spacing). Separable: x and y per slice,
+     * then z across slices.
+     */
+    void resampleVolume(const VolumeData& in, VolumeData& out, double spacingX, double spacingY, double spacingZ,
+                        Interpolation interpolation = Interpolation::Linear, unsigned int threads = 0);
+
+    // --- Oblique reslicing (Reslice.cpp) ---
+
+    // Non-owning view of a volume (x fastest, then y, then z)
+    struct VolumeView {
+        const uint16_t* data = nullptr;
+        unsigned int width = 0, height = 0, depth = 0;
+        glm::dvec3 spacing{1.0};
+
+        VolumeView() = default;
+        explicit VolumeView(const VolumeData& volume)
+            : data(volume.data.data()), width(volume.width), height(volume.height), depth(volume.depth),
+              spacing(volume.spacing_x, volume.spacing_y, volume.spacing_z) {}
+    };
+
+    // Output image plane in physical coordinates (mm): voxel (i, j, k) has its centre at
+    // (i * spacing_x, j * spacing_y, k * spacing_z). Pixel (c, r) of a width x height
+    // image lies at center + (c - (width-1)/2) * pixelSpacing * axisU
+    //                      + (r - (height-1)/2) * pixelSpacing * axisV.
+    struct ObliquePlane {
+        glm::dvec3 center{0.0};
+        glm::dvec3 axisU{1.0, 0.0, 0.0};   // image columns, left to right (normalized on use)
+        glm::dvec3 axisV{0.0, 1.0, 0.0};   // image rows, top to bottom (normalized on use)
+        double pixelSpacing = 1.0;         // mm between output pixels
+
+        glm::dvec3 normal() const;         // unit axisU x axisV
+    };
+
+    // Plane through `center` facing `normal`, with in-plane axes chosen to stay close to
+    // the volume's x (columns) and y (rows) for a z-normal
+    ObliquePlane planeFromNormal(const glm::dvec3& center, const glm::dvec3& normal, double pixelSpacing = 1.0);
+
+    // `count` copies of `plane` spaced `step` mm along its normal, centred on it
+    std::vector<ObliquePlane> parallelPlanes(const ObliquePlane& plane, unsigned int count, double step);
+
+    /**
+     * @brief Resamples the volume on a batch of planes (e.g. an oblique scroll stack or
+     *        the planes of a curved reformat).
+     *
+     * Each row starts from one plane/row position and advances by a constant voxel-space
+     * step per pixel, so there is no per-pixel matrix product. The part of a row inside
+     * the volume is found up front and sampled in blocks (coordinates and weights first,
+     * then the gathers), leaving no bounds checks in the inner loops. Samples up to half
+     * a voxel beyond the outer voxel centres clamp to the edge like GL_CLAMP_TO_EDGE;
+     * farther out is `background`. Rows of all planes are spread over the threads.
+     *
+     * @param out planes.size() images of width*height, row-major, top row first.
+     */
+    void reslicePlanes(const VolumeView& volume, const std::vector<ObliquePlane>& planes,
+                       unsigned int width, unsigned int height, uint16_t* out,
+                       Interpolation interpolation = Interpolation::Linear, uint16_t background = 0,
+                       unsigned int threads = 0);
+
+} // namespace VolumeOps
+
+#endif // VOLUMEOPS_H
@@ -0,0 +1,19 @@
+#version 330 core
+in vec3 vWorldPos;
+out vec4 FragColor;
+
+uniform sampler2D uProjection; // axis MIP of the whole volume
+uniform sampler1D uLUT;
+uniform vec3 uBoxMin;          // full volume box
+uniform vec3 uBoxMax;
+uniform int uAxis;             // 0=Z,1=Y,2=X
+uniform vec2 uWindow;          // (low, 1 / (high - low)) in texture units
+uniform int uShowVolume;
+
+void main(){
+    vec3 t = (vWorldPos - uBoxMin) / (uBoxMax - uBoxMin);
+    vec2 uv = uAxis == 0 ? t.xy : (uAxis == 1 ? t.xz : t.yz);
+    float val = texture(uProjection, uv).r;
+    FragColor = uShowVolume != 0 ? texture(uLUT, clamp((val - uWindow.x) * uWindow.y, 0.0, 1.0))
+                                 : vec4(0.0, 0.0, 0.0, 1.0);
+}
@@ -0,0 +1,14 @@
+#version 330 core
+in vec3 vNormal;
+in vec3 vPos;
+out vec4 FragColor;
+uniform vec3 uCamPos;
+uniform vec3 uColor;
+void main() {
+    // Two-sided headlight
+    vec3 n = normalize(vNormal);
+    vec3 l = normalize(uCamPos - vPos);
+    float diffuse = abs(dot(n, l));
+    float specular = pow(diffuse, 32.0);
+    FragColor = vec4(uColor * (0.2 + 0.8 * diffuse) + vec3(0.25 * specular), 1.0);
+}
@@ -0,0 +1,12 @@
+#version 330 core
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in vec3 aNormal;
+out vec3 vNormal;
+out vec3 vPos;
+uniform mat4 view;
+uniform mat4 projection;
+void main() {
+    vNormal = aNormal;
+    vPos = aPos;
+    gl_Position = projection * view * vec4(aPos, 1.0);
+}
@@ -6,10 +6,53 @@ uniform sampler3D uVolume;
 uniform sampler1D uLUT;
 uniform vec3 uBoxMin;
 uniform vec3 uBoxMax;
+uniform vec3 uTexOrigin; // world position of the texture's min corner
+uniform vec3 uTexScale;  // 1 / world size of the texture
 uniform int uAxis; // 0=Z,1=Y,2=X (reserved if needed later)
+// Thick slab along the slicer axis
+uniform int uSlabMode;       // 0 = single slice, 1 = max, 2 = min, 3 = mean
+uniform int uSlabCount;      // slices in the slab
+uniform int uSlabComponent;  // texture coordinate the slab runs along (0 = x, 1 = y, 2 = z)
+uniform float uSlabFirst;    // texture coordinate of the first slab slice
+uniform float uSlabStep;     // texture coordinate between slab slices
+// Segmentation overlay
+uniform int uShowLabels;        // 0 = no label texture bound
+uniform usampler3D uLabels;     // label per voxel, same region as uVolume
+uniform sampler1D uLabelTable;  // RGB colour, A = visible
+uniform float uLabelOpacity;
+// Layers: window and visibility of the volume, and a fused second volume
+uniform vec2 uWindow;           // (low, 1 / (high - low)) in texture units
+uniform int uShowVolume;
+uniform int uShowFusion;        // 0 = no fusion texture bound
+uniform sampler3D uFusion;
+uniform sampler1D uFusionLUT;
+uniform vec3 uFusionOrigin;     // world position of the fusion volume's min corner
+uniform vec3 uFusionScale;      // 1 / world size of the fusion volume
+uniform vec2 uFusionWindow;
+uniform float uFusionOpacity;
 
+// The texture may hold only a sub-region (crop upload): map over its own world box
 vec3 worldToTex(vec3 p){
-    return (p - uBoxMin) / (uBoxMax - uBoxMin);
+    return (p - uTexOrigin) * uTexScale;
+}
+
+// Colour of the label at tc (alpha 0 for background and hidden labels)
+vec4 labelColor(vec3 tc){
+    ivec3 size = textureSize(uLabels, 0);
+    uint label = texelFetch(uLabels, clamp(ivec3(tc * vec3(size)), ivec3(0), size - 1), 0).r;
+    if (label == 0u) return vec4(0.0);
+    return texelFetch(uLabelTable, int(label), 0);
+}
+
+float windowed(float s, vec2 window){
+    return clamp((s - window.x) * window.y, 0.0, 1.0);
+}
+
+// Windowed fusion value at world position p, -1 outside the fusion volume
+float fusionValue(vec3 p){
+    vec3 fc = (p - uFusionOrigin) * uFusionScale;
+    if (any(lessThan(fc, vec3(0.0))) || any(greaterThan(fc, vec3(1.0)))) return -1.0;
+    return windowed(texture(uFusion, fc).r, uFusionWindow);
 }
 
 void main(){
@@ -18,6 +61,33 @@ void main(){
     if (any(lessThan(tc, vec3(0.0))) || any(greaterThan(tc, vec3(1.0)))){
         discard;
     }
-    float val = texture(uVolume, tc).r;
-    FragColor = texture(uLUT, clamp(val, 0.0, 1.0));
+    float val;
+    if (uSlabMode == 0) {
+        val = texture(uVolume, tc).r;
+    } else {
+        // One sample per slice centre inside the slab, so cost follows the thickness
+        vec3 p = tc;
+        float acc = (uSlabMode == 2) ? 1.0 : 0.0;
+        for (int i = 0; i < uSlabCount; ++i) {
+            p[uSlabComponent] = uSlabFirst + float(i) * uSlabStep;
+            float s = texture(uVolume, p).r;
+            if (uSlabMode == 1) acc = max(acc, s);
+            else if (uSlabMode == 2) acc = min(acc, s);
+            else acc += s;
+        }
+        val = (uSlabMode == 3) ? acc / float(max(uSlabCount, 1)) : acc;
+    }
+    FragColor = uShowVolume != 0 ? texture(uLUT, windowed(val, uWindow)) : vec4(0.0, 0.0, 0.0, 1.0);
+    if (uShowFusion != 0) {
+        // The fused slice over the volume's, weighted by its windowed value; alone when the volume is hidden
+        float f = fusionValue(vWorldPos);
+        if (f >= 0.0) {
+            float k = uShowVolume != 0 ? uFusionOpacity * f : 1.0;
+            FragColor.rgb = mix(FragColor.rgb, texture(uFusionLUT, f).rgb, k);
+        }
+    }
+    if (uShowLabels != 0) {
+        vec4 label = labelColor(tc);
+        if (label.a > 0.0) FragColor.rgb = mix(FragColor.rgb, label.rgb, uLabelOpacity);
+    }
 }
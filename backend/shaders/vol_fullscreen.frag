@@ -5,13 +5,56 @@ out vec4 FragColor;
 uniform sampler3D uVolume;
 uniform sampler1D uLUT;
 uniform vec3 uBoxMin;
-uniform vec3 uBoxMax;
+uniform vec3 uBoxMax;    // ray box: the volume or its crop
+uniform vec3 uTexOrigin; // world position of the texture's min corner
+uniform vec3 uTexScale;  // 1 / world size of the texture
 uniform vec3 uCamPos;
 uniform mat4 uInvViewProj;
 uniform float uStep;
+// Shaded compositing (0 = MIP)
+uniform int uShading;
+uniform sampler3D uGradient; // RG: octahedral normal, B: sqrt(|gradient|)
+uniform float uDensity;
+uniform int uPreintegrated;         // 1: colour and opacity per step from uPreintegration
+uniform sampler2D uPreintegration;  // (front, back) sample pair -> premultiplied RGB, opacity
+// Segmentation overlay
+uniform int uShowLabels;        // 0 = no label texture bound
+uniform usampler3D uLabels;     // label per voxel, same region as uVolume
+uniform sampler1D uLabelTable;  // RGB colour, A = visible
+uniform float uLabelOpacity;
+// Layers: window and visibility of the volume, and a fused second volume
+uniform vec2 uWindow;           // (low, 1 / (high - low)) in texture units
+uniform int uShowVolume;
+uniform int uShowFusion;        // 0 = no fusion texture bound
+uniform sampler3D uFusion;
+uniform sampler1D uFusionLUT;
+uniform vec3 uFusionOrigin;     // world position of the fusion volume's min corner
+uniform vec3 uFusionScale;      // 1 / world size of the fusion volume
+uniform vec2 uFusionWindow;
+uniform float uFusionOpacity;
 
+// The texture may hold only a sub-region (crop upload): map over its own world box
 vec3 worldToTex(vec3 p){
-    return (p - uBoxMin) / (uBoxMax - uBoxMin);
+    return (p - uTexOrigin) * uTexScale;
+}
+
+// Colour of the label at tc (alpha 0 for background and hidden labels)
+vec4 labelColor(vec3 tc){
+    ivec3 size = textureSize(uLabels, 0);
+    uint label = texelFetch(uLabels, clamp(ivec3(tc * vec3(size)), ivec3(0), size - 1), 0).r;
+    if (label == 0u) return vec4(0.0);
+    return texelFetch(uLabelTable, int(label), 0);
+}
+
+float windowed(float s, vec2 window){
+    return clamp((s - window.x) * window.y, 0.0, 1.0);
+}
+
+// Windowed fusion value at world position p, -1 outside the fusion volume
+float fusionValue(vec3 p){
+    vec3 fc = (p - uFusionOrigin) * uFusionScale;
+    if (any(lessThan(fc, vec3(0.0))) || any(greaterThan(fc, vec3(1.0)))) return -1.0;
+    return windowed(texture(uFusion, fc).r, uFusionWindow);
 }
 
 bool boxIntersect(vec3 ro, vec3 rd, out float t0, out float t1){
@@ -25,6 +68,90 @@ bool boxIntersect(vec3 ro, vec3 rd, out float t0, out float t1){
     return t1 >= t0;
 }
 
+vec3 decodeNormal(vec2 e){
+    e = e * 2.0 - 1.0;
+    vec3 n = vec3(e, 1.0 - abs(e.x) - abs(e.y));
+    if (n.z < 0.0) {
+        n.xy = (1.0 - abs(n.yx)) * vec2(n.x >= 0.0 ? 1.0 : -1.0, n.y >= 0.0 ? 1.0 : -1.0);
+    }
+    return normalize(n);
+}
+
+// Table entry i holds s = i / (size - 1); map onto texel centres
+vec4 preintegrated(float front, float back){
+    vec2 size = vec2(textureSize(uPreintegration, 0));
+    return texture(uPreintegration, (vec2(front, back) * (size - 1.0) + 0.5) / size);
+}
+
+// Front-to-back compositing with a headlight; one extra fetch (uGradient) per sample.
+vec4 shade(vec3 ro, vec3 rd, float tStart, float tEnd){
+    vec3 L = -rd;
+    vec3 H = L; // headlight: view and light directions coincide
+    vec4 acc = vec4(0.0);
+    // Pre-integrated steps run from one sample to the next, so their samples sit on
+    // step boundaries from the ray entry instead of at step centres
+    float sPrev = 0.0;
+    if (uPreintegrated != 0) {
+        sPrev = windowed(texture(uVolume, clamp(worldToTex(ro + rd * (tStart - 0.5 * uStep)), 0.0, 1.0)).r, uWindow);
+        tStart += 0.5 * uStep;
+    }
+    for (float t = tStart; t < tEnd; t += uStep) {
+        vec3 p = ro + rd * t;
+        vec3 tc = worldToTex(p);
+        if (any(lessThan(tc, vec3(0.0))) || any(greaterThan(tc, vec3(1.0)))) {
+            break;
+        }
+        float s = windowed(texture(uVolume, tc).r, uWindow);
+        float a;
+        vec3 base;
+        if (uPreintegrated != 0) {
+            vec4 seg = preintegrated(sPrev, s);
+            a = seg.a;
+            base = a > 1e-5 ? seg.rgb / a : texture(uLUT, s).rgb;
+        } else {
+            a = 1.0 - exp(-s * s * uDensity * uStep);
+            base = texture(uLUT, s).rgb;
+        }
+        sPrev = s;
+        if (uShowVolume == 0) a = 0.0;
+        // Labelled voxels are tinted and kept visible even where the scalar is faint
+        vec4 label = uShowLabels != 0 ? labelColor(tc) : vec4(0.0);
+        if (label.a > 0.0) a = max(a, uLabelOpacity * (1.0 - exp(-uDensity * uStep)));
+        // The fused volume has its own colour and opacity at the same sample, unlit
+        float fa = 0.0;
+        vec3 fusionColor = vec3(0.0);
+        if (uShowFusion != 0) {
+            float f = fusionValue(p);
+            if (f > 0.0) {
+                fa = uFusionOpacity * (1.0 - exp(-f * f * uDensity * uStep));
+                fusionColor = texture(uFusionLUT, f).rgb;
+            }
+        }
+        if (a < 0.002 && fa < 0.002) continue;
+        vec3 c = vec3(0.0);
+        if (a < 0.002) {
+            a = 0.0;
+        } else {
+            vec3 g = texture(uGradient, tc).rgb;
+            vec3 n = decodeNormal(g.rg);
+            float edge = smoothstep(0.05, 0.3, g.b); // only light where there is a surface
+            float diffuse = abs(dot(n, L));
+            float specular = pow(abs(dot(n, H)), 32.0);
+            if (label.a > 0.0) base = mix(base, label.rgb, uLabelOpacity);
+            c = base * mix(1.0, 0.25 + 0.75 * diffuse, edge) + vec3(0.3 * specular * edge);
+        }
+        if (fa > 0.0) {
+            // Co-located layers: opacities combine, colours are weighted by opacity
+            c = (a * c + fa * fusionColor) / (a + fa);
+            a = 1.0 - (1.0 - a) * (1.0 - fa);
+        }
+        acc.rgb += (1.0 - acc.a) * a * c;
+        acc.a += (1.0 - acc.a) * a;
+        if (acc.a > 0.98) break;
+    }
+    return acc;
+}
+
 void main(){
     // Reconstruct world position from screen position
     vec4 clipPos = vec4(vScreenPos, 0.0, 1.0);
@@ -45,7 +172,17 @@ void main(){
         discard;
     }
 
+    if (uShading != 0) {
+        vec4 c = shade(ro, rd, tStart, tEnd);
+        if (c.a <= 0.0) discard;
+        FragColor = vec4(c.rgb, 1.0); // premultiplied over black, like MIP's LUT(0)
+        return;
+    }
+
+    // MIP: blend in the nearest visible label along the ray
     float valMax = 0.0;
+    float fusionMax = -1.0;
+    vec4 firstLabel = vec4(0.0);
     for (float t = tStart; t < tEnd; t += uStep) {
         vec3 pw = ro + rd * t;
         vec3 tc = worldToTex(pw);
@@ -54,7 +191,15 @@ void main(){
         }
         float s = texture(uVolume, tc).r;
         valMax = max(valMax, s);
+        if (uShowLabels != 0 && firstLabel.a == 0.0) firstLabel = labelColor(tc);
+        if (uShowFusion != 0) fusionMax = max(fusionMax, fusionValue(pw));
     }
 
-    FragColor = texture(uLUT, clamp(valMax, 0.0, 1.0));
+    FragColor = uShowVolume != 0 ? texture(uLUT, windowed(valMax, uWindow)) : vec4(0.0, 0.0, 0.0, 1.0);
+    if (fusionMax >= 0.0) {
+        // The fused MIP over the volume's, weighted by its windowed value; alone when the volume is hidden
+        float k = uShowVolume != 0 ? uFusionOpacity * fusionMax : 1.0;
+        FragColor.rgb = mix(FragColor.rgb, texture(uFusionLUT, fusionMax).rgb, k);
+    }
+    if (firstLabel.a > 0.0) FragColor.rgb = mix(FragColor.rgb, firstLabel.rgb, uLabelOpacity);
 }
@@ -59,9 +59,10 @@ void Camera::updateCameraVectors() {
     float elev_rad = glm::radians(m_elevation);
     float azim_rad = glm::radians(m_azimuth);
 
-    m_position.x = m_radius * cos(elev_rad) * sin(azim_rad);
-    m_position.y = m_radius * sin(elev_rad);
-    m_position.z = m_radius * cos(elev_rad) * cos(azim_rad);
+    // Orbit around the target
+    m_position.x = m_target.x + m_radius * cos(elev_rad) * sin(azim_rad);
+    m_position.y = m_target.y + m_radius * sin(elev_rad);
+    m_position.z = m_target.z + m_radius * cos(elev_rad) * cos(azim_rad);
 
     // Build stable orthonormal basis (elevation is clamped, so no pole crossing)
     glm::vec3 forward = glm::normalize(m_target - m_position);
@@ -81,13 +82,13 @@ glm::mat4 Camera::getProjectionMatrix() const {
     return glm::perspective(glm::radians(m_fov), m_aspectRatio, m_nearPlane, m_farPlane);
 }
 
-void Camera::frameBox(float w, float h, float d) {
+void Camera::frameBox(float w, float h, float d, const glm::vec3& center) {
     // Ensure positive sizes
     w = std::max(w, 1e-3f);
     h = std::max(h, 1e-3f);
     d = std::max(d, 1e-3f);
 
-    // Frame the box centered at origin. Choose a gentle default angle
+    // Frame the box around its center. Choose a gentle default angle
     m_azimuth = 45.0f;
     m_elevation = 20.0f;
 
@@ -107,7 +108,7 @@ void Camera::frameBox(float w, float h, float d) {
     m_farPlane  = farTarget;
 
     // Focus the camera at the center
-    m_target = glm::vec3(0.0f, 0.0f, 0.0f);
+    m_target = center;
     m_up = glm::vec3(0.0f, 1.0f, 0.0f);
     m_right = glm::vec3(1.0f, 0.0f, 0.0f);
 
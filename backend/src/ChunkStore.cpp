@@ -0,0 +1,504 @@
+// backend/src/ChunkStore.cpp
+
+#include "../include/ChunkStore.h"
+#include "../include/DataLoader.h"
+#include "../include/Parallel.h"
+#include "../include/MemoryBudget.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstdio>
+#include <cstring>
+#include <filesystem>
+#include <iostream>
+
+#include <zlib.h>
+
+namespace fs = std::filesystem;
+
+namespace ChunkStore {
+
+static const char kMagic[8] = {'M', 'V', 'R', 'C', 'H', 'U', 'N', 'K'};
+static constexpr uint32_t kVersion = 1;
+static constexpr uint32_t kCodecZlibShuffle = 1;
+static constexpr uint32_t kFlagZlib = 1;
+static constexpr size_t kHeaderBytes = 8 + 4 * 4 + 3 * 4 + 3 * 8 + 8;
+static constexpr size_t kLevelBytes = 3 * 4 + 3 * 8 + 3 * 4;
+static constexpr size_t kEntryBytes = 8 + 4 + 4;
+
+namespace {
+
+// RAII FILE* wrapper
+struct File {
+    FILE* f = nullptr;
+    File(const std::string& path, const char* mode) : f(std::fopen(path.c_str(), mode)) {}
+    ~File() { if (f) std::fclose(f); }
+    File(const File&) = delete;
+    File& operator=(const File&) = delete;
+    explicit operator bool() const { return f != nullptr; }
+};
+
+bool readAt(FILE* f, uint64_t offset, void* dst, size_t size) {
+    if (fseeko(f, static_cast<off_t>(offset), SEEK_SET) != 0) return false;
+    return std::fread(dst, 1, size, f) == size;
+}
+
+// Little-endian field encoding, independent of the host byte order
+void put32(std::vector<uint8_t>& out, uint32_t v) {
+    for (int i = 0; i < 4; ++i) out.push_back(static_cast<uint8_t>(v >> (8 * i)));
+}
+void put64(std::vector<uint8_t>& out, uint64_t v) {
+    for (int i = 0; i < 8; ++i) out.push_back(static_cast<uint8_t>(v >> (8 * i)));
+}
+void putF64(std::vector<uint8_t>& out, double v) {
+    uint64_t bits;
+    std::memcpy(&bits, &v, sizeof(bits));
+    put64(out, bits);
+}
+
+struct ByteReader {
+    const uint8_t* p;
+    uint32_t u32() {
+        uint32_t v = 0;
+        for (int i = 0; i < 4; ++i) v |= static_cast<uint32_t>(p[i]) << (8 * i);
+        p += 4;
+        return v;
+    }
+    uint64_t u64() {
+        uint64_t v = 0;
+        for (int i = 0; i < 8; ++i) v |= static_cast<uint64_t>(p[i]) << (8 * i);
+        p += 8;
+        return v;
+    }
+    double f64() {
+        const uint64_t bits = u64();
+        double v;
+        std::memcpy(&v, &bits, sizeof(v));
+        return v;
+    }
+};
+
+unsigned int chunkCount(unsigned int size, unsigned int chunk) { return (size + chunk - 1) / chunk; }
+
+void putLevel(std::vector<uint8_t>& out, const LevelInfo& level) {
+    put32(out, level.width);
+    put32(out, level.height);
+    put32(out, level.depth);
+    putF64(out, level.spacing_x);
+    putF64(out, level.spacing_y);
+    putF64(out, level.spacing_z);
+    put32(out, level.chunksX);
+    put32(out, level.chunksY);
+    put32(out, level.chunksZ);
+}
+
+// 2x2x2 mean of the voxels that exist (odd sizes round up), keeping the physical extent
+void downsample(const VolumeData& src, VolumeData& dst, unsigned int threads) {
+    dst.width = (src.width + 1) / 2;
+    dst.height = (src.height + 1) / 2;
+    dst.depth = (src.depth + 1) / 2;
+    dst.spacing_x = src.spacing_x * src.width / dst.width;
+    dst.spacing_y = src.spacing_y * src.height / dst.height;
+    dst.spacing_z = src.spacing_z * src.depth / dst.depth;
+    dst.data.assign(static_cast<size_t>(dst.width) * dst.height * dst.depth, 0);
+    const size_t sw = src.width, sSlice = static_cast<size_t>(src.width) * src.height;
+    Parallel::parallelFor(0, dst.depth, [&](size_t first, size_t last) {
+        for (size_t z = first; z < last; ++z) {
+            const size_t z0 = 2 * z, z1 = std::min<size_t>(z0 + 1, src.depth - 1);
+            for (size_t y = 0; y < dst.height; ++y) {
+                const size_t y0 = 2 * y, y1 = std::min<size_t>(y0 + 1, src.height - 1);
+                uint16_t* out = &dst.data[(z * dst.height + y) * dst.width];
+                for (size_t x = 0; x < dst.width; ++x) {
+                    const size_t x0 = 2 * x, x1 = std::min<size_t>(x0 + 1, src.width - 1);
+                    // On odd sizes the last voxel stands in for its missing neighbour
+                    uint32_t sum = 0;
+                    for (size_t zz : {z0, z1}) {
+                        for (size_t yy : {y0, y1}) {
+                            const uint16_t* row = &src.data[zz * sSlice + yy * sw];
+                            sum += row[x0] + row[x1];
+                        }
+                    }
+                    out[x] = static_cast<uint16_t>((sum + 4) / 8);
+                }
+            }
+        }
+    }, 1, threads);
+}
+
+// Byte-shuffled copy of one chunk: all low bytes, then all high bytes
+size_t gatherChunk(const VolumeData& vol, unsigned int chunk, unsigned int cx, unsigned int cy, unsigned int cz,
+                   std::vector<uint8_t>& out) {
+    const unsigned int x0 = cx * chunk, y0 = cy * chunk, z0 = cz * chunk;
+    const unsigned int w = std::min(chunk, vol.width - x0);
+    const unsigned int h = std::min(chunk, vol.height - y0);
+    const unsigned int d = std::min(chunk, vol.depth - z0);
+    const size_t n = static_cast<size_t>(w) * h * d;
+    out.resize(2 * n);
+    uint8_t* lo = out.data();
+    uint8_t* hi = out.data() + n;
+    size_t i = 0;
+    for (unsigned int z = 0; z < d; ++z) {
+        for (unsigned int y = 0; y < h; ++y) {
+            const uint16_t* row = &vol.data[((static_cast<size_t>(z0 + z) * vol.height) + y0 + y) * vol.width + x0];
+            for (unsigned int x = 0; x < w; ++x, ++i) {
+                lo[i] = static_cast<uint8_t>(row[x]);
+                hi[i] = static_cast<uint8_t>(row[x] >> 8);
+            }
+        }
+    }
+    return n;
+}
+
+} // namespace
+
+bool write(const std::string& path, const VolumeData& volume, const WriteOptions& options) {
+    if (volume.data.empty() || volume.width == 0 || volume.height == 0 || volume.depth == 0) {
+        std::cerr << "      MVR Error: No volume to write." << std::endl;
+        return false;
+    }
+    const unsigned int chunk = std::max(8u, options.chunkSize);
+    const int compression = std::clamp(options.compression, 0, 9);
+
+    // Level count: halve until everything fits in one chunk (or the requested count)
+    unsigned int levels = 1;
+    for (unsigned int w = volume.width, h = volume.height, d = volume.depth;
+         std::max({w, h, d}) > (options.levels ? 1u : chunk) && (options.levels == 0 || levels < options.levels);
+         ++levels) {
+        w = (w + 1) / 2;
+        h = (h + 1) / 2;
+        d = (d + 1) / 2;
+    }
+
+    const std::string tmpPath = path + ".tmp";
+    bool ok = true;
+    {
+        File file(tmpPath, "wb");
+        if (!file) {
+            std::cerr << "      MVR Error: Cannot open " << tmpPath << " for writing." << std::endl;
+            return false;
+        }
+        // Header with a placeholder index offset, patched at the end
+        std::vector<uint8_t> header(kMagic, kMagic + 8);
+        put32(header, kVersion);
+        put32(header, chunk);
+        put32(header, levels);
+        put32(header, kCodecZlibShuffle);
+        put32(header, volume.width);
+        put32(header, volume.height);
+        put32(header, volume.depth);
+        putF64(header, volume.spacing_x);
+        putF64(header, volume.spacing_y);
+        putF64(header, volume.spacing_z);
+        put64(header, 0);
+        ok = std::fwrite(header.data(), 1, header.size(), file.f) == header.size();
+
+        const unsigned int threads = options.threads ? options.threads : Parallel::threadCount();
+        const size_t batch = static_cast<size_t>(threads) * 8;
+        std::vector<uint8_t> index;
+        std::vector<std::vector<uint8_t>> stored(batch);
+        std::vector<uint32_t> flags(batch);
+        uint64_t offset = header.size();
+        VolumeData reduced;
+        const VolumeData* current = &volume;
+
+        for (unsigned int l = 0; l < levels && ok; ++l) {
+            if (l > 0) {
+                VolumeData next;
+                downsample(*current, next, threads);
+                reduced = std::move(next);
+                current = &reduced;
+            }
+            const VolumeData& vol = *current;
+            LevelInfo info;
+            info.width = vol.width;
+            info.height = vol.height;
+            info.depth = vol.depth;
+            info.spacing_x = vol.spacing_x;
+            info.spacing_y = vol.spacing_y;
+            info.spacing_z = vol.spacing_z;
+            info.chunksX = chunkCount(vol.width, chunk);
+            info.chunksY = chunkCount(vol.height, chunk);
+            info.chunksZ = chunkCount(vol.depth, chunk);
+            putLevel(index, info);
+
+            const size_t total = static_cast<size_t>(info.chunksX) * info.chunksY * info.chunksZ;
+            for (size_t b0 = 0; b0 < total && ok; b0 += batch) {
+                const size_t b1 = std::min(total, b0 + batch);
+                Parallel::parallelFor(b0, b1, [&](size_t first, size_t last) {
+                    std::vector<uint8_t> shuffled;
+                    for (size_t c = first; c < last; ++c) {
+                        const unsigned int cx = static_cast<unsigned int>(c % info.chunksX);
+                        const unsigned int cy = static_cast<unsigned int>((c / info.chunksX) % info.chunksY);
+                        const unsigned int cz = static_cast<unsigned int>(c / (static_cast<size_t>(info.chunksX) * info.chunksY));
+                        gatherChunk(vol, chunk, cx, cy, cz, shuffled);
+                        std::vector<uint8_t>& out = stored[c - b0];
+                        flags[c - b0] = 0;
+                        if (compression > 0) {
+                            uLongf size = compressBound(static_cast<uLong>(shuffled.size()));
+                            out.resize(size);
+                            if (compress2(out.data(), &size, shuffled.data(), static_cast<uLong>(shuffled.size()),
+                                          compression) == Z_OK && size < shuffled.size()) {
+                                out.resize(size);
+                                flags[c - b0] = kFlagZlib;
+                                continue;
+                            }
+                        }
+                        out = shuffled;  // incompressible: store as is
+                    }
+                }, 1, threads);
+                for (size_t c = b0; c < b1 && ok; ++c) {
+                    const std::vector<uint8_t>& out = stored[c - b0];
+                    ok = std::fwrite(out.data(), 1, out.size(), file.f) == out.size();
+                    put64(index, offset);
+                    put32(index, static_cast<uint32_t>(out.size()));
+                    put32(index, flags[c - b0]);
+                    offset += out.size();
+                }
+            }
+        }
+
+        if (ok) {
+            ok = std::fwrite(index.data(), 1, index.size(), file.f) == index.size();
+            std::vector<uint8_t> indexOffset;
+            put64(indexOffset, offset);
+            ok = ok && fseeko(file.f, static_cast<off_t>(kHeaderBytes - 8), SEEK_SET) == 0 &&
+                 std::fwrite(indexOffset.data(), 1, 8, file.f) == 8;
+        }
+        ok = (std::fflush(file.f) == 0) && ok;
+    }
+    std::error_code ec;
+    if (ok) fs::rename(tmpPath, path, ec);
+    if (!ok || ec) {
+        fs::remove(tmpPath, ec);
+        std::cerr << "      MVR Error: Failed to write chunk store: " << path << std::endl;
+        return false;
+    }
+    return true;
+}
+
+bool Reader::open(const std::string& path) {
+    close();
+    File file(path, "rb");
+    if (!file) {
+        std::cerr << "      MVR Error: Cannot open chunk store: " << path << std::endl;
+        return false;
+    }
+    std::error_code ec;
+    const uint64_t fileSize = fs::file_size(path, ec);
+    uint8_t head[kHeaderBytes];
+    if (ec || !readAt(file.f, 0, head, sizeof(head)) || std::memcmp(head, kMagic, 8) != 0) {
+        std::cerr << "      MVR Error: Not a chunk store: " << path << std::endl;
+        return false;
+    }
+    ByteReader in{head + 8};
+    const uint32_t version = in.u32();
+    const uint32_t chunk = in.u32();
+    const uint32_t levels = in.u32();
+    const uint32_t codec = in.u32();
+    in.p += 3 * 4 + 3 * 8;  // level 0 is repeated in the index
+    const uint64_t indexOffset = in.u64();
+    if (version != kVersion || codec != kCodecZlibShuffle || chunk == 0 || levels == 0 ||
+        indexOffset < kHeaderBytes || indexOffset > fileSize) {
+        std::cerr << "      MVR Error: Unsupported chunk store version or codec: " << path << std::endl;
+        return false;
+    }
+
+    std::vector<uint8_t> index(fileSize - indexOffset);
+    bool ok = readAt(file.f, indexOffset, index.data(), index.size());
+    ByteReader r{index.data()};
+    const uint8_t* end = index.data() + index.size();
+    std::vector<LevelInfo> infos;
+    std::vector<ChunkEntry> chunks;
+    for (uint32_t l = 0; l < levels && ok; ++l) {
+        if (static_cast<size_t>(end - r.p) < kLevelBytes) { ok = false; break; }
+        LevelInfo info;
+        info.width = r.u32();
+        info.height = r.u32();
+        info.depth = r.u32();
+        info.spacing_x = r.f64();
+        info.spacing_y = r.f64();
+        info.spacing_z = r.f64();
+        info.chunksX = r.u32();
+        info.chunksY = r.u32();
+        info.chunksZ = r.u32();
+        info.firstChunk = chunks.size();
+        const size_t count = static_cast<size_t>(info.chunksX) * info.chunksY * info.chunksZ;
+        if (info.chunksX != chunkCount(info.width, chunk) || info.chunksY != chunkCount(info.height, chunk) ||
+            info.chunksZ != chunkCount(info.depth, chunk) || count == 0 ||
+            static_cast<size_t>(end - r.p) / kEntryBytes < count) {
+            ok = false;
+            break;
+        }
+        for (size_t c = 0; c < count; ++c) {
+            ChunkEntry e;
+            e.offset = r.u64();
+            e.size = r.u32();
+            e.flags = r.u32();
+            if (e.offset + e.size > indexOffset) { ok = false; break; }
+            chunks.push_back(e);
+        }
+        infos.push_back(info);
+    }
+    if (!ok) {
+        std::cerr << "      MVR Error: Corrupt chunk store index: " << path << std::endl;
+        return false;
+    }
+    m_path = path;
+    m_chunkSize = chunk;
+    m_levels = std::move(infos);
+    m_chunks = std::move(chunks);
+    resetCounters();
+    return true;
+}
+
+void Reader::close() {
+    m_path.clear();
+    m_chunkSize = 0;
+    m_levels.clear();
+    m_chunks.clear();
+}
+
+uint64_t Reader::storedBytes() const {
+    uint64_t total = 0;
+    for (const ChunkEntry& e : m_chunks) total += e.size;
+    return total;
+}
+
+void Reader::resetCounters() {
+    m_chunksRead = 0;
+    m_bytesRead = 0;
+}
+
+bool Reader::readRegion(unsigned int level, unsigned int x0, unsigned int y0, unsigned int z0,
+                        unsigned int w, unsigned int h, unsigned int d, uint16_t* dst,
+                        unsigned int threads) const {
+    if (level >= m_levels.size()) return false;
+    const LevelInfo& info = m_levels[level];
+    if (w == 0 || h == 0 || d == 0) return true;
+    if (static_cast<uint64_t>(x0) + w > info.width || static_cast<uint64_t>(y0) + h > info.height ||
+        static_cast<uint64_t>(z0) + d > info.depth) {
+        return false;
+    }
+    const unsigned int cs = m_chunkSize;
+    const unsigned int cx0 = x0 / cs, cx1 = (x0 + w - 1) / cs;
+    const unsigned int cy0 = y0 / cs, cy1 = (y0 + h - 1) / cs;
+    const unsigned int cz0 = z0 / cs, cz1 = (z0 + d - 1) / cs;
+    const unsigned int nx = cx1 - cx0 + 1, ny = cy1 - cy0 + 1;
+    const size_t count = static_cast<size_t>(nx) * ny * (cz1 - cz0 + 1);
+
+    std::atomic<bool> ok{true};
+    // Chunks write disjoint parts of dst, so workers need no synchronisation
+    Parallel::parallelFor(0, count, [&](size_t first, size_t last) {
+        File file(m_path, "rb");
+        if (!file) { ok = false; return; }
+        std::vector<uint8_t> stored, shuffled;
+        uint64_t bytes = 0;
+        for (size_t i = first; i < last && ok; ++i) {
+            const unsigned int cx = cx0 + static_cast<unsigned int>(i % nx);
+            const unsigned int cy = cy0 + static_cast<unsigned int>((i / nx) % ny);
+            const unsigned int cz = cz0 + static_cast<unsigned int>(i / (static_cast<size_t>(nx) * ny));
+            const ChunkEntry& e = m_chunks[info.firstChunk + (static_cast<size_t>(cz) * info.chunksY + cy) * info.chunksX + cx];
+            const unsigned int bx = cx * cs, by = cy * cs, bz = cz * cs;
+            const unsigned int bw = std::min(cs, info.width - bx);
+            const unsigned int bh = std::min(cs, info.height - by);
+            const unsigned int bd = std::min(cs, info.depth - bz);
+            const size_t n = static_cast<size_t>(bw) * bh * bd;
+
+            stored.resize(e.size);
+            if (!readAt(file.f, e.offset, stored.data(), stored.size())) { ok = false; break; }
+            bytes += e.size;
+            const uint8_t* src = stored.data();
+            if (e.flags & kFlagZlib) {
+                shuffled.resize(2 * n);
+                uLongf size = static_cast<uLongf>(shuffled.size());
+                if (uncompress(shuffled.data(), &size, stored.data(), static_cast<uLong>(stored.size())) != Z_OK ||
+                    size != shuffled.size()) {
+                    ok = false;
+                    break;
+                }
+                src = shuffled.data();
+            } else if (stored.size() != 2 * n) {
+                ok = false;
+                break;
+            }
+
+            // Intersection of the chunk with the requested box
+            const unsigned int ix0 = std::max(bx, x0), ix1 = std::min(bx + bw, x0 + w);
+            const unsigned int iy0 = std::max(by, y0), iy1 = std::min(by + bh, y0 + h);
+            const unsigned int iz0 = std::max(bz, z0), iz1 = std::min(bz + bd, z0 + d);
+            const uint8_t* lo = src;
+            const uint8_t* hi = src + n;
+            for (unsigned int z = iz0; z < iz1; ++z) {
+                for (unsigned int y = iy0; y < iy1; ++y) {
+                    const size_t s = (static_cast<size_t>(z - bz) * bh + (y - by)) * bw + (ix0 - bx);
+                    uint16_t* out = dst + (static_cast<size_t>(z - z0) * h + (y - y0)) * w + (ix0 - x0);
+                    for (unsigned int x = 0; x < ix1 - ix0; ++x) {
+                        out[x] = static_cast<uint16_t>(lo[s + x] | (hi[s + x] << 8));
+                    }
+                }
+            }
+        }
+        m_chunksRead += last - first;
+        m_bytesRead += bytes;
+    }, 1, threads);
+    return ok;
+}
+
+bool Reader::readVolume(unsigned int level, VolumeData& volume, unsigned int threads, LoadStats* stats) const {
+    if (level >= m_levels.size()) return false;
+    const LevelInfo& info = m_levels[level];
+    ScopedLoadPhase phase(stats, LoadPhase::Decode);
+    const uint64_t bytesBefore = m_bytesRead.load();
+    volume.data.resize(static_cast<size_t>(info.width) * info.height * info.depth);
+    if (!readRegion(level, 0, 0, 0, info.width, info.height, info.depth, volume.data.data(), threads)) {
+        volume.clear();
+        return false;
+    }
+    volume.width = info.width;
+    volume.height = info.height;
+    volume.depth = info.depth;
+    volume.spacing_x = info.spacing_x;
+    volume.spacing_y = info.spacing_y;
+    volume.spacing_z = info.spacing_z;
+    if (stats) {
+        stats->bytesRead += m_bytesRead.load() - bytesBefore;
+        stats->bytesOutput += volume.data.size() * sizeof(uint16_t);
+        stats->dataType = "uint16";  // stores hold the normalized volume
+    }
+    return true;
+}
+
+} // namespace ChunkStore
+
+namespace DataLoader {
+
+bool loadChunkStore(const std::string& filePath, VolumeData& volumeData, LoadStats* stats, const LoadOptions& options) {
+    ChunkStore::Reader reader;
+    {
+        ScopedLoadPhase phase(stats, LoadPhase::HeaderParse);
+        if (!reader.open(filePath)) return false;
+    }
+    // The finest pyramid level that fits the host memory budget
+    unsigned int level = 0;
+    auto levelBytes = [&](unsigned int l) {
+        const ChunkStore::LevelInfo& info = reader.level(l);
+        return static_cast<uint64_t>(info.width) * info.height * info.depth * sizeof(uint16_t);
+    };
+    while (level + 1 < reader.levelCount() && !MemoryBudget::fits(MemoryBudget::Pool::Host, levelBytes(level))) ++level;
+    if (level > 0) {
+        std::cerr << "      MVR Warning: Chunk store exceeds the host memory budget; reading pyramid level " << level
+                  << "." << std::endl;
+    }
+    MemoryBudget::Allocation outputMemory(MemoryBudget::Category::LoadTemporary, levelBytes(level));
+    if (!reader.readVolume(level, volumeData, options.threads, stats)) {
+        std::cerr << "      MVR Error: Failed to read chunk store: " << filePath << std::endl;
+        return false;
+    }
+    if (getVerbosity() >= VerbositySummary) {
+        std::cout << "      MVR Info: Loaded chunk store: " << volumeData.width << "x" << volumeData.height << "x"
+                  << volumeData.depth << " (" << reader.chunksRead() << " chunks)" << std::endl;
+    }
+    return true;
+}
+
+} // namespace DataLoader
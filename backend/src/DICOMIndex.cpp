@@ -0,0 +1,270 @@
+// backend/src/DICOMIndex.cpp
+//
+// Recursive DICOM series discovery backed by a persistent per-root header index.
+
+#include "../include/DataLoader.h"
+
+#include <algorithm>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
+#include <iostream>
+#include <map>
+#include <sstream>
+#include <unordered_map>
+
+namespace fs = std::filesystem;
+
+namespace DataLoader {
+
+static const char* kIndexMagic = "#mvr-dicom-index";
+static const int   kIndexVersion = 1;
+
+// FNV-1a: stable across runs and platforms, unlike std::hash.
+static uint64_t fnv1a64(const std::string& s) {
+    uint64_t h = 1469598103934665603ull;
+    for (unsigned char c : s) {
+        h ^= c;
+        h *= 1099511628211ull;
+    }
+    return h;
+}
+
+static std::string indexFilePath(const std::string& indexDir, const std::string& rootDir) {
+    std::ostringstream name;
+    name << "dicom_index_" << std::hex << std::setw(16) << std::setfill('0') << fnv1a64(rootDir) << ".tsv";
+    return (fs::path(indexDir) / name.str()).string();
+}
+
+static std::vector<std::string> splitTabs(const std::string& line) {
+    std::vector<std::string> fields;
+    size_t start = 0;
+    while (true) {
+        size_t pos = line.find('\t', start);
+        fields.push_back(line.substr(start, pos == std::string::npos ? std::string::npos : pos - start));
+        if (pos == std::string::npos) break;
+        start = pos + 1;
+    }
+    return fields;
+}
+
+// Index entry: the cached header and whether the file parsed as DICOM at all.
+using IndexEntry = std::pair<DicomFileHeader, bool>;
+
+static std::unordered_map<std::string, IndexEntry> readIndex(const std::string& path, const std::string& rootDir) {
+    std::unordered_map<std::string, IndexEntry> index;
+    std::ifstream in(path);
+    if (!in.is_open()) return index;
+
+    std::string line;
+    if (!std::getline(in, line)) return index;
+    std::vector<std::string> head = splitTabs(line);
+    if (head.size() < 3 || head[0] != kIndexMagic || head[1] != std::to_string(kIndexVersion) || head[2] != rootDir) {
+        return index; // unknown version or hash collision: rebuild
+    }
+
+    while (std::getline(in, line)) {
+        std::vector<std::string> f = splitTabs(line);
+        if (f.size() != 17) continue;
+        try {
+            DicomFileHeader h;
+            h.path = f[0];
+            h.mtime = std::stoll(f[1]);
+            h.size = std::stoull(f[2]);
+            h.valid = (f[3] == "1");
+            h.seriesUID = f[4];
+            h.orientation = f[5];
+            h.hasPosition = (f[6] == "1");
+            h.position[0] = std::stod(f[7]);
+            h.position[1] = std::stod(f[8]);
+            h.position[2] = std::stod(f[9]);
+            h.sortKey = std::stod(f[10]);
+            h.rows = static_cast<unsigned int>(std::stoul(f[11]));
+            h.cols = static_cast<unsigned int>(std::stoul(f[12]));
+            h.spacingX = std::stod(f[13]);
+            h.spacingY = std::stod(f[14]);
+            h.sliceThickness = std::stod(f[15]);
+            const bool parsed = (f[16] == "1");
+            std::string key = h.path;
+            index.emplace(std::move(key), IndexEntry(std::move(h), parsed));
+        } catch (const std::exception&) {
+            continue; // corrupt line: that file is simply parsed again
+        }
+    }
+    return index;
+}
+
+static bool writeIndex(const std::string& path, const std::string& rootDir,
+                       const std::vector<IndexEntry>& entries) {
+    std::error_code ec;
+    fs::create_directories(fs::path(path).parent_path(), ec);
+
+    // Write to a temporary file and rename, so a crash never leaves a truncated index.
+    const std::string tmpPath = path + ".tmp";
+    {
+        std::ofstream out(tmpPath, std::ios::trunc);
+        if (!out.is_open()) return false;
+        out << kIndexMagic << '\t' << kIndexVersion << '\t' << rootDir << '\n';
+        out << std::setprecision(17);
+        for (const auto& [h, parsed] : entries) {
+            if (h.path.find_first_of("\t\n") != std::string::npos) continue;
+            out << h.path << '\t' << h.mtime << '\t' << h.size << '\t' << (h.valid ? 1 : 0) << '\t'
+                << h.seriesUID << '\t' << h.orientation << '\t' << (h.hasPosition ? 1 : 0) << '\t'
+                << h.position[0] << '\t' << h.position[1] << '\t' << h.position[2] << '\t'
+                << h.sortKey << '\t' << h.rows << '\t' << h.cols << '\t'
+                << h.spacingX << '\t' << h.spacingY << '\t' << h.sliceThickness << '\t'
+                << (parsed ? 1 : 0) << '\n';
+        }
+        if (!out.good()) return false;
+    }
+    fs::rename(tmpPath, path, ec);
+    return !ec;
+}
+
+// A regular file found by the stat() sweep
+struct Candidate { std::string path; int64_t mtime; uint64_t size; };
+
+static std::string canonicalRoot(const std::string& rootDir) {
+    std::error_code ec;
+    std::string root = fs::weakly_canonical(fs::path(rootDir), ec).string();
+    return ec ? rootDir : root;
+}
+
+// stat() sweep of the whole tree. Hidden entries (e.g. ".mvr") are skipped.
+static bool sweepTree(const std::string& root, std::vector<Candidate>& candidates, LoadStats* stats) {
+    std::error_code ec;
+    try {
+        fs::recursive_directory_iterator it(root, fs::directory_options::skip_permission_denied), end;
+        for (; it != end; it.increment(ec)) {
+            if (ec) { ec.clear(); continue; }
+            const fs::directory_entry& entry = *it;
+            const std::string name = entry.path().filename().string();
+            if (!name.empty() && name[0] == '.') {
+                if (entry.is_directory(ec)) it.disable_recursion_pending();
+                continue;
+            }
+            if (stats) stats->filesScanned += 1;
+            if (!entry.is_regular_file(ec)) {
+                continue;
+            }
+            Candidate c;
+            c.path = entry.path().string();
+            c.mtime = static_cast<int64_t>(entry.last_write_time(ec).time_since_epoch().count());
+            c.size = static_cast<uint64_t>(entry.file_size(ec));
+            candidates.push_back(std::move(c));
+        }
+    } catch (const fs::filesystem_error& e) {
+        std::cerr << "      MVR ERROR: Cannot access directory: " << root << " - " << e.what() << std::endl;
+        return false;
+    }
+    return true;
+}
+
+// Order-independent hash of the paths, mtimes and sizes found by a sweep
+static uint64_t treeSignature(const std::vector<Candidate>& candidates) {
+    uint64_t signature = fnv1a64(std::to_string(candidates.size()));
+    for (const Candidate& c : candidates) {
+        signature += fnv1a64(c.path + '\t' + std::to_string(c.mtime) + '\t' + std::to_string(c.size));
+    }
+    return signature;
+}
+
+uint64_t dicomTreeSignature(const std::string& rootDir) {
+    std::vector<Candidate> candidates;
+    if (!sweepTree(canonicalRoot(rootDir), candidates, nullptr)) return 0;
+    return treeSignature(candidates);
+}
+
+std::vector<DicomSeriesInfo> scanDICOMSeries(const std::string& rootDir, const std::string& indexDir, LoadStats* stats,
+                                             uint64_t* signature) {
+    const int verbosity = getVerbosity();
+    const std::string root = canonicalRoot(rootDir);
+
+    const std::string indexPath = indexDir.empty() ? std::string() : indexFilePath(indexDir, root);
+    std::unordered_map<std::string, IndexEntry> cached;
+    if (!indexPath.empty()) cached = readIndex(indexPath, root);
+
+    if (verbosity >= VerbositySummary) {
+        std::cout << "      MVR INFO: Scanning directory (recursively): " << root << std::endl;
+    }
+
+    // 1. stat() sweep of the whole tree.
+    std::vector<Candidate> candidates;
+    {
+        ScopedLoadPhase scanPhase(stats, LoadPhase::Scan);
+        if (!sweepTree(root, candidates, stats)) return {};
+    }
+    if (signature) *signature = treeSignature(candidates);
+
+    // 2. Headers: index lookup first, parse only new or changed files.
+    std::vector<IndexEntry> headers;
+    headers.reserve(candidates.size());
+    bool indexDirty = (cached.size() != candidates.size());
+    {
+        ScopedLoadPhase headerPhase(stats, LoadPhase::HeaderParse);
+        for (const Candidate& c : candidates) {
+            auto hit = cached.find(c.path);
+            if (hit != cached.end() && hit->second.first.mtime == c.mtime && hit->second.first.size == c.size) {
+                if (stats) stats->filesCached += 1;
+                headers.push_back(hit->second);
+                continue;
+            }
+            DicomFileHeader h;
+            bool parsed = readDICOMHeader(c.path, h);
+            h.path = c.path;
+            h.mtime = c.mtime;
+            h.size = c.size;
+            if (stats) {
+                stats->bytesRead += c.size;
+                if (parsed) stats->filesParsed += 1; else stats->filesSkipped += 1;
+            }
+            headers.emplace_back(std::move(h), parsed);
+            indexDirty = true;
+        }
+    }
+
+    if (!indexPath.empty() && indexDirty) {
+        if (!writeIndex(indexPath, root, headers)) {
+            std::cerr << "      MVR WARN: Could not write DICOM index: " << indexPath << std::endl;
+        }
+    }
+
+    // 3. Group by series UID + orientation and sort each series along its normal.
+    std::vector<DicomSeriesInfo> series;
+    {
+        ScopedLoadPhase sortPhase(stats, LoadPhase::Sort);
+        std::map<std::string, DicomSeriesInfo> groups;
+        for (auto& [h, parsed] : headers) {
+            if (!parsed || !h.valid) continue;
+            const std::string key = h.seriesUID + "|" + h.orientation;
+            DicomSeriesInfo& s = groups[key];
+            if (s.slices.empty()) {
+                s.key = key;
+                s.seriesUID = h.seriesUID;
+                s.orientation = h.orientation;
+            }
+            s.slices.push_back(h);
+        }
+        for (auto& [key, s] : groups) {
+            std::sort(s.slices.begin(), s.slices.end(), [](const DicomFileHeader& a, const DicomFileHeader& b) {
+                if (a.sortKey != b.sortKey) return a.sortKey < b.sortKey;
+                return a.path < b.path;
+            });
+            s.width = s.slices.front().cols;
+            s.height = s.slices.front().rows;
+            s.directory = fs::path(s.slices.front().path).parent_path().string();
+            series.push_back(std::move(s));
+        }
+        std::stable_sort(series.begin(), series.end(), [](const DicomSeriesInfo& a, const DicomSeriesInfo& b) {
+            return a.slices.size() > b.slices.size();
+        });
+    }
+
+    if (verbosity >= VerbositySummary) {
+        std::cout << "      MVR INFO: " << candidates.size() << " files, "
+                  << (stats ? stats->filesCached : 0) << " from index, " << series.size() << " series." << std::endl;
+    }
+    return series;
+}
+
+} // namespace DataLoader
@@ -2,12 +2,15 @@
 
 #include "../include/DataLoader.h"
 #include "../include/VolumeData.h"
+#include "../include/VolumeOps.h"
+#include "../include/MemoryBudget.h"
 
 #include <iostream>
 #include <vector>
 #include <algorithm>
 #include <filesystem>
 #include <cmath>
+#include <cstdio>
 
 // DCMTK includes
 #include "dcmtk/config/osconfig.h"
@@ -18,161 +21,344 @@ namespace fs = std::filesystem;
 
 namespace DataLoader {
 
-// Helper struct to hold slice information for robust sorting
-struct DicomSlice {
-    std::string filePath;
-    double sortKey; // Can be Z position, slice location, or instance number
-};
-
-bool loadDICOM(const std::string& directoryPath, VolumeData& volumeData) {
-    volumeData.clear();
-    std::vector<DicomSlice> slices;
+// Rounds an orientation cosine so nearly identical orientations group together.
+static double roundCosine(double v) {
+    double r = std::round(v * 1000.0) / 1000.0;
+    return (r == 0.0) ? 0.0 : r; // avoid "-0.000"
+}
 
-    std::cout << "      MVR INFO: Scanning directory (non-recursively): " << directoryPath << std::endl;
+bool readDICOMHeader(const std::string& filePath, DicomFileHeader& header) {
+    header.path = filePath;
+    header.valid = false;
 
-    // 1. Scan the SPECIFIED directory (non-recursively) for files.
-    try {
-        for (const auto& entry : fs::directory_iterator(directoryPath)) {
-            if (!entry.is_regular_file()){
-                std::cout << "      Skipping non-file: " << fs::path(entry.path()).filename().string() << std::endl;
-                continue;
+    // Stop before PixelData: only the header is needed to group and sort slices.
+    DcmFileFormat ff;
+    OFCondition status = ff.loadFileUntilTag(filePath.c_str(), EXS_Unknown, EGL_noChange, DCM_MaxReadLength,
+                                             ERM_autoDetect, DCM_PixelData);
+    if (status.bad()) {
+        // --- TOLERANT LOADING --- (raw dataset without meta header)
+        status = ff.loadFileUntilTag(filePath.c_str(), EXS_Unknown, EGL_noChange, DCM_MaxReadLength,
+                                     ERM_dataset, DCM_PixelData);
+        if (status.bad()) {
+            if (getVerbosity() >= VerbosityPerFile) {
+                std::cerr << "        -> FAILED to parse with DCMTK: " << filePath << " Error: " << status.text() << std::endl;
             }
+            return false;
+        }
+    }
 
-            const std::string filePath = entry.path().string();
-            
-            // --- DEBUG: Print every file being considered ---
-            // std::cout << "      Considering file: " << fs::path(filePath).filename().string() << std::endl;
-
-            DcmFileFormat ff;
-            
-            // --- TOLERANT LOADING ---
-            OFCondition status = ff.loadFile(filePath.c_str());
-            if (status.bad()) {
-                status = ff.loadFile(filePath.c_str(), EXS_Unknown, EGL_noChange, DCM_MaxReadLength, ERM_dataset);
-                if (status.bad()) {
-                    // --- DEBUG: Print files that fail to load and why ---
-                    std::cerr << "        -> FAILED to parse with DCMTK. Error: " << status.text() << std::endl;
-                    continue;
-                }
-            }
+    DcmDataset* ds = ff.getDataset();
+    Uint16 rows = 0, cols = 0;
+    ds->findAndGetUint16(DCM_Rows, rows);
+    ds->findAndGetUint16(DCM_Columns, cols);
+    header.rows = rows;
+    header.cols = cols;
+    header.valid = (rows > 0 && cols > 0);
 
-            // --- DEBUG: Confirm successful parsing and print dimensions ---
-            DicomImage dcmImage(filePath.c_str());
-            if (dcmImage.getStatus() == EIS_Normal) {
-                std::cout << "        -> OK. Dimensions: " << dcmImage.getWidth() << " x " << dcmImage.getHeight() << std::endl;
-            } else {
-                std::cerr << "        -> Parsed but could not create DicomImage object. Status: " << DicomImage::getString(dcmImage.getStatus()) << std::endl;
-            }
+    OFString uid;
+    if (ds->findAndGetOFString(DCM_SeriesInstanceUID, uid).good()) header.seriesUID = uid.c_str();
 
-            DcmDataset* ds = ff.getDataset();
-            double sortKey = 0.0;
-            bool hasKey = false;
-
-            // --- ROBUST SORTING LOGIC ---
-            OFString imagePos;
-            if (ds->findAndGetOFString(DCM_ImagePositionPatient, imagePos).good()) {
-                double z = 0.0;
-                if (sscanf(imagePos.c_str(), "%*f\\%*f\\%lf", &z) == 1) {
-                    sortKey = z;
-                    hasKey = true;
-                }
-            }
+    // Multi-valued tags are read value by value (findAndGetOFString only returns the first one).
+    double iop[6] = {0.0, 0.0, 0.0, 0.0, 0.0, 0.0};
+    bool hasOrientation = true;
+    for (unsigned long i = 0; i < 6 && hasOrientation; ++i) {
+        hasOrientation = ds->findAndGetFloat64(DCM_ImageOrientationPatient, iop[i], i).good();
+    }
+    header.orientation.clear();
+    if (hasOrientation) {
+        char buf[128];
+        std::snprintf(buf, sizeof(buf), "%.3f\\%.3f\\%.3f\\%.3f\\%.3f\\%.3f",
+                      roundCosine(iop[0]), roundCosine(iop[1]), roundCosine(iop[2]),
+                      roundCosine(iop[3]), roundCosine(iop[4]), roundCosine(iop[5]));
+        header.orientation = buf;
+    }
 
-            if (!hasKey) {
-                if (ds->findAndGetFloat64(DCM_SliceLocation, sortKey).good()) {
-                    hasKey = true;
-                }
-            }
+    header.hasPosition = true;
+    for (unsigned long i = 0; i < 3 && header.hasPosition; ++i) {
+        header.hasPosition = ds->findAndGetFloat64(DCM_ImagePositionPatient, header.position[i], i).good();
+    }
 
-            if (!hasKey) {
-                long instNum = 0;
-                if (ds->findAndGetLongInt(DCM_InstanceNumber, instNum).good()) {
-                    sortKey = static_cast<double>(instNum);
-                }
-            }
-            
-            slices.push_back({filePath, sortKey});
+    // --- ROBUST SORTING LOGIC ---
+    // Prefer the position along the slice normal (row x column), which is correct for
+    // any orientation; fall back to z, SliceLocation and finally InstanceNumber.
+    bool hasKey = false;
+    if (header.hasPosition && hasOrientation) {
+        const double nx = iop[1] * iop[5] - iop[2] * iop[4];
+        const double ny = iop[2] * iop[3] - iop[0] * iop[5];
+        const double nz = iop[0] * iop[4] - iop[1] * iop[3];
+        header.sortKey = header.position[0] * nx + header.position[1] * ny + header.position[2] * nz;
+        hasKey = true;
+    } else if (header.hasPosition) {
+        header.sortKey = header.position[2];
+        hasKey = true;
+    }
+    if (!hasKey) {
+        Float64 loc = 0.0;
+        if (ds->findAndGetFloat64(DCM_SliceLocation, loc).good()) {
+            header.sortKey = loc;
+            hasKey = true;
+        }
+    }
+    if (!hasKey) {
+        long instNum = 0;
+        if (ds->findAndGetLongInt(DCM_InstanceNumber, instNum).good()) {
+            header.sortKey = static_cast<double>(instNum);
         }
-    } catch (const fs::filesystem_error& e) {
-        std::cerr << "      MVR ERROR: Cannot access directory: " << directoryPath << " - " << e.what() << std::endl;
+    }
+
+    Float64 spacing = 0.0;
+    if (ds->findAndGetFloat64(DCM_PixelSpacing, spacing, 0).good() && spacing > 0.0) header.spacingY = spacing;
+    if (ds->findAndGetFloat64(DCM_PixelSpacing, spacing, 1).good() && spacing > 0.0) header.spacingX = spacing;
+    Float64 thickness = 0.0;
+    if (ds->findAndGetFloat64(DCM_SliceThickness, thickness).good()) header.sliceThickness = thickness;
+
+    if (getVerbosity() >= VerbosityPerFile) {
+        std::cout << "        -> OK. " << fs::path(filePath).filename().string() << " Dimensions: "
+                  << header.cols << " x " << header.rows << std::endl;
+    }
+    return true;
+}
+
+bool decodeDICOMSlice(const DicomFileHeader& header, VolumeOps::SliceImage& image, LoadStats* stats) {
+    DicomImage dcmImage(header.path.c_str());
+
+    if (dcmImage.getStatus()!= EIS_Normal) {
+        std::cerr << "      MVR WARN: Skipping unreadable DICOM file: " << header.path << std::endl;
         return false;
     }
 
-    if (slices.empty()) {
-        std::cerr << "      :MVR ERROR: No valid DICOM files were successfully parsed in: " << directoryPath << std::endl;
+    const DiPixel* pixelData = dcmImage.getInterData();
+    if (!pixelData) {
+        std::cerr << "      MVR WARN: Could not get pixel data from " << header.path << std::endl;
+        return false;
+    }
+    
+    const uint16_t* slicePixels = static_cast<const uint16_t*>(pixelData->getData());
+    if (!slicePixels) {
+        std::cerr << "      MVR WARN: Pixel data pointer is null for " << header.path << std::endl;
         return false;
     }
 
-    // 2. Sort the collected slices.
-    std::sort(slices.begin(), slices.end(),[](const DicomSlice& a, const DicomSlice& b) {
-        return a.sortKey < b.sortKey;
-    });
+    if (stats && stats->dataType.empty()) {
+        switch (pixelData->getRepresentation()) {
+            case EPR_Uint8:  stats->dataType = "uint8"; break;
+            case EPR_Sint8:  stats->dataType = "int8"; break;
+            case EPR_Uint16: stats->dataType = "uint16"; break;
+            case EPR_Sint16: stats->dataType = "int16"; break;
+            case EPR_Uint32: stats->dataType = "uint32"; break;
+            case EPR_Sint32: stats->dataType = "int32"; break;
+        }
+    }
+
+    image.width = dcmImage.getWidth();
+    image.height = dcmImage.getHeight();
+    image.spacingX = header.spacingX;
+    image.spacingY = header.spacingY;
+    image.offsetX = 0.0;
+    image.offsetY = 0.0;
+    image.position = header.sortKey;
+    image.pixels.assign(slicePixels, slicePixels + static_cast<size_t>(image.width) * image.height);
+    return true;
+}
 
-    std::cout << "      MVR INFO: Found and sorted " << slices.size() << " DICOM slices." << std::endl;
+// Parses the backslash-separated orientation string written by readDICOMHeader.
+static bool parseOrientation(const std::string& text, double iop[6]) {
+    return !text.empty() && std::sscanf(text.c_str(), "%lf\\%lf\\%lf\\%lf\\%lf\\%lf",
+                                        &iop[0], &iop[1], &iop[2], &iop[3], &iop[4], &iop[5]) == 6;
+}
 
-    // 3. Load pixel data from the sorted slices and stack them.
-    for (const auto& slice : slices) {
-        DicomImage dcmImage(slice.filePath.c_str());
+// Box-filters a decoded slice by `factor` in-plane; blocks cut off at the edges are
+// averaged over the pixels they hold.
+static void reduceSliceImage(VolumeOps::SliceImage& image, unsigned int factor) {
+    const size_t w = image.width, h = image.height;
+    const size_t ow = MemoryBudget::reducedSize(w, factor), oh = MemoryBudget::reducedSize(h, factor);
+    std::vector<uint32_t> sums(ow * oh, 0);
+    for (size_t y = 0; y < h; ++y) {
+        const uint16_t* row = image.pixels.data() + y * w;
+        uint32_t* out = sums.data() + (y / factor) * ow;
+        for (size_t x = 0; x < w; ++x) out[x / factor] += row[x];
+    }
+    std::vector<uint16_t> reduced(ow * oh);
+    for (size_t y = 0; y < oh; ++y) {
+        const size_t by = std::min<size_t>(factor, h - y * factor);
+        for (size_t x = 0; x < ow; ++x) {
+            const size_t count = by * std::min<size_t>(factor, w - x * factor);
+            reduced[y * ow + x] = static_cast<uint16_t>((sums[y * ow + x] + count / 2) / count);
+        }
+    }
+    image.pixels = std::move(reduced);
+    if (w > 1) image.spacingX *= factor;
+    if (h > 1) image.spacingY *= factor;
+    image.width = static_cast<unsigned int>(ow);
+    image.height = static_cast<unsigned int>(oh);
+}
 
-        if (dcmImage.getStatus()!= EIS_Normal) {
-            std::cerr << "      MVR WARN: Skipping unreadable DICOM file: " << slice.filePath << std::endl;
-            continue;
+// Averages each run of `factor` consecutive slices into one at their mean position and
+// offset. A slice whose size differs from its run's first slice is kept on its own.
+static void mergeSliceRuns(std::vector<VolumeOps::SliceImage>& images, unsigned int factor) {
+    std::vector<VolumeOps::SliceImage> merged;
+    for (size_t first = 0; first < images.size(); first += factor) {
+        const size_t last = std::min(images.size(), first + factor);
+        VolumeOps::SliceImage& base = images[first];
+        std::vector<uint32_t> sums(base.pixels.begin(), base.pixels.end());
+        double position = base.position, offsetX = base.offsetX, offsetY = base.offsetY;
+        uint32_t count = 1;
+        for (size_t k = first + 1; k < last; ++k) {
+            VolumeOps::SliceImage& image = images[k];
+            if (image.width != base.width || image.height != base.height) {
+                merged.push_back(std::move(image));
+                continue;
+            }
+            for (size_t i = 0; i < sums.size(); ++i) sums[i] += image.pixels[i];
+            position += image.position;
+            offsetX += image.offsetX;
+            offsetY += image.offsetY;
+            ++count;
+            std::vector<uint16_t>().swap(image.pixels);
         }
+        for (size_t i = 0; i < sums.size(); ++i) base.pixels[i] = static_cast<uint16_t>((sums[i] + count / 2) / count);
+        base.position = position / count;
+        base.offsetX = offsetX / count;
+        base.offsetY = offsetY / count;
+        merged.push_back(std::move(base));
+    }
+    std::stable_sort(merged.begin(), merged.end(), [](const VolumeOps::SliceImage& a, const VolumeOps::SliceImage& b) {
+        return a.position < b.position;
+    });
+    images = std::move(merged);
+}
+
+bool loadDICOMSeries(const DicomSeriesInfo& series, VolumeData& volumeData, LoadStats* stats,
+                     const LoadOptions& options) {
+    volumeData.clear();
+    if (series.slices.empty()) {
+        std::cerr << "      MVR ERROR: DICOM series has no slices: " << series.key << std::endl;
+        return false;
+    }
 
-        const DiPixel* pixelData = dcmImage.getInterData();
-        if (!pixelData) {
-            std::cerr << "      MVR WARN: Could not get pixel data from " << slice.filePath << std::endl;
-            continue;
+    // Over the host budget at full resolution: the reduction is chosen from the headers,
+    // before any pixel is decoded. Each slice is reduced in-plane as soon as it is decoded
+    // and runs of `factor` slices are averaged before stacking, so the full-resolution
+    // stack is never held. The estimate counts the decoded slices and the stacked output
+    // (2 bytes per voxel each) plus the slice being decoded.
+    unsigned int factor = 1;
+    if (options.fitHostBudget) {
+        const DicomFileHeader& first = series.slices.front();
+        const uint64_t sliceBytes = static_cast<uint64_t>(first.cols) * first.rows * sizeof(uint16_t);
+        factor = MemoryBudget::reductionFactor(MemoryBudget::Pool::Host, first.cols, first.rows, series.slices.size(),
+                                               2 * sizeof(uint16_t), 2 * sliceBytes);
+        if (factor == 0) {
+            std::cerr << "      MVR ERROR: DICOM series " << first.cols << "x" << first.rows << "x" << series.slices.size()
+                      << " does not fit the host memory budget at any resolution." << std::endl;
+            return false;
         }
-        
-        const uint16_t* slicePixels = static_cast<const uint16_t*>(pixelData->getData());
-        if (!slicePixels) {
-            std::cerr << "      MVR WARN: Pixel data pointer is null for " << slice.filePath << std::endl;
-            continue;
+        if (factor > 1 && getVerbosity() >= VerbositySummary) {
+            std::cout << "      MVR INFO: DICOM series " << first.cols << "x" << first.rows << "x" << series.slices.size()
+                      << " exceeds the host memory budget; reducing it " << factor << "x per axis while decoding." << std::endl;
         }
+    }
 
-        if (volumeData.width == 0) { // First valid slice: set dimensions and spacing
-            volumeData.width = dcmImage.getWidth();
-            volumeData.height = dcmImage.getHeight();
-            
-            DcmFileFormat ff;
-            ff.loadFile(slice.filePath.c_str());
-            DcmDataset* ds = ff.getDataset();
-            OFString spacingStr;
-            if (ds->findAndGetOFString(DCM_PixelSpacing, spacingStr).good()) {
-                sscanf(spacingStr.c_str(), "%lf\\%lf", &volumeData.spacing_y, &volumeData.spacing_x);
-            }
-        }
+    // Decode every readable slice with its geometry; sizes and gaps are reconciled below.
+    ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+    std::vector<VolumeOps::SliceImage> images;
+    std::vector<const DicomFileHeader*> headers;
+    images.reserve(series.slices.size());
+    MemoryBudget::Allocation imageMemory(MemoryBudget::Category::LoadTemporary);
 
-        volumeData.data.insert(volumeData.data.end(), slicePixels, slicePixels + (volumeData.width * volumeData.height));
+    for (const auto& slice : series.slices) {
+        VolumeOps::SliceImage image;
+        if (!decodeDICOMSlice(slice, image, stats)) continue;
+        if (factor > 1) reduceSliceImage(image, factor);
+        if (!images.empty() && (image.width != images.front().width || image.height != images.front().height)
+            && getVerbosity() >= VerbosityPerFile) {
+            std::cout << "        -> Resampling slice with mismatched size " << image.width << "x"
+                      << image.height << ": " << slice.path << std::endl;
+        }
+        imageMemory.resize(imageMemory.bytes() + image.pixels.size() * sizeof(uint16_t));
+        images.push_back(std::move(image));
+        headers.push_back(&slice);
     }
+    decodePhase.stop();
 
-    if (volumeData.data.empty()) {
-        std::cerr << "      MVR ERROR: Failed to decode any slices from the selected directory." << std::endl;
+    if (images.empty()) {
+        std::cerr << "      MVR ERROR: Failed to decode any slices from the selected series." << std::endl;
         return false;
     }
 
-    volumeData.depth = volumeData.data.size() / (volumeData.width * volumeData.height);
-
-    // 4. Calculate Z spacing.
-    if (slices.size() > 1) {
-        volumeData.spacing_z = std::abs(slices[1].sortKey - slices[0].sortKey);
-        if (volumeData.spacing_z == 0) {
-            DcmFileFormat ff;
-            ff.loadFile(slices[0].filePath.c_str());
-            ff.getDataset()->findAndGetFloat64(DCM_SliceThickness, volumeData.spacing_z);
+    ScopedLoadPhase resamplePhase(stats, LoadPhase::Resample);
+    const bool allPositioned = std::all_of(headers.begin(), headers.end(),
+                                           [](const DicomFileHeader* h) { return h->hasPosition; });
+    double iop[6];
+    if (allPositioned && parseOrientation(headers.front()->orientation, iop)) {
+        // In-plane offset of each slice's first pixel relative to the first slice
+        const double* ref = headers.front()->position;
+        for (size_t k = 0; k < images.size(); ++k) {
+            const double* p = headers[k]->position;
+            const double d[3] = {p[0] - ref[0], p[1] - ref[1], p[2] - ref[2]};
+            images[k].offsetX = d[0] * iop[0] + d[1] * iop[1] + d[2] * iop[2];
+            images[k].offsetY = d[0] * iop[3] + d[1] * iop[4] + d[2] * iop[5];
         }
+    } else if (!allPositioned) {
+        // Sorted by SliceLocation/InstanceNumber: the keys are not reliable distances,
+        // so keep the stack as-is with the first gap (or the thickness) as spacing.
+        double spacing = images.size() > 1 ? std::abs(images[1].position - images[0].position) : 0.0;
+        if (spacing == 0) spacing = series.slices.front().sliceThickness;
+        if (spacing <= 0) spacing = 1.0; // Final fallback
+        for (size_t k = 0; k < images.size(); ++k) images[k].position = k * spacing;
     }
-    if (volumeData.spacing_z <= 0) {
-        volumeData.spacing_z = 1.0; // Final fallback
+
+    const size_t decoded = images.size();
+    if (factor > 1) {
+        mergeSliceRuns(images, factor);
+        imageMemory.resize(0);
+        for (const auto& image : images) imageMemory.resize(imageMemory.bytes() + image.pixels.size() * sizeof(uint16_t));
     }
 
-    std::cout << "      MVR INFO: Loaded DICOM volume: "
-              << volumeData.width << "x"
-              << volumeData.height << "x"
-              << volumeData.depth << std::endl;
+    VolumeOps::ResampleOptions resample;
+    resample.interpolation = options.interpolation;
+    resample.isotropic = options.isotropic;
+    // The stacked output counts as a load temporary until the caller takes it over
+    MemoryBudget::Allocation outputMemory(MemoryBudget::Category::LoadTemporary,
+                                          static_cast<uint64_t>(images.front().width) * images.front().height *
+                                          images.size() * sizeof(uint16_t));
+    if (!VolumeOps::stackSlices(images, volumeData, resample, options.threads)) {
+        std::cerr << "      MVR ERROR: Failed to stack the slices of the selected series." << std::endl;
+        return false;
+    }
+    resamplePhase.stop();
+
+    if (stats) {
+        stats->bytesOutput += volumeData.data.size() * sizeof(uint16_t);
+        stats->reduction = factor;
+    }
+    if (getVerbosity() >= VerbositySummary) {
+        std::cout << "      MVR INFO: Loaded DICOM volume: "
+                  << volumeData.width << "x"
+                  << volumeData.height << "x"
+                  << volumeData.depth << " from " << decoded << " slices, spacing "
+                  << volumeData.spacing_x << " x " << volumeData.spacing_y << " x " << volumeData.spacing_z
+                  << " mm" << std::endl;
+    }
 
     return true;
 }
 
+bool loadDICOM(const std::string& directoryPath, VolumeData& volumeData, LoadStats* stats, const std::string& indexDir,
+               const LoadOptions& options) {
+    volumeData.clear();
+
+    std::vector<DicomSeriesInfo> series = scanDICOMSeries(directoryPath, indexDir, stats);
+    if (series.empty()) {
+        std::cerr << "      :MVR ERROR: No valid DICOM files were successfully parsed in: " << directoryPath << std::endl;
+        return false;
+    }
+
+    // scanDICOMSeries returns the largest series first.
+    if (getVerbosity() >= VerbositySummary) {
+        std::cout << "      MVR INFO: Found " << series.size() << " DICOM series; loading " << series.front().key
+                  << " (" << series.front().slices.size() << " slices)." << std::endl;
+    }
+    return loadDICOMSeries(series.front(), volumeData, stats, options);
+}
+
 } // namespace DataLoader
\ No newline at end of file
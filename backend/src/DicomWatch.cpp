@@ -0,0 +1,255 @@
+// backend/src/DicomWatch.cpp
+//
+// Live DICOM directory watch: inotify on Linux, directory listing elsewhere.
+
+#include "../include/DicomWatch.h"
+
+#include <algorithm>
+#include <chrono>
+#include <filesystem>
+#include <iostream>
+#include <map>
+
+#ifdef __linux__
+#include <cerrno>
+#include <poll.h>
+#include <sys/inotify.h>
+#include <unistd.h>
+#endif
+
+namespace fs = std::filesystem;
+
+// How often a blocked inotify wait checks for stop()
+static const int kStopCheckMs = 100;
+
+DicomWatch::~DicomWatch() {
+    stop();
+}
+
+bool DicomWatch::start(const std::string& directoryPath, bool polling, int pollIntervalMs) {
+    stop();
+    std::error_code ec;
+    if (!fs::is_directory(directoryPath, ec)) {
+        std::cerr << "      MVR ERROR: Not a directory: " << directoryPath << std::endl;
+        return false;
+    }
+    m_directory = directoryPath;
+    m_pollIntervalMs = std::max(10, pollIntervalMs);
+    m_files.clear();
+    m_filesSeen = 0;
+    {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        m_queue.clear();
+        m_queueMemory.release();
+        m_seriesKey.clear();
+        m_stop = false;
+    }
+    // The watch is in place before the first listing, so no file falls between the two
+    m_polling = polling || !initInotify();
+    if (DataLoader::getVerbosity() >= DataLoader::VerbositySummary) {
+        std::cout << "      MVR INFO: Watching " << m_directory << " for DICOM slices ("
+                  << (m_polling ? "polling" : "inotify") << ")." << std::endl;
+    }
+    m_worker = std::thread(&DicomWatch::watchLoop, this);
+    return true;
+}
+
+void DicomWatch::stop() {
+    {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        m_stop = true;
+    }
+    m_stopCv.notify_all();
+    if (m_worker.joinable()) m_worker.join();
+    closeInotify();
+}
+
+std::string DicomWatch::seriesKey() const {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    return m_seriesKey;
+}
+
+size_t DicomWatch::takeSlices(std::vector<Slice>& out) {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    const size_t count = m_queue.size();
+    for (Slice& slice : m_queue) out.push_back(std::move(slice));
+    m_queue.clear();
+    m_queueMemory.release();
+    return count;
+}
+
+void DicomWatch::watchLoop() {
+    // Files already there: one batch, so the series is chosen and sorted as a whole
+    process(listDirectory(false), true);
+    while (true) {
+        std::vector<std::string> paths;
+        if (!m_polling) {
+            bool overflow = false;
+            if (!readInotify(paths, overflow)) {
+                std::cerr << "      MVR WARN: inotify watch on " << m_directory << " ended; polling instead." << std::endl;
+                closeInotify();
+                m_polling = true;
+            }
+            // The kernel dropped events: list the directory for the files not read yet
+            if (overflow) paths = listDirectory(false);
+        } else {
+            paths = listDirectory(true);
+        }
+        if (!paths.empty()) process(std::move(paths), false);
+
+        std::unique_lock<std::mutex> lock(m_mutex);
+        if (m_polling) {
+            m_stopCv.wait_for(lock, std::chrono::milliseconds(m_pollIntervalMs), [this] { return m_stop; });
+        }
+        if (m_stop) break;
+    }
+}
+
+bool DicomWatch::initInotify() {
+#ifdef __linux__
+    m_inotifyFd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC);
+    if (m_inotifyFd < 0) return false;
+    // Closed after writing, or renamed in (writers that write to a temporary name first)
+    if (inotify_add_watch(m_inotifyFd, m_directory.c_str(), IN_CLOSE_WRITE | IN_MOVED_TO) < 0) {
+        closeInotify();
+        return false;
+    }
+    return true;
+#else
+    return false;
+#endif
+}
+
+void DicomWatch::closeInotify() {
+#ifdef __linux__
+    if (m_inotifyFd >= 0) ::close(m_inotifyFd);
+#endif
+    m_inotifyFd = -1;
+}
+
+// Waits up to kStopCheckMs for events and appends the files they name. Returns false if
+// the watch is gone (e.g. the directory was removed).
+bool DicomWatch::readInotify(std::vector<std::string>& paths, bool& overflow) {
+#ifdef __linux__
+    pollfd pfd{m_inotifyFd, POLLIN, 0};
+    const int ready = ::poll(&pfd, 1, kStopCheckMs);
+    if (ready < 0) return errno == EINTR;
+    if (ready == 0) return true;
+
+    alignas(inotify_event) char buffer[16 * 1024];
+    while (true) {
+        const ssize_t n = ::read(m_inotifyFd, buffer, sizeof(buffer));
+        if (n <= 0) break;  // EAGAIN: drained
+        for (const char* p = buffer; p < buffer + n;) {
+            const inotify_event* event = reinterpret_cast<const inotify_event*>(p);
+            p += sizeof(inotify_event) + event->len;
+            if (event->mask & IN_IGNORED) return false;
+            if (event->mask & IN_Q_OVERFLOW) {
+                overflow = true;
+                continue;
+            }
+            if ((event->mask & IN_ISDIR) || event->len == 0 || event->name[0] == '.') continue;
+            paths.push_back((fs::path(m_directory) / event->name).string());
+        }
+    }
+    return true;
+#else
+    (void)paths;
+    (void)overflow;
+    return false;
+#endif
+}
+
+// Files of the directory not read yet. With stableOnly, a file is returned only once its
+// size has not changed since the previous listing, so partly written files are skipped.
+std::vector<std::string> DicomWatch::listDirectory(bool stableOnly) {
+    std::vector<std::string> paths;
+    std::error_code ec;
+    fs::directory_iterator it(m_directory, fs::directory_options::skip_permission_denied, ec), end;
+    if (ec) {
+        std::cerr << "      MVR ERROR: Cannot access directory: " << m_directory << " - " << ec.message() << std::endl;
+        return paths;
+    }
+    for (; it != end; it.increment(ec)) {
+        if (ec) break;
+        const fs::directory_entry& entry = *it;
+        const std::string name = entry.path().filename().string();
+        if (name.empty() || name[0] == '.' || !entry.is_regular_file(ec)) continue;
+        const std::string path = entry.path().string();
+        const int64_t size = static_cast<int64_t>(entry.file_size(ec));
+        if (ec) continue;
+        FileState& state = m_files[path];
+        if (state.done || (state.failed && state.size == size)) continue;
+        state.failed = false;
+        const bool stable = state.size == size;
+        state.size = size;
+        if (!stableOnly || stable) paths.push_back(path);
+    }
+    return paths;
+}
+
+// Reads the headers of the files, then decodes the slices of the followed series in
+// order along the slice normal
+void DicomWatch::process(std::vector<std::string> paths, bool chooseSeries) {
+    std::sort(paths.begin(), paths.end());
+    paths.erase(std::unique(paths.begin(), paths.end()), paths.end());
+
+    std::vector<DataLoader::DicomFileHeader> headers;
+    headers.reserve(paths.size());
+    for (const std::string& path : paths) {
+        DataLoader::DicomFileHeader header;
+        const bool parsed = DataLoader::readDICOMHeader(path, header);
+        FileState& state = m_files[path];
+        std::error_code ec;
+        state.size = static_cast<int64_t>(fs::file_size(path, ec));
+        state.done = parsed && header.valid;
+        state.failed = !state.done;
+        m_filesSeen += 1;
+        if (state.done) headers.push_back(std::move(header));
+    }
+    if (headers.empty()) return;
+
+    std::string key = seriesKey();
+    if (key.empty()) {
+        // The largest series of the batch, or the first file's
+        std::map<std::string, size_t> counts;
+        for (const auto& h : headers) counts[h.seriesUID + "|" + h.orientation] += 1;
+        key = headers.front().seriesUID + "|" + headers.front().orientation;
+        if (chooseSeries) {
+            for (const auto& [k, count] : counts) {
+                if (count > counts[key]) key = k;
+            }
+        }
+        std::lock_guard<std::mutex> lock(m_mutex);
+        m_seriesKey = key;
+    }
+    headers.erase(std::remove_if(headers.begin(), headers.end(), [&](const DataLoader::DicomFileHeader& h) {
+        return h.seriesUID + "|" + h.orientation != key;
+    }), headers.end());
+    std::sort(headers.begin(), headers.end(), [](const DataLoader::DicomFileHeader& a,
+                                                 const DataLoader::DicomFileHeader& b) {
+        if (a.sortKey != b.sortKey) return a.sortKey < b.sortKey;
+        return a.path < b.path;
+    });
+
+    for (auto& header : headers) {
+        {
+            std::lock_guard<std::mutex> lock(m_mutex);
+            if (m_stop) return;
+        }
+        Slice slice;
+        if (!DataLoader::decodeDICOMSlice(header, slice.image)) {
+            m_files[header.path].failed = true;
+            m_files[header.path].done = false;
+            continue;
+        }
+        slice.header = std::move(header);
+        enqueue(std::move(slice));
+    }
+}
+
+void DicomWatch::enqueue(Slice&& slice) {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    m_queueMemory.resize(m_queueMemory.bytes() + slice.image.pixels.size() * sizeof(uint16_t));
+    m_queue.push_back(std::move(slice));
+}
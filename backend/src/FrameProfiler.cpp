@@ -0,0 +1,235 @@
+// backend/src/FrameProfiler.cpp
+
+#include "../include/FrameProfiler.h"
+
+#include <algorithm>
+#include <fstream>
+#include <iostream>
+
+#include "../glad/glad.hpp"
+
+const char* FrameProfiler::phaseName(FramePhase phase) {
+    switch (phase) {
+        case FramePhase::DeferredSetup: return "deferred_setup";
+        case FramePhase::UniformSetup:  return "uniform_setup";
+        case FramePhase::VolumeDraw:    return "volume_draw";
+        case FramePhase::SliceDraw:     return "slice_draw";
+        case FramePhase::BBoxDraw:      return "bbox_draw";
+        case FramePhase::MeshDraw:      return "mesh_draw";
+        default:                        return "unknown";
+    }
+}
+
+double FrameProfiler::nowUs() const {
+    return std::chrono::duration<double, std::micro>(Clock::now() - m_epoch).count();
+}
+
+void FrameProfiler::setEnabled(bool enabled) {
+    if (!enabled && m_inFrame) endFrame();
+    m_enabled = enabled;
+}
+
+void FrameProfiler::reset() {
+    m_ring.clear();
+    m_ringHead = 0;
+    for (auto& slot : m_slots) {
+        slot.pending = false;
+        slot.issued.fill(false);
+    }
+}
+
+void FrameProfiler::ensureQueries() {
+    if (m_queriesReady) return;
+    for (auto& slot : m_slots) {
+        glGenQueries(kFramePhaseCount, slot.queries.data());
+    }
+    m_ring.reserve(kRingSize);
+    m_queriesReady = true;
+}
+
+void FrameProfiler::releaseQueries() {
+    if (!m_queriesReady) return;
+    if (m_inFrame) endFrame();
+    for (auto& slot : m_slots) {
+        glDeleteQueries(kFramePhaseCount, slot.queries.data());
+        slot.queries.fill(0);
+        slot.pending = false;
+        slot.issued.fill(false);
+    }
+    m_queriesReady = false;
+}
+
+FrameProfiler::FrameRecord* FrameProfiler::findRecord(uint64_t frameIndex) {
+    // Recent frames sit just behind the head, so search backwards from there.
+    const size_t n = m_ring.size();
+    for (size_t i = 0; i < n; ++i) {
+        size_t idx = (m_ringHead + n - 1 - i) % n;
+        if (m_ring[idx].frameIndex == frameIndex) return &m_ring[idx];
+    }
+    return nullptr;
+}
+
+void FrameProfiler::resolveSlot(QuerySlot& slot) {
+    slot.pending = false;
+    FrameRecord* rec = findRecord(slot.frameIndex);
+    if (!rec) return;
+
+    double total = 0.0;
+    for (int p = 0; p < kFramePhaseCount; ++p) {
+        if (!slot.issued[p]) continue;
+        GLint available = 0;
+        glGetQueryObjectiv(slot.queries[p], GL_QUERY_RESULT_AVAILABLE, &available);
+        if (!available) {
+            // Never block on the GPU; this frame simply has no GPU timing.
+            return;
+        }
+        GLuint64 ns = 0;
+        glGetQueryObjectui64v(slot.queries[p], GL_QUERY_RESULT, &ns);
+        rec->phaseGpuMs[p] = static_cast<double>(ns) * 1e-6;
+        total += rec->phaseGpuMs[p];
+    }
+    rec->gpuTotalMs = total;
+}
+
+void FrameProfiler::beginFrame() {
+    if (!m_enabled) return;
+    if (m_inFrame) endFrame();
+    ensureQueries();
+
+    // The slot we are about to reuse belongs to a frame kQuerySlots frames ago.
+    QuerySlot& slot = m_slots[m_frameIndex % kQuerySlots];
+    if (slot.pending) resolveSlot(slot);
+    slot.issued.fill(false);
+    slot.frameIndex = m_frameIndex;
+
+    m_current = FrameRecord{};
+    m_current.frameIndex = m_frameIndex;
+    m_frameStart = Clock::now();
+    m_current.startUs = nowUs();
+    m_activeGpuPhase = -1;
+    m_inFrame = true;
+}
+
+void FrameProfiler::endFrame() {
+    if (!m_inFrame) return;
+    if (m_activeGpuPhase >= 0) {
+        glEndQuery(GL_TIME_ELAPSED);
+        m_activeGpuPhase = -1;
+    }
+    m_current.cpuTotalMs = std::chrono::duration<double, std::milli>(Clock::now() - m_frameStart).count();
+
+    QuerySlot& slot = m_slots[m_frameIndex % kQuerySlots];
+    slot.pending = std::any_of(slot.issued.begin(), slot.issued.end(), [](bool b){ return b; });
+
+    if (m_ring.size() < kRingSize) {
+        m_ring.push_back(m_current);
+        m_ringHead = m_ring.size() % kRingSize;
+    } else {
+        m_ring[m_ringHead] = m_current;
+        m_ringHead = (m_ringHead + 1) % kRingSize;
+    }
+    ++m_frameIndex;
+    m_inFrame = false;
+}
+
+void FrameProfiler::beginPhase(FramePhase phase) {
+    if (!m_enabled || !m_inFrame) return;
+    const int p = static_cast<int>(phase);
+    m_phaseStart[p] = Clock::now();
+    if (!m_current.phaseUsed[p]) m_current.phaseStartUs[p] = nowUs();
+
+    // GL_TIME_ELAPSED queries cannot nest; only the outermost phase gets GPU time.
+    QuerySlot& slot = m_slots[m_frameIndex % kQuerySlots];
+    if (m_activeGpuPhase < 0 && !slot.issued[p]) {
+        glBeginQuery(GL_TIME_ELAPSED, slot.queries[p]);
+        slot.issued[p] = true;
+        m_activeGpuPhase = p;
+    }
+}
+
+void FrameProfiler::endPhase(FramePhase phase) {
+    if (!m_enabled || !m_inFrame) return;
+    const int p = static_cast<int>(phase);
+    m_current.phaseCpuMs[p] += std::chrono::duration<double, std::milli>(Clock::now() - m_phaseStart[p]).count();
+    m_current.phaseUsed[p] = true;
+    if (m_activeGpuPhase == p) {
+        glEndQuery(GL_TIME_ELAPSED);
+        m_activeGpuPhase = -1;
+    }
+}
+
+static FrameTimePercentiles percentiles(std::vector<double>& values) {
+    FrameTimePercentiles out;
+    if (values.empty()) return out;
+    std::sort(values.begin(), values.end());
+    auto rank = [&](double q) {
+        size_t idx = static_cast<size_t>(q * (values.size() - 1) + 0.5);
+        return values[std::min(idx, values.size() - 1)];
+    };
+    out.p50 = rank(0.50);
+    out.p95 = rank(0.95);
+    out.p99 = rank(0.99);
+    return out;
+}
+
+FrameStats FrameProfiler::getStats() const {
+    FrameStats stats;
+    std::vector<double> cpu, gpu;
+    cpu.reserve(m_ring.size());
+    gpu.reserve(m_ring.size());
+    for (const auto& rec : m_ring) {
+        cpu.push_back(rec.cpuTotalMs);
+        for (int p = 0; p < kFramePhaseCount; ++p) stats.phaseCpuMeanMs[p] += rec.phaseCpuMs[p];
+        if (rec.gpuTotalMs >= 0.0) {
+            gpu.push_back(rec.gpuTotalMs);
+            for (int p = 0; p < kFramePhaseCount; ++p) stats.phaseGpuMeanMs[p] += rec.phaseGpuMs[p];
+        }
+    }
+    stats.frameCount = cpu.size();
+    stats.gpuFrameCount = gpu.size();
+    // Means are per frame (not per use) so the phases add up to the frame time.
+    for (int p = 0; p < kFramePhaseCount; ++p) {
+        if (!cpu.empty()) stats.phaseCpuMeanMs[p] /= static_cast<double>(cpu.size());
+        if (!gpu.empty()) stats.phaseGpuMeanMs[p] /= static_cast<double>(gpu.size());
+    }
+    stats.cpu = percentiles(cpu);
+    stats.gpu = percentiles(gpu);
+    return stats;
+}
+
+bool FrameProfiler::writeChromeTrace(const std::string& path) const {
+    std::ofstream out(path);
+    if (!out.is_open()) {
+        std::cerr << "[FrameProfiler::writeChromeTrace] ERROR: Cannot open " << path << std::endl;
+        return false;
+    }
+
+    // Oldest frame first
+    std::vector<const FrameRecord*> frames;
+    frames.reserve(m_ring.size());
+    const size_t n = m_ring.size();
+    const size_t start = (n < kRingSize) ? 0 : m_ringHead;
+    for (size_t i = 0; i < n; ++i) frames.push_back(&m_ring[(start + i) % n]);
+
+    out << "{\"traceEvents\":[\n";
+    out << "{\"name\":\"thread_name\",\"ph\":\"M\",\"pid\":1,\"tid\":1,\"args\":{\"name\":\"CPU\"}},\n";
+    out << "{\"name\":\"thread_name\",\"ph\":\"M\",\"pid\":1,\"tid\":2,\"args\":{\"name\":\"GPU\"}}";
+    for (const FrameRecord* rec : frames) {
+        out << ",\n{\"name\":\"frame\",\"ph\":\"X\",\"pid\":1,\"tid\":1,\"ts\":" << rec->startUs
+            << ",\"dur\":" << rec->cpuTotalMs * 1000.0
+            << ",\"args\":{\"frame\":" << rec->frameIndex << "}}";
+        for (int p = 0; p < kFramePhaseCount; ++p) {
+            if (!rec->phaseUsed[p]) continue;
+            const char* name = phaseName(static_cast<FramePhase>(p));
+            out << ",\n{\"name\":\"" << name << "\",\"ph\":\"X\",\"pid\":1,\"tid\":1,\"ts\":" << rec->phaseStartUs[p]
+                << ",\"dur\":" << rec->phaseCpuMs[p] * 1000.0 << "}";
+            if (rec->gpuTotalMs >= 0.0) {
+                // GPU work is aligned to the CPU submit time; the GPU clock is not correlated.
+                out << ",\n{\"name\":\"" << name << "\",\"ph\":\"X\",\"pid\":1,\"tid\":2,\"ts\":" << rec->phaseStartUs[p]
+                    << ",\"dur\":" << rec->phaseGpuMs[p] * 1000.0 << "}";
+            }
+        }
+    }
+    out << "\n],\"displayTimeUnit\":\"ms\"}\n";
+    return out.good();
+}
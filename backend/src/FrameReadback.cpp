@@ -0,0 +1,96 @@
+// backend/src/FrameReadback.cpp
+
+#include "../include/FrameReadback.h"
+
+#include <cstring>
+#include <iostream>
+
+#include "../glad/glad.hpp"
+
+bool FrameReadback::configure(int width, int height, size_t slots) {
+    release();
+    if (width <= 0 || height <= 0 || slots == 0) return false;
+    m_width = width;
+    m_height = height;
+    m_slots.resize(slots);
+    for (auto& slot : m_slots) {
+        glGenBuffers(1, &slot.pbo);
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, slot.pbo);
+        glBufferData(GL_PIXEL_PACK_BUFFER, static_cast<GLsizeiptr>(frameBytes()), nullptr, GL_STREAM_READ);
+    }
+    glBindBuffer(GL_PIXEL_PACK_BUFFER, 0);
+    return true;
+}
+
+void FrameReadback::release() {
+    for (auto& slot : m_slots) {
+        if (slot.fence) glDeleteSync(static_cast<GLsync>(slot.fence));
+        if (slot.pbo) glDeleteBuffers(1, &slot.pbo);
+    }
+    m_slots.clear();
+    m_head = 0;
+    m_pending = 0;
+    m_width = m_height = 0;
+}
+
+bool FrameReadback::submit(int64_t tag) {
+    if (m_slots.empty() || full()) return false;
+    Slot& slot = m_slots[(m_head + m_pending) % m_slots.size()];
+    glBindBuffer(GL_PIXEL_PACK_BUFFER, slot.pbo);
+    glPixelStorei(GL_PACK_ALIGNMENT, 4);
+    // With a pack buffer bound the pointer is an offset and the call returns immediately
+    glReadPixels(0, 0, m_width, m_height, GL_RGBA, GL_UNSIGNED_BYTE, nullptr);
+    glBindBuffer(GL_PIXEL_PACK_BUFFER, 0);
+    slot.fence = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0);
+    slot.tag = tag;
+    ++m_pending;
+    // Make sure the copy is actually queued before the caller goes on to the next frame
+    glFlush();
+    return true;
+}
+
+bool FrameReadback::oldestReady() {
+    if (m_pending == 0) return false;
+    Slot& slot = m_slots[m_head];
+    if (!slot.fence) return true;
+    GLenum status = glClientWaitSync(static_cast<GLsync>(slot.fence), 0, 0);
+    return status == GL_ALREADY_SIGNALED || status == GL_CONDITION_SATISFIED;
+}
+
+bool FrameReadback::retrieve(uint8_t* dst, int64_t& tag) {
+    if (m_pending == 0) return false;
+    Slot& slot = m_slots[m_head];
+    if (slot.fence) {
+        GLsync fence = static_cast<GLsync>(slot.fence);
+        // 1 s per wait; a lost context would otherwise hang the caller forever
+        GLenum status = glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, 1000000000ull);
+        while (status == GL_TIMEOUT_EXPIRED) {
+            status = glClientWaitSync(fence, 0, 1000000000ull);
+        }
+        glDeleteSync(fence);
+        slot.fence = nullptr;
+        if (status == GL_WAIT_FAILED) {
+            std::cerr << "      MVR Error: FrameReadback fence wait failed" << std::endl;
+        }
+    }
+    glBindBuffer(GL_PIXEL_PACK_BUFFER, slot.pbo);
+    const size_t rowBytes = static_cast<size_t>(m_width) * 4;
+    auto* src = static_cast<const uint8_t*>(
+        glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, static_cast<GLsizeiptr>(frameBytes()), GL_MAP_READ_BIT));
+    bool ok = src != nullptr;
+    if (ok) {
+        // GL rows are bottom-up
+        for (int y = 0; y < m_height; ++y) {
+            std::memcpy(dst + static_cast<size_t>(y) * rowBytes,
+                        src + static_cast<size_t>(m_height - 1 - y) * rowBytes, rowBytes);
+        }
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER);
+    } else {
+        std::cerr << "      MVR Error: FrameReadback could not map pixel buffer" << std::endl;
+    }
+    glBindBuffer(GL_PIXEL_PACK_BUFFER, 0);
+    tag = slot.tag;
+    m_head = (m_head + 1) % m_slots.size();
+    --m_pending;
+    return ok;
+}
@@ -0,0 +1,343 @@
+// backend/src/GzipReader.cpp
+
+#include "../include/GzipReader.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <condition_variable>
+#include <cstdio>
+#include <cstring>
+#include <deque>
+#include <iostream>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+#include <zlib.h>
+
+namespace GzipReader {
+
+// Target size of one decompressed chunk handed to the consumer.
+static constexpr size_t kChunkBytes = size_t(4) << 20;
+
+namespace {
+
+// RAII FILE* wrapper
+struct File {
+    FILE* f = nullptr;
+    explicit File(const std::string& path) : f(std::fopen(path.c_str(), "rb")) {}
+    ~File() { if (f) std::fclose(f); }
+    File(const File&) = delete;
+    File& operator=(const File&) = delete;
+    explicit operator bool() const { return f != nullptr; }
+};
+
+bool readAt(FILE* f, uint64_t offset, void* dst, size_t size) {
+    if (fseeko(f, static_cast<off_t>(offset), SEEK_SET) != 0) return false;
+    return std::fread(dst, 1, size, f) == size;
+}
+
+uint16_t le16(const uint8_t* p) { return static_cast<uint16_t>(p[0] | (p[1] << 8)); }
+uint32_t le32(const uint8_t* p) {
+    return static_cast<uint32_t>(p[0]) | (static_cast<uint32_t>(p[1]) << 8) |
+           (static_cast<uint32_t>(p[2]) << 16) | (static_cast<uint32_t>(p[3]) << 24);
+}
+
+struct BgzfBlock {
+    uint64_t offset = 0;      // file offset of the member
+    uint32_t size = 0;        // total member size (header + deflate data + trailer)
+    uint32_t headerSize = 0;  // 12 + XLEN
+    uint32_t isize = 0;       // uncompressed size
+    uint32_t crc = 0;
+};
+
+// Parses the BGZF header at `offset`. Returns false if the member is not BGZF.
+bool readBgzfHeader(FILE* f, uint64_t offset, BgzfBlock& block) {
+    uint8_t head[12];
+    if (!readAt(f, offset, head, sizeof(head))) return false;
+    if (head[0] != 0x1f || head[1] != 0x8b || head[2] != 8 || !(head[3] & 0x04)) return false;
+    const uint16_t xlen = le16(head + 10);
+    std::vector<uint8_t> extra(xlen);
+    if (xlen == 0 || std::fread(extra.data(), 1, xlen, f) != xlen) return false;
+
+    // Find the "BC" subfield carrying BSIZE (total member size - 1)
+    for (size_t p = 0; p + 4 <= extra.size();) {
+        const uint16_t slen = le16(&extra[p + 2]);
+        if (extra[p] == 'B' && extra[p + 1] == 'C' && slen == 2 && p + 6 <= extra.size()) {
+            block.offset = offset;
+            block.size = static_cast<uint32_t>(le16(&extra[p + 4])) + 1;
+            block.headerSize = 12u + xlen;
+            uint8_t trailer[8];
+            if (block.size < block.headerSize + 8) return false;
+            if (!readAt(f, offset + block.size - 8, trailer, sizeof(trailer))) return false;
+            block.crc = le32(trailer);
+            block.isize = le32(trailer + 4);
+            return true;
+        }
+        p += 4 + slen;
+    }
+    return false;
+}
+
+// Builds the member table of a BGZF file; false if any member is not BGZF.
+bool scanBgzf(const std::string& path, std::vector<BgzfBlock>& blocks) {
+    File file(path);
+    if (!file) return false;
+    if (fseeko(file.f, 0, SEEK_END) != 0) return false;
+    const uint64_t fileSize = static_cast<uint64_t>(ftello(file.f));
+    uint64_t offset = 0;
+    while (offset < fileSize) {
+        BgzfBlock block;
+        if (!readBgzfHeader(file.f, offset, block)) return false;
+        if (block.isize > 0) blocks.push_back(block); // skip the empty EOF marker
+        offset += block.size;
+    }
+    return !blocks.empty();
+}
+
+struct BgzfChunk {
+    size_t firstBlock = 0;
+    size_t lastBlock = 0;      // exclusive
+    size_t outputSize = 0;
+};
+
+bool inflateBgzfChunk(FILE* f, z_stream& zs, const std::vector<BgzfBlock>& blocks, const BgzfChunk& chunk,
+                      std::vector<uint8_t>& compressed, std::vector<uint8_t>& out) {
+    const uint64_t begin = blocks[chunk.firstBlock].offset;
+    const BgzfBlock& lastBlock = blocks[chunk.lastBlock - 1];
+    const uint64_t end = lastBlock.offset + lastBlock.size;
+    compressed.resize(static_cast<size_t>(end - begin));
+    if (!readAt(f, begin, compressed.data(), compressed.size())) return false;
+
+    out.resize(chunk.outputSize);
+    size_t outPos = 0;
+    for (size_t b = chunk.firstBlock; b < chunk.lastBlock; ++b) {
+        const BgzfBlock& block = blocks[b];
+        const size_t local = static_cast<size_t>(block.offset - begin);
+        inflateReset(&zs);
+        zs.next_in = compressed.data() + local + block.headerSize;
+        zs.avail_in = block.size - block.headerSize - 8;
+        zs.next_out = out.data() + outPos;
+        zs.avail_out = block.isize;
+        if (inflate(&zs, Z_FINISH) != Z_STREAM_END || zs.avail_out != 0) return false;
+        if (crc32(0L, out.data() + outPos, block.isize) != block.crc) return false;
+        outPos += block.isize;
+    }
+    return true;
+}
+
+bool readBgzfParallel(const std::string& path, const std::vector<BgzfBlock>& blocks,
+                      const ChunkConsumer& consumer, unsigned int threads) {
+    // Group members into chunks of ~kChunkBytes output
+    std::vector<BgzfChunk> chunks;
+    BgzfChunk current;
+    for (size_t b = 0; b < blocks.size(); ++b) {
+        current.outputSize += blocks[b].isize;
+        current.lastBlock = b + 1;
+        if (current.outputSize >= kChunkBytes) {
+            chunks.push_back(current);
+            current = BgzfChunk{};
+            current.firstBlock = b + 1;
+        }
+    }
+    if (current.lastBlock > current.firstBlock) chunks.push_back(current);
+
+    const unsigned int workers = std::max(1u, std::min<unsigned int>(threads, static_cast<unsigned int>(chunks.size())));
+    const size_t window = static_cast<size_t>(workers) * 2; // bounded look-ahead
+
+    std::mutex mutex;
+    std::condition_variable cv;
+    std::vector<std::vector<uint8_t>> results(chunks.size());
+    std::vector<char> ready(chunks.size(), 0);
+    size_t nextChunk = 0, consumed = 0;
+    bool failed = false, stop = false;
+
+    auto worker = [&]() {
+        File file(path);
+        z_stream zs;
+        std::memset(&zs, 0, sizeof(zs));
+        if (!file || inflateInit2(&zs, -MAX_WBITS) != Z_OK) {
+            std::lock_guard<std::mutex> lock(mutex);
+            failed = true;
+            cv.notify_all();
+            return;
+        }
+        std::vector<uint8_t> compressed;
+        while (true) {
+            size_t c;
+            {
+                std::unique_lock<std::mutex> lock(mutex);
+                cv.wait(lock, [&]{ return stop || failed || nextChunk >= chunks.size() || nextChunk < consumed + window; });
+                if (stop || failed || nextChunk >= chunks.size()) break;
+                c = nextChunk++;
+            }
+            std::vector<uint8_t> out;
+            bool ok = inflateBgzfChunk(file.f, zs, blocks, chunks[c], compressed, out);
+            {
+                std::lock_guard<std::mutex> lock(mutex);
+                if (ok) { results[c] = std::move(out); ready[c] = 1; }
+                else failed = true;
+            }
+            cv.notify_all();
+        }
+        inflateEnd(&zs);
+    };
+
+    std::vector<std::thread> pool;
+    for (unsigned int t = 0; t < workers; ++t) pool.emplace_back(worker);
+
+    bool ok = true;
+    for (size_t c = 0; c < chunks.size(); ++c) {
+        std::vector<uint8_t> buf;
+        {
+            std::unique_lock<std::mutex> lock(mutex);
+            cv.wait(lock, [&]{ return ready[c] || failed; });
+            if (!ready[c]) { ok = false; break; }
+            buf = std::move(results[c]);
+        }
+        const bool more = consumer(buf.data(), buf.size());
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            consumed = c + 1;
+            if (!more) stop = true;
+        }
+        cv.notify_all();
+        if (!more) break;
+    }
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        stop = true;
+    }
+    cv.notify_all();
+    for (auto& th : pool) th.join();
+    if (failed) ok = false;
+    if (!ok) std::cerr << "      MVR ERROR: BGZF decompression failed: " << path << std::endl;
+    return ok;
+}
+
+// One inflater thread feeding a bounded queue; the caller converts while it inflates.
+bool readPipelined(const std::string& path, const ChunkConsumer& consumer) {
+    static constexpr size_t kQueueDepth = 3;
+    static constexpr size_t kInputBytes = size_t(1) << 20;
+
+    std::mutex mutex;
+    std::condition_variable cv;
+    std::deque<std::vector<uint8_t>> queue;
+    bool done = false, failed = false, stop = false;
+
+    auto push = [&](std::vector<uint8_t>&& chunk) {
+        std::unique_lock<std::mutex> lock(mutex);
+        cv.wait(lock, [&]{ return stop || queue.size() < kQueueDepth; });
+        if (stop) return false;
+        queue.push_back(std::move(chunk));
+        cv.notify_all();
+        return true;
+    };
+
+    std::thread producer([&]() {
+        bool ok = true;
+        File file(path);
+        z_stream zs;
+        std::memset(&zs, 0, sizeof(zs));
+        if (!file || inflateInit2(&zs, 16 + MAX_WBITS) != Z_OK) {
+            ok = false;
+        } else {
+            std::vector<uint8_t> in(kInputBytes);
+            std::vector<uint8_t> out(kChunkBytes);
+            size_t outPos = 0;
+            bool eof = false, streamEnd = false;
+            zs.avail_in = 0;
+            while (ok) {
+                if (zs.avail_in == 0 && !eof) {
+                    size_t n = std::fread(in.data(), 1, in.size(), file.f);
+                    if (n < in.size()) eof = true;
+                    zs.next_in = in.data();
+                    zs.avail_in = static_cast<uInt>(n);
+                }
+                if (zs.avail_in == 0 && eof) {
+                    if (!streamEnd) ok = false; // truncated file
+                    break;
+                }
+
+                if (streamEnd) {
+                    // Concatenated member? Anything else (e.g. zero padding) ends the stream.
+                    if (zs.avail_in >= 2 && zs.next_in[0] == 0x1f && zs.next_in[1] == 0x8b) {
+                        inflateReset(&zs);
+                        streamEnd = false;
+                    } else {
+                        break;
+                    }
+                }
+
+                zs.next_out = out.data() + outPos;
+                zs.avail_out = static_cast<uInt>(out.size() - outPos);
+                int ret = inflate(&zs, Z_NO_FLUSH);
+                outPos = out.size() - zs.avail_out;
+                if (ret == Z_STREAM_END) {
+                    streamEnd = true;
+                } else if (ret != Z_OK && ret != Z_BUF_ERROR) {
+                    ok = false;
+                    break;
+                }
+                if (outPos == out.size()) {
+                    if (!push(std::move(out))) break;
+                    out = std::vector<uint8_t>(kChunkBytes);
+                    outPos = 0;
+                }
+            }
+            if (ok && outPos > 0) {
+                out.resize(outPos);
+                push(std::move(out));
+            }
+            inflateEnd(&zs);
+        }
+        std::lock_guard<std::mutex> lock(mutex);
+        if (!ok) failed = true;
+        done = true;
+        cv.notify_all();
+    });
+
+    bool ok = true;
+    while (true) {
+        std::vector<uint8_t> chunk;
+        {
+            std::unique_lock<std::mutex> lock(mutex);
+            cv.wait(lock, [&]{ return !queue.empty() || done; });
+            if (queue.empty()) break; // done and drained
+            chunk = std::move(queue.front());
+            queue.pop_front();
+        }
+        cv.notify_all();
+        if (!consumer(chunk.data(), chunk.size())) break;
+    }
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        stop = true;
+        if (failed) ok = false;
+    }
+    cv.notify_all();
+    producer.join();
+    if (failed) ok = false;
+    if (!ok) std::cerr << "      MVR ERROR: gzip decompression failed: " << path << std::endl;
+    return ok;
+}
+
+} // namespace
+
+bool isBGZF(const std::string& path) {
+    File file(path);
+    if (!file) return false;
+    BgzfBlock block;
+    return readBgzfHeader(file.f, 0, block);
+}
+
+bool readStream(const std::string& path, const ChunkConsumer& consumer, unsigned int threads) {
+    if (threads == 0) threads = Parallel::threadCount();
+    std::vector<BgzfBlock> blocks;
+    if (threads > 1 && isBGZF(path) && scanBgzf(path, blocks)) {
+        return readBgzfParallel(path, blocks, consumer, threads);
+    }
+    return readPipelined(path, consumer);
+}
+
+} // namespace GzipReader
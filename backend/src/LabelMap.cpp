@@ -0,0 +1,92 @@
+// backend/src/LabelMap.cpp
+
+#include "../include/LabelMap.h"
+
+#include <algorithm>
+#include <cstring>
+
+void LabelMap::clear() {
+    m_width = m_height = m_depth = 0;
+    std::vector<uint32_t>().swap(m_runLengths);
+    std::vector<uint8_t>().swap(m_runValues);
+    std::vector<size_t>().swap(m_sliceRuns);
+}
+
+void LabelMap::encodeSlice(const uint8_t* src, size_t count, std::vector<uint32_t>& lengths,
+                           std::vector<uint8_t>& values) {
+    lengths.clear();
+    values.clear();
+    size_t i = 0;
+    while (i < count) {
+        const uint8_t v = src[i];
+        size_t j = i + 1;
+        // Background dominates; skip it a word at a time
+        if (v == 0) {
+            while (j + 8 <= count) {
+                uint64_t word;
+                std::memcpy(&word, src + j, sizeof(word));
+                if (word != 0) break;
+                j += 8;
+            }
+        }
+        while (j < count && src[j] == v) ++j;
+        lengths.push_back(static_cast<uint32_t>(j - i));
+        values.push_back(v);
+        i = j;
+    }
+    lengths.shrink_to_fit();
+    values.shrink_to_fit();
+}
+
+void LabelMap::assemble(std::vector<std::vector<uint32_t>>& lengths, std::vector<std::vector<uint8_t>>& values) {
+    m_sliceRuns.assign(m_depth + 1, 0);
+    for (unsigned int z = 0; z < m_depth; ++z) m_sliceRuns[z + 1] = m_sliceRuns[z] + lengths[z].size();
+    m_runLengths.clear();
+    m_runValues.clear();
+    m_runLengths.reserve(m_sliceRuns[m_depth]);
+    m_runValues.reserve(m_sliceRuns[m_depth]);
+    for (unsigned int z = 0; z < m_depth; ++z) {
+        m_runLengths.insert(m_runLengths.end(), lengths[z].begin(), lengths[z].end());
+        m_runValues.insert(m_runValues.end(), values[z].begin(), values[z].end());
+        std::vector<uint32_t>().swap(lengths[z]);
+        std::vector<uint8_t>().swap(values[z]);
+    }
+}
+
+void LabelMap::encode(const uint8_t* labels, unsigned int width, unsigned int height, unsigned int depth,
+                      unsigned int threads) {
+    const size_t sliceSize = static_cast<size_t>(width) * height;
+    encodeSlices(width, height, depth, [&](unsigned int z, uint8_t* dst) {
+        std::memcpy(dst, labels + z * sliceSize, sliceSize);
+    }, threads);
+}
+
+void LabelMap::decodeSlices(unsigned int firstZ, unsigned int count, uint8_t* dst) const {
+    const size_t lastZ = std::min<size_t>(m_depth, static_cast<size_t>(firstZ) + count);
+    for (size_t r = m_sliceRuns[firstZ]; r < m_sliceRuns[lastZ]; ++r) {
+        const uint32_t n = m_runLengths[r];
+        std::memset(dst, m_runValues[r], n);
+        dst += n;
+    }
+}
+
+uint8_t LabelMap::at(unsigned int x, unsigned int y, unsigned int z) const {
+    if (x >= m_width || y >= m_height || z >= m_depth) return 0;
+    size_t offset = static_cast<size_t>(y) * m_width + x;
+    for (size_t r = m_sliceRuns[z]; r < m_sliceRuns[z + 1]; ++r) {
+        if (offset < m_runLengths[r]) return m_runValues[r];
+        offset -= m_runLengths[r];
+    }
+    return 0;
+}
+
+size_t LabelMap::memoryBytes() const {
+    return m_runLengths.capacity() * sizeof(uint32_t) + m_runValues.capacity() +
+           m_sliceRuns.capacity() * sizeof(size_t);
+}
+
+std::array<uint64_t, LabelMap::kLabelCount> LabelMap::histogram() const {
+    std::array<uint64_t, kLabelCount> counts{};
+    for (size_t r = 0; r < m_runValues.size(); ++r) counts[m_runValues[r]] += m_runLengths[r];
+    return counts;
+}
@@ -0,0 +1,35 @@
+// backend/src/LoadStats.cpp
+
+#include "../include/LoadStats.h"
+#include "../include/DataLoader.h"
+
+#include <atomic>
+
+const char* LoadStats::phaseName(LoadPhase phase) {
+    switch (phase) {
+        case LoadPhase::Scan:        return "scan";
+        case LoadPhase::HeaderParse: return "header_parse";
+        case LoadPhase::Sort:        return "sort";
+        case LoadPhase::Decode:      return "decode";
+        case LoadPhase::Resample:    return "resample";
+        case LoadPhase::Normalize:   return "normalize";
+        case LoadPhase::Gradient:    return "gradient";
+        case LoadPhase::Projection:  return "projection";
+        case LoadPhase::Upload:      return "upload";
+        default:                     return "unknown";
+    }
+}
+
+namespace DataLoader {
+
+static std::atomic<int> g_verbosity{VerbositySummary};
+
+void setVerbosity(int level) {
+    g_verbosity.store(level < VerbosityQuiet ? VerbosityQuiet : (level > VerbosityPerFile ? VerbosityPerFile : level));
+}
+
+int getVerbosity() {
+    return g_verbosity.load(std::memory_order_relaxed);
+}
+
+} // namespace DataLoader
@@ -0,0 +1,350 @@
+// backend/src/MarchingCubes.cpp
+
+#include "../include/VolumeOps.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <iostream>
+#include <unordered_map>
+
+namespace VolumeOps {
+
+namespace {
+
+// Cube corners are numbered by their offset bits: corner i = (i&1, (i>>1)&1, (i>>2)&1).
+// Edge e runs along axis e/4 from its base corner (the endpoint with that axis bit clear).
+struct CubeTopology {
+    int edgeBase[12];
+    int edgeAxis[12];
+    // Per case: triangles as edge triples, -1 terminated (at most 10 triangles)
+    int8_t triangles[256][31];
+};
+
+int edgeBetween(int a, int b) {
+    const int diff = a ^ b;
+    const int axis = diff == 1 ? 0 : (diff == 2 ? 1 : 2);
+    const int base = std::min(a, b);
+    // The two remaining bits of the base corner, in axis order, select one of 4 edges
+    int slot = 0, bit = 0;
+    for (int k = 0; k < 3; ++k) {
+        if (k == axis) continue;
+        slot |= ((base >> k) & 1) << bit++;
+    }
+    return axis * 4 + slot;
+}
+
+// True if both edges lie on one face of the cube (all four endpoints agree on one axis bit).
+bool edgesShareFace(const CubeTopology& topo, int e1, int e2) {
+    const int corners[4] = {topo.edgeBase[e1], topo.edgeBase[e1] | (1 << topo.edgeAxis[e1]),
+                            topo.edgeBase[e2], topo.edgeBase[e2] | (1 << topo.edgeAxis[e2])};
+    for (int axis = 0; axis < 3; ++axis) {
+        int ones = 0;
+        for (int c : corners) ones += (c >> axis) & 1;
+        if (ones == 0 || ones == 4) return true;
+    }
+    return false;
+}
+
+// Derives the classic marching cubes case table from the cube faces instead of
+// hard-coding it. On every face, each sign-changing edge is paired with another one
+// into a segment; chaining the segments of all six faces gives closed polygons that
+// are fanned into triangles. Faces are walked counter-clockwise seen from outside the
+// cube and segments run from the inside->outside crossing to the outside->inside one,
+// so every polygon comes out with the same orientation. On ambiguous faces (two
+// diagonal inside corners) the inside corners are kept apart; the rule depends only
+// on the face, so neighbouring cubes agree and the surface is watertight.
+CubeTopology buildTopology() {
+    CubeTopology topo{};
+    for (int e = 0; e < 12; ++e) {
+        topo.edgeAxis[e] = e / 4;
+        for (int c = 0; c < 8; ++c) {
+            if (!((c >> topo.edgeAxis[e]) & 1) && edgeBetween(c, c | (1 << topo.edgeAxis[e])) == e) {
+                topo.edgeBase[e] = c;
+            }
+        }
+    }
+
+    int faces[6][4];
+    for (int axis = 0, f = 0; axis < 3; ++axis) {
+        const int u = (axis + 1) % 3, v = (axis + 2) % 3;
+        for (int side = 0; side < 2; ++side, ++f) {
+            const int uv[4][2] = {{0, 0}, {1, 0}, {1, 1}, {0, 1}};
+            for (int k = 0; k < 4; ++k) {
+                const int kk = side ? k : 3 - k; // reversed on the negative side
+                faces[f][k] = (side << axis) | (uv[kk][0] << u) | (uv[kk][1] << v);
+            }
+        }
+    }
+
+    for (int cubeCase = 0; cubeCase < 256; ++cubeCase) {
+        int next[12];
+        std::fill(next, next + 12, -1);
+        for (const auto& face : faces) {
+            int crossings = 0;
+            int edgeAt[4];
+            bool exitAt[4]; // inside -> outside at position k
+            for (int k = 0; k < 4; ++k) {
+                const int a = face[k], b = face[(k + 1) % 4];
+                const bool inA = (cubeCase >> a) & 1, inB = (cubeCase >> b) & 1;
+                edgeAt[k] = (inA != inB) ? edgeBetween(a, b) : -1;
+                exitAt[k] = inA && !inB;
+                if (inA != inB) ++crossings;
+            }
+            for (int k = 0; k < 4; ++k) {
+                if (edgeAt[k] < 0 || !exitAt[k]) continue;
+                if (crossings == 2) {
+                    for (int j = 1; j < 4; ++j) {
+                        int m = (k + j) % 4;
+                        if (edgeAt[m] >= 0) { next[edgeAt[k]] = edgeAt[m]; break; }
+                    }
+                } else {
+                    // Ambiguous face: pair with the preceding crossing, which cuts off the inside corner
+                    next[edgeAt[k]] = edgeAt[(k + 3) % 4];
+                }
+            }
+        }
+
+        int count = 0;
+        bool visited[12] = {};
+        for (int start = 0; start < 12; ++start) {
+            if (next[start] < 0 || visited[start]) continue;
+            int loop[12];
+            int n = 0;
+            for (int e = start; !visited[e]; e = next[e]) {
+                visited[e] = true;
+                loop[n++] = e;
+            }
+            // Start the fan where no diagonal lies in a cube face: such a diagonal could
+            // coincide with one of the neighbouring cube and make the surface non-manifold.
+            int first = 0;
+            for (int r = 0; r < n; ++r) {
+                bool flat = false;
+                for (int i = 2; i + 1 < n && !flat; ++i) {
+                    flat = edgesShareFace(topo, loop[r], loop[(r + i) % n]);
+                }
+                if (!flat) { first = r; break; }
+            }
+            for (int i = 1; i + 1 < n; ++i) {
+                // Reversed fan: counter-clockwise seen from outside the inside region
+                topo.triangles[cubeCase][count++] = static_cast<int8_t>(loop[first]);
+                topo.triangles[cubeCase][count++] = static_cast<int8_t>(loop[(first + i + 1) % n]);
+                topo.triangles[cubeCase][count++] = static_cast<int8_t>(loop[(first + i) % n]);
+            }
+        }
+        topo.triangles[cubeCase][count] = -1;
+    }
+    return topo;
+}
+
+const CubeTopology& topology() {
+    static const CubeTopology topo = buildTopology();
+    return topo;
+}
+
+constexpr uint32_t kForeign = 0x80000000u;
+
+// Output of one z-slab. Indices with kForeign set refer to foreignKeys (vertices on
+// the slab's top plane, owned by the next slab).
+struct Slab {
+    std::unordered_map<uint64_t, uint32_t> owned;
+    std::unordered_map<uint64_t, uint32_t> foreign;
+    std::vector<uint64_t> foreignKeys;
+    std::vector<float> vertices;
+    std::vector<float> normals;
+    std::vector<uint32_t> indices;
+};
+
+} // namespace
+
+void buildMinMaxBlocks(const VolumeData& volume, MinMaxBlocks& blocks, unsigned int blockSize, unsigned int threads) {
+    const size_t w = volume.width, h = volume.height, d = volume.depth;
+    blocks = MinMaxBlocks{};
+    if (w == 0 || h == 0 || d == 0 || volume.data.size() < w * h * d) return;
+    blockSize = std::max(1u, blockSize);
+    blocks.blockSize = blockSize;
+    blocks.blocksX = static_cast<unsigned int>((w + blockSize - 1) / blockSize);
+    blocks.blocksY = static_cast<unsigned int>((h + blockSize - 1) / blockSize);
+    blocks.blocksZ = static_cast<unsigned int>((d + blockSize - 1) / blockSize);
+    const size_t count = static_cast<size_t>(blocks.blocksX) * blocks.blocksY * blocks.blocksZ;
+    blocks.minValue.assign(count, 0xFFFF);
+    blocks.maxValue.assign(count, 0);
+
+    const uint16_t* src = volume.data.data();
+    Parallel::parallelFor(0, blocks.blocksZ, [&](size_t first, size_t last) {
+        for (size_t bz = first; bz < last; ++bz) {
+            // One voxel of overlap so the blocks cover the corners of their last cells
+            const size_t z0 = bz * blockSize, z1 = std::min(d - 1, z0 + blockSize);
+            for (size_t z = z0; z <= z1; ++z) {
+                for (unsigned int by = 0; by < blocks.blocksY; ++by) {
+                    const size_t y0 = static_cast<size_t>(by) * blockSize, y1 = std::min(h - 1, y0 + blockSize);
+                    for (size_t y = y0; y <= y1; ++y) {
+                        const uint16_t* row = src + (z * h + y) * w;
+                        for (unsigned int bx = 0; bx < blocks.blocksX; ++bx) {
+                            const size_t x0 = static_cast<size_t>(bx) * blockSize, x1 = std::min(w - 1, x0 + blockSize);
+                            auto mm = std::minmax_element(row + x0, row + x1 + 1);
+                            const size_t i = blocks.index(bx, by, static_cast<unsigned int>(bz));
+                            blocks.minValue[i] = std::min(blocks.minValue[i], *mm.first);
+                            blocks.maxValue[i] = std::max(blocks.maxValue[i], *mm.second);
+                        }
+                    }
+                }
+            }
+        }
+    }, 1, threads);
+}
+
+void extractIsosurface(const VolumeData& volume, float isoValue, TriangleMesh& mesh,
+                       const MinMaxBlocks* blocks, unsigned int threads) {
+    mesh.clear();
+    const size_t w = volume.width, h = volume.height, d = volume.depth;
+    if (w < 2 || h < 2 || d < 2 || volume.data.size() < w * h * d) return;
+    if (blocks && (blocks->empty() || blocks->blocksX * static_cast<size_t>(blocks->blockSize) < w - 1)) blocks = nullptr;
+
+    const CubeTopology& topo = topology();
+    const uint16_t* src = volume.data.data();
+    const float spacing[3] = {
+        volume.spacing_x > 0.0 ? static_cast<float>(volume.spacing_x) : 1.0f,
+        volume.spacing_y > 0.0 ? static_cast<float>(volume.spacing_y) : 1.0f,
+        volume.spacing_z > 0.0 ? static_cast<float>(volume.spacing_z) : 1.0f};
+    const size_t dims[3] = {w, h, d};
+    // Voxel centers map to the renderer's box, which is centered on the origin
+    float origin[3];
+    for (int a = 0; a < 3; ++a) origin[a] = (0.5f - 0.5f * static_cast<float>(dims[a])) * spacing[a];
+
+    auto at = [&](size_t x, size_t y, size_t z) -> float { return src[(z * h + y) * w + x]; };
+    auto gradient = [&](size_t x, size_t y, size_t z, float g[3]) {
+        const size_t p[3] = {x, y, z};
+        for (int a = 0; a < 3; ++a) {
+            size_t lo[3] = {x, y, z}, hi[3] = {x, y, z};
+            lo[a] = p[a] > 0 ? p[a] - 1 : p[a];
+            hi[a] = p[a] + 1 < dims[a] ? p[a] + 1 : p[a];
+            const float span = static_cast<float>(hi[a] - lo[a]) * spacing[a];
+            g[a] = span > 0.0f ? (at(hi[0], hi[1], hi[2]) - at(lo[0], lo[1], lo[2])) / span : 0.0f;
+        }
+    };
+
+    // Cells span z in [0, d-1); split them into slabs for the workers
+    const size_t cellsZ = d - 1;
+    const unsigned int workers = threads ? threads : Parallel::threadCount();
+    const size_t slabCount = std::min<size_t>(cellsZ, static_cast<size_t>(workers) * 4);
+    std::vector<Slab> slabs(slabCount);
+    auto slabBegin = [&](size_t s) { return s * cellsZ / slabCount; };
+
+    Parallel::parallelFor(0, slabCount, [&](size_t firstSlab, size_t lastSlab) {
+        for (size_t s = firstSlab; s < lastSlab; ++s) {
+            Slab& slab = slabs[s];
+            const size_t z0 = slabBegin(s), z1 = slabBegin(s + 1);
+            const bool lastSlabOfVolume = (s + 1 == slabCount);
+
+            auto vertexFor = [&](size_t x, size_t y, size_t z, int edge) -> uint32_t {
+                const int base = topo.edgeBase[edge];
+                const int axis = topo.edgeAxis[edge];
+                size_t p0[3] = {x + (base & 1), y + ((base >> 1) & 1), z + ((base >> 2) & 1)};
+                const uint64_t key = (((static_cast<uint64_t>(p0[2]) * h) + p0[1]) * w + p0[0]) * 3 + axis;
+
+                if (p0[2] >= z1 && !lastSlabOfVolume) {
+                    auto it = slab.foreign.find(key);
+                    if (it != slab.foreign.end()) return it->second;
+                    uint32_t ref = kForeign | static_cast<uint32_t>(slab.foreignKeys.size());
+                    slab.foreignKeys.push_back(key);
+                    slab.foreign.emplace(key, ref);
+                    return ref;
+                }
+                auto it = slab.owned.find(key);
+                if (it != slab.owned.end()) return it->second;
+
+                size_t p1[3] = {p0[0], p0[1], p0[2]};
+                p1[axis] += 1;
+                const float v0 = at(p0[0], p0[1], p0[2]);
+                const float v1 = at(p1[0], p1[1], p1[2]);
+                const float t = (v1 != v0) ? (isoValue - v0) / (v1 - v0) : 0.5f;
+
+                float g0[3], g1[3];
+                gradient(p0[0], p0[1], p0[2], g0);
+                gradient(p1[0], p1[1], p1[2], g1);
+                float n[3];
+                float len = 0.0f;
+                for (int a = 0; a < 3; ++a) {
+                    n[a] = -(g0[a] + t * (g1[a] - g0[a])); // away from the inside
+                    len += n[a] * n[a];
+                }
+                len = len > 0.0f ? 1.0f / std::sqrt(len) : 0.0f;
+                for (int a = 0; a < 3; ++a) {
+                    float pos = static_cast<float>(p0[a]) + (a == axis ? t : 0.0f);
+                    slab.vertices.push_back(origin[a] + pos * spacing[a]);
+                    slab.normals.push_back(n[a] * len);
+                }
+                const uint32_t index = static_cast<uint32_t>(slab.vertices.size() / 3 - 1);
+                slab.owned.emplace(key, index);
+                return index;
+            };
+
+            const unsigned int bs = blocks ? blocks->blockSize : 0;
+            for (size_t z = z0; z < z1; ++z) {
+                for (size_t y = 0; y + 1 < h; ++y) {
+                    const uint16_t* r00 = src + (z * h + y) * w;
+                    const uint16_t* r10 = r00 + w;
+                    const uint16_t* r01 = r00 + w * h;
+                    const uint16_t* r11 = r01 + w;
+                    for (size_t x = 0; x + 1 < w; ++x) {
+                        if (bs && x % bs == 0) {
+                            const size_t i = blocks->index(static_cast<unsigned int>(x / bs),
+                                                           static_cast<unsigned int>(y / bs),
+                                                           static_cast<unsigned int>(z / bs));
+                            if (blocks->maxValue[i] < isoValue || blocks->minValue[i] >= isoValue) {
+                                x += bs - 1; // whole block is on one side of the surface
+                                continue;
+                            }
+                        }
+                        const uint16_t c[8] = {r00[x], r00[x + 1], r10[x], r10[x + 1],
+                                               r01[x], r01[x + 1], r11[x], r11[x + 1]};
+                        int cubeCase = 0;
+                        for (int k = 0; k < 8; ++k) cubeCase |= (c[k] >= isoValue ? 1 : 0) << k;
+                        if (cubeCase == 0 || cubeCase == 255) continue;
+
+                        const int8_t* tri = topo.triangles[cubeCase];
+                        for (int k = 0; tri[k] >= 0; ++k) {
+                            slab.indices.push_back(vertexFor(x, y, z, tri[k]));
+                        }
+                    }
+                }
+            }
+            slab.foreign.clear();
+        }
+    }, 1, workers);
+
+    // Merge: owned vertices are concatenated, top-plane references resolved in the next slab
+    std::vector<size_t> vertexOffset(slabCount + 1, 0), indexOffset(slabCount + 1, 0);
+    for (size_t s = 0; s < slabCount; ++s) {
+        vertexOffset[s + 1] = vertexOffset[s] + slabs[s].vertices.size() / 3;
+        indexOffset[s + 1] = indexOffset[s] + slabs[s].indices.size();
+    }
+    mesh.vertices.resize(vertexOffset[slabCount] * 3);
+    mesh.normals.resize(vertexOffset[slabCount] * 3);
+    mesh.indices.resize(indexOffset[slabCount]);
+
+    Parallel::parallelFor(0, slabCount, [&](size_t firstSlab, size_t lastSlab) {
+        for (size_t s = firstSlab; s < lastSlab; ++s) {
+            const Slab& slab = slabs[s];
+            std::copy(slab.vertices.begin(), slab.vertices.end(), mesh.vertices.begin() + vertexOffset[s] * 3);
+            std::copy(slab.normals.begin(), slab.normals.end(), mesh.normals.begin() + vertexOffset[s] * 3);
+            std::vector<uint32_t> resolved(slab.foreignKeys.size(), 0);
+            for (size_t i = 0; i < slab.foreignKeys.size(); ++i) {
+                // Every crossing edge on the shared plane is also cut by a cell of the next slab
+                auto it = slabs[s + 1].owned.find(slab.foreignKeys[i]);
+                resolved[i] = it != slabs[s + 1].owned.end()
+                                  ? static_cast<uint32_t>(vertexOffset[s + 1] + it->second) : 0;
+            }
+            uint32_t* out = mesh.indices.data() + indexOffset[s];
+            for (size_t i = 0; i < slab.indices.size(); ++i) {
+                const uint32_t idx = slab.indices[i];
+                out[i] = (idx & kForeign) ? resolved[idx & ~kForeign]
+                                          : static_cast<uint32_t>(vertexOffset[s] + idx);
+            }
+        }
+    }, 1, workers);
+}
+
+} // namespace VolumeOps
@@ -0,0 +1,130 @@
+// backend/src/MemoryBudget.cpp
+
+#include "../include/MemoryBudget.h"
+
+#include <algorithm>
+#include <atomic>
+
+namespace MemoryBudget {
+
+namespace {
+
+std::array<std::atomic<uint64_t>, kCategoryCount> g_categoryBytes{};
+std::array<std::atomic<uint64_t>, kPoolCount> g_poolBytes{};
+std::array<std::atomic<uint64_t>, kPoolCount> g_poolPeak{};
+std::array<std::atomic<uint64_t>, kPoolCount> g_poolBudget{};
+
+void add(Category category, uint64_t bytes) {
+    if (bytes == 0) return;
+    g_categoryBytes[static_cast<int>(category)].fetch_add(bytes);
+    const int pool = static_cast<int>(poolOf(category));
+    const uint64_t now = g_poolBytes[pool].fetch_add(bytes) + bytes;
+    uint64_t peak = g_poolPeak[pool].load();
+    while (now > peak && !g_poolPeak[pool].compare_exchange_weak(peak, now)) {}
+}
+
+void subtract(Category category, uint64_t bytes) {
+    if (bytes == 0) return;
+    g_categoryBytes[static_cast<int>(category)].fetch_sub(bytes);
+    g_poolBytes[static_cast<int>(poolOf(category))].fetch_sub(bytes);
+}
+
+} // namespace
+
+Pool poolOf(Category category) {
+    return category >= Category::VolumeTexture ? Pool::Device : Pool::Host;
+}
+
+const char* poolName(Pool pool) {
+    return pool == Pool::Device ? "device" : "host";
+}
+
+const char* categoryName(Category category) {
+    switch (category) {
+        case Category::Volume:            return "volume";
+        case Category::LoadTemporary:     return "load_temporary";
+        case Category::TimeFrames:        return "time_frames";
+        case Category::Gradients:         return "gradients";
+        case Category::Projections:       return "projections";
+        case Category::BlockIndex:        return "block_index";
+        case Category::Labels:            return "labels";
+        case Category::Mesh:              return "mesh";
+        case Category::FusionVolume:      return "fusion_volume";
+        case Category::VolumeTexture:     return "volume_texture";
+        case Category::GradientTexture:   return "gradient_texture";
+        case Category::LabelTexture:      return "label_texture";
+        case Category::ProjectionTexture: return "projection_texture";
+        case Category::MeshBuffers:       return "mesh_buffers";
+        case Category::TransferTexture:   return "transfer_texture";
+        case Category::FusionTexture:     return "fusion_texture";
+        default:                          return "unknown";
+    }
+}
+
+void setBudget(Pool pool, uint64_t bytes) {
+    g_poolBudget[static_cast<int>(pool)].store(bytes);
+}
+
+uint64_t budget(Pool pool) {
+    return g_poolBudget[static_cast<int>(pool)].load();
+}
+
+uint64_t used(Pool pool) {
+    return g_poolBytes[static_cast<int>(pool)].load();
+}
+
+uint64_t used(Category category) {
+    return g_categoryBytes[static_cast<int>(category)].load();
+}
+
+uint64_t peak(Pool pool) {
+    return g_poolPeak[static_cast<int>(pool)].load();
+}
+
+void resetPeak(Pool pool) {
+    g_poolPeak[static_cast<int>(pool)].store(used(pool));
+}
+
+bool fits(Pool pool, uint64_t bytes, uint64_t freed) {
+    const uint64_t limit = budget(pool);
+    if (limit == 0) return true;
+    const uint64_t current = used(pool);
+    const uint64_t after = current - std::min(current, freed);
+    return after <= limit && bytes <= limit - after;
+}
+
+unsigned int reductionFactor(Pool pool, uint64_t width, uint64_t height, uint64_t depth,
+                             uint64_t bytesPerVoxel, uint64_t fixedBytes, uint64_t freed) {
+    for (unsigned int factor = 1;; factor *= 2) {
+        const uint64_t w = reducedSize(width, factor), h = reducedSize(height, factor), d = reducedSize(depth, factor);
+        if (fits(pool, w * h * d * bytesPerVoxel + fixedBytes, freed)) return factor;
+        if (w <= 1 && h <= 1 && d <= 1) return 0;
+    }
+}
+
+Usage snapshot() {
+    Usage usage;
+    for (int c = 0; c < kCategoryCount; ++c) usage.bytes[c] = g_categoryBytes[c].load();
+    for (int p = 0; p < kPoolCount; ++p) {
+        usage.used[p] = g_poolBytes[p].load();
+        usage.peak[p] = g_poolPeak[p].load();
+        usage.budget[p] = g_poolBudget[p].load();
+    }
+    return usage;
+}
+
+Allocation::Allocation(Category category, uint64_t bytes) : m_category(category) {
+    resize(bytes);
+}
+
+Allocation::~Allocation() {
+    release();
+}
+
+void Allocation::resize(uint64_t bytes) {
+    if (bytes > m_bytes) add(m_category, bytes - m_bytes);
+    else subtract(m_category, m_bytes - bytes);
+    m_bytes = bytes;
+}
+
+} // namespace MemoryBudget
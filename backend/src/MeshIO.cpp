@@ -0,0 +1,121 @@
+// backend/src/MeshIO.cpp
+
+#include "../include/TriangleMesh.h"
+
+#include <algorithm>
+#include <cctype>
+#include <cmath>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+
+namespace MeshIO {
+
+namespace {
+
+bool isLittleEndian() {
+    const uint16_t probe = 1;
+    uint8_t first;
+    std::memcpy(&first, &probe, 1);
+    return first == 1;
+}
+
+template <typename T>
+void put(std::ofstream& out, T value) {
+    // Both formats are little-endian on disk
+    uint8_t bytes[sizeof(T)];
+    std::memcpy(bytes, &value, sizeof(T));
+    if (!isLittleEndian()) std::reverse(bytes, bytes + sizeof(T));
+    out.write(reinterpret_cast<const char*>(bytes), sizeof(T));
+}
+
+} // namespace
+
+bool writePLY(const TriangleMesh& mesh, const std::string& path) {
+    std::ofstream out(path, std::ios::binary);
+    if (!out) {
+        std::cerr << "      MVR Error: Cannot open " << path << " for writing." << std::endl;
+        return false;
+    }
+    const bool withNormals = mesh.normals.size() == mesh.vertices.size();
+    out << "ply\n"
+        << "format binary_little_endian 1.0\n"
+        << "comment MedicalVolumeRenderer isosurface\n"
+        << "element vertex " << mesh.vertexCount() << "\n"
+        << "property float x\nproperty float y\nproperty float z\n";
+    if (withNormals) out << "property float nx\nproperty float ny\nproperty float nz\n";
+    out << "element face " << mesh.triangleCount() << "\n"
+        << "property list uchar uint vertex_indices\n"
+        << "end_header\n";
+
+    if (isLittleEndian()) {
+        // Interleave into one buffer per element type and write in bulk
+        const size_t stride = withNormals ? 6 : 3;
+        std::vector<float> vbuf(mesh.vertexCount() * stride);
+        for (size_t i = 0; i < mesh.vertexCount(); ++i) {
+            std::memcpy(&vbuf[i * stride], &mesh.vertices[i * 3], 3 * sizeof(float));
+            if (withNormals) std::memcpy(&vbuf[i * stride + 3], &mesh.normals[i * 3], 3 * sizeof(float));
+        }
+        out.write(reinterpret_cast<const char*>(vbuf.data()), vbuf.size() * sizeof(float));
+
+        std::vector<char> fbuf(mesh.triangleCount() * 13);
+        for (size_t t = 0; t < mesh.triangleCount(); ++t) {
+            fbuf[t * 13] = 3;
+            std::memcpy(&fbuf[t * 13 + 1], &mesh.indices[t * 3], 3 * sizeof(uint32_t));
+        }
+        out.write(fbuf.data(), fbuf.size());
+    } else {
+        for (size_t i = 0; i < mesh.vertexCount(); ++i) {
+            for (int c = 0; c < 3; ++c) put(out, mesh.vertices[i * 3 + c]);
+            if (withNormals) for (int c = 0; c < 3; ++c) put(out, mesh.normals[i * 3 + c]);
+        }
+        for (size_t t = 0; t < mesh.triangleCount(); ++t) {
+            put<uint8_t>(out, 3);
+            for (int c = 0; c < 3; ++c) put(out, mesh.indices[t * 3 + c]);
+        }
+    }
+    return static_cast<bool>(out);
+}
+
+bool writeSTL(const TriangleMesh& mesh, const std::string& path) {
+    std::ofstream out(path, std::ios::binary);
+    if (!out) {
+        std::cerr << "      MVR Error: Cannot open " << path << " for writing." << std::endl;
+        return false;
+    }
+    char header[80] = {};
+    std::strncpy(header, "MedicalVolumeRenderer isosurface", sizeof(header) - 1);
+    out.write(header, sizeof(header));
+    put(out, static_cast<uint32_t>(mesh.triangleCount()));
+
+    const float* v = mesh.vertices.data();
+    for (size_t t = 0; t < mesh.triangleCount(); ++t) {
+        const float* a = v + 3 * mesh.indices[t * 3 + 0];
+        const float* b = v + 3 * mesh.indices[t * 3 + 1];
+        const float* c = v + 3 * mesh.indices[t * 3 + 2];
+        float e1[3] = {b[0] - a[0], b[1] - a[1], b[2] - a[2]};
+        float e2[3] = {c[0] - a[0], c[1] - a[1], c[2] - a[2]};
+        float n[3] = {e1[1] * e2[2] - e1[2] * e2[1], e1[2] * e2[0] - e1[0] * e2[2], e1[0] * e2[1] - e1[1] * e2[0]};
+        float len = std::sqrt(n[0] * n[0] + n[1] * n[1] + n[2] * n[2]);
+        if (len > 0.0f) { n[0] /= len; n[1] /= len; n[2] /= len; }
+        for (float f : n) put(out, f);
+        for (int k = 0; k < 3; ++k) put(out, a[k]);
+        for (int k = 0; k < 3; ++k) put(out, b[k]);
+        for (int k = 0; k < 3; ++k) put(out, c[k]);
+        put<uint16_t>(out, 0);
+    }
+    return static_cast<bool>(out);
+}
+
+bool write(const TriangleMesh& mesh, const std::string& path) {
+    std::string ext;
+    size_t dot = path.find_last_of('.');
+    if (dot != std::string::npos) ext = path.substr(dot);
+    std::transform(ext.begin(), ext.end(), ext.begin(), [](unsigned char c){ return std::tolower(c); });
+    if (ext == ".ply") return writePLY(mesh, path);
+    if (ext == ".stl") return writeSTL(mesh, path);
+    std::cerr << "      MVR Error: Unsupported mesh format '" << ext << "' (use .ply or .stl)." << std::endl;
+    return false;
+}
+
+} // namespace MeshIO
@@ -6,10 +6,21 @@
 
 #include "../include/DataLoader.h"
 #include "../include/VolumeData.h"
+#include "../include/GzipReader.h"
+#include "../include/Parallel.h"
+#include "../include/MemoryBudget.h"
 #include <iostream>
 #include <vector>
 #include <algorithm>
+#include <atomic>
+#include <cmath>
 #include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <filesystem>
+#include <fstream>
+#include <limits>
+#include <type_traits>
 
 // nifti_clib includes
 extern "C" {
@@ -19,15 +30,380 @@ extern "C" {
 
 namespace DataLoader {
 
-bool loadNIFTI(const std::string& filePath, VolumeData& volumeData) {
+namespace {
+
+bool hasGzipExtension(const std::string& path) {
+    return path.size() > 3 && path.compare(path.size() - 3, 3, ".gz") == 0;
+}
+
+// Datatypes the streaming path converts; anything else goes through nifti_image_load.
+bool isStreamableType(int datatype) {
+    switch (datatype) {
+        case NIFTI_TYPE_UINT8:
+        case NIFTI_TYPE_INT16:
+        case NIFTI_TYPE_UINT16:
+        case NIFTI_TYPE_FLOAT32:
+        case NIFTI_TYPE_FLOAT64:
+            return true;
+        default:
+            return false;
+    }
+}
+
+template <typename T>
+void byteSwap(T* values, size_t count) {
+    for (size_t i = 0; i < count; ++i) {
+        uint8_t* b = reinterpret_cast<uint8_t*>(values + i);
+        std::reverse(b, b + sizeof(T));
+    }
+}
+
+// Reads an uncompressed file in chunks, with the same contract as GzipReader::readStream.
+bool readFileStream(const std::string& path, const GzipReader::ChunkConsumer& consumer) {
+    std::ifstream file(path, std::ios::binary);
+    if (!file) return false;
+    std::vector<char> buffer(size_t(1) << 22);
+    while (file) {
+        file.read(buffer.data(), static_cast<std::streamsize>(buffer.size()));
+        const size_t got = static_cast<size_t>(file.gcount());
+        if (got == 0) break;
+        if (!consumer(reinterpret_cast<const uint8_t*>(buffer.data()), got)) return true;
+    }
+    return file.eof();
+}
+
+// Streams `count` elements of `elemSize` bytes, starting `offset` bytes into the
+// (decompressed) file, to sink(bytes, firstElement, numElements) in order. Elements
+// that straddle two chunks are reassembled before being passed on.
+template <typename Sink>
+bool streamElements(const std::string& path, bool compressed, uint64_t offset, size_t count, size_t elemSize,
+                    unsigned int threads, Sink&& sink) {
+    uint64_t skip = offset;
+    size_t done = 0;
+    uint8_t carry[8];
+    size_t carryBytes = 0;
+
+    auto consume = [&](const uint8_t* data, size_t size) {
+        if (skip > 0) {
+            const size_t n = static_cast<size_t>(std::min<uint64_t>(skip, size));
+            data += n; size -= n; skip -= n;
+            if (size == 0) return true;
+        }
+        if (carryBytes > 0) {
+            const size_t take = std::min(elemSize - carryBytes, size);
+            std::memcpy(carry + carryBytes, data, take);
+            carryBytes += take; data += take; size -= take;
+            if (carryBytes < elemSize) return true;
+            sink(carry, done, size_t(1));
+            ++done;
+            carryBytes = 0;
+            if (done >= count) return false;
+        }
+        const size_t n = std::min(size / elemSize, count - done);
+        if (n > 0) {
+            sink(data, done, n);
+            done += n;
+            data += n * elemSize;
+            size -= n * elemSize;
+        }
+        if (done >= count) return false; // everything needed has arrived
+        std::memcpy(carry, data, size);  // size < elemSize here
+        carryBytes = size;
+        return true;
+    };
+    const bool ok = compressed ? GzipReader::readStream(path, consume, threads) : readFileStream(path, consume);
+    return ok && done == count;
+}
+
+// Maps staged raw values to [0, 65535] in parallel. Same arithmetic as the
+// nifti_image_load path: scl_slope/scl_inter applied in double, then min/max scaling.
+template <typename T>
+void normalizeStaged(const T* src, uint16_t* dst, size_t count, T rawMin, T rawMax,
+                     double slope, double inter, unsigned int threads) {
+    const double a = static_cast<double>(rawMin) * slope + inter;
+    const double b = static_cast<double>(rawMax) * slope + inter;
+    const double mn = std::min(a, b), mx = std::max(a, b);
+    if (mx <= mn) {
+        std::fill(dst, dst + count, 0);
+        return;
+    }
+    const double scale = 65535.0 / (mx - mn);
+    Parallel::parallelFor(0, count, [&](size_t begin, size_t end) {
+        for (size_t i = begin; i < end; ++i) {
+            double v = (static_cast<double>(src[i]) * slope + inter - mn) * scale;
+            if (v < 0.0) v = 0.0; else if (v > 65535.0) v = 65535.0;
+            dst[i] = static_cast<uint16_t>(v + 0.5);
+        }
+    }, 1 << 16, threads);
+}
+
+// Rounds scaled raw values to labels 0..255 for one slice; counts clamped voxels.
+template <typename T>
+size_t convertLabelSlice(const T* src, uint8_t* dst, size_t count, double slope, double inter) {
+    size_t clamped = 0;
+    if (std::is_integral<T>::value && slope == 1.0 && inter == 0.0) {
+        for (size_t i = 0; i < count; ++i) {
+            const auto v = src[i];
+            if (v < 0 || v > 255) {
+                ++clamped;
+                dst[i] = v < 0 ? 0 : 255;
+            } else {
+                dst[i] = static_cast<uint8_t>(v);
+            }
+        }
+        return clamped;
+    }
+    for (size_t i = 0; i < count; ++i) {
+        const double v = std::round(static_cast<double>(src[i]) * slope + inter);
+        if (!(v >= 0.0 && v <= 255.0)) {
+            ++clamped;
+            dst[i] = v > 255.0 ? 255 : 0;
+        } else {
+            dst[i] = static_cast<uint8_t>(v);
+        }
+    }
+    return clamped;
+}
+
+// Inflates the voxel data of a compressed NIfTI file on several threads and converts
+// it to uint16 while it streams in. Only float inputs need a staging buffer (4 or 8
+// bytes per voxel, for the global min/max); integer types are written straight into
+// volumeData.data.
+bool loadCompressedVoxels(nifti_image* nim, const std::string& dataPath, VolumeData& volumeData,
+                          LoadStats* stats, const LoadOptions& options) {
+    // First frame only for 4D files (see NiftiTimeSeries for the others)
+    const size_t num_voxels = static_cast<size_t>(nim->nx) * nim->ny * nim->nz;
+    const bool swap = (nim->byte_order != nifti_short_order());
+    const uint64_t offset = nim->iname_offset > 0 ? static_cast<uint64_t>(nim->iname_offset) : 0;
+    const unsigned int threads = options.threads ? options.threads : Parallel::threadCount();
+    const double slope = (nim->scl_slope == 0.0) ? 1.0 : nim->scl_slope;
+    const double inter = nim->scl_inter;
+    volumeData.data.resize(num_voxels);
+    uint16_t* out = volumeData.data.data();
+
+    // Copies one run of elements into `dst`, fixes the byte order and tracks min/max.
+    auto stageInto = [&](auto* dst, auto& mn, auto& mx) {
+        using T = std::remove_pointer_t<decltype(dst)>;
+        return [dst, &mn, &mx, swap](const uint8_t* bytes, size_t first, size_t n) {
+            T* values = dst + first;
+            std::memcpy(values, bytes, n * sizeof(T));
+            if (swap) byteSwap(values, n);
+            for (size_t i = 0; i < n; ++i) {
+                if (values[i] < mn) mn = values[i];
+                if (values[i] > mx) mx = values[i];
+            }
+        };
+    };
+
+    switch (nim->datatype) {
+        case NIFTI_TYPE_UINT16: {
+            ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+            return streamElements(dataPath, true, offset, num_voxels, sizeof(uint16_t), threads,
+                [&](const uint8_t* bytes, size_t first, size_t n) {
+                    std::memcpy(out + first, bytes, n * sizeof(uint16_t));
+                    if (swap) byteSwap(out + first, n);
+                });
+        }
+        case NIFTI_TYPE_UINT8: {
+            ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+            return streamElements(dataPath, true, offset, num_voxels, 1, threads,
+                [&](const uint8_t* bytes, size_t first, size_t n) {
+                    for (size_t i = 0; i < n; ++i) out[first + i] = static_cast<uint16_t>(bytes[i]) * 257u;
+                });
+        }
+        case NIFTI_TYPE_INT16: {
+            // Raw int16 bits are staged in the output buffer and normalized in place.
+            int16_t* raw = reinterpret_cast<int16_t*>(out);
+            int16_t mn = INT16_MAX, mx = INT16_MIN;
+            ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+            if (!streamElements(dataPath, true, offset, num_voxels, sizeof(int16_t), threads, stageInto(raw, mn, mx))) return false;
+            decodePhase.stop();
+            ScopedLoadPhase normalizePhase(stats, LoadPhase::Normalize);
+            normalizeStaged(raw, out, num_voxels, mn, mx, slope, inter, threads);
+            return true;
+        }
+        case NIFTI_TYPE_FLOAT32: {
+            std::vector<float> staged(num_voxels);
+            MemoryBudget::Allocation stagedMemory(MemoryBudget::Category::LoadTemporary, num_voxels * sizeof(float));
+            float mn = std::numeric_limits<float>::max(), mx = std::numeric_limits<float>::lowest();
+            ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+            if (!streamElements(dataPath, true, offset, num_voxels, sizeof(float), threads, stageInto(staged.data(), mn, mx))) return false;
+            decodePhase.stop();
+            ScopedLoadPhase normalizePhase(stats, LoadPhase::Normalize);
+            normalizeStaged(staged.data(), out, num_voxels, mn, mx, slope, inter, threads);
+            return true;
+        }
+        case NIFTI_TYPE_FLOAT64: {
+            std::vector<double> staged(num_voxels);
+            MemoryBudget::Allocation stagedMemory(MemoryBudget::Category::LoadTemporary, num_voxels * sizeof(double));
+            double mn = std::numeric_limits<double>::max(), mx = std::numeric_limits<double>::lowest();
+            ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+            if (!streamElements(dataPath, true, offset, num_voxels, sizeof(double), threads, stageInto(staged.data(), mn, mx))) return false;
+            decodePhase.stop();
+            ScopedLoadPhase normalizePhase(stats, LoadPhase::Normalize);
+            normalizeStaged(staged.data(), out, num_voxels, mn, mx, slope, inter, threads);
+            return true;
+        }
+        default:
+            return false;
+    }
+}
+
+// Streams the first frame's voxels (compressed or not) and box-filters them by `factor`
+// on every axis while they arrive, so the full-resolution volume is never held: only
+// one output slice of sums and the reduced result. Integer types are averaged straight
+// into volumeData.data; int16 and float inputs are averaged into a reduced float
+// staging buffer first, since their range (and so the uint16 mapping) is known only at
+// the end. With factor 1 this is a low-memory variant of the normal path.
+bool loadReducedVoxels(nifti_image* nim, const std::string& dataPath, unsigned int factor, VolumeData& volumeData,
+                       LoadStats* stats, const LoadOptions& options) {
+    const size_t nx = nim->nx, ny = nim->ny, nz = nim->nz;
+    const size_t ox = MemoryBudget::reducedSize(nx, factor), oy = MemoryBudget::reducedSize(ny, factor);
+    const size_t oz = MemoryBudget::reducedSize(nz, factor);
+    const size_t num_voxels = nx * ny * nz;
+    const bool swap = (nim->byte_order != nifti_short_order());
+    const uint64_t offset = nim->iname_offset > 0 ? static_cast<uint64_t>(nim->iname_offset) : 0;
+    const unsigned int threads = options.threads ? options.threads : Parallel::threadCount();
+    const double slope = (nim->scl_slope == 0.0) ? 1.0 : nim->scl_slope;
+    const double inter = nim->scl_inter;
+    const bool normalize = nim->datatype != NIFTI_TYPE_UINT8 && nim->datatype != NIFTI_TYPE_UINT16;
+
+    volumeData.data.resize(ox * oy * oz);
+    std::vector<float> staged(normalize ? volumeData.data.size() : 0);
+    MemoryBudget::Allocation stagedMemory(MemoryBudget::Category::LoadTemporary, staged.size() * sizeof(float));
+    std::vector<double> sums(ox * oy, 0.0);
+    float mn = std::numeric_limits<float>::max(), mx = std::numeric_limits<float>::lowest();
+
+    // Writes the means of output slice `z` (input slices z*factor ...) and resets the sums
+    auto flushSlice = [&](size_t z) {
+        const size_t bz = std::min<size_t>(factor, nz - z * factor);
+        for (size_t y = 0; y < oy; ++y) {
+            const size_t by = std::min<size_t>(factor, ny - y * factor);
+            for (size_t x = 0; x < ox; ++x) {
+                const size_t bx = std::min<size_t>(factor, nx - x * factor);
+                const size_t i = y * ox + x;
+                const double mean = sums[i] / static_cast<double>(bx * by * bz);
+                const size_t o = z * ox * oy + i;
+                if (normalize) {
+                    staged[o] = static_cast<float>(mean);
+                    mn = std::min(mn, staged[o]);
+                    mx = std::max(mx, staged[o]);
+                } else {
+                    const double v = nim->datatype == NIFTI_TYPE_UINT8 ? mean * 257.0 : mean;
+                    volumeData.data[o] = static_cast<uint16_t>(std::min(65535.0, v + 0.5));
+                }
+            }
+        }
+        std::fill(sums.begin(), sums.end(), 0.0);
+    };
+
+    // Input position of the next element; elements arrive in file order (x fastest)
+    size_t x = 0, y = 0, z = 0;
+    auto reduceInto = [&](auto type) {
+        using T = decltype(type);
+        return [&](const uint8_t* bytes, size_t, size_t n) {
+            for (size_t k = 0; k < n; ++k) {
+                T v;
+                std::memcpy(&v, bytes + k * sizeof(T), sizeof(T));
+                if (swap) byteSwap(&v, 1);
+                sums[(y / factor) * ox + x / factor] += static_cast<double>(v);
+                if (++x < nx) continue;
+                x = 0;
+                if (++y < ny) continue;
+                y = 0;
+                if (++z % factor == 0 || z == nz) flushSlice((z - 1) / factor);
+            }
+        };
+    };
+
+    const bool compressed = hasGzipExtension(dataPath);
+    ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+    bool ok = false;
+    switch (nim->datatype) {
+        case NIFTI_TYPE_UINT8:
+            ok = streamElements(dataPath, compressed, offset, num_voxels, 1, threads, reduceInto(uint8_t{}));
+            break;
+        case NIFTI_TYPE_UINT16:
+            ok = streamElements(dataPath, compressed, offset, num_voxels, 2, threads, reduceInto(uint16_t{}));
+            break;
+        case NIFTI_TYPE_INT16:
+            ok = streamElements(dataPath, compressed, offset, num_voxels, 2, threads, reduceInto(int16_t{}));
+            break;
+        case NIFTI_TYPE_FLOAT32:
+            ok = streamElements(dataPath, compressed, offset, num_voxels, 4, threads, reduceInto(float{}));
+            break;
+        case NIFTI_TYPE_FLOAT64:
+            ok = streamElements(dataPath, compressed, offset, num_voxels, 8, threads, reduceInto(double{}));
+            break;
+        default:
+            break;
+    }
+    decodePhase.stop();
+    if (!ok) return false;
+    if (normalize) {
+        ScopedLoadPhase normalizePhase(stats, LoadPhase::Normalize);
+        normalizeStaged(staged.data(), volumeData.data.data(), staged.size(), mn, mx, slope, inter, threads);
+    }
+
+    volumeData.width = static_cast<unsigned int>(ox);
+    volumeData.height = static_cast<unsigned int>(oy);
+    volumeData.depth = static_cast<unsigned int>(oz);
+    if (nx > 1) volumeData.spacing_x *= factor;
+    if (ny > 1) volumeData.spacing_y *= factor;
+    if (nz > 1) volumeData.spacing_z *= factor;
+    return true;
+}
+
+// Bytes per voxel the normal path holds besides the uint16 output: the nifti_image_load
+// blob plus the double conversion buffer, or the float staging of the streaming path.
+uint64_t decodeTemporaryBytes(const nifti_image* nim, bool streamed) {
+    const bool normalize = nim->datatype != NIFTI_TYPE_UINT8 && nim->datatype != NIFTI_TYPE_UINT16;
+    if (streamed) return (nim->datatype == NIFTI_TYPE_FLOAT32 || nim->datatype == NIFTI_TYPE_FLOAT64) ? nim->nbyper : 0;
+    return static_cast<uint64_t>(nim->nbyper) + (normalize ? sizeof(double) : 0);
+}
+
+} // namespace
+
+const char* niftiDataTypeName(int datatype) {
+    switch (datatype) {
+        case NIFTI_TYPE_UINT8:   return "uint8";
+        case NIFTI_TYPE_INT8:    return "int8";
+        case NIFTI_TYPE_INT16:   return "int16";
+        case NIFTI_TYPE_UINT16:  return "uint16";
+        case NIFTI_TYPE_INT32:   return "int32";
+        case NIFTI_TYPE_UINT32:  return "uint32";
+        case NIFTI_TYPE_INT64:   return "int64";
+        case NIFTI_TYPE_UINT64:  return "uint64";
+        case NIFTI_TYPE_FLOAT32: return "float32";
+        case NIFTI_TYPE_FLOAT64: return "float64";
+        default:                 return "";
+    }
+}
+
+bool loadNIFTI(const std::string& filePath, VolumeData& volumeData, LoadStats* stats, const LoadOptions& options) {
     volumeData.clear();
 
-    // Read the NIfTI image. The second argument '1' means to read the data blob.
-    nifti_image* nim = nifti_image_read(filePath.c_str(), 1);
+    if (stats) {
+        std::error_code ec;
+        auto size = std::filesystem::file_size(filePath, ec);
+        if (!ec) stats->bytesRead += static_cast<uint64_t>(size);
+        stats->filesScanned += 1;
+    }
+
+    // Read the header only (second argument '0'); the data blob is loaded separately
+    // so header parsing and decoding can be timed on their own.
+    ScopedLoadPhase headerPhase(stats, LoadPhase::HeaderParse);
+    nifti_image* nim = nifti_image_read(filePath.c_str(), 0);
+    headerPhase.stop();
     if (!nim) {
         std::cerr << "      MVR Error: Failed to read NIfTI file: " << filePath << std::endl;
+        if (stats) stats->filesSkipped += 1;
         return false;
     }
+    if (stats) {
+        stats->filesParsed += 1;
+        stats->dataType = niftiDataTypeName(nim->datatype);
+    }
 
     // Check if the image is 3D
     if (nim->dim[0] < 3) {
@@ -45,14 +421,95 @@ bool loadNIFTI(const std::string& filePath, VolumeData& volumeData) {
     volumeData.spacing_y = nim->dy;
     volumeData.spacing_z = nim->dz;
 
-    // 2. Read and convert data into uint16_t buffer with normalization.
-    if (!nim->data) {
+    // 4D+ files: only the first frame is read here; the remaining dimensions are
+    // flattened into frames that NiftiTimeSeries reads on demand.
+    const size_t num_voxels = static_cast<size_t>(nim->nx) * nim->ny * nim->nz;
+    const size_t num_frames = num_voxels ? static_cast<size_t>(nim->nvox) / num_voxels : 0;
+    if (num_frames > 1 && getVerbosity() >= VerbositySummary) {
+        std::cout << "      MVR Info: NIfTI file has " << num_frames << " frames; loading the first." << std::endl;
+    }
+
+    const std::string dataPath = nim->iname ? nim->iname : filePath;
+    const bool streamed = options.parallelGzip && hasGzipExtension(dataPath) && isStreamableType(nim->datatype);
+
+    // Over the host budget at full resolution: the reduction is chosen from the header,
+    // before any voxel is decoded, and applied while the data streams in.
+    const uint64_t fullBytes = num_voxels * (sizeof(uint16_t) + decodeTemporaryBytes(nim, streamed));
+    if (options.fitHostBudget && !MemoryBudget::fits(MemoryBudget::Pool::Host, fullBytes)) {
+        const bool normalize = nim->datatype != NIFTI_TYPE_UINT8 && nim->datatype != NIFTI_TYPE_UINT16;
+        const unsigned int factor = isStreamableType(nim->datatype)
+            ? MemoryBudget::reductionFactor(MemoryBudget::Pool::Host, nim->nx, nim->ny, nim->nz,
+                                            sizeof(uint16_t) + (normalize ? sizeof(float) : 0))
+            : 0;
+        if (factor == 0) {
+            std::cerr << "      MVR Error: NIfTI volume " << volumeData.width << "x" << volumeData.height << "x"
+                      << volumeData.depth << " does not fit the host memory budget"
+                      << (isStreamableType(nim->datatype) ? " at any resolution." : " and its datatype cannot be reduced while loading.")
+                      << std::endl;
+            nifti_image_free(nim);
+            return false;
+        }
+        const uint64_t reducedVoxels = MemoryBudget::reducedSize(nim->nx, factor) * MemoryBudget::reducedSize(nim->ny, factor) *
+                                       MemoryBudget::reducedSize(nim->nz, factor);
+        MemoryBudget::Allocation outputMemory(MemoryBudget::Category::LoadTemporary, reducedVoxels * sizeof(uint16_t));
+        if (getVerbosity() >= VerbositySummary) {
+            std::cout << "      MVR Info: NIfTI volume " << volumeData.width << "x" << volumeData.height << "x"
+                      << volumeData.depth << " exceeds the host memory budget; reducing it " << factor
+                      << "x per axis while decoding." << std::endl;
+        }
+        const bool ok = loadReducedVoxels(nim, dataPath, factor, volumeData, stats, options);
+        nifti_image_free(nim);
+        if (!ok) {
+            std::cerr << "      MVR Error: Failed to read the voxel data of " << filePath << std::endl;
+            volumeData.clear();
+            return false;
+        }
+        if (stats) {
+            stats->bytesOutput += volumeData.data.size() * sizeof(uint16_t);
+            stats->reduction = factor;
+        }
+        if (getVerbosity() >= VerbositySummary) {
+            std::cout << "      MVR Info: Loaded NIfTI volume: " << volumeData.width << "x" << volumeData.height << "x" << volumeData.depth << std::endl;
+        }
+        return true;
+    }
+
+    // The output buffer counts as a load temporary until the caller takes it over
+    MemoryBudget::Allocation outputMemory(MemoryBudget::Category::LoadTemporary, num_voxels * sizeof(uint16_t));
+
+    // 2a. Compressed data: multi-threaded inflate, converted while it streams in.
+    if (streamed) {
+        if (loadCompressedVoxels(nim, dataPath, volumeData, stats, options)) {
+            nifti_image_free(nim);
+            if (stats) stats->bytesOutput += volumeData.data.size() * sizeof(uint16_t);
+            if (getVerbosity() >= VerbositySummary) {
+                std::cout << "      MVR Info: Loaded NIfTI volume: " << volumeData.width << "x" << volumeData.height << "x" << volumeData.depth << std::endl;
+            }
+            return true;
+        }
+        std::cerr << "      MVR Warning: Parallel gzip path failed, retrying with nifti_image_load." << std::endl;
+    }
+
+    // 2b. Read and convert data into uint16_t buffer with normalization.
+    ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+    void* blob = nullptr;
+    void* frameBlob = nullptr; // malloc'ed by nifti_read_collapsed_image for 4D files
+    if (num_frames > 1) {
+        const int dims[8] = {0, -1, -1, -1, 0, 0, 0, 0};
+        if (nifti_read_collapsed_image(nim, dims, &frameBlob) > 0) blob = frameBlob;
+    } else if (nifti_image_load(nim) == 0) {
+        blob = nim->data;
+    }
+    decodePhase.stop();
+    MemoryBudget::Allocation blobMemory(MemoryBudget::Category::LoadTemporary,
+                                        blob ? num_voxels * static_cast<uint64_t>(nim->nbyper) : 0);
+    if (!blob) {
         std::cerr << "      MVR Error: NIfTI file contains no pixel data." << std::endl;
+        free(frameBlob);
         nifti_image_free(nim);
         return false;
     }
 
-    const size_t num_voxels = static_cast<size_t>(nim->nvox);
     volumeData.data.resize(num_voxels);
 
     // Helper lambdas
@@ -78,51 +535,151 @@ bool loadNIFTI(const std::string& filePath, VolumeData& volumeData) {
         }
     };
 
+    ScopedLoadPhase normalizePhase(stats, LoadPhase::Normalize);
     switch (nim->datatype) {
         case NIFTI_TYPE_UINT16: {
-            const uint16_t* ptr = static_cast<uint16_t*>(nim->data);
+            const uint16_t* ptr = static_cast<uint16_t*>(blob);
             std::copy(ptr, ptr + num_voxels, volumeData.data.begin());
             break;
         }
         case NIFTI_TYPE_INT16: {
-            const int16_t* ptr = static_cast<int16_t*>(nim->data);
+            const int16_t* ptr = static_cast<int16_t*>(blob);
             std::vector<double> tmp(num_voxels);
+            MemoryBudget::Allocation tmpMemory(MemoryBudget::Category::LoadTemporary, num_voxels * sizeof(double));
             for (size_t i = 0; i < num_voxels; ++i) tmp[i] = apply_slope_inter(static_cast<double>(ptr[i]));
             normalize_to_u16(tmp);
             break;
         }
         case NIFTI_TYPE_UINT8: {
-            const uint8_t* ptr = static_cast<uint8_t*>(nim->data);
+            const uint8_t* ptr = static_cast<uint8_t*>(blob);
             // Expand 8-bit to 16-bit
             for (size_t i = 0; i < num_voxels; ++i) volumeData.data[i] = static_cast<uint16_t>(ptr[i]) * 257u;
             break;
         }
         case NIFTI_TYPE_FLOAT32: {
-            const float* ptr = static_cast<float*>(nim->data);
+            const float* ptr = static_cast<float*>(blob);
             std::vector<double> tmp(num_voxels);
+            MemoryBudget::Allocation tmpMemory(MemoryBudget::Category::LoadTemporary, num_voxels * sizeof(double));
             for (size_t i = 0; i < num_voxels; ++i) tmp[i] = apply_slope_inter(static_cast<double>(ptr[i]));
             normalize_to_u16(tmp);
             break;
         }
         case NIFTI_TYPE_FLOAT64: {
-            const double* ptr = static_cast<double*>(nim->data);
+            const double* ptr = static_cast<double*>(blob);
             std::vector<double> tmp(num_voxels);
+            MemoryBudget::Allocation tmpMemory(MemoryBudget::Category::LoadTemporary, num_voxels * sizeof(double));
             for (size_t i = 0; i < num_voxels; ++i) tmp[i] = apply_slope_inter(ptr[i]);
             normalize_to_u16(tmp);
             break;
         }
         default: {
             std::cerr << "      MVR Warning: Unsupported NIfTI datatype (code " << nim->datatype << "), normalizing as bytes." << std::endl;
-            const uint8_t* ptr = static_cast<uint8_t*>(nim->data);
+            const uint8_t* ptr = static_cast<uint8_t*>(blob);
             for (size_t i = 0; i < num_voxels; ++i) volumeData.data[i] = static_cast<uint16_t>(ptr[i]) * 257u;
             break;
         }
     }
 
+    normalizePhase.stop();
+
     // 3. Clean up by freeing the nifti_image struct.
+    free(frameBlob);
+    nifti_image_free(nim);
+
+    if (stats) stats->bytesOutput += volumeData.data.size() * sizeof(uint16_t);
+    if (getVerbosity() >= VerbositySummary) {
+        std::cout << "      MVR Info: Loaded NIfTI volume: " << volumeData.width << "x" << volumeData.height << "x" << volumeData.depth << std::endl;
+    }
+    return true;
+}
+
+bool loadNIFTILabels(const std::string& filePath, LabelMap& labels, LoadStats* stats, const LoadOptions& options) {
+    labels.clear();
+    if (stats) {
+        std::error_code ec;
+        auto size = std::filesystem::file_size(filePath, ec);
+        if (!ec) stats->bytesRead += static_cast<uint64_t>(size);
+        stats->filesScanned += 1;
+    }
+
+    ScopedLoadPhase headerPhase(stats, LoadPhase::HeaderParse);
+    nifti_image* nim = nifti_image_read(filePath.c_str(), 0);
+    headerPhase.stop();
+    if (!nim) {
+        std::cerr << "      MVR Error: Failed to read NIfTI label file: " << filePath << std::endl;
+        if (stats) stats->filesSkipped += 1;
+        return false;
+    }
+    if (stats) stats->filesParsed += 1;
+    if (nim->dim[0] < 3) {
+        std::cerr << "      MVR Error: NIfTI label file is not a 3D volume." << std::endl;
+        nifti_image_free(nim);
+        return false;
+    }
+
+    const size_t num_voxels = static_cast<size_t>(nim->nx) * nim->ny * nim->nz;
+    const size_t num_frames = num_voxels ? static_cast<size_t>(nim->nvox) / num_voxels : 0;
+    ScopedLoadPhase decodePhase(stats, LoadPhase::Decode);
+    void* blob = nullptr;
+    void* frameBlob = nullptr;
+    if (num_frames > 1) {
+        const int dims[8] = {0, -1, -1, -1, 0, 0, 0, 0};
+        if (nifti_read_collapsed_image(nim, dims, &frameBlob) > 0) blob = frameBlob;
+    } else if (nifti_image_load(nim) == 0) {
+        blob = nim->data;
+    }
+    decodePhase.stop();
+    if (!blob) {
+        std::cerr << "      MVR Error: NIfTI label file contains no pixel data." << std::endl;
+        free(frameBlob);
+        nifti_image_free(nim);
+        return false;
+    }
+
+    const double slope = (nim->scl_slope == 0.0) ? 1.0 : nim->scl_slope;
+    const double inter = nim->scl_inter;
+    const size_t sliceSize = static_cast<size_t>(nim->nx) * nim->ny;
+    std::atomic<size_t> clamped{0};
+    bool supported = true;
+    // Converted and run-length encoded one slice at a time
+    ScopedLoadPhase encodePhase(stats, LoadPhase::Normalize);
+    auto encodeAs = [&](auto tag) {
+        using T = decltype(tag);
+        const T* src = static_cast<const T*>(blob);
+        labels.encodeSlices(nim->nx, nim->ny, nim->nz, [&](unsigned int z, uint8_t* dst) {
+            clamped += convertLabelSlice(src + z * sliceSize, dst, sliceSize, slope, inter);
+        }, options.threads);
+    };
+    switch (nim->datatype) {
+        case NIFTI_TYPE_UINT8:   encodeAs(uint8_t{}); break;
+        case NIFTI_TYPE_INT8:    encodeAs(int8_t{}); break;
+        case NIFTI_TYPE_UINT16:  encodeAs(uint16_t{}); break;
+        case NIFTI_TYPE_INT16:   encodeAs(int16_t{}); break;
+        case NIFTI_TYPE_UINT32:  encodeAs(uint32_t{}); break;
+        case NIFTI_TYPE_INT32:   encodeAs(int32_t{}); break;
+        case NIFTI_TYPE_INT64:   encodeAs(int64_t{}); break;
+        case NIFTI_TYPE_UINT64:  encodeAs(uint64_t{}); break;
+        case NIFTI_TYPE_FLOAT32: encodeAs(float{}); break;
+        case NIFTI_TYPE_FLOAT64: encodeAs(double{}); break;
+        default:
+            std::cerr << "      MVR Error: Unsupported NIfTI label datatype (code " << nim->datatype << ")." << std::endl;
+            supported = false;
+            break;
+    }
+    encodePhase.stop();
+    free(frameBlob);
     nifti_image_free(nim);
+    if (!supported) return false;
 
-    std::cout << "      MVR Info: Loaded NIfTI volume: " << volumeData.width << "x" << volumeData.height << "x" << volumeData.depth << std::endl;
+    if (clamped > 0) {
+        std::cerr << "      MVR Warning: " << clamped.load() << " label voxels outside 0..255 were clamped." << std::endl;
+    }
+    if (stats) stats->bytesOutput += labels.memoryBytes();
+    if (getVerbosity() >= VerbositySummary) {
+        std::cout << "      MVR Info: Loaded NIfTI labels: " << labels.width() << "x" << labels.height() << "x"
+                  << labels.depth() << ", " << labels.runCount() << " runs, "
+                  << labels.memoryBytes() / 1024 << " KiB" << std::endl;
+    }
     return true;
 }
 
@@ -0,0 +1,411 @@
+// backend/src/NiftiTimeSeries.cpp
+
+#include "../include/NiftiTimeSeries.h"
+#include "../include/DataLoader.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <cstring>
+#include <iostream>
+#include <limits>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#include <zlib.h>
+
+// nifti_clib includes
+extern "C" {
+    #include "../extern/nifti_clib/niftilib/nifti1_io.h"
+}
+
+namespace {
+
+bool hasGzipExtension(const std::string& path) {
+    return path.size() > 3 && path.compare(path.size() - 3, 3, ".gz") == 0;
+}
+
+template <typename T>
+T loadValue(const uint8_t* p, bool swap) {
+    T v;
+    if (swap) {
+        uint8_t b[sizeof(T)];
+        std::reverse_copy(p, p + sizeof(T), b);
+        std::memcpy(&v, b, sizeof(T));
+    } else {
+        std::memcpy(&v, p, sizeof(T));
+    }
+    return v;
+}
+
+// Min/max of raw values after scl_slope/scl_inter.
+template <typename T>
+void scaledRange(const uint8_t* raw, size_t count, bool swap, double slope, double inter, double& mn, double& mx) {
+    T lo = std::numeric_limits<T>::max(), hi = std::numeric_limits<T>::lowest();
+    for (size_t i = 0; i < count; ++i) {
+        T v = loadValue<T>(raw + i * sizeof(T), swap);
+        if (v < lo) lo = v;
+        if (v > hi) hi = v;
+    }
+    const double a = static_cast<double>(lo) * slope + inter;
+    const double b = static_cast<double>(hi) * slope + inter;
+    mn = std::min(a, b);
+    mx = std::max(a, b);
+}
+
+template <typename T>
+void normalizeFrame(const uint8_t* raw, uint16_t* out, size_t count, bool swap,
+                    double slope, double inter, double mn, double mx) {
+    if (mx <= mn) {
+        std::fill(out, out + count, 0);
+        return;
+    }
+    const double scale = 65535.0 / (mx - mn);
+    Parallel::parallelFor(0, count, [&](size_t begin, size_t end) {
+        for (size_t i = begin; i < end; ++i) {
+            double v = (static_cast<double>(loadValue<T>(raw + i * sizeof(T), swap)) * slope + inter - mn) * scale;
+            if (v < 0.0) v = 0.0; else if (v > 65535.0) v = 65535.0;
+            out[i] = static_cast<uint16_t>(v + 0.5);
+        }
+    }, 1 << 16);
+}
+
+} // namespace
+
+NiftiTimeSeries::~NiftiTimeSeries() {
+    close();
+}
+
+size_t NiftiTimeSeries::probeFrameCount(const std::string& filePath) {
+    nifti_image* nim = nifti_image_read(filePath.c_str(), 0);
+    if (!nim) return 0;
+    size_t frames = 0;
+    if (nim->dim[0] >= 3 && nim->nx > 0 && nim->ny > 0 && nim->nz > 0) {
+        frames = static_cast<size_t>(nim->nvox) / (static_cast<size_t>(nim->nx) * nim->ny * nim->nz);
+    }
+    nifti_image_free(nim);
+    return frames;
+}
+
+bool NiftiTimeSeries::open(const std::string& filePath, size_t cacheFrames) {
+    close();
+
+    nifti_image* nim = nifti_image_read(filePath.c_str(), 0);
+    if (!nim) {
+        std::cerr << "      MVR Error: Failed to read NIfTI header: " << filePath << std::endl;
+        return false;
+    }
+    if (nim->dim[0] < 3 || nim->nx <= 0 || nim->ny <= 0 || nim->nz <= 0) {
+        nifti_image_free(nim);
+        return false;
+    }
+    switch (nim->datatype) {
+        case NIFTI_TYPE_UINT8:
+        case NIFTI_TYPE_INT16:
+        case NIFTI_TYPE_UINT16:
+        case NIFTI_TYPE_FLOAT32:
+        case NIFTI_TYPE_FLOAT64:
+            break;
+        default:
+            nifti_image_free(nim);
+            return false;
+    }
+
+    m_nx = static_cast<unsigned int>(nim->nx);
+    m_ny = static_cast<unsigned int>(nim->ny);
+    m_nz = static_cast<unsigned int>(nim->nz);
+    m_dx = nim->dx; m_dy = nim->dy; m_dz = nim->dz;
+    m_datatype = nim->datatype;
+    m_bytesPerVoxel = static_cast<size_t>(nim->nbyper);
+    m_swap = (nim->byte_order != nifti_short_order());
+    m_dataOffset = nim->iname_offset > 0 ? static_cast<uint64_t>(nim->iname_offset) : 0;
+    m_dataPath = nim->iname ? nim->iname : filePath;
+    m_compressed = hasGzipExtension(m_dataPath);
+    m_slope = (nim->scl_slope == 0.0) ? 1.0 : nim->scl_slope;
+    m_inter = nim->scl_inter;
+    m_frameInterval = nim->dt;
+    const bool hasCalRange = nim->cal_max > nim->cal_min;
+    m_rangeMin = nim->cal_min;
+    m_rangeMax = nim->cal_max;
+    // Every dimension past the third (t, u, v, w) is flattened into the frame index.
+    const size_t frames = static_cast<size_t>(nim->nvox) / frameVoxels();
+    nifti_image_free(nim);
+
+    if (m_compressed) {
+        gzFile gz = gzopen(m_dataPath.c_str(), "rb");
+        if (!gz) {
+            std::cerr << "      MVR Error: Cannot open NIfTI data: " << m_dataPath << std::endl;
+            return false;
+        }
+        gzbuffer(gz, 1u << 18);
+        m_gz = gz;
+        m_gzPos = 0;
+    } else {
+        int fd = ::open(m_dataPath.c_str(), O_RDONLY);
+        struct stat st;
+        if (fd < 0 || fstat(fd, &st) != 0 || st.st_size <= 0) {
+            if (fd >= 0) ::close(fd);
+            std::cerr << "      MVR Error: Cannot open NIfTI data: " << m_dataPath << std::endl;
+            return false;
+        }
+        void* map = mmap(nullptr, static_cast<size_t>(st.st_size), PROT_READ, MAP_PRIVATE, fd, 0);
+        ::close(fd);
+        if (map == MAP_FAILED) {
+            std::cerr << "      MVR Error: Cannot map NIfTI data: " << m_dataPath << std::endl;
+            return false;
+        }
+        m_map = static_cast<const uint8_t*>(map);
+        m_mapSize = static_cast<size_t>(st.st_size);
+    }
+    m_frameCount = std::max<size_t>(1, frames);
+    m_ringCapacity = std::max<size_t>(2, cacheFrames);
+
+    // One normalization range for all frames (see header); integer types map directly.
+    if (!hasCalRange && (m_datatype == NIFTI_TYPE_INT16 || m_datatype == NIFTI_TYPE_FLOAT32 ||
+                         m_datatype == NIFTI_TYPE_FLOAT64)) {
+        std::lock_guard<std::mutex> io(m_ioMutex);
+        const uint8_t* raw = nullptr;
+        if (m_map) {
+            if (m_dataOffset + frameBytes() <= m_mapSize) raw = m_map + m_dataOffset;
+        } else {
+            m_rawBuffer.resize(frameBytes());
+            if (readRaw(0, m_rawBuffer.data())) raw = m_rawBuffer.data();
+        }
+        if (!raw) {
+            std::cerr << "      MVR Error: NIfTI file is truncated: " << m_dataPath << std::endl;
+            close();
+            return false;
+        }
+        switch (m_datatype) {
+            case NIFTI_TYPE_INT16:   scaledRange<int16_t>(raw, frameVoxels(), m_swap, m_slope, m_inter, m_rangeMin, m_rangeMax); break;
+            case NIFTI_TYPE_FLOAT32: scaledRange<float>(raw, frameVoxels(), m_swap, m_slope, m_inter, m_rangeMin, m_rangeMax); break;
+            default:                 scaledRange<double>(raw, frameVoxels(), m_swap, m_slope, m_inter, m_rangeMin, m_rangeMax); break;
+        }
+        // Frame 0 is at hand: keep it decoded so acquire(0) does not read (for .gz,
+        // rewind and inflate) it a second time
+        auto first = std::make_shared<std::vector<uint16_t>>();
+        convert(raw, *first);
+        insert(0, std::move(first));
+    }
+
+    m_stopWorker = false;
+    m_worker = std::thread(&NiftiTimeSeries::prefetchLoop, this);
+
+    if (DataLoader::getVerbosity() >= DataLoader::VerbositySummary) {
+        std::cout << "      MVR Info: NIfTI time series: " << m_nx << "x" << m_ny << "x" << m_nz << ", "
+                  << m_frameCount << " frame(s), " << (m_compressed ? "sequential gzip" : "memory-mapped")
+                  << " access, " << m_ringCapacity << " cached." << std::endl;
+    }
+    return true;
+}
+
+void NiftiTimeSeries::close() {
+    if (m_worker.joinable()) {
+        {
+            std::lock_guard<std::mutex> lock(m_ringMutex);
+            m_stopWorker = true;
+            m_pending.clear();
+        }
+        m_workCv.notify_all();
+        m_worker.join();
+    }
+    std::lock_guard<std::mutex> io(m_ioMutex);
+    if (m_map) {
+        munmap(const_cast<uint8_t*>(m_map), m_mapSize);
+        m_map = nullptr;
+        m_mapSize = 0;
+    }
+    if (m_gz) {
+        gzclose(static_cast<gzFile>(m_gz));
+        m_gz = nullptr;
+        m_gzPos = 0;
+    }
+    m_rawBuffer.clear();
+    m_rawBuffer.shrink_to_fit();
+    {
+        std::lock_guard<std::mutex> lock(m_ringMutex);
+        m_ring.clear();
+        m_ringNext = 0;
+        trackRing();
+    }
+    m_frameCount = 0;
+}
+
+void NiftiTimeSeries::describe(VolumeData& volumeData) const {
+    volumeData.width = m_nx;
+    volumeData.height = m_ny;
+    volumeData.depth = m_nz;
+    volumeData.spacing_x = m_dx;
+    volumeData.spacing_y = m_dy;
+    volumeData.spacing_z = m_dz;
+}
+
+NiftiTimeSeries::Frame NiftiTimeSeries::acquire(size_t frame) {
+    if (frame >= m_frameCount) return nullptr;
+
+    Frame result = lookup(frame);
+    if (!result) {
+        std::lock_guard<std::mutex> io(m_ioMutex);
+        result = lookup(frame); // the prefetcher may have just finished it
+        if (!result) {
+            auto decoded = std::make_shared<std::vector<uint16_t>>();
+            if (!decode(frame, *decoded)) return nullptr;
+            result = decoded;
+            insert(frame, result);
+        }
+    }
+
+    // Decode the next frames (wrapping, for looped playback) in the background.
+    {
+        std::lock_guard<std::mutex> lock(m_ringMutex);
+        m_pending.clear();
+        const size_t ahead = std::min<size_t>(3, std::min(m_ringCapacity - 1, m_frameCount - 1));
+        for (size_t k = 1; k <= ahead; ++k) {
+            const size_t next = (frame + k) % m_frameCount;
+            bool cached = std::any_of(m_ring.begin(), m_ring.end(), [&](const Slot& s){ return s.frame == next; });
+            if (!cached) m_pending.push_back(next);
+        }
+    }
+    m_workCv.notify_one();
+    return result;
+}
+
+void NiftiTimeSeries::setCacheFrames(size_t frames) {
+    std::lock_guard<std::mutex> lock(m_ringMutex);
+    frames = std::max<size_t>(2, frames);
+    // Reorder oldest -> newest, then keep the newest `frames` slots.
+    std::vector<Slot> ordered;
+    ordered.reserve(m_ring.size());
+    for (size_t i = 0; i < m_ring.size(); ++i) {
+        ordered.push_back(std::move(m_ring[(m_ringNext + i) % m_ring.size()]));
+    }
+    if (ordered.size() > frames) ordered.erase(ordered.begin(), ordered.end() - static_cast<std::ptrdiff_t>(frames));
+    m_ring = std::move(ordered);
+    m_ringNext = 0;
+    m_ringCapacity = frames;
+    trackRing();
+}
+
+size_t NiftiTimeSeries::cacheFrames() const {
+    std::lock_guard<std::mutex> lock(m_ringMutex);
+    return m_ringCapacity;
+}
+
+// Called with m_ioMutex held.
+bool NiftiTimeSeries::decode(size_t frame, std::vector<uint16_t>& out) {
+    const size_t bytes = frameBytes();
+    const uint64_t offset = m_dataOffset + static_cast<uint64_t>(frame) * bytes;
+    if (m_map) {
+        if (offset + bytes > m_mapSize) return false;
+        convert(m_map + offset, out);
+        // Hint the kernel to start reading the following frame.
+        const uint64_t next = offset + bytes;
+        if (next + bytes <= m_mapSize) {
+            const uint64_t page = static_cast<uint64_t>(sysconf(_SC_PAGESIZE));
+            const uint64_t aligned = next - (next % page);
+            madvise(const_cast<uint8_t*>(m_map) + aligned, static_cast<size_t>(next + bytes - aligned), MADV_WILLNEED);
+        }
+        return true;
+    }
+    m_rawBuffer.resize(bytes);
+    if (!readRaw(frame, m_rawBuffer.data())) return false;
+    convert(m_rawBuffer.data(), out);
+    return true;
+}
+
+// Sequential read of one frame from the gzip stream. Called with m_ioMutex held.
+bool NiftiTimeSeries::readRaw(size_t frame, uint8_t* dst) {
+    gzFile gz = static_cast<gzFile>(m_gz);
+    if (!gz) return false;
+    const size_t bytes = frameBytes();
+    const uint64_t offset = m_dataOffset + static_cast<uint64_t>(frame) * bytes;
+    if (offset < m_gzPos) {
+        gzrewind(gz); // gzip has no random access: going back means decoding from the start
+        m_gzPos = 0;
+    }
+    if (offset > m_gzPos) {
+        if (gzseek(gz, static_cast<z_off_t>(offset), SEEK_SET) < 0) return false;
+        m_gzPos = offset;
+    }
+    size_t done = 0;
+    while (done < bytes) {
+        const unsigned int want = static_cast<unsigned int>(std::min<size_t>(bytes - done, 1u << 30));
+        const int got = gzread(gz, dst + done, want);
+        if (got <= 0) {
+            m_gzPos += done;
+            std::cerr << "      MVR Error: NIfTI frame " << frame << " could not be read from " << m_dataPath << std::endl;
+            return false;
+        }
+        done += static_cast<size_t>(got);
+    }
+    m_gzPos += bytes;
+    return true;
+}
+
+void NiftiTimeSeries::convert(const uint8_t* raw, std::vector<uint16_t>& out) const {
+    const size_t count = frameVoxels();
+    out.resize(count);
+    uint16_t* dst = out.data();
+    switch (m_datatype) {
+        case NIFTI_TYPE_UINT8:
+            for (size_t i = 0; i < count; ++i) dst[i] = static_cast<uint16_t>(raw[i]) * 257u;
+            break;
+        case NIFTI_TYPE_UINT16:
+            if (m_swap) {
+                for (size_t i = 0; i < count; ++i) dst[i] = loadValue<uint16_t>(raw + 2 * i, true);
+            } else {
+                std::memcpy(dst, raw, count * sizeof(uint16_t));
+            }
+            break;
+        case NIFTI_TYPE_INT16:
+            normalizeFrame<int16_t>(raw, dst, count, m_swap, m_slope, m_inter, m_rangeMin, m_rangeMax);
+            break;
+        case NIFTI_TYPE_FLOAT32:
+            normalizeFrame<float>(raw, dst, count, m_swap, m_slope, m_inter, m_rangeMin, m_rangeMax);
+            break;
+        case NIFTI_TYPE_FLOAT64:
+            normalizeFrame<double>(raw, dst, count, m_swap, m_slope, m_inter, m_rangeMin, m_rangeMax);
+            break;
+        default:
+            std::fill(out.begin(), out.end(), 0);
+            break;
+    }
+}
+
+NiftiTimeSeries::Frame NiftiTimeSeries::lookup(size_t frame) {
+    std::lock_guard<std::mutex> lock(m_ringMutex);
+    for (const Slot& s : m_ring) {
+        if (s.frame == frame) return s.data;
+    }
+    return nullptr;
+}
+
+void NiftiTimeSeries::insert(size_t frame, Frame data) {
+    std::lock_guard<std::mutex> lock(m_ringMutex);
+    if (m_ring.size() < m_ringCapacity) {
+        m_ring.push_back(Slot{frame, std::move(data)});
+        trackRing();
+        return;
+    }
+    // Ring is full: overwrite the oldest slot.
+    m_ring[m_ringNext] = Slot{frame, std::move(data)};
+    m_ringNext = (m_ringNext + 1) % m_ringCapacity;
+}
+
+void NiftiTimeSeries::prefetchLoop() {
+    while (true) {
+        size_t frame;
+        {
+            std::unique_lock<std::mutex> lock(m_ringMutex);
+            m_workCv.wait(lock, [&]{ return m_stopWorker || !m_pending.empty(); });
+            if (m_stopWorker) return;
+            frame = m_pending.front();
+            m_pending.pop_front();
+        }
+        std::lock_guard<std::mutex> io(m_ioMutex);
+        if (lookup(frame)) continue;
+        auto decoded = std::make_shared<std::vector<uint16_t>>();
+        if (decode(frame, *decoded)) insert(frame, std::move(decoded));
+    }
+}
@@ -0,0 +1,112 @@
+// backend/src/RaycastMIP.cpp
+
+#include "../include/VolumeOps.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <cmath>
+
+namespace VolumeOps {
+
+namespace {
+
+// Voxel at (x, y, z) of the full volume; z is translated into the slab
+inline float voxel(const uint16_t* data, size_t w, size_t h, int x, int y, int z) {
+    return data[(static_cast<size_t>(z) * h + y) * w + x];
+}
+
+} // namespace
+
+bool raycastMIPSlab(const MIPSlab& slab, const glm::mat4& invViewProj, const glm::vec3& cameraPos,
+                    unsigned int width, unsigned int height, uint32_t* out, unsigned int threads) {
+    const size_t pixels = static_cast<size_t>(width) * height;
+    std::fill(out, out + pixels, 0u);
+    const unsigned int fullDepth = slab.fullDepth;
+    const unsigned int zBegin = slab.zBegin;
+    const unsigned int zEnd = std::min(slab.zEnd, fullDepth);
+    const unsigned int slabZ0 = slab.z0;
+    if (slab.width == 0 || slab.height == 0 || zBegin >= zEnd) return true;
+    // Trilinear samples owned by [zBegin, zEnd) read slices zBegin-1 .. zEnd
+    const unsigned int needLo = zBegin > 0 ? zBegin - 1 : 0;
+    const unsigned int needHi = std::min(zEnd, fullDepth - 1);
+    if (!slab.data || needLo < slabZ0 || needHi >= slabZ0 + slab.depth) return false;
+
+    const glm::vec3 spacing = glm::max(slab.spacing, glm::vec3(1e-6f));
+    const glm::vec3 dims(slab.width, slab.height, fullDepth);
+    const glm::vec3 boxSize = dims * spacing;
+    const glm::vec3 boxMin = -0.5f * boxSize;
+    const glm::vec3 boxMax = 0.5f * boxSize;
+    const float step = std::max(glm::length(boxSize) / 256.0f, 0.001f);
+    const size_t w = slab.width, h = slab.height;
+    const uint16_t* data = slab.data;
+    const int maxX = static_cast<int>(slab.width) - 1;
+    const int maxY = static_cast<int>(slab.height) - 1;
+    const int maxZ = static_cast<int>(fullDepth) - 1;
+
+    Parallel::parallelFor(0, height, [&](size_t rowBegin, size_t rowEnd) {
+        for (size_t py = rowBegin; py < rowEnd; ++py) {
+            for (size_t px = 0; px < width; ++px) {
+                // Pixel centre in NDC; row 0 is the top of the image
+                glm::vec4 clip((px + 0.5f) / width * 2.0f - 1.0f, 1.0f - (py + 0.5f) / height * 2.0f, 0.0f, 1.0f);
+                glm::vec4 world = invViewProj * clip;
+                const glm::vec3 ro = cameraPos;
+                const glm::vec3 rd = glm::normalize(glm::vec3(world) / world.w - cameraPos);
+
+                const glm::vec3 inv = 1.0f / rd;
+                const glm::vec3 t0s = (boxMin - ro) * inv;
+                const glm::vec3 t1s = (boxMax - ro) * inv;
+                const glm::vec3 tSmall = glm::min(t0s, t1s);
+                const glm::vec3 tBig = glm::max(t0s, t1s);
+                const float tEnter = std::max(std::max(tSmall.x, tSmall.y), tSmall.z);
+                const float tExit = std::min(std::min(tBig.x, tBig.y), tBig.z);
+                if (tExit < tEnter) continue;
+                const float tStart = std::max(tEnter, 0.0f) + step * 0.5f;
+                if (tExit <= tStart) continue;
+                const int sampleCount = static_cast<int>(std::ceil((tExit - tStart) / step));
+
+                // Narrow the loop to samples near the slab; ownership is still decided
+                // per sample below so neighbouring slabs agree exactly
+                int first = 0, last = sampleCount;
+                if (std::fabs(rd.z) > 1e-8f) {
+                    const float za = boxMin.z + zBegin * spacing.z, zb = boxMin.z + zEnd * spacing.z;
+                    float ta = (za - ro.z) / rd.z, tb = (zb - ro.z) / rd.z;
+                    if (ta > tb) std::swap(ta, tb);
+                    const float limit = static_cast<float>(sampleCount);
+                    first = static_cast<int>(std::clamp(std::floor((ta - tStart) / step) - 1.0f, 0.0f, limit));
+                    last = static_cast<int>(std::clamp(std::ceil((tb - tStart) / step) + 2.0f, 0.0f, limit));
+                }
+
+                float best = -1.0f;
+                for (int i = first; i < last; ++i) {
+                    const float t = tStart + i * step;
+                    if (t >= tExit) break;
+                    const glm::vec3 tc = (ro + rd * t - boxMin) / boxSize;
+                    if (tc.x < 0.0f || tc.y < 0.0f || tc.z < 0.0f || tc.x > 1.0f || tc.y > 1.0f || tc.z > 1.0f) {
+                        continue;
+                    }
+                    const float zc = tc.z * dims.z;
+                    if (zc < zBegin || (zc >= zEnd && !(zEnd == fullDepth && zc <= dims.z))) continue;
+
+                    // GL_LINEAR with clamp-to-edge
+                    const glm::vec3 u = tc * dims - 0.5f;
+                    const glm::vec3 f0 = glm::floor(u);
+                    const glm::vec3 f = u - f0;
+                    const int x0 = std::clamp(static_cast<int>(f0.x), 0, maxX), x1 = std::clamp(static_cast<int>(f0.x) + 1, 0, maxX);
+                    const int y0 = std::clamp(static_cast<int>(f0.y), 0, maxY), y1 = std::clamp(static_cast<int>(f0.y) + 1, 0, maxY);
+                    const int z0 = std::clamp(static_cast<int>(f0.z), 0, maxZ) - static_cast<int>(slabZ0);
+                    const int z1 = std::clamp(static_cast<int>(f0.z) + 1, 0, maxZ) - static_cast<int>(slabZ0);
+                    const float c00 = glm::mix(voxel(data, w, h, x0, y0, z0), voxel(data, w, h, x1, y0, z0), f.x);
+                    const float c10 = glm::mix(voxel(data, w, h, x0, y1, z0), voxel(data, w, h, x1, y1, z0), f.x);
+                    const float c01 = glm::mix(voxel(data, w, h, x0, y0, z1), voxel(data, w, h, x1, y0, z1), f.x);
+                    const float c11 = glm::mix(voxel(data, w, h, x0, y1, z1), voxel(data, w, h, x1, y1, z1), f.x);
+                    const float s = glm::mix(glm::mix(c00, c10, f.y), glm::mix(c01, c11, f.y), f.z);
+                    best = std::max(best, s);
+                }
+                if (best >= 0.0f) out[py * width + px] = 1u + static_cast<uint32_t>(std::lround(best));
+            }
+        }
+    }, 4, threads);
+    return true;
+}
+
+} // namespace VolumeOps
@@ -2,10 +2,18 @@
 
 #include "../include/Renderer.h"
 #include "../include/DataLoader.h"
+#include "../include/ChunkStore.h"
+#include "../include/VolumeOps.h"
+#include "../include/TriangleMesh.h"
+#include "../include/MemoryBudget.h"
+#include "../include/Parallel.h"
 #include <filesystem>
 #include <iostream>
 #include <fstream>
 #include <sstream>
+#include <chrono>
+#include <algorithm>
+#include <cmath>
 
 #include "../glad/glad.hpp"
 #include <GLFW/glfw3.h>
@@ -21,6 +29,11 @@ namespace fs = std::filesystem;
     #define SHADERS_DIR "../shaders"
 #endif
 
+// Ray samples across the volume diagonal at render quality 1
+constexpr float kRaySamplesPerDiagonal = 256.0f;
+// Shaded mode: optical depth of a full-intensity ray across the diagonal
+constexpr float kShadedOpticalDepth = 64.0f;
+
 // Helper to load shader source from file under SHADERS_DIR
 static std::string loadShaderFile(const char* filename) {
     std::string fullPath = std::string(SHADERS_DIR) + "/" + filename;
@@ -34,23 +47,413 @@ static std::string loadShaderFile(const char* filename) {
     return buffer.str();
 }
 
+// Uploads the voxel region [origin, origin + size) of a full-size CPU array into the bound
+// 3D texture, reading it in place through the unpack strides (no cropped copy).
+// allocate = true (re)defines the texture at the region size; otherwise the region is
+// written at depth zOffset of the existing texture.
+static void uploadTextureRegion(bool allocate, GLint internalFormat, GLenum format, GLenum type, const void* data,
+                                const glm::ivec3& origin, const glm::ivec3& size, const glm::ivec3& full,
+                                int zOffset = 0) {
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1);
+    glPixelStorei(GL_UNPACK_ROW_LENGTH, full.x);
+    glPixelStorei(GL_UNPACK_IMAGE_HEIGHT, full.y);
+    glPixelStorei(GL_UNPACK_SKIP_PIXELS, origin.x);
+    glPixelStorei(GL_UNPACK_SKIP_ROWS, origin.y);
+    glPixelStorei(GL_UNPACK_SKIP_IMAGES, origin.z);
+    if (allocate) {
+        glTexImage3D(GL_TEXTURE_3D, 0, internalFormat, size.x, size.y, size.z, 0, format, type, data);
+    } else {
+        glTexSubImage3D(GL_TEXTURE_3D, 0, 0, 0, zOffset, size.x, size.y, size.z, format, type, data);
+    }
+    glPixelStorei(GL_UNPACK_ROW_LENGTH, 0);
+    glPixelStorei(GL_UNPACK_IMAGE_HEIGHT, 0);
+    glPixelStorei(GL_UNPACK_SKIP_PIXELS, 0);
+    glPixelStorei(GL_UNPACK_SKIP_ROWS, 0);
+    glPixelStorei(GL_UNPACK_SKIP_IMAGES, 0);
+}
+
+// Box-filtered copy of the voxel region [origin, origin + size), reduced `factor` times
+// per axis into `dims` (blocks at the far edges average what they cover). uint8_t output
+// is requantized from the uint16 range.
+template <typename T>
+static void reduceRegion(const VolumeData& volume, const glm::ivec3& origin, const glm::ivec3& size, int factor,
+                         const glm::ivec3& dims, std::vector<T>& out, unsigned int threads) {
+    out.resize(static_cast<size_t>(dims.x) * dims.y * dims.z);
+    const size_t width = volume.width;
+    const size_t sliceSize = width * volume.height;
+    const uint16_t* src = volume.data.data();
+    const glm::ivec3 end = origin + size;
+    Parallel::parallelFor(0, dims.z, [&](size_t zBegin, size_t zEnd) {
+        for (size_t oz = zBegin; oz < zEnd; ++oz) {
+            const int z0 = origin.z + static_cast<int>(oz) * factor, z1 = std::min(end.z, z0 + factor);
+            for (int oy = 0; oy < dims.y; ++oy) {
+                const int y0 = origin.y + oy * factor, y1 = std::min(end.y, y0 + factor);
+                T* dst = out.data() + (oz * dims.y + oy) * dims.x;
+                for (int ox = 0; ox < dims.x; ++ox) {
+                    const int x0 = origin.x + ox * factor, x1 = std::min(end.x, x0 + factor);
+                    uint64_t sum = 0;
+                    for (int z = z0; z < z1; ++z) {
+                        for (int y = y0; y < y1; ++y) {
+                            const uint16_t* row = src + z * sliceSize + y * width;
+                            for (int x = x0; x < x1; ++x) sum += row[x];
+                        }
+                    }
+                    const uint64_t count = static_cast<uint64_t>(z1 - z0) * (y1 - y0) * (x1 - x0);
+                    const uint64_t mean = (sum + count / 2) / count;
+                    dst[ox] = static_cast<T>(sizeof(T) == 1 ? (mean + 128) / 257 : mean);
+                }
+            }
+        }
+    }, 1, threads);
+}
+
 // --- Slicer setters (keep outside of loadShaderFile) ---
-void Renderer::setSliceMode(bool enabled) { 
-    m_sliceMode = enabled; 
+void Renderer::setSliceMode(bool enabled, int view) { 
+    if (ViewState* v = getView(view)) { v->sliceMode = enabled; v->dirty = true; }
+}
+void Renderer::setSliceAxis(int axis, int view)  { 
+    if (ViewState* v = getView(view)) { v->sliceAxis = (axis<0 ? 0 : (axis>2 ? 2 : axis)); v->dirty = true; }
+}
+void Renderer::setSliceIndex(int index, int view){ 
+    if (ViewState* v = getView(view)) { v->sliceIndex = index; v->dirty = true; }
+}
+int Renderer::getSliceIndex(int view) const {
+    const ViewState* v = getView(view);
+    return v ? v->sliceIndex : 0;
 }
-void Renderer::setSliceAxis(int axis)  { 
-    m_sliceAxis = (axis<0 ? 0 : (axis>2 ? 2 : axis)); 
+void Renderer::setSlabThickness(float thicknessMm, int view) {
+    if (ViewState* v = getView(view)) { v->slabThickness = std::max(0.0f, thicknessMm); v->dirty = true; }
 }
-void Renderer::setSliceIndex(int index){ 
-    m_sliceIndex = index; 
+float Renderer::getSlabThickness(int view) const {
+    const ViewState* v = getView(view);
+    return v ? v->slabThickness : 0.0f;
+}
+void Renderer::setSlabMode(int mode, int view) {
+    if (ViewState* v = getView(view)) { v->slabMode = std::clamp(mode, 0, 2); v->dirty = true; }
+}
+int Renderer::getSlabMode(int view) const {
+    const ViewState* v = getView(view);
+    return v ? v->slabMode : 0;
+}
+bool Renderer::getSlabProjection(int view, std::vector<uint16_t>& image, unsigned int& width,
+                                 unsigned int& height) const {
+    const ViewState* v = getView(view);
+    if (!v || !isVolumeLoaded()) return false;
+    const VolumeData& vol = *m_volumeData;
+    const unsigned int sizes[3] = {vol.depth, vol.height, vol.width};
+    const double spacings[3] = {vol.spacing_z, vol.spacing_y, vol.spacing_x};
+    unsigned int first = 0, count = 0;
+    VolumeOps::slabRange(sizes[v->sliceAxis], spacings[v->sliceAxis], v->sliceIndex, v->slabThickness, first, count);
+    VolumeOps::computeSlabProjection(vol, v->sliceAxis, first, count, static_cast<VolumeOps::SlabMode>(v->slabMode),
+                                     image, width, height, m_loadOptions.threads);
+    return true;
 }
 
 Renderer::Renderer() {
     m_volumeData = std::make_unique<VolumeData>();
+    m_views.push_back(std::make_unique<ViewState>()); // view 0
+    resetLabelTable();
+}
+
+// --- Views ---
+
+Renderer::ViewState* Renderer::getView(int view) {
+    if (view < 0 || view >= static_cast<int>(m_views.size())) return nullptr;
+    return m_views[view].get();
+}
+
+const Renderer::ViewState* Renderer::getView(int view) const {
+    if (view < 0 || view >= static_cast<int>(m_views.size())) return nullptr;
+    return m_views[view].get();
+}
+
+int Renderer::createView() {
+    m_views.push_back(std::make_unique<ViewState>());
+    m_views.back()->profiler.setEnabled(m_profilingEnabled);
+    return static_cast<int>(m_views.size()) - 1;
+}
+
+void Renderer::destroyView(int view) {
+    if (view <= 0) return; // view 0 lives as long as the renderer
+    ViewState* v = getView(view);
+    if (!v) return;
+    if (m_glInitialized) {
+        if (v->fullscreenQuadVAO) glDeleteVertexArrays(1, &v->fullscreenQuadVAO);
+        if (v->boundingBoxVAO) glDeleteVertexArrays(1, &v->boundingBoxVAO);
+        if (v->sliceVAO) glDeleteVertexArrays(1, &v->sliceVAO);
+        if (v->sliceVBO) glDeleteBuffers(1, &v->sliceVBO);
+        if (v->meshVAO) glDeleteVertexArrays(1, &v->meshVAO);
+        v->profiler.releaseQueries();
+    }
+    m_views[view].reset();
+}
+
+int Renderer::getViewCount() const {
+    return static_cast<int>(std::count_if(m_views.begin(), m_views.end(),
+                                          [](const std::unique_ptr<ViewState>& v){ return v != nullptr; }));
+}
+
+bool Renderer::needsRedraw(int view) const {
+    const ViewState* v = getView(view);
+    if (!v) return false;
+    return v->dirty || v->drawnSceneRevision != m_sceneRevision;
+}
+
+void Renderer::setViewOrientation(int axis, int view) {
+    ViewState* v = getView(view);
+    if (!v) return;
+    v->alignAxis = (axis < 0 || axis > 2) ? -1 : axis;
+    applyViewFraming(*v);
+}
+
+size_t Renderer::getTextureMemoryBytes() const {
+    size_t bytes = 0;
+    bytes += m_volumeTexMemory.bytes();
+    bytes += m_transferTexMemory.bytes();
+    bytes += m_fusionTexMemory.bytes();
+    bytes += m_gradientTexBytes;
+    bytes += m_labelTexBytes;
+    bytes += m_axisProjectionTexBytes;
+    if (m_labelTableTex1D != 0) bytes += LabelMap::kLabelCount * 4;
+    return bytes;
+}
+
+// --- Memory budgets ---
+
+void Renderer::setHostMemoryBudget(uint64_t bytes) {
+    MemoryBudget::setBudget(MemoryBudget::Pool::Host, bytes);
+    // Caches go at once; the volume itself is reduced on the next load
+    trackMemory();
+    if (!MemoryBudget::fits(MemoryBudget::Pool::Host, 0)) evictCaches();
+}
+
+uint64_t Renderer::getHostMemoryBudget() const {
+    return MemoryBudget::budget(MemoryBudget::Pool::Host);
+}
+
+void Renderer::setDeviceMemoryBudget(uint64_t bytes) {
+    MemoryBudget::setBudget(MemoryBudget::Pool::Device, bytes);
+    m_needsVolumeTextureSetup = true;  // re-chosen on the next frame
+    touchScene();
+}
+
+uint64_t Renderer::getDeviceMemoryBudget() const {
+    return MemoryBudget::budget(MemoryBudget::Pool::Device);
+}
+
+Renderer::MemoryStatus Renderer::getMemoryStatus() {
+    trackMemory();
+    MemoryStatus status;
+    status.usage = MemoryBudget::snapshot();
+    status.deviceTotalBytes = m_deviceTotalBytes;
+    status.deviceAvailableBytes = m_deviceAvailableBytes;
+    status.volumeTextureBits = m_volumeTexBits;
+    status.volumeTextureFactor = m_volumeTexFactor;
+    status.actions = m_memoryActions;
+    return status;
+}
+
+// Re-syncs the host-side entries with the buffers they describe
+void Renderer::trackMemory() {
+    m_volumeMemory.resize(m_volumeData->data.capacity() * sizeof(uint16_t));
+    m_gradientMemory.resize(m_gradientData.capacity());
+    size_t projectionBytes = 0;
+    for (const auto& image : m_axisProjections.image) projectionBytes += image.capacity() * sizeof(uint16_t);
+    m_projectionMemory.resize(projectionBytes);
+    m_blockIndexMemory.resize((m_minMaxBlocks.minValue.capacity() + m_minMaxBlocks.maxValue.capacity()) *
+                              sizeof(uint16_t));
+    m_labelMemory.resize(m_labels.memoryBytes());
+    m_fusionMemory.resize(m_fusionData.data.capacity() * sizeof(uint16_t));
+    m_meshMemory.resize((m_mesh.vertices.capacity() + m_mesh.normals.capacity()) * sizeof(float) +
+                        m_mesh.indices.capacity() * sizeof(uint32_t));
+}
+
+void Renderer::noteMemoryAction(const std::string& action) {
+    if (std::find(m_memoryActions.begin(), m_memoryActions.end(), action) != m_memoryActions.end()) return;
+    m_memoryActions.push_back(action);
+    std::cerr << "      MVR Warning: Memory budget: " << action << "." << std::endl;
+}
+
+// Drops what can be recomputed: the isosurface block index, CPU gradients and all but
+// two decoded 4D frames
+void Renderer::evictCaches() {
+    bool evicted = false;
+    if (!m_minMaxBlocks.empty()) {
+        m_minMaxBlocks = VolumeOps::MinMaxBlocks{};
+        evicted = true;
+    }
+    if (!m_gradientData.empty()) {
+        std::vector<uint8_t>().swap(m_gradientData);
+        m_gradientsValid = false;
+        evicted = true;
+    }
+    if (m_timeSeries && m_timeSeries->cacheFrames() > 2) {
+        m_timeSeries->setCacheFrames(2);
+        evicted = true;
+    }
+    if (evicted) {
+        trackMemory();
+        noteMemoryAction("evicted caches");
+    }
+}
+
+// Evicts caches, then downsamples a 3D volume once, by the power of two that brings the
+// host pool within budget. NIfTI and DICOM loads are already reduced while decoding; this
+// covers the rest (e.g. isotropic resampling that grew the volume).
+void Renderer::enforceHostBudget() {
+    const MemoryBudget::Pool host = MemoryBudget::Pool::Host;
+    trackMemory();
+    if (MemoryBudget::fits(host, 0)) return;
+    evictCaches();
+    if (MemoryBudget::fits(host, 0)) return;
+    if (m_timeSeries || m_dicomWatch) {
+        // Every frame, or watched slice, has to match the first one's dimensions
+        noteMemoryAction(m_timeSeries ? "over the host budget; 4D frames stay at full resolution"
+                                      : "over the host budget; watched DICOM slices stay at full resolution");
+        return;
+    }
+
+    const VolumeData& in = *m_volumeData;
+    const unsigned int factor = MemoryBudget::reductionFactor(host, in.width, in.height, in.depth, sizeof(uint16_t), 0,
+                                                              m_volumeMemory.bytes());
+    if (factor == 0) {
+        // Even a single voxel would not fit: the rest of the host pool is over budget
+        noteMemoryAction("over the host budget without the volume; not downsampled");
+        return;
+    }
+    auto scaled = [factor](unsigned int size, double spacing) { return size > 1 ? spacing * factor : spacing; };
+    VolumeData out;
+    {
+        MemoryBudget::Allocation staging(MemoryBudget::Category::LoadTemporary,
+                                         MemoryBudget::reducedSize(in.width, factor) *
+                                         MemoryBudget::reducedSize(in.height, factor) *
+                                         MemoryBudget::reducedSize(in.depth, factor) * sizeof(uint16_t));
+        VolumeOps::resampleVolume(in, out, scaled(in.width, in.spacing_x), scaled(in.height, in.spacing_y),
+                                  scaled(in.depth, in.spacing_z), VolumeOps::Interpolation::Linear,
+                                  m_loadOptions.threads);
+    }
+    *m_volumeData = std::move(out);
+    trackMemory();
+    noteMemoryAction("downsampled the volume to " + std::to_string(m_volumeData->width) + "x" +
+                     std::to_string(m_volumeData->height) + "x" + std::to_string(m_volumeData->depth));
+}
+
+// Drops the voxels and everything derived from them (gradients, block index, axis MIPs,
+// isosurface, labels, fused volume) together with their storage, so none of it counts
+// against the host budget of the load that replaces them
+void Renderer::releaseVolumeState() {
+    m_volumeData->clear();
+    std::vector<uint16_t>().swap(m_volumeData->data);
+    m_gradientsValid = false;
+    std::vector<uint8_t>().swap(m_gradientData);
+    m_minMaxBlocks = VolumeOps::MinMaxBlocks{};
+    m_axisProjections.clear();
+    if (!m_mesh.empty()) {
+        TriangleMesh empty;
+        std::swap(m_mesh, empty); // clear() would keep the capacity
+        m_needsMeshUpload = true;
+    }
+    if (!m_labels.empty()) {
+        m_labels.clear(); // segmentation of the previous volume
+        m_needsLabelUpload = true;
+    }
+    if (hasFusionVolume()) {
+        m_fusionData.clear(); // fused with the previous volume
+        std::vector<uint16_t>().swap(m_fusionData.data);
+        m_needsFusionUpload = true;
+    }
+    trackMemory();
+}
+
+// Within the VRAM budget and, where the driver reports it, the free VRAM; `freed` bytes
+// are released by the allocation being replaced
+bool Renderer::fitsDevice(uint64_t bytes, uint64_t freed) const {
+    if (!MemoryBudget::fits(MemoryBudget::Pool::Device, bytes, freed)) return false;
+    return m_deviceAvailableBytes < 0 || bytes <= static_cast<uint64_t>(m_deviceAvailableBytes) + freed;
+}
+
+// Dedicated VRAM from NVX_gpu_memory_info; other drivers leave both values at -1
+void Renderer::queryDeviceMemory() {
+    constexpr GLenum kTotalMemoryNVX = 0x9048;      // GPU_MEMORY_INFO_TOTAL_AVAILABLE_MEMORY_NVX (kB)
+    constexpr GLenum kAvailableMemoryNVX = 0x9049;  // GPU_MEMORY_INFO_CURRENT_AVAILABLE_VIDMEM_NVX (kB)
+    while (glGetError() != GL_NO_ERROR) {}
+    GLint total = 0, available = 0;
+    glGetIntegerv(kTotalMemoryNVX, &total);
+    glGetIntegerv(kAvailableMemoryNVX, &available);
+    if (glGetError() != GL_NO_ERROR || total <= 0) {
+        m_deviceTotalBytes = m_deviceAvailableBytes = -1;
+        return;
+    }
+    m_deviceTotalBytes = static_cast<int64_t>(total) * 1024;
+    m_deviceAvailableBytes = static_cast<int64_t>(available) * 1024;
+}
+
+// Frames the (scaled) volume or crop box and re-applies the view's axis lock, if any.
+void Renderer::applyViewFraming(ViewState& view) {
+    if (isVolumeLoaded()) {
+        glm::ivec3 lo, hi;
+        glm::vec3 boxMin, boxMax;
+        visibleRegion(lo, hi);
+        regionWorldBox(lo, hi, boxMin, boxMax);
+        glm::vec3 size = (boxMax - boxMin) * m_bboxScale;
+        view.camera.frameBox(size.x, size.y, size.z, 0.5f * (boxMin + boxMax));
+    }
+    // Same angles as the Z/Y/X-normal buttons in the UI
+    if (view.alignAxis == 0) view.camera.setAngles(0.0f, 0.0f);
+    else if (view.alignAxis == 1) view.camera.setAngles(0.0f, 89.0f);
+    else if (view.alignAxis == 2) view.camera.setAngles(90.0f, 0.0f);
+    view.dirty = true;
+}
+
+// Builds the per-context VAOs of a view over the shared vertex buffers.
+void Renderer::ensureViewObjects(ViewState& view) {
+    if (view.fullscreenQuadVAO == 0 && m_fullscreenQuadVBO != 0) {
+        glGenVertexArrays(1, &view.fullscreenQuadVAO);
+        glBindVertexArray(view.fullscreenQuadVAO);
+        glBindBuffer(GL_ARRAY_BUFFER, m_fullscreenQuadVBO);
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 2 * sizeof(float), (void*)0);
+        glEnableVertexAttribArray(0);
+    }
+    if (view.boundingBoxVAO == 0 && m_boundingBoxVBO != 0) {
+        glGenVertexArrays(1, &view.boundingBoxVAO);
+        glBindVertexArray(view.boundingBoxVAO);
+        glBindBuffer(GL_ARRAY_BUFFER, m_boundingBoxVBO);
+        // position
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 6 * sizeof(float), (void*)0);
+        glEnableVertexAttribArray(0);
+        // color
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 6 * sizeof(float), (void*)(3 * sizeof(float)));
+        glEnableVertexAttribArray(1);
+    }
+    if (view.meshVAO == 0 && m_meshVBO != 0) {
+        glGenVertexArrays(1, &view.meshVAO);
+        glBindVertexArray(view.meshVAO);
+        glBindBuffer(GL_ARRAY_BUFFER, m_meshVBO);
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, m_meshEBO);
+        // position
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 6 * sizeof(float), (void*)0);
+        glEnableVertexAttribArray(0);
+        // normal
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 6 * sizeof(float), (void*)(3 * sizeof(float)));
+        glEnableVertexAttribArray(1);
+    }
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+    glBindVertexArray(0);
 }
 
 
-void Renderer::init() {
+void Renderer::init(int view) {
+    // Additional views share the programs and buffers created by the first init();
+    // they only need the per-context state.
+    if (m_glInitialized) {
+        if (ViewState* v = getView(view)) v->dirty = true;
+        glEnable(GL_DEPTH_TEST);
+        glDisable(GL_CULL_FACE);
+        glLineWidth(2.0f);
+        glClearColor(m_bgColor.r, m_bgColor.g, m_bgColor.b, 1.0f);
+        return;
+    }
+
     // Initialize GL loader (GLAD).
     // In Qt, the context is current when this is called, so glad can query via system loader.
     // If this fails, nothing will render.
@@ -64,7 +467,19 @@ void Renderer::init() {
     std::cout << "  [Renderer::init ] Vendor: " << glGetString(GL_VENDOR) << std::endl;
     std::cout << "  [Renderer::init ] Renderer: " << glGetString(GL_RENDERER) << std::endl;
 
-    // --- Compile Shaders --- (bounding box)
+    // Shaders are compiled on first use (bounding box, volume, slice, mesh), so the
+    // first frame of an empty window does not wait on shader file reads/compiles.
+
+    // --- OpenGL State ---
+    glEnable(GL_DEPTH_TEST);
+    glDisable(GL_CULL_FACE);
+    glLineWidth(2.0f);
+    glClearColor(m_bgColor.r, m_bgColor.g, m_bgColor.b, 1.0f);
+    m_glInitialized = true;
+    queryDeviceMemory();
+}
+
+void Renderer::compileBoundingBoxShader() {
     std::string bboxVSsrc = loadShaderFile("bbox.vert");
     std::string bboxFSsrc = loadShaderFile("bbox.frag");
     const char* bboxVS = bboxVSsrc.c_str();
@@ -78,7 +493,7 @@ void Renderer::init() {
         glGetShaderiv(vertexShader, GL_COMPILE_STATUS, &success);
         if (!success) {
             glGetShaderInfoLog(vertexShader, sizeof(log), nullptr, log);
-            std::cerr << "[Renderer::init] ERROR: Vertex shader compile failed: " << log << std::endl;
+            std::cerr << "[Renderer::compileBoundingBoxShader] ERROR: Vertex shader compile failed: " << log << std::endl;
         }
     }
 
@@ -90,7 +505,7 @@ void Renderer::init() {
         glGetShaderiv(fragmentShader, GL_COMPILE_STATUS, &success);
         if (!success) {
             glGetShaderInfoLog(fragmentShader, sizeof(log), nullptr, log);
-            std::cerr << "[Renderer::init] ERROR: Fragment shader compile failed: " << log << std::endl;
+            std::cerr << "[Renderer::compileBoundingBoxShader] ERROR: Fragment shader compile failed: " << log << std::endl;
         }
     }
 
@@ -103,33 +518,41 @@ void Renderer::init() {
         glGetProgramiv(m_shaderProgram, GL_LINK_STATUS, &success);
         if (!success) {
             glGetProgramInfoLog(m_shaderProgram, sizeof(log), nullptr, log);
-            std::cerr << "[Renderer::init] ERROR: Shader program link failed: " << log << std::endl;
+            std::cerr << "[Renderer::compileBoundingBoxShader] ERROR: Shader program link failed: " << log << std::endl;
         }
     }
     glDeleteShader(vertexShader);
     glDeleteShader(fragmentShader);
-
-    // --- OpenGL State ---
-    glEnable(GL_DEPTH_TEST);
-    glDisable(GL_CULL_FACE);
-    glLineWidth(2.0f);
-    glClearColor(m_bgColor.r, m_bgColor.g, m_bgColor.b, 1.0f);
 }
 
-void Renderer::resize(int width, int height) {
+void Renderer::resize(int width, int height, int view) {
+    ViewState* v = getView(view);
+    if (!v) return;
     glViewport(0, 0, width, height);
-    m_camera.setAspectRatio((float)width / (float)height);
+    v->width = width;
+    v->height = height;
+    v->camera.setAspectRatio((float)width / (float)std::max(1, height));
+    v->dirty = true;
 }
 
-void Renderer::render() {
+void Renderer::render(int view) {
+    ViewState* v = getView(view);
+    if (!v) return;
+    // Bracket the whole frame for the view's profiler (closed on every return path)
+    FrameProfiler& profiler = v->profiler;
+    ScopedFrame frameScope(profiler);
+
     // Apply current background color each frame so user changes take effect
     glClearColor(m_bgColor.r, m_bgColor.g, m_bgColor.b, 1.0f);
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT);
+    v->dirty = false;
+    v->drawnSceneRevision = m_sceneRevision;
 
     if (!isVolumeLoaded()) return;
 
     // If a new volume was loaded, set up GL resources now (context is current in paintGL)
     if (m_needsGLSetup) {
+        ScopedFramePhase setupPhase(profiler, FramePhase::DeferredSetup);
         // Build or rebuild GL resources tied to the current context
         setupVolumeTexture();
         setupProxyCube();
@@ -137,15 +560,113 @@ void Renderer::render() {
         setupBoundingBox();
         setupColormapLUT();
         m_needsGLSetup = false;
-        std::cout << "  [Renderer::render] Deferred GL setup completed." << std::endl;
+        m_needsFrameUpload = false; // the full upload above already holds the current frame
+        m_watchDirtyZ = -1;         // and every watched slice so far
+        m_needsCropUpdate = false;  // the bounding box and textures above already follow the crop
+        if (DataLoader::getVerbosity() >= DataLoader::VerbosityPerFile) {
+            std::cout << "  [Renderer::render] Deferred GL setup completed." << std::endl;
+        }
+    }
+
+    // A new 4D frame only replaces the texture contents
+    if (m_needsFrameUpload) {
+        ScopedFramePhase uploadPhase(profiler, FramePhase::DeferredSetup);
+        uploadVolumeFrame();
+        m_needsFrameUpload = false;
+    }
+
+    // A live DICOM watch changed slices from m_watchDirtyZ on: only those are re-sent
+    if (m_watchDirtyZ >= 0) {
+        ScopedFramePhase watchPhase(profiler, FramePhase::DeferredSetup);
+        uploadWatchSlices();
+    }
+
+    // A crop change always moves the bounding box; the textures are rebuilt only when
+    // they have to hold a different region (crop upload on, or switched off again)
+    if (m_needsCropUpdate) {
+        ScopedFramePhase cropPhase(profiler, FramePhase::DeferredSetup);
+        setupBoundingBox();
+        glm::ivec3 lo, hi;
+        textureRegion(lo, hi);
+        if (m_volumeTex3D != 0 && (lo != m_texOrigin || hi - lo != m_texSize)) {
+            setupVolumeTexture();
+            if (m_gradientTex3D != 0) m_needsGradientUpload = true;
+        }
+        m_needsCropUpdate = false;
+    }
+
+    // A new VRAM budget re-chooses the volume texture's format and resolution
+    if (m_needsVolumeTextureSetup) {
+        ScopedFramePhase budgetPhase(profiler, FramePhase::DeferredSetup);
+        if (m_volumeTex3D != 0) setupVolumeTexture();
+        m_needsVolumeTextureSetup = false;
+    }
+
+    // The pre-integration table follows the colormap and the step; it is only built
+    // while the shaded mode can use it
+    if (m_needsPreintegrationSetup && m_shadingEnabled && m_preintegrationEnabled) {
+        ScopedFramePhase tablePhase(profiler, FramePhase::DeferredSetup);
+        setupPreintegrationTable();
+    }
+
+    // The fusion volume is uploaded whole; its colormap is re-sent on its own
+    if (m_needsFusionUpload) {
+        ScopedFramePhase fusionPhase(profiler, FramePhase::DeferredSetup);
+        setupFusionTexture();
+    }
+    if (m_needsFusionLutUpload && m_fusionTex3D != 0) {
+        uploadColormap(m_fusionLutTex1D, m_fusionColormapPreset);
+        m_needsFusionLutUpload = false;
+        trackTransferTextures();
+    }
+
+    // Labels follow the volume texture's region; the colour table is 1 KB and is
+    // re-sent on its own when a label's colour or visibility changes
+    if (m_needsLabelUpload) {
+        ScopedFramePhase labelPhase(profiler, FramePhase::DeferredSetup);
+        setupLabelTexture();
+    }
+    if (m_needsLabelTableUpload && m_labelTableTex1D != 0) {
+        uploadLabelTable();
+    }
+
+    // Gradients follow the volume when shading is switched on (or a new 4D frame arrives);
+    // a live DICOM watch defers them until it stops
+    if (m_shadingEnabled && m_needsGradientUpload && !m_dicomWatch) {
+        ScopedFramePhase gradientPhase(profiler, FramePhase::DeferredSetup);
+        setupGradientTexture();
+    }
+
+    if (m_needsMeshUpload) {
+        ScopedFramePhase meshPhase(profiler, FramePhase::DeferredSetup);
+        uploadMesh();
+    }
+
+    ensureViewObjects(*v);
+    if (v->shouldFrameCamera) {
+        // Frame this view's camera on its first frame after a load
+        applyViewFraming(*v);
+        v->shouldFrameCamera = false;
+        v->dirty = false;
     }
+    Camera& camera = v->camera;
 
     // --- Draw volume or slicer ---
-    if (!m_sliceMode && m_volumeTex3D != 0 && m_volumeShader != 0 && m_fullscreenQuadVAO != 0){
+    // At an exact axis pose the MIP is the cached axis projection: one textured quad
+    v->projectedAxis = axisProjectionFor(*v);
+    if (v->projectedAxis >= 0) {
+        if (m_axisProjections.empty() || m_needsAxisProjectionUpload) {
+            ScopedFramePhase projectionPhase(profiler, FramePhase::DeferredSetup);
+            if (m_axisProjections.empty()) computeAxisProjections(nullptr);
+            setupAxisProjectionTextures();
+        }
+        drawAxisProjection(*v, v->projectedAxis);
+    } else if (!v->sliceMode && m_volumeTex3D != 0 && m_volumeShader != 0 && v->fullscreenQuadVAO != 0){
+        profiler.beginPhase(FramePhase::UniformSetup);
         glUseProgram(m_volumeShader);
 
-        glm::mat4 view = m_camera.getViewMatrix();
-        glm::mat4 projection = m_camera.getProjectionMatrix();
+        glm::mat4 view = camera.getViewMatrix();
+        glm::mat4 projection = camera.getProjectionMatrix();
         glm::mat4 viewProj = projection * view;
         glm::mat4 invViewProj = glm::inverse(viewProj);
 
@@ -153,25 +674,49 @@ void Renderer::render() {
         glm::mat4 invView = glm::inverse(view);
         glm::vec3 camPos = glm::vec3(invView[3]);
 
-        // Compute volume box in world space (unscaled). Box is centered at origin.
-        float sx = (m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f);
-        float sy = (m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f);
-        float sz = (m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
-        glm::vec3 boxSize = glm::vec3(m_volumeData->width * sx, m_volumeData->height * sy, m_volumeData->depth * sz);
-        glm::vec3 boxMin = -0.5f * boxSize;
-        glm::vec3 boxMax =  0.5f * boxSize;
+        // Volume box in world space (unscaled), centered at origin. Rays are clipped to
+        // the crop box; texture coordinates map over the region the texture holds.
+        glm::vec3 boxSize = glm::vec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth) * voxelSpacing();
+        glm::ivec3 cropLo, cropHi;
+        glm::vec3 boxMin, boxMax, texMin, texMax;
+        visibleRegion(cropLo, cropHi);
+        regionWorldBox(cropLo, cropHi, boxMin, boxMax);
+        regionWorldBox(m_texOrigin, m_texOrigin + textureExtent(), texMin, texMax);
+        glm::vec3 texScale = 1.0f / glm::max(texMax - texMin, glm::vec3(1e-6f));
 
         glUniformMatrix4fv(glGetUniformLocation(m_volumeShader, "uInvViewProj"), 1, GL_FALSE, glm::value_ptr(invViewProj));
         glUniform3fv(glGetUniformLocation(m_volumeShader, "uCamPos"), 1, glm::value_ptr(camPos));
         glUniform3fv(glGetUniformLocation(m_volumeShader, "uBoxMin"), 1, glm::value_ptr(boxMin));
         glUniform3fv(glGetUniformLocation(m_volumeShader, "uBoxMax"), 1, glm::value_ptr(boxMax));
+        glUniform3fv(glGetUniformLocation(m_volumeShader, "uTexOrigin"), 1, glm::value_ptr(texMin));
+        glUniform3fv(glGetUniformLocation(m_volumeShader, "uTexScale"), 1, glm::value_ptr(texScale));
 
-        // Choose step based on box diagonal to target ~256 samples across the volume
+        // Choose step based on the full box diagonal to target ~256 samples (times the
+        // render quality) across the volume; a crop keeps the sample spacing and so
+        // takes proportionally fewer
         float diag = glm::length(boxSize);
-        float step = diag / 256.0f; // tune for quality/perf
+        float step = diag / (kRaySamplesPerDiagonal * m_renderQuality);
         step = std::max(step, 0.001f);
         glUniform1f(glGetUniformLocation(m_volumeShader, "uStep"), step);
 
+        const bool shaded = m_shadingEnabled && m_gradientTex3D != 0;
+        glUniform1i(glGetUniformLocation(m_volumeShader, "uShading"), shaded ? 1 : 0);
+        if (shaded) {
+            // Opacity per world unit, so the look does not depend on the step size
+            glUniform1f(glGetUniformLocation(m_volumeShader, "uDensity"), kShadedOpticalDepth / diag);
+            glActiveTexture(GL_TEXTURE2);
+            glBindTexture(GL_TEXTURE_3D, m_gradientTex3D);
+            glUniform1i(glGetUniformLocation(m_volumeShader, "uGradient"), 2);
+            const bool preintegrated = m_preintegrationEnabled && m_preintegrationTex2D != 0;
+            glUniform1i(glGetUniformLocation(m_volumeShader, "uPreintegrated"), preintegrated ? 1 : 0);
+            if (preintegrated) {
+                glActiveTexture(GL_TEXTURE5);
+                glBindTexture(GL_TEXTURE_2D, m_preintegrationTex2D);
+            }
+        }
+        // Own unit even when unused, like the label samplers (see bindLabelUniforms)
+        glUniform1i(glGetUniformLocation(m_volumeShader, "uPreintegration"), 5);
+
         glActiveTexture(GL_TEXTURE0);
         glBindTexture(GL_TEXTURE_3D, m_volumeTex3D);
         glUniform1i(glGetUniformLocation(m_volumeShader, "uVolume"), 0);
@@ -182,21 +727,65 @@ void Renderer::render() {
             glBindTexture(GL_TEXTURE_1D, m_lutTex1D);
             glUniform1i(glGetUniformLocation(m_volumeShader, "uLUT"), 1);
         }
+        bindLabelUniforms(m_volumeShader);
+        bindLayerUniforms(m_volumeShader);
+
+        profiler.endPhase(FramePhase::UniformSetup);
 
         // Disable depth test for fullscreen quad to avoid occlusion
         glDisable(GL_DEPTH_TEST);
         glDisable(GL_CULL_FACE);
 
-        glBindVertexArray(m_fullscreenQuadVAO);
+        profiler.beginPhase(FramePhase::VolumeDraw);
+        glBindVertexArray(v->fullscreenQuadVAO);
         glDrawArrays(GL_TRIANGLES, 0, 6);
         glBindVertexArray(0);
+        profiler.endPhase(FramePhase::VolumeDraw);
 
         // Restore state
         glEnable(GL_DEPTH_TEST);
     }
 
+    // --- Isosurface mesh (3D views only); the volume pass writes no depth ---
+    if (!v->sliceMode && m_showMesh && m_meshIndexCount > 0 && v->meshVAO != 0) {
+        ScopedFramePhase meshPhase(profiler, FramePhase::MeshDraw);
+        if (m_meshShader == 0) {
+            std::string mVSsrc = loadShaderFile("mesh.vert");
+            std::string mFSsrc = loadShaderFile("mesh.frag");
+            const char* mvs = mVSsrc.c_str();
+            const char* mfs = mFSsrc.c_str();
+            unsigned int mvsId = glCreateShader(GL_VERTEX_SHADER);
+            glShaderSource(mvsId, 1, &mvs, nullptr);
+            glCompileShader(mvsId);
+            unsigned int mfsId = glCreateShader(GL_FRAGMENT_SHADER);
+            glShaderSource(mfsId, 1, &mfs, nullptr);
+            glCompileShader(mfsId);
+            m_meshShader = glCreateProgram();
+            glAttachShader(m_meshShader, mvsId);
+            glAttachShader(m_meshShader, mfsId);
+            glLinkProgram(m_meshShader);
+            glDeleteShader(mvsId);
+            glDeleteShader(mfsId);
+        }
+        glm::mat4 view = camera.getViewMatrix();
+        glm::mat4 projection = camera.getProjectionMatrix();
+        glm::vec3 camPos = glm::vec3(glm::inverse(view)[3]);
+        glm::vec3 color(0.90f, 0.85f, 0.75f); // bone-like
+        glUseProgram(m_meshShader);
+        glUniformMatrix4fv(glGetUniformLocation(m_meshShader, "view"), 1, GL_FALSE, glm::value_ptr(view));
+        glUniformMatrix4fv(glGetUniformLocation(m_meshShader, "projection"), 1, GL_FALSE, glm::value_ptr(projection));
+        glUniform3fv(glGetUniformLocation(m_meshShader, "uCamPos"), 1, glm::value_ptr(camPos));
+        glUniform3fv(glGetUniformLocation(m_meshShader, "uColor"), 1, glm::value_ptr(color));
+
+        glEnable(GL_DEPTH_TEST);
+        glBindVertexArray(v->meshVAO);
+        glDrawElements(GL_TRIANGLES, (GLsizei)m_meshIndexCount, GL_UNSIGNED_INT, (void*)0);
+        glBindVertexArray(0);
+    }
+
     // --- Slicer mode: draw a single textured slice quad inside the bbox ---
-    if (m_sliceMode && m_volumeTex3D != 0){
+    if (v->sliceMode && m_volumeTex3D != 0){
+        profiler.beginPhase(FramePhase::UniformSetup);
         // Lazy compile slice shader if needed
         if (m_sliceShader == 0){
             std::string sVSsrc = loadShaderFile("slice.vert");
@@ -217,17 +806,22 @@ void Renderer::render() {
             glDeleteShader(sfsId);
         }
 
-        // Compute box min/max from volume spacing/dims (unscaled)
-        float sx = (m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f);
-        float sy = (m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f);
-        float sz = (m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
-        glm::vec3 boxSize = glm::vec3(m_volumeData->width * sx, m_volumeData->height * sy, m_volumeData->depth * sz);
-        glm::vec3 boxMin = -0.5f * boxSize;
-        glm::vec3 boxMax =  0.5f * boxSize;
+        // Slice quads span the crop box (unscaled); slice positions stay in full-volume voxels
+        glm::vec3 boxSize = glm::vec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth) * voxelSpacing();
+        glm::vec3 fullMin = -0.5f * boxSize;
+        glm::vec3 fullMax =  0.5f * boxSize;
+        glm::ivec3 cropLo, cropHi;
+        glm::vec3 boxMin, boxMax, texMin, texMax;
+        visibleRegion(cropLo, cropHi);
+        regionWorldBox(cropLo, cropHi, boxMin, boxMax);
+        regionWorldBox(m_texOrigin, m_texOrigin + textureExtent(), texMin, texMax);
+        glm::vec3 texScale = 1.0f / glm::max(texMax - texMin, glm::vec3(1e-6f));
 
         // Build/update slice quad VBO
-        if (m_sliceVAO == 0) glGenVertexArrays(1, &m_sliceVAO);
-        if (m_sliceVBO == 0) glGenBuffers(1, &m_sliceVBO);
+        if (v->sliceVAO == 0) glGenVertexArrays(1, &v->sliceVAO);
+        if (v->sliceVBO == 0) glGenBuffers(1, &v->sliceVBO);
+        int& sliceIndex = v->sliceIndex;
+        const int sliceAxis = v->sliceAxis;
 
         std::vector<float> quad; // positions only (3 floats)
         quad.reserve(6*3);
@@ -236,22 +830,22 @@ void Renderer::render() {
         int w = (int)m_volumeData->width;
         int h = (int)m_volumeData->height;
         int d = (int)m_volumeData->depth;
-        if (m_sliceAxis == 0) m_sliceIndex = clampi(m_sliceIndex, 0, d-1);
-        else if (m_sliceAxis == 1) m_sliceIndex = clampi(m_sliceIndex, 0, h-1);
-        else m_sliceIndex = clampi(m_sliceIndex, 0, w-1);
+        if (sliceAxis == 0) sliceIndex = clampi(sliceIndex, 0, d-1);
+        else if (sliceAxis == 1) sliceIndex = clampi(sliceIndex, 0, h-1);
+        else sliceIndex = clampi(sliceIndex, 0, w-1);
 
-        if (m_sliceAxis == 0){ // Z
-            float s = (m_sliceIndex + 0.5f) / float(std::max(1,d));
-            float z = glm::mix(boxMin.z, boxMax.z, s);
+        if (sliceAxis == 0){ // Z
+            float s = (sliceIndex + 0.5f) / float(std::max(1,d));
+            float z = glm::mix(fullMin.z, fullMax.z, s);
             glm::vec3 p0(boxMin.x, boxMin.y, z);
             glm::vec3 p1(boxMax.x, boxMin.y, z);
             glm::vec3 p2(boxMax.x, boxMax.y, z);
             glm::vec3 p3(boxMin.x, boxMax.y, z);
             auto push = [&](glm::vec3 p){ quad.push_back(p.x); quad.push_back(p.y); quad.push_back(p.z); };
             push(p0); push(p1); push(p2); push(p0); push(p2); push(p3);
-        } else if (m_sliceAxis == 1){ // Y
-            float s = (m_sliceIndex + 0.5f) / float(std::max(1,h));
-            float y = glm::mix(boxMin.y, boxMax.y, s);
+        } else if (sliceAxis == 1){ // Y
+            float s = (sliceIndex + 0.5f) / float(std::max(1,h));
+            float y = glm::mix(fullMin.y, fullMax.y, s);
             glm::vec3 p0(boxMin.x, y, boxMin.z);
             glm::vec3 p1(boxMax.x, y, boxMin.z);
             glm::vec3 p2(boxMax.x, y, boxMax.z);
@@ -259,8 +853,8 @@ void Renderer::render() {
             auto push = [&](glm::vec3 p){ quad.push_back(p.x); quad.push_back(p.y); quad.push_back(p.z); };
             push(p0); push(p1); push(p2); push(p0); push(p2); push(p3);
         } else { // X
-            float s = (m_sliceIndex + 0.5f) / float(std::max(1,w));
-            float x = glm::mix(boxMin.x, boxMax.x, s);
+            float s = (sliceIndex + 0.5f) / float(std::max(1,w));
+            float x = glm::mix(fullMin.x, fullMax.x, s);
             glm::vec3 p0(x, boxMin.y, boxMin.z);
             glm::vec3 p1(x, boxMax.y, boxMin.z);
             glm::vec3 p2(x, boxMax.y, boxMax.z);
@@ -269,8 +863,8 @@ void Renderer::render() {
             push(p0); push(p1); push(p2); push(p0); push(p2); push(p3);
         }
 
-        glBindVertexArray(m_sliceVAO);
-        glBindBuffer(GL_ARRAY_BUFFER, m_sliceVBO);
+        glBindVertexArray(v->sliceVAO);
+        glBindBuffer(GL_ARRAY_BUFFER, v->sliceVBO);
         glBufferData(GL_ARRAY_BUFFER, quad.size()*sizeof(float), quad.data(), GL_DYNAMIC_DRAW);
         glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 3*sizeof(float), (void*)0);
         glEnableVertexAttribArray(0);
@@ -278,14 +872,42 @@ void Renderer::render() {
 
         glUseProgram(m_sliceShader);
         glm::mat4 model = glm::mat4(1.0f);
-        glm::mat4 view = m_camera.getViewMatrix();
-        glm::mat4 projection = m_camera.getProjectionMatrix();
+        glm::mat4 view = camera.getViewMatrix();
+        glm::mat4 projection = camera.getProjectionMatrix();
         glUniformMatrix4fv(glGetUniformLocation(m_sliceShader, "model"), 1, GL_FALSE, glm::value_ptr(model));
         glUniformMatrix4fv(glGetUniformLocation(m_sliceShader, "view"), 1, GL_FALSE, glm::value_ptr(view));
         glUniformMatrix4fv(glGetUniformLocation(m_sliceShader, "projection"), 1, GL_FALSE, glm::value_ptr(projection));
         glUniform3fv(glGetUniformLocation(m_sliceShader, "uBoxMin"), 1, glm::value_ptr(boxMin));
         glUniform3fv(glGetUniformLocation(m_sliceShader, "uBoxMax"), 1, glm::value_ptr(boxMax));
-        glUniform1i(glGetUniformLocation(m_sliceShader, "uAxis"), m_sliceAxis);
+        glUniform3fv(glGetUniformLocation(m_sliceShader, "uTexOrigin"), 1, glm::value_ptr(texMin));
+        glUniform3fv(glGetUniformLocation(m_sliceShader, "uTexScale"), 1, glm::value_ptr(texScale));
+        glUniform1i(glGetUniformLocation(m_sliceShader, "uAxis"), sliceAxis);
+
+        // Thick slab: the slices it covers, clipped to the crop, as texture coordinates
+        // along the slicer axis
+        const int slabComponent = 2 - sliceAxis;
+        int slabMode = 0, slabCount = 1;
+        float slabFirst = 0.0f, slabStep = 0.0f;
+        if (v->slabThickness > 0.0f) {
+            const int sizes[3] = {d, h, w};
+            const double spacings[3] = {m_volumeData->spacing_z, m_volumeData->spacing_y, m_volumeData->spacing_x};
+            unsigned int first = 0, count = 0;
+            VolumeOps::slabRange(sizes[sliceAxis], spacings[sliceAxis], sliceIndex, v->slabThickness, first, count);
+            const int lo = std::max<int>(first, cropLo[slabComponent]);
+            const int hi = std::min<int>(first + count, cropHi[slabComponent]);
+            if (hi > lo) {
+                const float texSlices = static_cast<float>(std::max(1, textureExtent()[slabComponent]));
+                slabMode = 1 + v->slabMode;
+                slabCount = hi - lo;
+                slabFirst = (lo - m_texOrigin[slabComponent] + 0.5f) / texSlices;
+                slabStep = 1.0f / texSlices;
+            }
+        }
+        glUniform1i(glGetUniformLocation(m_sliceShader, "uSlabMode"), slabMode);
+        glUniform1i(glGetUniformLocation(m_sliceShader, "uSlabCount"), slabCount);
+        glUniform1i(glGetUniformLocation(m_sliceShader, "uSlabComponent"), slabComponent);
+        glUniform1f(glGetUniformLocation(m_sliceShader, "uSlabFirst"), slabFirst);
+        glUniform1f(glGetUniformLocation(m_sliceShader, "uSlabStep"), slabStep);
 
         glActiveTexture(GL_TEXTURE0);
         glBindTexture(GL_TEXTURE_3D, m_volumeTex3D);
@@ -296,22 +918,35 @@ void Renderer::render() {
             glBindTexture(GL_TEXTURE_1D, m_lutTex1D);
             glUniform1i(glGetUniformLocation(m_sliceShader, "uLUT"), 1);
         }
+        bindLabelUniforms(m_sliceShader);
+        bindLayerUniforms(m_sliceShader);
 
-        glDisable(GL_CULL_FACE);
-        glBindVertexArray(m_sliceVAO);
-        glDrawArrays(GL_TRIANGLES, 0, 6);
-        glBindVertexArray(0);
+        profiler.endPhase(FramePhase::UniformSetup);
+
+        // A slice outside the crop along its own axis shows nothing
+        const bool sliceInCrop = sliceIndex >= cropLo[slabComponent] && sliceIndex < cropHi[slabComponent];
+
+        profiler.beginPhase(FramePhase::SliceDraw);
+        if (sliceInCrop) {
+            glDisable(GL_CULL_FACE);
+            glBindVertexArray(v->sliceVAO);
+            glDrawArrays(GL_TRIANGLES, 0, 6);
+            glBindVertexArray(0);
+        }
+        profiler.endPhase(FramePhase::SliceDraw);
     }
 
     // Draw bounding box lines on top (avoid being occluded by proxy cube depth)
     if (m_showBoundingBox) {
+        ScopedFramePhase bboxPhase(profiler, FramePhase::BBoxDraw);
         glDisable(GL_DEPTH_TEST);
+        if (m_shaderProgram == 0) compileBoundingBoxShader();
         glUseProgram(m_shaderProgram);
 
     // Set up transformation matrices
     glm::mat4 model = glm::mat4(1.0f); // Identity matrix
-    glm::mat4 view = m_camera.getViewMatrix();
-    glm::mat4 projection = m_camera.getProjectionMatrix();
+    glm::mat4 view = camera.getViewMatrix();
+    glm::mat4 projection = camera.getProjectionMatrix();
 
     // Pass matrices to the shader
     glUniformMatrix4fv(glGetUniformLocation(m_shaderProgram, "model"), 1, GL_FALSE, glm::value_ptr(model));
@@ -319,7 +954,7 @@ void Renderer::render() {
     glUniformMatrix4fv(glGetUniformLocation(m_shaderProgram, "projection"), 1, GL_FALSE, glm::value_ptr(projection));
 
         // Draw the bounding box
-        glBindVertexArray(m_boundingBoxVAO);
+        glBindVertexArray(v->boundingBoxVAO);
         glDrawArrays(GL_LINES, 0, 24);
         glBindVertexArray(0);
     }
@@ -329,18 +964,20 @@ void Renderer::render() {
 void Renderer::setupBoundingBox() {
     if (!isVolumeLoaded()) return;
 
-    float sx = (m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f);
-    float sy = (m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f);
-    float sz = (m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
+    // The volume, or the crop box when one is set, scaled about its center
+    glm::ivec3 lo, hi;
+    glm::vec3 boxMin, boxMax;
+    visibleRegion(lo, hi);
+    regionWorldBox(lo, hi, boxMin, boxMax);
+    glm::vec3 c = 0.5f * (boxMin + boxMax);
 
-    float w = m_volumeData->width * sx * m_bboxScale;
-    float h = m_volumeData->height * sy * m_bboxScale;
-    float d = m_volumeData->depth * sz * m_bboxScale;
+    float w = (boxMax.x - boxMin.x) * m_bboxScale;
+    float h = (boxMax.y - boxMin.y) * m_bboxScale;
+    float d = (boxMax.z - boxMin.z) * m_bboxScale;
 
-    // Center the box at the origin
-    float x_min = -w / 2.0f; float x_max = w / 2.0f;
-    float y_min = -h / 2.0f; float y_max = h / 2.0f;
-    float z_min = -d / 2.0f; float z_max = d / 2.0f;
+    float x_min = c.x - w / 2.0f; float x_max = c.x + w / 2.0f;
+    float y_min = c.y - h / 2.0f; float y_max = c.y + h / 2.0f;
+    float z_min = c.z - d / 2.0f; float z_max = c.z + d / 2.0f;
 
     // Define the 12 lines of the cube by endpoints
     std::vector<glm::vec3> edges = {
@@ -385,30 +1022,16 @@ void Renderer::setupBoundingBox() {
         vertices.push_back(color.r); vertices.push_back(color.g); vertices.push_back(color.b);
     }
 
-    if (m_boundingBoxVAO == 0) glGenVertexArrays(1, &m_boundingBoxVAO);
+    // Shared buffer; each view's VAO (see ensureViewObjects) references it
     if (m_boundingBoxVBO == 0) glGenBuffers(1, &m_boundingBoxVBO);
 
-    glBindVertexArray(m_boundingBoxVAO);
     glBindBuffer(GL_ARRAY_BUFFER, m_boundingBoxVBO);
     glBufferData(GL_ARRAY_BUFFER, vertices.size() * sizeof(float), vertices.data(), GL_STATIC_DRAW);
-
-    // position
-    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 6 * sizeof(float), (void*)0);
-    glEnableVertexAttribArray(0);
-    // color
-    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 6 * sizeof(float), (void*)(3 * sizeof(float)));
-    glEnableVertexAttribArray(1);
-
     glBindBuffer(GL_ARRAY_BUFFER, 0);
-    glBindVertexArray(0);
 
-    // Frame the box with the camera only when requested (e.g., after load)
-    if (m_shouldFrameCameraNext) {
-        m_camera.frameBox(w, h, d);
-        m_shouldFrameCameraNext = false;
+    if (DataLoader::getVerbosity() >= DataLoader::VerbosityPerFile) {
+        std::cout << "  [Renderer::setupBoundingBox] Box dimensions: " << w << "x" << h << "x" << d << std::endl;
     }
-
-    std::cout << "  [Renderer::setupBoundingBox] Box dimensions: " << w << "x" << h << "x" << d << std::endl;
 }
 
 void Renderer::setupVolumeTexture() {
@@ -428,115 +1051,896 @@ void Renderer::setupVolumeTexture() {
     glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE);
 
     // Upload data (uint16). Use GL_R16 normalized format so sampler returns [0,1]
-    glPixelStorei(GL_UNPACK_ALIGNMENT, 1);
-    glTexImage3D(
-        GL_TEXTURE_3D,
-        0,
-        GL_R16,
-        (GLsizei)m_volumeData->width,
-        (GLsizei)m_volumeData->height,
-        (GLsizei)m_volumeData->depth,
-        0,
-        GL_RED,
-        GL_UNSIGNED_SHORT,
-        m_volumeData->data.data()
-    );
+    // The first upload after a load is attributed to the load's "upload" phase.
+    // With crop upload on, only the crop region is allocated and uploaded.
+    ScopedLoadPhase uploadPhase(m_needsUploadTiming ? &m_lastLoadStats : nullptr, LoadPhase::Upload);
+    m_needsUploadTiming = false;
+    glm::ivec3 lo, hi;
+    textureRegion(lo, hi);
+    m_texOrigin = lo;
+    m_texSize = hi - lo;
+    m_texDepthCapacity = m_texSize.z;
+
+    // Fit the VRAM budget: drop an unused gradient texture, then store 8 bits, then
+    // halve the resolution until the texture fits
+    queryDeviceMemory();
+    const uint64_t current = m_volumeTexMemory.bytes();
+    m_volumeTexBits = 16;
+    m_volumeTexFactor = 1;
+    if (!fitsDevice(volumeTextureBytes(), current) && !m_shadingEnabled && m_gradientTex3D != 0) {
+        glDeleteTextures(1, &m_gradientTex3D);
+        m_gradientTex3D = 0;
+        m_gradientTexBytes = 0;
+        m_gradientTexMemory.release();
+        m_needsGradientUpload = true;
+        noteMemoryAction("released the unused gradient texture");
+    }
+    auto degrade = [&]() {
+        if (m_volumeTexBits == 16) {
+            m_volumeTexBits = 8;
+            return true;
+        }
+        const glm::ivec3 dims = volumeTextureDims();
+        if (dims.x <= 1 && dims.y <= 1 && dims.z <= 1) return false;
+        m_volumeTexFactor *= 2;
+        return true;
+    };
+    while (!fitsDevice(volumeTextureBytes(), current) && degrade()) {}
+    // The driver can still refuse the allocation; keep stepping down
+    while (!uploadVolumeTexture(true)) {
+        if (!degrade()) {
+            std::cerr << "      MVR Error: Out of GPU memory for the volume texture." << std::endl;
+            break;
+        }
+    }
+    if (m_volumeTexBits != 16 || m_volumeTexFactor != 1) {
+        const glm::ivec3 dims = volumeTextureDims();
+        noteMemoryAction("volume texture stored at " + std::to_string(m_volumeTexBits) + " bits, " +
+                         std::to_string(dims.x) + "x" + std::to_string(dims.y) + "x" + std::to_string(dims.z));
+    }
 
     // Set swizzle so sampling returns grayscale in all channels if needed
     GLint swizzleMask[] = {GL_RED, GL_RED, GL_RED, GL_ONE};
     glTexParameteriv(GL_TEXTURE_3D, GL_TEXTURE_SWIZZLE_RGBA, swizzleMask);
 
     glBindTexture(GL_TEXTURE_3D, 0);
+    if (!m_labels.empty()) m_needsLabelUpload = true;  // the label texture holds the same region
 }
 
-void Renderer::setupProxyCube() {
-    // Create a unit cube centered at origin that will be scaled by box size via model (here model=identity, so we precompute in object-space actual positions)
-    float sx = (m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f);
-    float sy = (m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f);
-    float sz = (m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
-    float w = m_volumeData->width * sx;
-    float h = m_volumeData->height * sy;
-    float d = m_volumeData->depth * sz;
-    float x0 = -w*0.5f, x1 = w*0.5f;
-    float y0 = -h*0.5f, y1 = h*0.5f;
-    float z0 = -d*0.5f, z1 = d*0.5f;
+void Renderer::uploadVolumeFrame() {
+    if (!isVolumeLoaded() || m_volumeTex3D == 0) return;
+    glBindTexture(GL_TEXTURE_3D, m_volumeTex3D);
+    uploadVolumeTexture(false);
+    glBindTexture(GL_TEXTURE_3D, 0);
+}
 
-    // 12 triangles (36 verts) for cube faces
-    std::vector<float> verts = {
-        // +X
-        x1,y0,z0,  x1,y1,z0,  x1,y1,z1,
-        x1,y0,z0,  x1,y1,z1,  x1,y0,z1,
-        // -X
-        x0,y0,z0,  x0,y0,z1,  x0,y1,z1,
-        x0,y0,z0,  x0,y1,z1,  x0,y1,z0,
-        // +Y
-        x0,y1,z0,  x0,y1,z1,  x1,y1,z1,
-        x0,y1,z0,  x1,y1,z1,  x1,y1,z0,
-        // -Y
-        x0,y0,z0,  x1,y0,z0,  x1,y0,z1,
-        x0,y0,z0,  x1,y0,z1,  x0,y0,z1,
-        // +Z
-        x0,y0,z1,  x1,y0,z1,  x1,y1,z1,
-        x0,y0,z1,  x1,y1,z1,  x0,y1,z1,
-        // -Z
-        x0,y0,z0,  x0,y1,z0,  x1,y1,z0,
-        x0,y0,z0,  x1,y1,z0,  x1,y0,z0
-    };
+// Texture size at the current downsampling factor
+glm::ivec3 Renderer::volumeTextureDims() const {
+    return (m_texSize + glm::ivec3(m_volumeTexFactor - 1)) / m_volumeTexFactor;
+}
 
-    if (m_proxyCubeVAO == 0) glGenVertexArrays(1, &m_proxyCubeVAO);
-    if (m_proxyCubeVBO == 0) glGenBuffers(1, &m_proxyCubeVBO);
+// Voxels the volume texture spans; deeper than m_texSize while a DICOM watch grows it
+glm::ivec3 Renderer::textureExtent() const {
+    return glm::ivec3(m_texSize.x, m_texSize.y, std::max(m_texSize.z, m_texDepthCapacity));
+}
 
-    glBindVertexArray(m_proxyCubeVAO);
-    glBindBuffer(GL_ARRAY_BUFFER, m_proxyCubeVBO);
-    glBufferData(GL_ARRAY_BUFFER, verts.size() * sizeof(float), verts.data(), GL_STATIC_DRAW);
-    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 3 * sizeof(float), (void*)0);
-    glEnableVertexAttribArray(0);
-    glBindBuffer(GL_ARRAY_BUFFER, 0);
-    glBindVertexArray(0);
+uint64_t Renderer::volumeTextureBytes() const {
+    const glm::ivec3 dims = volumeTextureDims();
+    return static_cast<uint64_t>(dims.x) * dims.y * dims.z * (m_volumeTexBits / 8);
+}
 
-    // Compile volume shader (fullscreen quad approach)
-    std::string volVSsrc = loadShaderFile("vol_fullscreen.vert");
-    std::string volFSsrc = loadShaderFile("vol_fullscreen.frag");
-    const char* vssc = volVSsrc.c_str();
-    const char* fssc = volFSsrc.c_str();
+// Uploads the texture region into the bound volume texture at the current bit depth and
+// downsampling factor. Full-size 16-bit data is read in place; otherwise a reduced copy
+// is made. Returns false if GL ran out of memory.
+bool Renderer::uploadVolumeTexture(bool allocate) {
+    const glm::ivec3 full(m_volumeData->width, m_volumeData->height, m_volumeData->depth);
+    while (glGetError() != GL_NO_ERROR) {}  // report only this upload's errors
+    if (m_volumeTexBits == 16 && m_volumeTexFactor == 1) {
+        uploadTextureRegion(allocate, GL_R16, GL_RED, GL_UNSIGNED_SHORT, m_volumeData->data.data(), m_texOrigin,
+                            m_texSize, full);
+    } else {
+        const glm::ivec3 dims = volumeTextureDims();
+        MemoryBudget::Allocation staging(MemoryBudget::Category::LoadTemporary, volumeTextureBytes());
+        if (m_volumeTexBits == 8) {
+            std::vector<uint8_t> reduced;
+            reduceRegion(*m_volumeData, m_texOrigin, m_texSize, m_volumeTexFactor, dims, reduced, m_loadOptions.threads);
+            uploadTextureRegion(allocate, GL_R8, GL_RED, GL_UNSIGNED_BYTE, reduced.data(), glm::ivec3(0), dims, dims);
+        } else {
+            std::vector<uint16_t> reduced;
+            reduceRegion(*m_volumeData, m_texOrigin, m_texSize, m_volumeTexFactor, dims, reduced, m_loadOptions.threads);
+            uploadTextureRegion(allocate, GL_R16, GL_RED, GL_UNSIGNED_SHORT, reduced.data(), glm::ivec3(0), dims, dims);
+        }
+    }
+    const bool ok = glGetError() != GL_OUT_OF_MEMORY;
+    if (allocate) m_volumeTexMemory.resize(ok ? volumeTextureBytes() : 0);
+    return ok;
+}
 
-    unsigned int vs = glCreateShader(GL_VERTEX_SHADER);
-    glShaderSource(vs, 1, &vssc, nullptr);
-    glCompileShader(vs);
-    unsigned int fs = glCreateShader(GL_FRAGMENT_SHADER);
-    glShaderSource(fs, 1, &fssc, nullptr);
-    glCompileShader(fs);
-    m_volumeShader = glCreateProgram();
-    glAttachShader(m_volumeShader, vs);
-    glAttachShader(m_volumeShader, fs);
-    glLinkProgram(m_volumeShader);
-    glDeleteShader(vs);
-    glDeleteShader(fs);
+void Renderer::computeGradients(LoadStats* stats) {
+    ScopedLoadPhase gradientPhase(stats, LoadPhase::Gradient);
+    VolumeOps::computeGradients(*m_volumeData, m_gradientData, m_loadOptions.threads);
+    m_gradientsValid = true;
+    trackMemory();
 }
 
-// --- Colormap LUT setup ---
-// static void colorPreset(int preset, float t, float& r, float& g, float& b) {
-//     // 10 simple presets approximating common colormaps
-//     t = std::max(0.0f, std::min(1.0f, t));
-//     switch (preset) {
-//         case 0: { // Grayscale
-//             r = g = b = t; break;
-//         }
-//         case 1: { // Inverted Grayscale
-//             r = g = b = 1.0f - t; break;
-//         }
-//         case 2: { // Hot
-//             float x = t;
-//             r = std::min(1.0f, 3.0f * x);
-//             g = std::min(1.0f, std::max(0.0f, 3.0f * x - 1.0f));
-//             b = std::min(1.0f, std::max(0.0f, 3.0f * x - 2.0f));
-//             break;
-//         }
-//         case 3: { // Cool
-//             r = t; g = 1.0f - t; b = 1.0f; break;
-//         }
-//         case 4: { // Spring
-//             r = 1.0f; g = t; b = 1.0f - t; break;
+void Renderer::setupGradientTexture() {
+    if (!isVolumeLoaded()) return;
+    // Shading falls back to unshaded rendering when the gradients do not fit
+    const uint64_t texBytes = static_cast<uint64_t>(m_texSize.x) * m_texSize.y * m_texSize.z *
+                              VolumeOps::kGradientBytesPerVoxel;
+    const uint64_t hostBytes = m_gradientsValid ? 0 : m_volumeData->data.size() * VolumeOps::kGradientBytesPerVoxel;
+    if (!MemoryBudget::fits(MemoryBudget::Pool::Host, hostBytes) || !fitsDevice(texBytes, m_gradientTexBytes)) {
+        if (m_gradientTex3D != 0) glDeleteTextures(1, &m_gradientTex3D);
+        m_gradientTex3D = 0;
+        m_gradientTexBytes = 0;
+        m_gradientTexMemory.release();
+        std::vector<uint8_t>().swap(m_gradientData);
+        m_gradientsValid = false;
+        m_needsGradientUpload = false;
+        noteMemoryAction("shading off: gradients do not fit the memory budget");
+        trackMemory();
+        return;
+    }
+    if (!m_gradientsValid) computeGradients(nullptr);
+
+    if (m_gradientTex3D == 0) glGenTextures(1, &m_gradientTex3D);
+    glBindTexture(GL_TEXTURE_3D, m_gradientTex3D);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE);
+
+    // RGB8: octahedral normal (RG) + sqrt-encoded magnitude (B), 3 bytes per voxel.
+    // Same region as the volume texture; gradients are computed on the whole volume so
+    // voxels on the crop border still see their neighbours.
+    while (glGetError() != GL_NO_ERROR) {}
+    uploadTextureRegion(true, GL_RGB8, GL_RGB, GL_UNSIGNED_BYTE, m_gradientData.data(), m_texOrigin, m_texSize,
+                        glm::ivec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth));
+    const bool outOfMemory = glGetError() == GL_OUT_OF_MEMORY;
+    glBindTexture(GL_TEXTURE_3D, 0);
+    m_gradientTexBytes = static_cast<size_t>(m_texSize.x) * m_texSize.y * m_texSize.z * 3;
+    if (outOfMemory) {
+        glDeleteTextures(1, &m_gradientTex3D);
+        m_gradientTex3D = 0;
+        m_gradientTexBytes = 0;
+        noteMemoryAction("shading off: out of GPU memory for the gradients");
+    }
+
+    // The texture is the only copy needed from here on
+    std::vector<uint8_t>().swap(m_gradientData);
+    m_gradientsValid = false;
+    m_needsGradientUpload = false;
+    m_gradientTexMemory.resize(m_gradientTexBytes);
+    trackMemory();
+}
+
+// --- Segmentation labels ---
+
+void Renderer::resetLabelTable() {
+    // Golden-ratio hue steps keep neighbouring label numbers apart in colour
+    for (int i = 0; i < LabelMap::kLabelCount; ++i) {
+        float h = std::fmod(i * 0.618034f, 1.0f) * 6.0f;
+        float x = 1.0f - std::fabs(std::fmod(h, 2.0f) - 1.0f);
+        glm::vec3 rgb = h < 1 ? glm::vec3(1, x, 0) : h < 2 ? glm::vec3(x, 1, 0) : h < 3 ? glm::vec3(0, 1, x)
+                      : h < 4 ? glm::vec3(0, x, 1) : h < 5 ? glm::vec3(x, 0, 1) : glm::vec3(1, 0, x);
+        m_labelColors[i] = glm::mix(glm::vec3(0.25f), rgb, 0.85f) + glm::vec3(0.1f);
+        m_labelVisible[i] = i != 0;  // 0 is background
+    }
+    m_needsLabelTableUpload = true;
+}
+
+bool Renderer::loadLabelMap(const std::string& path) {
+    if (!isVolumeLoaded()) {
+        std::cerr << "      MVR Error: Load a volume before its label map." << std::endl;
+        return false;
+    }
+    if (m_dicomWatch) {
+        std::cerr << "      MVR Error: Stop the DICOM watch before loading a label map." << std::endl;
+        return false;
+    }
+    LabelMap labels;
+    if (!DataLoader::loadNIFTILabels(path, labels, nullptr, m_loadOptions)) return false;
+    if (labels.width() != m_volumeData->width || labels.height() != m_volumeData->height ||
+        labels.depth() != m_volumeData->depth) {
+        std::cerr << "      MVR Error: Label map is " << labels.width() << "x" << labels.height() << "x"
+                  << labels.depth() << " but the volume is " << m_volumeData->width << "x"
+                  << m_volumeData->height << "x" << m_volumeData->depth << "." << std::endl;
+        return false;
+    }
+    m_labels = std::move(labels);
+    m_needsLabelUpload = true;
+    trackMemory();
+    touchScene();
+    return true;
+}
+
+void Renderer::clearLabelMap() {
+    if (m_labels.empty()) return;
+    m_labels.clear();
+    m_needsLabelUpload = true;  // releases the texture on the next frame
+    trackMemory();
+    touchScene();
+}
+
+bool Renderer::hasLabelMap() const {
+    return !m_labels.empty();
+}
+
+std::vector<std::pair<int, uint64_t>> Renderer::getLabelCounts() const {
+    std::vector<std::pair<int, uint64_t>> counts;
+    if (m_labels.empty()) return counts;
+    const auto histogram = m_labels.histogram();
+    for (int i = 1; i < LabelMap::kLabelCount; ++i) {
+        if (histogram[i] != 0) counts.emplace_back(i, histogram[i]);
+    }
+    return counts;
+}
+
+size_t Renderer::getLabelMapMemoryBytes() const {
+    return m_labels.memoryBytes();
+}
+
+void Renderer::setLabelColor(int label, float r, float g, float b) {
+    if (label < 0 || label >= LabelMap::kLabelCount) return;
+    m_labelColors[label] = glm::clamp(glm::vec3(r, g, b), 0.0f, 1.0f);
+    m_needsLabelTableUpload = true;
+    touchScene();
+}
+
+glm::vec3 Renderer::getLabelColor(int label) const {
+    if (label < 0 || label >= LabelMap::kLabelCount) return glm::vec3(0.0f);
+    return m_labelColors[label];
+}
+
+void Renderer::setLabelVisible(int label, bool visible) {
+    if (label < 0 || label >= LabelMap::kLabelCount) return;
+    m_labelVisible[label] = visible;
+    m_needsLabelTableUpload = true;
+    touchScene();
+}
+
+bool Renderer::getLabelVisible(int label) const {
+    if (label < 0 || label >= LabelMap::kLabelCount) return false;
+    return m_labelVisible[label];
+}
+
+void Renderer::setLabelOpacity(float opacity) {
+    m_labelOpacity = std::max(0.0f, std::min(1.0f, opacity));
+    touchScene();
+}
+
+float Renderer::getLabelOpacity() const {
+    return m_labelOpacity;
+}
+
+void Renderer::setShowLabels(bool show) {
+    m_showLabels = show;
+    touchScene();
+}
+
+bool Renderer::getShowLabels() const {
+    return m_showLabels;
+}
+
+void Renderer::setupLabelTexture() {
+    m_needsLabelUpload = false;
+    if (m_labels.empty()) {
+        if (m_labelTex3D != 0) glDeleteTextures(1, &m_labelTex3D);
+        m_labelTex3D = 0;
+        m_labelTexBytes = 0;
+        m_labelTexMemory.release();
+        return;
+    }
+
+    if (m_labelTex3D == 0) glGenTextures(1, &m_labelTex3D);
+    glBindTexture(GL_TEXTURE_3D, m_labelTex3D);
+    // Integer texture: labels are fetched exactly, never interpolated
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MIN_FILTER, GL_NEAREST);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MAG_FILTER, GL_NEAREST);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE);
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1);
+    glTexImage3D(GL_TEXTURE_3D, 0, GL_R8UI, m_texSize.x, m_texSize.y, m_texSize.z, 0, GL_RED_INTEGER,
+                 GL_UNSIGNED_BYTE, nullptr);
+
+    // Decode a slab of slices at a time (about 16 MB) so the dense labels never exist
+    // on the host as a whole
+    const glm::ivec3 full(m_labels.width(), m_labels.height(), 0);
+    const size_t sliceBytes = static_cast<size_t>(full.x) * full.y;
+    const int slab = static_cast<int>(std::max<size_t>(1, (size_t(16) << 20) / std::max<size_t>(1, sliceBytes)));
+    std::vector<uint8_t> slices(std::min(slab, m_texSize.z) * sliceBytes);
+    for (int z = 0; z < m_texSize.z; z += slab) {
+        const int count = std::min(slab, m_texSize.z - z);
+        m_labels.decodeSlices(m_texOrigin.z + z, count, slices.data());
+        uploadTextureRegion(false, GL_R8UI, GL_RED_INTEGER, GL_UNSIGNED_BYTE, slices.data(),
+                            glm::ivec3(m_texOrigin.x, m_texOrigin.y, 0), glm::ivec3(m_texSize.x, m_texSize.y, count),
+                            glm::ivec3(full.x, full.y, count), z);
+    }
+    glBindTexture(GL_TEXTURE_3D, 0);
+    m_labelTexBytes = static_cast<size_t>(m_texSize.x) * m_texSize.y * m_texSize.z;
+    m_labelTexMemory.resize(m_labelTexBytes);
+
+    if (m_labelTableTex1D == 0) {
+        glGenTextures(1, &m_labelTableTex1D);
+        glBindTexture(GL_TEXTURE_1D, m_labelTableTex1D);
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MIN_FILTER, GL_NEAREST);
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MAG_FILTER, GL_NEAREST);
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
+        glTexImage1D(GL_TEXTURE_1D, 0, GL_RGBA8, LabelMap::kLabelCount, 0, GL_RGBA, GL_UNSIGNED_BYTE, nullptr);
+        glBindTexture(GL_TEXTURE_1D, 0);
+        m_needsLabelTableUpload = true;
+    }
+}
+
+void Renderer::uploadLabelTable() {
+    // RGB = colour, A = visibility; the overlay opacity is a separate uniform
+    std::array<unsigned char, LabelMap::kLabelCount * 4> table;
+    for (int i = 0; i < LabelMap::kLabelCount; ++i) {
+        table[4 * i + 0] = (unsigned char)std::round(255.0f * m_labelColors[i].r);
+        table[4 * i + 1] = (unsigned char)std::round(255.0f * m_labelColors[i].g);
+        table[4 * i + 2] = (unsigned char)std::round(255.0f * m_labelColors[i].b);
+        table[4 * i + 3] = m_labelVisible[i] ? 255 : 0;
+    }
+    glBindTexture(GL_TEXTURE_1D, m_labelTableTex1D);
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1);
+    glTexSubImage1D(GL_TEXTURE_1D, 0, 0, LabelMap::kLabelCount, GL_RGBA, GL_UNSIGNED_BYTE, table.data());
+    glBindTexture(GL_TEXTURE_1D, 0);
+    m_needsLabelTableUpload = false;
+}
+
+void Renderer::bindLabelUniforms(unsigned int program) {
+    // The samplers get their own units even when unused: two sampler types on one
+    // unit make the draw call fail
+    const bool labels = m_showLabels && m_labelTex3D != 0 && m_labelTableTex1D != 0;
+    glUniform1i(glGetUniformLocation(program, "uLabels"), 3);
+    glUniform1i(glGetUniformLocation(program, "uLabelTable"), 4);
+    glUniform1i(glGetUniformLocation(program, "uShowLabels"), labels ? 1 : 0);
+    glUniform1f(glGetUniformLocation(program, "uLabelOpacity"), m_labelOpacity);
+    if (!labels) return;
+    glActiveTexture(GL_TEXTURE3);
+    glBindTexture(GL_TEXTURE_3D, m_labelTex3D);
+    glActiveTexture(GL_TEXTURE4);
+    glBindTexture(GL_TEXTURE_1D, m_labelTableTex1D);
+    glActiveTexture(GL_TEXTURE0);
+}
+
+// --- Fusion ---
+
+bool Renderer::loadFusionVolume(const std::string& path) {
+    if (!isVolumeLoaded()) {
+        std::cerr << "      MVR Error: Load a volume before fusing a second one with it." << std::endl;
+        return false;
+    }
+    if (!fs::exists(path)) {
+        std::cerr << "      MVR ERROR: Path does not exist: " << path << std::endl;
+        return false;
+    }
+    VolumeData fusion;
+    bool success = false;
+    if (fs::is_directory(path)) {
+        success = DataLoader::loadDICOM(path, fusion, nullptr, m_cacheDir, m_loadOptions);
+    } else {
+        const std::string extension = fs::path(path).extension().string();
+        if (extension == ".nii" || extension == ".gz") {
+            success = DataLoader::loadNIFTI(path, fusion, nullptr, m_loadOptions);
+        } else if (extension == ChunkStore::kExtension) {
+            success = DataLoader::loadChunkStore(path, fusion, nullptr, m_loadOptions);
+        } else {
+            std::cerr << "      MVR ERROR: Unsupported file type: " << extension << std::endl;
+        }
+    }
+    if (!success) return false;
+
+    m_fusionData = std::move(fusion);
+    m_needsFusionUpload = true;
+    trackMemory();
+    if (!MemoryBudget::fits(MemoryBudget::Pool::Host, 0)) evictCaches();
+    touchScene();
+    return true;
+}
+
+void Renderer::clearFusionVolume() {
+    if (!hasFusionVolume()) return;
+    m_fusionData.clear();
+    std::vector<uint16_t>().swap(m_fusionData.data);
+    m_needsFusionUpload = true;  // releases the texture on the next frame
+    trackMemory();
+    touchScene();
+}
+
+bool Renderer::hasFusionVolume() const {
+    return m_fusionData.width > 0;
+}
+
+std::array<unsigned int, 3> Renderer::getFusionDimensions() const {
+    return {m_fusionData.width, m_fusionData.height, m_fusionData.depth};
+}
+
+glm::vec3 Renderer::getFusionSpacing() const {
+    return glm::vec3(m_fusionData.spacing_x, m_fusionData.spacing_y, m_fusionData.spacing_z);
+}
+
+void Renderer::setFusionOffset(float x, float y, float z) {
+    m_fusionOffset = glm::vec3(x, y, z);
+    touchScene();
+}
+
+glm::vec3 Renderer::getFusionOffset() const {
+    return m_fusionOffset;
+}
+
+void Renderer::setFusionColormapPreset(int presetIndex) {
+    m_fusionColormapPreset = std::max(0, std::min(9, presetIndex));
+    m_needsFusionLutUpload = true;
+    touchScene();
+}
+
+int Renderer::getFusionColormapPreset() const {
+    return m_fusionColormapPreset;
+}
+
+void Renderer::setFusionOpacity(float opacity) {
+    m_fusionOpacity = std::max(0.0f, std::min(1.0f, opacity));
+    touchScene();
+}
+
+float Renderer::getFusionOpacity() const {
+    return m_fusionOpacity;
+}
+
+void Renderer::setLayerWindow(int layer, float low, float high) {
+    if (layer < 0 || layer > 1) return;
+    low = std::max(0.0f, std::min(65534.0f, low));
+    high = std::max(low + 1.0f, std::min(65535.0f, high));
+    m_layerWindow[layer] = glm::vec2(low, high);
+    touchScene();
+}
+
+glm::vec2 Renderer::getLayerWindow(int layer) const {
+    if (layer < 0 || layer > 1) return glm::vec2(0.0f);
+    return m_layerWindow[layer];
+}
+
+void Renderer::setLayerVisible(int layer, bool visible) {
+    if (layer < 0 || layer > 1) return;
+    m_layerVisible[layer] = visible;
+    touchScene();
+}
+
+bool Renderer::isLayerVisible(int layer) const {
+    if (layer < 0 || layer > 1) return false;
+    return m_layerVisible[layer];
+}
+
+bool Renderer::fusionShown() const {
+    return m_layerVisible[1] && m_fusionTex3D != 0 && m_fusionLutTex1D != 0;
+}
+
+void Renderer::setupFusionTexture() {
+    m_needsFusionUpload = false;
+    const glm::ivec3 dims(m_fusionData.width, m_fusionData.height, m_fusionData.depth);
+    const uint64_t bytes = static_cast<uint64_t>(dims.x) * dims.y * dims.z * sizeof(uint16_t);
+    const bool fits = hasFusionVolume() && fitsDevice(bytes, m_fusionTexMemory.bytes());
+    if (!fits) {
+        if (m_fusionTex3D != 0) glDeleteTextures(1, &m_fusionTex3D);
+        m_fusionTex3D = 0;
+        m_fusionTexMemory.release();
+        if (hasFusionVolume()) noteMemoryAction("fusion volume hidden: it does not fit the VRAM budget");
+        return;
+    }
+
+    if (m_fusionTex3D == 0) glGenTextures(1, &m_fusionTex3D);
+    glBindTexture(GL_TEXTURE_3D, m_fusionTex3D);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE);
+    while (glGetError() != GL_NO_ERROR) {}
+    uploadTextureRegion(true, GL_R16, GL_RED, GL_UNSIGNED_SHORT, m_fusionData.data.data(), glm::ivec3(0), dims, dims);
+    const bool outOfMemory = glGetError() == GL_OUT_OF_MEMORY;
+    glBindTexture(GL_TEXTURE_3D, 0);
+    if (outOfMemory) {
+        glDeleteTextures(1, &m_fusionTex3D);
+        m_fusionTex3D = 0;
+        m_fusionTexMemory.release();
+        noteMemoryAction("fusion volume hidden: out of GPU memory");
+        return;
+    }
+    m_fusionTexMemory.resize(bytes);
+    if (m_fusionLutTex1D == 0) m_needsFusionLutUpload = true;
+}
+
+void Renderer::bindLayerUniforms(unsigned int program) {
+    // Windows as (low, 1 / (high - low)) in texture units, which read voxel / 65535
+    auto window = [](const glm::vec2& w) { return glm::vec2(w.x / 65535.0f, 65535.0f / (w.y - w.x)); };
+    const glm::vec2 volumeWindow = window(m_layerWindow[0]);
+    glUniform2fv(glGetUniformLocation(program, "uWindow"), 1, glm::value_ptr(volumeWindow));
+    glUniform1i(glGetUniformLocation(program, "uShowVolume"), m_layerVisible[0] ? 1 : 0);
+    // Own units even when unused, like the label samplers (see bindLabelUniforms)
+    const bool fusion = fusionShown();
+    glUniform1i(glGetUniformLocation(program, "uFusion"), 6);
+    glUniform1i(glGetUniformLocation(program, "uFusionLUT"), 7);
+    glUniform1i(glGetUniformLocation(program, "uShowFusion"), fusion ? 1 : 0);
+    if (!fusion) return;
+
+    // The fusion volume's world box: centred on the primary's (the origin), then offset
+    const glm::vec3 spacing(m_fusionData.spacing_x > 0.0 ? (float)m_fusionData.spacing_x : 1.0f,
+                            m_fusionData.spacing_y > 0.0 ? (float)m_fusionData.spacing_y : 1.0f,
+                            m_fusionData.spacing_z > 0.0 ? (float)m_fusionData.spacing_z : 1.0f);
+    const glm::vec3 size = glm::vec3(m_fusionData.width, m_fusionData.height, m_fusionData.depth) * spacing;
+    const glm::vec3 origin = m_fusionOffset - 0.5f * size;
+    const glm::vec3 scale = 1.0f / glm::max(size, glm::vec3(1e-6f));
+    const glm::vec2 fusionWindow = window(m_layerWindow[1]);
+    glUniform3fv(glGetUniformLocation(program, "uFusionOrigin"), 1, glm::value_ptr(origin));
+    glUniform3fv(glGetUniformLocation(program, "uFusionScale"), 1, glm::value_ptr(scale));
+    glUniform2fv(glGetUniformLocation(program, "uFusionWindow"), 1, glm::value_ptr(fusionWindow));
+    glUniform1f(glGetUniformLocation(program, "uFusionOpacity"), m_fusionOpacity);
+    glActiveTexture(GL_TEXTURE6);
+    glBindTexture(GL_TEXTURE_3D, m_fusionTex3D);
+    glActiveTexture(GL_TEXTURE7);
+    glBindTexture(GL_TEXTURE_1D, m_fusionLutTex1D);
+    glActiveTexture(GL_TEXTURE0);
+}
+
+// --- Axis projections ---
+
+void Renderer::setAxisProjectionsEnabled(bool enabled) {
+    m_axisProjectionsEnabled = enabled;
+    touchScene();
+}
+
+bool Renderer::getAxisProjectionsEnabled() const {
+    return m_axisProjectionsEnabled;
+}
+
+const std::vector<uint16_t>& Renderer::getAxisProjection(int axis, unsigned int& width, unsigned int& height) {
+    static const std::vector<uint16_t> kEmpty;
+    width = height = 0;
+    if (axis < 0 || axis > 2 || !isVolumeLoaded()) return kEmpty;
+    if (m_axisProjections.empty()) computeAxisProjections(nullptr);
+    width = m_axisProjections.width[axis];
+    height = m_axisProjections.height[axis];
+    return m_axisProjections.image[axis];
+}
+
+bool Renderer::hasAxisProjections() const {
+    return isVolumeLoaded() && !m_axisProjections.empty();
+}
+
+int Renderer::getProjectedAxis(int view) const {
+    const ViewState* v = getView(view);
+    return v ? v->projectedAxis : -1;
+}
+
+bool Renderer::reslice(const std::vector<VolumeOps::ObliquePlane>& planes, unsigned int width, unsigned int height,
+                       uint16_t* out, VolumeOps::Interpolation interpolation, uint16_t background) const {
+    if (!isVolumeLoaded()) return false;
+    VolumeOps::reslicePlanes(VolumeOps::VolumeView(*m_volumeData), planes, width, height, out, interpolation,
+                             background);
+    return true;
+}
+
+void Renderer::computeAxisProjections(LoadStats* stats) {
+    ScopedLoadPhase projectionPhase(stats, LoadPhase::Projection);
+    VolumeOps::computeAxisProjections(*m_volumeData, m_axisProjections, m_loadOptions.threads);
+    m_needsAxisProjectionUpload = true;
+    trackMemory();
+}
+
+void Renderer::setupAxisProjectionTextures() {
+    m_axisProjectionTexBytes = 0;
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1);
+    for (int axis = 0; axis < 3; ++axis) {
+        if (m_axisProjectionTex[axis] == 0) glGenTextures(1, &m_axisProjectionTex[axis]);
+        glBindTexture(GL_TEXTURE_2D, m_axisProjectionTex[axis]);
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE);
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_R16, m_axisProjections.width[axis], m_axisProjections.height[axis], 0,
+                     GL_RED, GL_UNSIGNED_SHORT, m_axisProjections.image[axis].data());
+        m_axisProjectionTexBytes += m_axisProjections.image[axis].size() * sizeof(uint16_t);
+    }
+    glBindTexture(GL_TEXTURE_2D, 0);
+    m_needsAxisProjectionUpload = false;
+    m_projectionTexMemory.resize(m_axisProjectionTexBytes);
+}
+
+// Projection axis (0 = Z, 1 = Y, 2 = X) the view can be drawn from, or -1. Only plain
+// MIP of the whole volume matches the projections, and only at the poses View Z/Y/X
+// set: elevation 0 with a quarter-turn azimuth, or looking straight down/up.
+int Renderer::axisProjectionFor(const ViewState& view) const {
+    if (!m_axisProjectionsEnabled || view.sliceMode || m_shadingEnabled || m_cropEnabled) return -1;
+    if (m_showLabels && !m_labels.empty()) return -1;
+    if (fusionShown()) return -1;
+    if (m_dicomWatch) return -1;  // every new slice would recompute them
+    const float tolerance = 1e-3f;
+    const float elevation = view.camera.getElevation();
+    if (std::fabs(elevation) >= 89.0f - tolerance) return 1;
+    if (std::fabs(elevation) > tolerance) return -1;
+    float azimuth = std::fmod(view.camera.getAzimuth(), 360.0f);
+    if (azimuth < 0.0f) azimuth += 360.0f;
+    const float quarter = std::round(azimuth / 90.0f);
+    if (std::fabs(azimuth - quarter * 90.0f) > tolerance) return -1;
+    return static_cast<int>(quarter) % 2 == 0 ? 0 : 2;
+}
+
+void Renderer::drawAxisProjection(ViewState& v, int axis) {
+    v.profiler.beginPhase(FramePhase::UniformSetup);
+    if (m_axisProjectionShader == 0) {
+        std::string pVSsrc = loadShaderFile("slice.vert");
+        std::string pFSsrc = loadShaderFile("axis_projection.frag");
+        const char* pvs = pVSsrc.c_str();
+        const char* pfs = pFSsrc.c_str();
+        unsigned int pvsId = glCreateShader(GL_VERTEX_SHADER);
+        glShaderSource(pvsId, 1, &pvs, nullptr);
+        glCompileShader(pvsId);
+        unsigned int pfsId = glCreateShader(GL_FRAGMENT_SHADER);
+        glShaderSource(pfsId, 1, &pfs, nullptr);
+        glCompileShader(pfsId);
+        m_axisProjectionShader = glCreateProgram();
+        glAttachShader(m_axisProjectionShader, pvsId);
+        glAttachShader(m_axisProjectionShader, pfsId);
+        glLinkProgram(m_axisProjectionShader);
+        glDeleteShader(pvsId);
+        glDeleteShader(pfsId);
+    }
+
+    // Quad through the volume centre, perpendicular to the projection axis
+    glm::vec3 boxMin, boxMax;
+    regionWorldBox(glm::ivec3(0), glm::ivec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth),
+                   boxMin, boxMax);
+    const int normal = 2 - axis;                // world component along the axis
+    const int a = normal == 0 ? 1 : 0;          // in-plane components
+    const int b = normal == 2 ? 1 : 2;
+    const float center = 0.5f * (boxMin[normal] + boxMax[normal]);
+    auto corner = [&](bool maxA, bool maxB) {
+        glm::vec3 p;
+        p[normal] = center;
+        p[a] = maxA ? boxMax[a] : boxMin[a];
+        p[b] = maxB ? boxMax[b] : boxMin[b];
+        return p;
+    };
+    const glm::vec3 quad[6] = {corner(false, false), corner(true, false), corner(true, true),
+                               corner(false, false), corner(true, true), corner(false, true)};
+
+    // The slice VAO is free: a view draws either a slice or the volume
+    if (v.sliceVAO == 0) glGenVertexArrays(1, &v.sliceVAO);
+    if (v.sliceVBO == 0) glGenBuffers(1, &v.sliceVBO);
+    glBindVertexArray(v.sliceVAO);
+    glBindBuffer(GL_ARRAY_BUFFER, v.sliceVBO);
+    glBufferData(GL_ARRAY_BUFFER, sizeof(quad), quad, GL_DYNAMIC_DRAW);
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 3 * sizeof(float), (void*)0);
+    glEnableVertexAttribArray(0);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+
+    glUseProgram(m_axisProjectionShader);
+    glm::mat4 model = glm::mat4(1.0f);
+    glm::mat4 view = v.camera.getViewMatrix();
+    glm::mat4 projection = v.camera.getProjectionMatrix();
+    glUniformMatrix4fv(glGetUniformLocation(m_axisProjectionShader, "model"), 1, GL_FALSE, glm::value_ptr(model));
+    glUniformMatrix4fv(glGetUniformLocation(m_axisProjectionShader, "view"), 1, GL_FALSE, glm::value_ptr(view));
+    glUniformMatrix4fv(glGetUniformLocation(m_axisProjectionShader, "projection"), 1, GL_FALSE, glm::value_ptr(projection));
+    glUniform3fv(glGetUniformLocation(m_axisProjectionShader, "uBoxMin"), 1, glm::value_ptr(boxMin));
+    glUniform3fv(glGetUniformLocation(m_axisProjectionShader, "uBoxMax"), 1, glm::value_ptr(boxMax));
+    glUniform1i(glGetUniformLocation(m_axisProjectionShader, "uAxis"), axis);
+
+    glActiveTexture(GL_TEXTURE0);
+    glBindTexture(GL_TEXTURE_2D, m_axisProjectionTex[axis]);
+    glUniform1i(glGetUniformLocation(m_axisProjectionShader, "uProjection"), 0);
+    if (m_lutTex1D != 0) {
+        glActiveTexture(GL_TEXTURE1);
+        glBindTexture(GL_TEXTURE_1D, m_lutTex1D);
+        glUniform1i(glGetUniformLocation(m_axisProjectionShader, "uLUT"), 1);
+    }
+    bindLayerUniforms(m_axisProjectionShader);
+    v.profiler.endPhase(FramePhase::UniformSetup);
+
+    // Like the raymarched volume: no depth test, no depth writes to occlude the mesh
+    glDisable(GL_DEPTH_TEST);
+    glDisable(GL_CULL_FACE);
+    v.profiler.beginPhase(FramePhase::VolumeDraw);
+    glDrawArrays(GL_TRIANGLES, 0, 6);
+    glBindVertexArray(0);
+    v.profiler.endPhase(FramePhase::VolumeDraw);
+    glEnable(GL_DEPTH_TEST);
+    glActiveTexture(GL_TEXTURE0);
+}
+
+size_t Renderer::extractIsosurface(float isoValue, bool useBlockIndex) {
+    if (!isVolumeLoaded()) return 0;
+    const auto start = std::chrono::steady_clock::now();
+    if (useBlockIndex && m_minMaxBlocks.empty()) {
+        VolumeOps::buildMinMaxBlocks(*m_volumeData, m_minMaxBlocks, 8, m_loadOptions.threads);
+    }
+    VolumeOps::extractIsosurface(*m_volumeData, isoValue, m_mesh,
+                                 useBlockIndex ? &m_minMaxBlocks : nullptr, m_loadOptions.threads);
+    m_needsMeshUpload = true; // uploaded in render(), when a context is current
+    trackMemory();
+    touchScene();
+    if (DataLoader::getVerbosity() >= DataLoader::VerbositySummary) {
+        const double ms = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - start).count();
+        std::cout << "      MVR INFO: Isosurface at " << isoValue << ": " << m_mesh.triangleCount() << " triangles, "
+                  << m_mesh.vertexCount() << " vertices in " << ms << " ms." << std::endl;
+    }
+    return m_mesh.triangleCount();
+}
+
+const TriangleMesh& Renderer::getMesh() const {
+    return m_mesh;
+}
+
+void Renderer::clearMesh() {
+    m_mesh.clear();
+    m_needsMeshUpload = true;
+    trackMemory();
+    touchScene();
+}
+
+bool Renderer::exportMesh(const std::string& path) const {
+    if (m_mesh.empty()) {
+        std::cerr << "      MVR Error: No isosurface to export." << std::endl;
+        return false;
+    }
+    return MeshIO::write(m_mesh, path);
+}
+
+void Renderer::setShowMesh(bool show) {
+    m_showMesh = show;
+    touchScene();
+}
+
+bool Renderer::getShowMesh() const {
+    return m_showMesh;
+}
+
+void Renderer::uploadMesh() {
+    m_needsMeshUpload = false;
+    m_meshIndexCount = m_mesh.indices.size();
+    m_meshBufferMemory.release();  // the buffers are re-specified below, or unused
+    if (m_mesh.empty()) return;
+    if (m_meshVBO == 0) glGenBuffers(1, &m_meshVBO);
+    if (m_meshEBO == 0) glGenBuffers(1, &m_meshEBO);
+
+    // Interleave position + normal
+    const size_t n = m_mesh.vertexCount();
+    const bool hasNormals = m_mesh.normals.size() == m_mesh.vertices.size();
+    std::vector<float> interleaved(n * 6, 0.0f);
+    for (size_t i = 0; i < n; ++i) {
+        std::copy_n(&m_mesh.vertices[i * 3], 3, &interleaved[i * 6]);
+        if (hasNormals) std::copy_n(&m_mesh.normals[i * 3], 3, &interleaved[i * 6 + 3]);
+    }
+    glBindBuffer(GL_ARRAY_BUFFER, m_meshVBO);
+    glBufferData(GL_ARRAY_BUFFER, interleaved.size() * sizeof(float), interleaved.data(), GL_STATIC_DRAW);
+    // Filled through GL_ARRAY_BUFFER: the element binding belongs to the views' VAOs
+    glBindBuffer(GL_ARRAY_BUFFER, m_meshEBO);
+    glBufferData(GL_ARRAY_BUFFER, m_mesh.indices.size() * sizeof(uint32_t), m_mesh.indices.data(), GL_STATIC_DRAW);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+    m_meshBufferMemory.resize(interleaved.size() * sizeof(float) + m_mesh.indices.size() * sizeof(uint32_t));
+}
+
+void Renderer::setShadingEnabled(bool enabled) {
+    m_shadingEnabled = enabled;
+    touchScene();
+}
+
+bool Renderer::isShadingEnabled() const {
+    return m_shadingEnabled;
+}
+
+void Renderer::setRenderQuality(float quality) {
+    quality = std::max(0.25f, std::min(2.0f, quality));
+    if (quality == m_renderQuality) return;
+    m_renderQuality = quality;
+    m_needsPreintegrationSetup = true;  // the table integrates over one step
+    touchScene();
+}
+
+float Renderer::getRenderQuality() const {
+    return m_renderQuality;
+}
+
+void Renderer::setPreintegrationEnabled(bool enabled) {
+    m_preintegrationEnabled = enabled;
+    touchScene();
+}
+
+bool Renderer::isPreintegrationEnabled() const {
+    return m_preintegrationEnabled;
+}
+
+void Renderer::setupProxyCube() {
+    // Create a unit cube centered at origin that will be scaled by box size via model (here model=identity, so we precompute in object-space actual positions)
+    float sx = (m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f);
+    float sy = (m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f);
+    float sz = (m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
+    float w = m_volumeData->width * sx;
+    float h = m_volumeData->height * sy;
+    float d = m_volumeData->depth * sz;
+    float x0 = -w*0.5f, x1 = w*0.5f;
+    float y0 = -h*0.5f, y1 = h*0.5f;
+    float z0 = -d*0.5f, z1 = d*0.5f;
+
+    // 12 triangles (36 verts) for cube faces
+    std::vector<float> verts = {
+        // +X
+        x1,y0,z0,  x1,y1,z0,  x1,y1,z1,
+        x1,y0,z0,  x1,y1,z1,  x1,y0,z1,
+        // -X
+        x0,y0,z0,  x0,y0,z1,  x0,y1,z1,
+        x0,y0,z0,  x0,y1,z1,  x0,y1,z0,
+        // +Y
+        x0,y1,z0,  x0,y1,z1,  x1,y1,z1,
+        x0,y1,z0,  x1,y1,z1,  x1,y1,z0,
+        // -Y
+        x0,y0,z0,  x1,y0,z0,  x1,y0,z1,
+        x0,y0,z0,  x1,y0,z1,  x0,y0,z1,
+        // +Z
+        x0,y0,z1,  x1,y0,z1,  x1,y1,z1,
+        x0,y0,z1,  x1,y1,z1,  x0,y1,z1,
+        // -Z
+        x0,y0,z0,  x0,y1,z0,  x1,y1,z0,
+        x0,y0,z0,  x1,y1,z0,  x1,y0,z0
+    };
+
+    if (m_proxyCubeVAO == 0) glGenVertexArrays(1, &m_proxyCubeVAO);
+    if (m_proxyCubeVBO == 0) glGenBuffers(1, &m_proxyCubeVBO);
+
+    glBindVertexArray(m_proxyCubeVAO);
+    glBindBuffer(GL_ARRAY_BUFFER, m_proxyCubeVBO);
+    glBufferData(GL_ARRAY_BUFFER, verts.size() * sizeof(float), verts.data(), GL_STATIC_DRAW);
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 3 * sizeof(float), (void*)0);
+    glEnableVertexAttribArray(0);
+    glBindBuffer(GL_ARRAY_BUFFER, 0);
+    glBindVertexArray(0);
+
+    // Compile volume shader (fullscreen quad approach) once; later loads reuse it
+    if (m_volumeShader != 0) return;
+    std::string volVSsrc = loadShaderFile("vol_fullscreen.vert");
+    std::string volFSsrc = loadShaderFile("vol_fullscreen.frag");
+    const char* vssc = volVSsrc.c_str();
+    const char* fssc = volFSsrc.c_str();
+
+    unsigned int vs = glCreateShader(GL_VERTEX_SHADER);
+    glShaderSource(vs, 1, &vssc, nullptr);
+    glCompileShader(vs);
+    unsigned int fs = glCreateShader(GL_FRAGMENT_SHADER);
+    glShaderSource(fs, 1, &fssc, nullptr);
+    glCompileShader(fs);
+    m_volumeShader = glCreateProgram();
+    glAttachShader(m_volumeShader, vs);
+    glAttachShader(m_volumeShader, fs);
+    glLinkProgram(m_volumeShader);
+    glDeleteShader(vs);
+    glDeleteShader(fs);
+}
+
+// --- Colormap LUT setup ---
+// static void colorPreset(int preset, float t, float& r, float& g, float& b) {
+//     // 10 simple presets approximating common colormaps
+//     t = std::max(0.0f, std::min(1.0f, t));
+//     switch (preset) {
+//         case 0: { // Grayscale
+//             r = g = b = t; break;
+//         }
+//         case 1: { // Inverted Grayscale
+//             r = g = b = 1.0f - t; break;
+//         }
+//         case 2: { // Hot
+//             float x = t;
+//             r = std::min(1.0f, 3.0f * x);
+//             g = std::min(1.0f, std::max(0.0f, 3.0f * x - 1.0f));
+//             b = std::min(1.0f, std::max(0.0f, 3.0f * x - 2.0f));
+//             break;
+//         }
+//         case 3: { // Cool
+//             r = t; g = 1.0f - t; b = 1.0f; break;
+//         }
+//         case 4: { // Spring
+//             r = 1.0f; g = t; b = 1.0f - t; break;
 //         }
 //         case 5: { // Summer
 //             r = t; g = 0.5f + 0.5f*t; b = 0.4f; break;
@@ -607,31 +2011,32 @@ void Renderer::setupFullscreenQuad() {
         -1.0f,  1.0f
     };
 
-    if (m_fullscreenQuadVAO == 0) glGenVertexArrays(1, &m_fullscreenQuadVAO);
+    // Shared buffer; each view's VAO (see ensureViewObjects) references it
     if (m_fullscreenQuadVBO == 0) glGenBuffers(1, &m_fullscreenQuadVBO);
 
-    glBindVertexArray(m_fullscreenQuadVAO);
     glBindBuffer(GL_ARRAY_BUFFER, m_fullscreenQuadVBO);
     glBufferData(GL_ARRAY_BUFFER, sizeof(quadVertices), quadVertices, GL_STATIC_DRAW);
-    glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 2 * sizeof(float), (void*)0);
-    glEnableVertexAttribArray(0);
     glBindBuffer(GL_ARRAY_BUFFER, 0);
-    glBindVertexArray(0);
 }
 
 void Renderer::setupColormapLUT() {
+    uploadColormap(m_lutTex1D, m_colormapPreset);
+    trackTransferTextures();
+}
+
+void Renderer::uploadColormap(unsigned int& texture, int preset) {
     const int N = 256;
     std::vector<unsigned char> data(N*4);
     for (int i=0;i<N;++i){
         float t = i / float(N-1);
-        float r,g,b; colorPreset(m_colormapPreset, t, r, g, b);
+        float r,g,b; colorPreset(preset, t, r, g, b);
         data[4*i+0] = (unsigned char)std::round(255.0f * r);
         data[4*i+1] = (unsigned char)std::round(255.0f * g);
         data[4*i+2] = (unsigned char)std::round(255.0f * b);
         data[4*i+3] = 255;
     }
-    if (m_lutTex1D == 0) glGenTextures(1, &m_lutTex1D);
-    glBindTexture(GL_TEXTURE_1D, m_lutTex1D);
+    if (texture == 0) glGenTextures(1, &texture);
+    glBindTexture(GL_TEXTURE_1D, texture);
     glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
     glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
     glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
@@ -640,64 +2045,204 @@ void Renderer::setupColormapLUT() {
     glBindTexture(GL_TEXTURE_1D, 0);
 }
 
-void Renderer::setShowBoundingBox(bool show) { m_showBoundingBox = show; }
+void Renderer::trackTransferTextures() {
+    const uint64_t lutBytes = 256 * 4;
+    m_transferTexMemory.resize((m_lutTex1D != 0 ? lutBytes : 0) + (m_fusionLutTex1D != 0 ? lutBytes : 0) +
+                               (m_preintegrationTex2D != 0 ? 256 * 256 * 8 : 0));  // RGBA16F table
+}
+
+void Renderer::setupPreintegrationTable() {
+    // Same colours as the LUT; one step's optical depth at s = 1 is density * step
+    const int N = 256;
+    std::vector<glm::vec3> colors(N);
+    for (int i = 0; i < N; ++i) colorPreset(m_colormapPreset, i / float(N - 1), colors[i].r, colors[i].g, colors[i].b);
+    std::vector<float> table;
+    VolumeOps::buildPreintegrationTable(colors, kShadedOpticalDepth / (kRaySamplesPerDiagonal * m_renderQuality), table);
+
+    if (m_preintegrationTex2D == 0) glGenTextures(1, &m_preintegrationTex2D);
+    glBindTexture(GL_TEXTURE_2D, m_preintegrationTex2D);
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR);
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR);
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE);
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE);
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 4);
+    // Half floats keep the faint opacities of thin segments that RGBA8 would round to 0
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA16F, N, N, 0, GL_RGBA, GL_FLOAT, table.data());
+    glBindTexture(GL_TEXTURE_2D, 0);
+    m_needsPreintegrationSetup = false;
+    trackTransferTextures();
+}
+
+void Renderer::setShowBoundingBox(bool show) { m_showBoundingBox = show; touchScene(); }
 
 void Renderer::setColormapPreset(int presetIndex) {
     m_colormapPreset = std::max(0, std::min(9, presetIndex));
     // Mark for deferred rebuild next frame when context is current
     m_needsGLSetup = true;
+    m_needsPreintegrationSetup = true;
+    touchScene();
+}
+
+void Renderer::camera_rotate(float dx, float dy, int view) {
+    if (ViewState* v = getView(view)) { v->camera.rotate(dx, dy); v->dirty = true; }
 }
 
-void Renderer::camera_rotate(float dx, float dy) {
-    m_camera.rotate(dx, dy);
+void Renderer::camera_zoom(float delta, int view) {
+    if (ViewState* v = getView(view)) { v->camera.zoom(delta); v->dirty = true; }
 }
 
-void Renderer::camera_zoom(float delta) {
-    m_camera.zoom(delta);
+void Renderer::set_camera_angles(float azimuthDeg, float elevationDeg, int view) {
+    if (ViewState* v = getView(view)) { v->camera.setAngles(azimuthDeg, elevationDeg); v->dirty = true; }
 }
 
-void Renderer::set_camera_angles(float azimuthDeg, float elevationDeg) {
-    m_camera.setAngles(azimuthDeg, elevationDeg);
+glm::vec2 Renderer::get_camera_angles(int view) const {
+    const ViewState* v = getView(view);
+    return v ? glm::vec2(v->camera.getAzimuth(), v->camera.getElevation()) : glm::vec2(0.0f);
+}
+
+Camera Renderer::getCamera(int view) const {
+    const ViewState* v = getView(view);
+    return v ? v->camera : Camera();
 }
 
 void Renderer::setBackgroundColor(float r, float g, float b) {
     m_bgColor = glm::vec3(r, g, b);
+    touchScene();
 }
 
 void Renderer::setBoundingBoxScale(float scale) {
     m_bboxScale = std::max(0.1f, std::min(5.0f, scale));
     m_needsGLSetup = true; // Rebuild bbox VBO with new size next frame
+    touchScene();
+}
+
+void Renderer::frameCameraToBox(int view) {
+    ViewState* v = getView(view);
+    if (!v || !isVolumeLoaded()) return;
+    // Unscaled physical box of the volume, or of the crop box
+    glm::ivec3 lo, hi;
+    glm::vec3 boxMin, boxMax;
+    visibleRegion(lo, hi);
+    regionWorldBox(lo, hi, boxMin, boxMax);
+    glm::vec3 size = boxMax - boxMin;
+    v->camera.frameBox(size.x, size.y, size.z, 0.5f * (boxMin + boxMax));
+    v->dirty = true;
+}
+
+// --- Region of interest ---
+
+glm::vec3 Renderer::voxelSpacing() const {
+    return glm::vec3(m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f,
+                     m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f,
+                     m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
 }
 
-void Renderer::frameCameraToBox() {
+void Renderer::visibleRegion(glm::ivec3& lo, glm::ivec3& hi) const {
+    if (m_cropEnabled) {
+        lo = m_cropMin;
+        hi = m_cropMax;
+    } else {
+        lo = glm::ivec3(0);
+        hi = glm::ivec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth);
+    }
+}
+
+void Renderer::textureRegion(glm::ivec3& lo, glm::ivec3& hi) const {
+    if (m_cropUpload) {
+        visibleRegion(lo, hi);
+    } else {
+        lo = glm::ivec3(0);
+        hi = glm::ivec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth);
+    }
+}
+
+void Renderer::regionWorldBox(const glm::ivec3& lo, const glm::ivec3& hi, glm::vec3& boxMin, glm::vec3& boxMax) const {
+    glm::vec3 spacing = voxelSpacing();
+    glm::vec3 half = 0.5f * glm::vec3(m_volumeData->width, m_volumeData->height, m_volumeData->depth) * spacing;
+    boxMin = glm::vec3(lo) * spacing - half;
+    boxMax = glm::vec3(hi) * spacing - half;
+}
+
+void Renderer::setCropBox(int minX, int minY, int minZ, int maxX, int maxY, int maxZ) {
     if (!isVolumeLoaded()) return;
-    // Compute unscaled physical box of the volume
-    float sx = (m_volumeData->spacing_x > 0.0 ? (float)m_volumeData->spacing_x : 1.0f);
-    float sy = (m_volumeData->spacing_y > 0.0 ? (float)m_volumeData->spacing_y : 1.0f);
-    float sz = (m_volumeData->spacing_z > 0.0 ? (float)m_volumeData->spacing_z : 1.0f);
-    float w = (float)m_volumeData->width * sx;
-    float h = (float)m_volumeData->height * sy;
-    float d = (float)m_volumeData->depth * sz;
-    m_camera.frameBox(w, h, d);
+    const glm::ivec3 dims(m_volumeData->width, m_volumeData->height, m_volumeData->depth);
+    glm::ivec3 lo(minX, minY, minZ), hi(maxX, maxY, maxZ);
+    for (int a = 0; a < 3; ++a) {
+        lo[a] = std::max(0, std::min(lo[a], dims[a] - 1));
+        hi[a] = std::max(lo[a] + 1, std::min(hi[a], dims[a]));
+    }
+    const bool whole = lo == glm::ivec3(0) && hi == dims;
+    if (whole == !m_cropEnabled && (whole || (lo == m_cropMin && hi == m_cropMax))) return;
+    m_cropEnabled = !whole;
+    m_cropMin = lo;
+    m_cropMax = hi;
+    m_needsCropUpdate = true;
+    touchScene();
+}
+
+void Renderer::clearCropBox() {
+    if (!m_cropEnabled) return;
+    m_cropEnabled = false;
+    m_needsCropUpdate = true;
+    touchScene();
+}
+
+bool Renderer::hasCropBox() const {
+    return m_cropEnabled;
+}
+
+std::array<int, 6> Renderer::getCropBox() const {
+    if (!isVolumeLoaded()) return {0, 0, 0, 0, 0, 0};
+    glm::ivec3 lo, hi;
+    visibleRegion(lo, hi);
+    return {lo.x, lo.y, lo.z, hi.x, hi.y, hi.z};
+}
+
+void Renderer::setCropUploadEnabled(bool enabled) {
+    if (m_cropUpload == enabled) return;
+    m_cropUpload = enabled;
+    m_needsCropUpdate = true;
+    touchScene();
+}
+
+bool Renderer::getCropUploadEnabled() const {
+    return m_cropUpload;
 }
 
 bool Renderer::loadVolume(const std::string& path) {
-    std::cout << "      MVR INFO:: Attempting to load volume from path: " << path << std::endl;
+    const bool info = DataLoader::getVerbosity() >= DataLoader::VerbositySummary;
+    const auto loadStart = std::chrono::steady_clock::now();
+    m_lastLoadStats.clear();
+    m_lastLoadStats.path = path;
+    m_timeSeries.reset();
+    m_timeFrame = 0;
+    m_dicomWatch.reset();
+
+    if (info) std::cout << "      MVR INFO:: Attempting to load volume from path: " << path << std::endl;
     if (!fs::exists(path)) {
         std::cerr << "      MVR ERROR: Path does not exist: " << path << std::endl;
         return false;
     }
-    m_volumeData->clear();
+    // Release the previous volume first so it does not add to the new load's peak
+    releaseVolumeState();
+    DataLoader::LoadOptions options = m_loadOptions;
+    options.fitHostBudget = true;
 
     bool success = false;
     if (fs::is_directory(path)) {
-        std::cout << "      MVR INFO:: Path is a directory, attempting to load as DICOM series." << std::endl;
-        success = DataLoader::loadDICOM(path, *m_volumeData);
+        if (info) std::cout << "      MVR INFO:: Path is a directory, attempting to load as DICOM series." << std::endl;
+        m_lastLoadStats.format = "dicom";
+        success = DataLoader::loadDICOM(path, *m_volumeData, &m_lastLoadStats, m_cacheDir, options);
     } else if (fs::is_regular_file(path)) {
-        std::cout << "      MVR INFO: Path is a file, attempting to load." << std::endl;
+        if (info) std::cout << "      MVR INFO: Path is a file, attempting to load." << std::endl;
         std::string extension = fs::path(path).extension().string();
         if (extension == ".nii" || extension == ".gz") {
-            success = DataLoader::loadNIFTI(path, *m_volumeData);
+            m_lastLoadStats.format = "nifti";
+            success = loadTimeSeries(path) ||
+                      DataLoader::loadNIFTI(path, *m_volumeData, &m_lastLoadStats, options);
+        } else if (extension == ChunkStore::kExtension) {
+            m_lastLoadStats.format = "chunked";
+            success = DataLoader::loadChunkStore(path, *m_volumeData, &m_lastLoadStats, options);
         } else {
             std::cerr << "      MVR ERROR: Unsupported file type: " << extension << std::endl;
         }
@@ -705,8 +2250,42 @@ bool Renderer::loadVolume(const std::string& path) {
         std::cerr << "      MVR ERROR: Path is not a regular file or directory." << std::endl;
     }
 
+    return finishLoad(success, loadStart);
+}
+
+bool Renderer::finishLoad(bool success, std::chrono::steady_clock::time_point loadStart) {
+    // The previous volume's derived data went in releaseVolumeState(), before loading
+    m_needsGradientUpload = success;
+    if (success) {
+        m_cropEnabled = false;  // voxel bounds of the previous volume
+        m_needsCropUpdate = false;
+    }
+    m_memoryActions.clear();
+    if (success && m_lastLoadStats.reduction > 1) {
+        noteMemoryAction("downsampled the volume " + std::to_string(m_lastLoadStats.reduction) +
+                         "x per axis while loading, to " + std::to_string(m_volumeData->width) + "x" +
+                         std::to_string(m_volumeData->height) + "x" + std::to_string(m_volumeData->depth));
+    }
+    if (success) enforceHostBudget();
+    if (success && m_shadingEnabled && !m_dicomWatch &&
+        MemoryBudget::fits(MemoryBudget::Pool::Host, m_volumeData->data.size() * VolumeOps::kGradientBytesPerVoxel)) {
+        // Once per load, on the CPU; uploaded with the scalar texture on the next frame
+        computeGradients(&m_lastLoadStats);
+    }
+    if (success && m_axisProjectionsEnabled && !m_dicomWatch) {
+        // One pass over the volume; the textures are created on the first aligned frame
+        computeAxisProjections(&m_lastLoadStats);
+    }
+
+    trackMemory();
+
+    m_lastLoadStats.success = success;
+    m_lastLoadStats.totalMs = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - loadStart).count();
+
     if (success) {
-        std::cout << "      MVR INFO: Volume loaded successfully." << std::endl;
+        if (DataLoader::getVerbosity() >= DataLoader::VerbositySummary) {
+            std::cout << "      MVR INFO: Volume loaded successfully in " << m_lastLoadStats.totalMs << " ms." << std::endl;
+        }
     } else {
         std::cerr << "      MVR ERROR: Failed to load volume." << std::endl;
     }
@@ -715,12 +2294,369 @@ bool Renderer::loadVolume(const std::string& path) {
     // Defer GL resource setup until render(), when the QOpenGLWidget context is current.
     if (success) {
         m_needsGLSetup = true;
-        m_shouldFrameCameraNext = true; // Frame camera on first bbox build after a successful load
+        m_needsUploadTiming = true;   // record the first texture upload into m_lastLoadStats
+        // Frame every view's camera on its first frame after a successful load
+        for (auto& v : m_views) {
+            if (v) v->shouldFrameCamera = true;
+        }
+        touchScene();
     }
 
     return success;
 }
 
+void Renderer::setCacheDirectory(const std::string& dir) {
+    m_cacheDir = dir;
+}
+
+const std::string& Renderer::getCacheDirectory() const {
+    return m_cacheDir;
+}
+
+bool Renderer::saveChunkStore(const std::string& path, unsigned int chunkSize, unsigned int levels,
+                              int compression) const {
+    if (!isVolumeLoaded()) {
+        std::cerr << "      MVR Error: No volume to save." << std::endl;
+        return false;
+    }
+    ChunkStore::WriteOptions options;
+    options.chunkSize = chunkSize;
+    options.levels = levels;
+    options.compression = compression;
+    options.threads = m_loadOptions.threads;
+    return ChunkStore::write(path, *m_volumeData, options);
+}
+
+const std::vector<DataLoader::DicomSeriesInfo>& Renderer::listDICOMSeries(const std::string& directoryPath) {
+    m_lastLoadStats.clear();
+    m_lastLoadStats.path = directoryPath;
+    m_lastLoadStats.format = "dicom";
+    m_seriesCacheSignature = 0;
+    m_seriesCache = DataLoader::scanDICOMSeries(directoryPath, m_cacheDir, &m_lastLoadStats, &m_seriesCacheSignature);
+    m_seriesCacheRoot = directoryPath;
+    return m_seriesCache;
+}
+
+bool Renderer::loadDICOMSeries(const std::string& directoryPath, const std::string& seriesKey) {
+    const auto loadStart = std::chrono::steady_clock::now();
+    m_lastLoadStats.clear();
+    // Reuse the series list from listDICOMSeries() for the same root while a stat() sweep
+    // finds the same files, mtimes and sizes; otherwise rescan.
+    bool current = false;
+    if (m_seriesCacheRoot == directoryPath) {
+        ScopedLoadPhase scanPhase(&m_lastLoadStats, LoadPhase::Scan);
+        current = m_seriesCacheSignature != 0 &&
+                  DataLoader::dicomTreeSignature(directoryPath) == m_seriesCacheSignature;
+    }
+    if (!current) {
+        listDICOMSeries(directoryPath);
+    }
+    m_lastLoadStats.path = directoryPath;
+    m_lastLoadStats.format = "dicom";
+
+    auto it = std::find_if(m_seriesCache.begin(), m_seriesCache.end(),
+                           [&](const DataLoader::DicomSeriesInfo& s){ return s.key == seriesKey; });
+    if (it == m_seriesCache.end()) {
+        std::cerr << "      MVR ERROR: DICOM series not found: " << seriesKey << std::endl;
+        return false;
+    }
+    m_timeSeries.reset();
+    m_timeFrame = 0;
+    m_dicomWatch.reset();
+    releaseVolumeState();
+    DataLoader::LoadOptions options = m_loadOptions;
+    options.fitHostBudget = true;
+    bool success = DataLoader::loadDICOMSeries(*it, *m_volumeData, &m_lastLoadStats, options);
+    return finishLoad(success, loadStart);
+}
+
+const LoadStats& Renderer::getLoadStats() const {
+    return m_lastLoadStats;
+}
+
+void Renderer::setLoadVerbosity(int level) {
+    DataLoader::setVerbosity(level);
+}
+
+int Renderer::getLoadVerbosity() const {
+    return DataLoader::getVerbosity();
+}
+
+void Renderer::setParallelGzip(bool enabled) {
+    m_loadOptions.parallelGzip = enabled;
+}
+
+bool Renderer::getParallelGzip() const {
+    return m_loadOptions.parallelGzip;
+}
+
+void Renderer::setLoadThreads(unsigned int threads) {
+    m_loadOptions.threads = threads;
+}
+
+unsigned int Renderer::getLoadThreads() const {
+    return m_loadOptions.threads;
+}
+
+void Renderer::setResampleInterpolation(int mode) {
+    m_loadOptions.interpolation = mode == 0 ? VolumeOps::Interpolation::Nearest : VolumeOps::Interpolation::Linear;
+}
+
+int Renderer::getResampleInterpolation() const {
+    return static_cast<int>(m_loadOptions.interpolation);
+}
+
+void Renderer::setResampleIsotropic(bool enabled) {
+    m_loadOptions.isotropic = enabled;
+}
+
+bool Renderer::getResampleIsotropic() const {
+    return m_loadOptions.isotropic;
+}
+
+// Opens a 4D NIfTI file as a time series and shows its first frame.
+// Returns false for 3D files (and unsupported datatypes) so loadNIFTI handles them.
+bool Renderer::loadTimeSeries(const std::string& path) {
+    ScopedLoadPhase headerPhase(&m_lastLoadStats, LoadPhase::HeaderParse);
+    if (NiftiTimeSeries::probeFrameCount(path) < 2) return false;
+    auto series = std::make_unique<NiftiTimeSeries>();
+    if (!series->open(path, static_cast<size_t>(m_timeFrameCache))) return false;
+    headerPhase.stop();
+
+    ScopedLoadPhase decodePhase(&m_lastLoadStats, LoadPhase::Decode);
+    NiftiTimeSeries::Frame frame = series->acquire(0);
+    decodePhase.stop();
+    if (!frame) return false;
+
+    series->describe(*m_volumeData);
+    m_volumeData->data = *frame;
+    m_lastLoadStats.filesScanned += 1;
+    m_lastLoadStats.filesParsed += 1;
+    m_lastLoadStats.bytesOutput += m_volumeData->data.size() * sizeof(uint16_t);
+    m_lastLoadStats.dataType = DataLoader::niftiDataTypeName(series->datatype());
+    std::error_code ec;
+    auto size = fs::file_size(path, ec);
+    if (!ec) m_lastLoadStats.bytesRead += static_cast<uint64_t>(size);
+
+    m_timeSeries = std::move(series);
+    m_timeFrame = 0;
+    return true;
+}
+
+int Renderer::getTimeFrameCount() const {
+    if (m_timeSeries) return static_cast<int>(m_timeSeries->frameCount());
+    return isVolumeLoaded() ? 1 : 0;
+}
+
+int Renderer::getTimeFrame() const {
+    return m_timeFrame;
+}
+
+bool Renderer::setTimeFrame(int frame) {
+    if (!m_timeSeries) return frame == 0;
+    const int count = static_cast<int>(m_timeSeries->frameCount());
+    frame = std::max(0, std::min(frame, count - 1));
+    if (frame == m_timeFrame) return true;
+
+    NiftiTimeSeries::Frame data = m_timeSeries->acquire(static_cast<size_t>(frame));
+    if (!data || data->size() != m_volumeData->data.size()) {
+        std::cerr << "      MVR ERROR: Failed to read time frame " << frame << std::endl;
+        return false;
+    }
+    std::copy(data->begin(), data->end(), m_volumeData->data.begin());
+    m_timeFrame = frame;
+    m_needsFrameUpload = true; // texture contents only, uploaded in render()
+    m_gradientsValid = false;  // gradients of the new frame are computed in render() if shading
+    m_needsGradientUpload = true;
+    m_minMaxBlocks = VolumeOps::MinMaxBlocks{};
+    m_axisProjections.clear(); // recomputed when an aligned view or Python needs them
+    trackMemory();
+    touchScene();
+    return true;
+}
+
+double Renderer::getTimeFrameInterval() const {
+    return m_timeSeries ? m_timeSeries->frameInterval() : 0.0;
+}
+
+void Renderer::setTimeFrameCacheSize(int frames) {
+    m_timeFrameCache = std::max(2, frames);
+    if (m_timeSeries) m_timeSeries->setCacheFrames(static_cast<size_t>(m_timeFrameCache));
+}
+
+int Renderer::getTimeFrameCacheSize() const {
+    return m_timeFrameCache;
+}
+
+// --- Live DICOM watch ---
+
+bool Renderer::startDicomWatch(const std::string& directoryPath, bool polling, int pollIntervalMs) {
+    m_dicomWatch.reset();
+    auto watch = std::make_unique<DicomWatch>();
+    if (!watch->start(directoryPath, polling, pollIntervalMs)) return false;
+
+    // Replaces the loaded volume; the first slices to arrive finish the "load"
+    m_lastLoadStats.clear();
+    m_lastLoadStats.path = directoryPath;
+    m_lastLoadStats.format = "dicom";
+    m_timeSeries.reset();
+    m_timeFrame = 0;
+    releaseVolumeState();
+    m_watchPositions.clear();
+    m_watchDirtyZ = -1;
+    m_dicomWatch = std::move(watch);
+    touchScene();
+    return true;
+}
+
+void Renderer::stopDicomWatch() {
+    if (!m_dicomWatch) return;
+    pollDicomWatch();  // slices already decoded
+    m_dicomWatch.reset();
+    if (!isVolumeLoaded()) return;
+    // Trim the texture to the volume and rebuild what was deferred while slices arrived
+    if (m_texDepthCapacity > m_texSize.z) m_needsVolumeTextureSetup = true;
+    m_needsGradientUpload = true;
+    touchScene();
+}
+
+bool Renderer::isDicomWatching() const {
+    return m_dicomWatch != nullptr;
+}
+
+bool Renderer::isDicomWatchPolling() const {
+    return m_dicomWatch && m_dicomWatch->isPolling();
+}
+
+int Renderer::pollDicomWatch() {
+    if (!m_dicomWatch) return 0;
+    std::vector<DicomWatch::Slice> slices;
+    if (m_dicomWatch->takeSlices(slices) == 0) return 0;
+    const auto start = std::chrono::steady_clock::now();
+
+    VolumeData& volume = *m_volumeData;
+    const bool first = !isVolumeLoaded();
+    if (first) {
+        // The first slice fixes the in-plane grid
+        const DicomWatch::Slice& slice = slices.front();
+        volume.clear();
+        volume.width = slice.image.width;
+        volume.height = slice.image.height;
+        volume.spacing_x = slice.image.spacingX;
+        volume.spacing_y = slice.image.spacingY;
+        m_watchPositions.clear();
+        m_watchThickness = slice.header.sliceThickness;
+        m_watchPositioned = slice.header.hasPosition;
+    }
+
+    const size_t sliceSize = static_cast<size_t>(volume.width) * volume.height;
+    int dirty = -1;
+    int inserted = 0;
+    for (const DicomWatch::Slice& slice : slices) {
+        const VolumeOps::SliceImage& image = slice.image;
+        if (image.width != volume.width || image.height != volume.height) {
+            std::cerr << "      MVR WARN: Skipping slice with mismatched size " << image.width << "x"
+                      << image.height << ": " << slice.header.path << std::endl;
+            continue;
+        }
+        // Sorted along the normal: appending at the end moves no other slice, and a
+        // slice at a position already held replaces it
+        auto it = std::lower_bound(m_watchPositions.begin(), m_watchPositions.end(), image.position);
+        const size_t z = static_cast<size_t>(it - m_watchPositions.begin());
+        if (it != m_watchPositions.end() && *it == image.position) {
+            std::copy(image.pixels.begin(), image.pixels.end(), volume.data.begin() + z * sliceSize);
+        } else {
+            m_watchPositions.insert(it, image.position);
+            volume.data.insert(volume.data.begin() + z * sliceSize, image.pixels.begin(), image.pixels.end());
+            volume.depth += 1;
+        }
+        dirty = dirty < 0 ? static_cast<int>(z) : std::min(dirty, static_cast<int>(z));
+        inserted += 1;
+    }
+    if (inserted == 0) return 0;
+
+    const size_t count = m_watchPositions.size();
+    double spacing = m_watchThickness;
+    if (count > 1 && m_watchPositioned) {
+        spacing = (m_watchPositions.back() - m_watchPositions.front()) / static_cast<double>(count - 1);
+    }
+    volume.spacing_z = spacing > 0.0 ? spacing : 1.0;
+
+    if (first) {
+        m_lastLoadStats.filesParsed += static_cast<uint64_t>(inserted);
+        m_lastLoadStats.bytesOutput += volume.data.size() * sizeof(uint16_t);
+        finishLoad(true, start);
+        return inserted;
+    }
+    m_watchDirtyZ = m_watchDirtyZ < 0 ? dirty : std::min(m_watchDirtyZ, dirty);
+    // Whole-volume data is stale; it is recomputed on demand, or when the watch stops
+    m_gradientsValid = false;
+    std::vector<uint8_t>().swap(m_gradientData);
+    m_needsGradientUpload = true;
+    m_minMaxBlocks = VolumeOps::MinMaxBlocks{};
+    m_axisProjections.clear();
+    trackMemory();
+    touchScene();
+    return inserted;
+}
+
+// Re-sends slices [m_watchDirtyZ, depth) into the volume texture. The texture grows by
+// doubling its depth; the shaders map over the whole allocation (textureExtent), so the
+// unused top needs no special case.
+void Renderer::uploadWatchSlices() {
+    const int first = m_watchDirtyZ;
+    m_watchDirtyZ = -1;
+    if (!isVolumeLoaded() || m_volumeTex3D == 0) return;
+    setupBoundingBox();  // depth and spacing changed
+    if (m_gradientTex3D != 0) {
+        // Holds the old region; rebuilt when the watch stops
+        glDeleteTextures(1, &m_gradientTex3D);
+        m_gradientTex3D = 0;
+        m_gradientTexBytes = 0;
+        m_gradientTexMemory.release();
+    }
+
+    glm::ivec3 lo, hi;
+    textureRegion(lo, hi);
+    const glm::ivec3 full(m_volumeData->width, m_volumeData->height, m_volumeData->depth);
+    const bool inPlace = m_volumeTexBits == 16 && m_volumeTexFactor == 1 && !m_cropUpload &&
+                         lo == glm::ivec3(0) && m_texSize.x == full.x && m_texSize.y == full.y;
+    if (!inPlace) {
+        setupVolumeTexture();  // reduced or cropped textures are rebuilt whole
+        return;
+    }
+
+    int from = std::min(first, full.z - 1);
+    glBindTexture(GL_TEXTURE_3D, m_volumeTex3D);
+    if (full.z > m_texDepthCapacity) {
+        const int capacity = std::max(full.z, 2 * m_texDepthCapacity);
+        const uint64_t bytes = static_cast<uint64_t>(full.x) * full.y * capacity * sizeof(uint16_t);
+        bool outOfMemory = !fitsDevice(bytes, m_volumeTexMemory.bytes());
+        if (!outOfMemory) {
+            while (glGetError() != GL_NO_ERROR) {}
+            glTexImage3D(GL_TEXTURE_3D, 0, GL_R16, full.x, full.y, capacity, 0, GL_RED, GL_UNSIGNED_SHORT, nullptr);
+            outOfMemory = glGetError() == GL_OUT_OF_MEMORY;
+        }
+        if (outOfMemory) {
+            glBindTexture(GL_TEXTURE_3D, 0);
+            setupVolumeTexture();  // exact size, degraded to fit
+            return;
+        }
+        m_texDepthCapacity = capacity;
+        m_volumeTexMemory.resize(bytes);
+        from = 0;
+    }
+    uploadTextureRegion(false, GL_R16, GL_RED, GL_UNSIGNED_SHORT, m_volumeData->data.data(), glm::ivec3(0, 0, from),
+                        glm::ivec3(full.x, full.y, full.z - from), full, from);
+    if (full.z < m_texDepthCapacity) {
+        // Repeat the last slice above it, so filtering at the top clamps as at the other faces
+        uploadTextureRegion(false, GL_R16, GL_RED, GL_UNSIGNED_SHORT, m_volumeData->data.data(),
+                            glm::ivec3(0, 0, full.z - 1), glm::ivec3(full.x, full.y, 1), full, full.z);
+    }
+    glBindTexture(GL_TEXTURE_3D, 0);
+    m_texSize = full;
+}
+
 // --- New Lightweight Getter Implementations ---
 
 bool Renderer::isVolumeLoaded() const {
@@ -754,3 +2690,34 @@ double Renderer::getVolumeSpacingZ() const {
 VolumeData* Renderer::getVolume() {
     return m_volumeData.get();
 }
+
+// --- Frame profiler ---
+
+void Renderer::setProfilingEnabled(bool enabled) {
+    m_profilingEnabled = enabled;
+    for (auto& v : m_views) {
+        if (v) v->profiler.setEnabled(enabled);
+    }
+}
+
+bool Renderer::isProfilingEnabled() const {
+    return m_profilingEnabled;
+}
+
+FrameStats Renderer::getFrameStats(int view) const {
+    const ViewState* v = getView(view);
+    return v ? v->profiler.getStats() : FrameStats{};
+}
+
+void Renderer::resetFrameStats(int view) {
+    if (ViewState* v = getView(view)) v->profiler.reset();
+}
+
+bool Renderer::exportFrameTrace(const std::string& path, int view) const {
+    const ViewState* v = getView(view);
+    if (!v) {
+        std::cerr << "      MVR ERROR: No view " << view << " to export a frame trace from." << std::endl;
+        return false;
+    }
+    return v->profiler.writeChromeTrace(path);
+}
@@ -0,0 +1,322 @@
+// backend/src/Resample.cpp
+
+#include "../include/VolumeOps.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+
+namespace VolumeOps {
+
+namespace {
+
+// Elements per work item of the z pass (256 KB of uint16 output).
+constexpr size_t kBlendChunk = 128 * 1024;
+
+// Where each output sample along one axis reads from: (1-w)*src[i0] + w*src[i1].
+// i0 < 0 marks samples outside the source; they are written as 0.
+struct AxisMap {
+    std::vector<int32_t> i0;
+    std::vector<int32_t> i1;
+    std::vector<float> w;
+    bool identity = false;
+
+    size_t size() const { return i0.size(); }
+};
+
+// coord(i) is the source coordinate (in source samples) of output sample i.
+template <typename Coord>
+AxisMap makeAxisMap(size_t outCount, size_t srcCount, Interpolation interpolation, Coord coord) {
+    AxisMap map;
+    map.i0.resize(outCount);
+    map.i1.resize(outCount);
+    map.w.resize(outCount);
+    const double last = static_cast<double>(srcCount) - 1.0;
+    bool identity = outCount == srcCount;
+    for (size_t i = 0; i < outCount; ++i) {
+        double c = coord(i);
+        // Half a sample of slack at the borders, so edge samples clamp instead of vanishing
+        if (srcCount == 0 || c < -0.5 || c > last + 0.5) {
+            map.i0[i] = map.i1[i] = -1;
+            map.w[i] = 0.0f;
+            identity = false;
+            continue;
+        }
+        c = std::min(std::max(c, 0.0), last);
+        int32_t a;
+        float w = 0.0f;
+        if (interpolation == Interpolation::Nearest) {
+            a = static_cast<int32_t>(std::lround(c));
+        } else {
+            a = static_cast<int32_t>(std::floor(c));
+            double f = c - a;
+            // Snap near-integer coordinates so aligned grids copy exactly
+            if (f < 1e-4) f = 0.0;
+            else if (f > 1.0 - 1e-4) { ++a; f = 0.0; }
+            w = static_cast<float>(f);
+        }
+        a = std::min(a, static_cast<int32_t>(srcCount) - 1);
+        map.i0[i] = a;
+        map.i1[i] = std::min(a + 1, static_cast<int32_t>(srcCount) - 1);
+        map.w[i] = w;
+        if (a != static_cast<int32_t>(i) || w != 0.0f) identity = false;
+    }
+    map.identity = identity;
+    return map;
+}
+
+inline uint16_t toU16(float v) {
+    // Inputs are uint16, so a blend never leaves the range; only round
+    return static_cast<uint16_t>(v + 0.5f);
+}
+
+// Blends two rows of n samples: dst = a + w*(b-a).
+template <typename T>
+inline void blendRow(const T* a, const T* b, float w, size_t n, uint16_t* dst) {
+    for (size_t x = 0; x < n; ++x) {
+        const float fa = static_cast<float>(a[x]);
+        dst[x] = toU16(fa + w * (static_cast<float>(b[x]) - fa));
+    }
+}
+
+// Second (y) pass over rows of the x-resampled plane.
+template <typename T>
+void resampleColumns(const T* rows, size_t rowLength, const AxisMap& my, uint16_t* dst) {
+    for (size_t y = 0; y < my.size(); ++y) {
+        uint16_t* out = dst + y * rowLength;
+        if (my.i0[y] < 0) {
+            std::fill(out, out + rowLength, 0);
+            continue;
+        }
+        const T* a = rows + static_cast<size_t>(my.i0[y]) * rowLength;
+        if (my.w[y] == 0.0f) {
+            for (size_t x = 0; x < rowLength; ++x) out[x] = static_cast<uint16_t>(a[x]);
+            continue;
+        }
+        blendRow(a, rows + static_cast<size_t>(my.i1[y]) * rowLength, my.w[y], rowLength, out);
+    }
+}
+
+// Resamples one plane: x along each source row into `tmp`, then y across rows.
+void resamplePlane(const uint16_t* src, size_t srcWidth, size_t srcHeight,
+                   const AxisMap& mx, const AxisMap& my, uint16_t* dst, std::vector<float>& tmp) {
+    const size_t outWidth = mx.size();
+    if (mx.identity && my.identity) {
+        std::memcpy(dst, src, srcWidth * srcHeight * sizeof(uint16_t));
+        return;
+    }
+    if (mx.identity) {
+        resampleColumns(src, srcWidth, my, dst);
+        return;
+    }
+    // Only the source rows some output row reads are needed
+    tmp.resize(outWidth * srcHeight);
+    int32_t rowMin = static_cast<int32_t>(srcHeight), rowMax = -1;
+    for (size_t y = 0; y < my.size(); ++y) {
+        if (my.i0[y] < 0) continue;
+        rowMin = std::min(rowMin, my.i0[y]);
+        rowMax = std::max(rowMax, my.i1[y]);
+    }
+    for (int32_t r = rowMin; r <= rowMax; ++r) {
+        const uint16_t* in = src + static_cast<size_t>(r) * srcWidth;
+        float* out = tmp.data() + static_cast<size_t>(r) * outWidth;
+        for (size_t x = 0; x < outWidth; ++x) {
+            if (mx.i0[x] < 0) { out[x] = 0.0f; continue; }
+            const float a = in[mx.i0[x]];
+            out[x] = a + mx.w[x] * (static_cast<float>(in[mx.i1[x]]) - a);
+        }
+    }
+    if (my.identity) {
+        for (size_t i = 0; i < outWidth * srcHeight; ++i) dst[i] = toU16(tmp[i]);
+        return;
+    }
+    resampleColumns(tmp.data(), outWidth, my, dst);
+}
+
+// z pass: output plane k = blend of input planes mz.i0[k], mz.i1[k].
+void blendPlanes(const std::vector<const uint16_t*>& planes, size_t planeSize, const AxisMap& mz,
+                 uint16_t* dst, unsigned int threads) {
+    const size_t chunksPerPlane = (planeSize + kBlendChunk - 1) / kBlendChunk;
+    Parallel::parallelFor(0, mz.size() * chunksPerPlane, [&](size_t first, size_t last) {
+        for (size_t item = first; item < last; ++item) {
+            const size_t k = item / chunksPerPlane;
+            const size_t begin = (item % chunksPerPlane) * kBlendChunk;
+            const size_t n = std::min(kBlendChunk, planeSize - begin);
+            uint16_t* out = dst + k * planeSize + begin;
+            if (mz.i0[k] < 0) {
+                std::fill(out, out + n, 0);
+            } else if (mz.w[k] == 0.0f) {
+                std::memcpy(out, planes[mz.i0[k]] + begin, n * sizeof(uint16_t));
+            } else {
+                blendRow(planes[mz.i0[k]] + begin, planes[mz.i1[k]] + begin, mz.w[k], n, out);
+            }
+        }
+    }, 1, threads);
+}
+
+double median(std::vector<double> values) {
+    if (values.empty()) return 0.0;
+    auto mid = values.begin() + values.size() / 2;
+    std::nth_element(values.begin(), mid, values.end());
+    return *mid;
+}
+
+} // namespace
+
+bool stackSlices(std::vector<SliceImage>& slices, VolumeData& out, const ResampleOptions& options,
+                 unsigned int threads) {
+    out.clear();
+    // Slices at the same position (e.g. repeated acquisitions) keep the first one
+    slices.erase(std::unique(slices.begin(), slices.end(), [](const SliceImage& a, const SliceImage& b) {
+        return std::fabs(a.position - b.position) < 1e-4;
+    }), slices.end());
+    slices.erase(std::remove_if(slices.begin(), slices.end(), [](const SliceImage& s) {
+        return s.width == 0 || s.height == 0 || s.pixels.size() < static_cast<size_t>(s.width) * s.height;
+    }), slices.end());
+    if (slices.empty()) return false;
+
+    const size_t n = slices.size();
+    std::vector<double> gaps;
+    for (size_t k = 1; k < n; ++k) gaps.push_back(slices[k].position - slices[k - 1].position);
+    const double medianGap = median(gaps);
+    bool uniform = true;
+    for (double g : gaps) {
+        if (std::fabs(g - medianGap) > options.uniformTolerance * medianGap) uniform = false;
+    }
+    const double extentZ = slices.back().position - slices.front().position;
+    double spacingZ = (n > 1 && extentZ > 0.0) ? (uniform ? extentZ / (n - 1) : medianGap) : 1.0;
+
+    // Target in-plane grid: the first slice's, or cubic voxels
+    const SliceImage& ref = slices.front();
+    double spacingX = ref.spacingX > 0.0 ? ref.spacingX : 1.0;
+    double spacingY = ref.spacingY > 0.0 ? ref.spacingY : 1.0;
+    size_t width = ref.width, height = ref.height;
+    bool resampleZ = !uniform;
+    if (options.isotropic) {
+        const double t = options.isotropicSpacing > 0.0 ? options.isotropicSpacing
+                                                        : std::min({spacingX, spacingY, spacingZ});
+        width = std::max<size_t>(1, static_cast<size_t>(std::lround(width * spacingX / t)));
+        height = std::max<size_t>(1, static_cast<size_t>(std::lround(height * spacingY / t)));
+        if (std::fabs(spacingZ - t) > 1e-6 * t) resampleZ = n > 1;
+        spacingX = spacingY = spacingZ = t;
+    }
+    const size_t planeSize = width * height;
+
+    // In-plane: bring every slice onto the target grid (in physical coordinates)
+    Parallel::parallelFor(0, n, [&](size_t first, size_t last) {
+        std::vector<float> tmp;
+        for (size_t k = first; k < last; ++k) {
+            SliceImage& s = slices[k];
+            const double sx = s.spacingX > 0.0 ? s.spacingX : 1.0;
+            const double sy = s.spacingY > 0.0 ? s.spacingY : 1.0;
+            AxisMap mx = makeAxisMap(width, s.width, options.interpolation,
+                                     [&](size_t x) { return (x * spacingX - s.offsetX) / sx; });
+            AxisMap my = makeAxisMap(height, s.height, options.interpolation,
+                                     [&](size_t y) { return (y * spacingY - s.offsetY) / sy; });
+            if (mx.identity && my.identity) continue;
+            std::vector<uint16_t> resampled(planeSize);
+            resamplePlane(s.pixels.data(), s.width, s.height, mx, my, resampled.data(), tmp);
+            s.pixels.swap(resampled);
+            s.width = static_cast<unsigned int>(width);
+            s.height = static_cast<unsigned int>(height);
+        }
+    }, 1, threads);
+
+    out.width = static_cast<unsigned int>(width);
+    out.height = static_cast<unsigned int>(height);
+    out.spacing_x = spacingX;
+    out.spacing_y = spacingY;
+    out.spacing_z = spacingZ > 0.0 ? spacingZ : 1.0;
+
+    if (!resampleZ) {
+        out.depth = static_cast<unsigned int>(n);
+        out.data.resize(planeSize * n);
+        Parallel::parallelFor(0, n, [&](size_t first, size_t last) {
+            for (size_t k = first; k < last; ++k) {
+                std::memcpy(out.data.data() + k * planeSize, slices[k].pixels.data(), planeSize * sizeof(uint16_t));
+                std::vector<uint16_t>().swap(slices[k].pixels);
+            }
+        }, 1, threads);
+        slices.clear();
+        return true;
+    }
+
+    // Through-plane: sample the stack at regular positions between the first and last slice
+    const size_t depth = static_cast<size_t>(std::floor(extentZ / out.spacing_z + 1e-6)) + 1;
+    const double z0 = slices.front().position;
+    size_t cursor = 0;
+    AxisMap mz = makeAxisMap(depth, n, options.interpolation, [&](size_t z) {
+        const double p = z0 + z * out.spacing_z;
+        while (cursor + 2 < n && slices[cursor + 1].position <= p) ++cursor; // outputs ascend
+        const double a = slices[cursor].position, b = slices[cursor + 1].position;
+        return cursor + (p - a) / (b - a);
+    });
+    std::vector<const uint16_t*> planes(n);
+    for (size_t k = 0; k < n; ++k) planes[k] = slices[k].pixels.data();
+    out.depth = static_cast<unsigned int>(depth);
+    out.data.resize(planeSize * depth);
+    blendPlanes(planes, planeSize, mz, out.data.data(), threads);
+    slices.clear();
+    return true;
+}
+
+void resampleVolume(const VolumeData& in, VolumeData& out, double spacingX, double spacingY, double spacingZ,
+                    Interpolation interpolation, unsigned int threads) {
+    const size_t w = in.width, h = in.height, d = in.depth;
+    const double isx = in.spacing_x > 0.0 ? in.spacing_x : 1.0;
+    const double isy = in.spacing_y > 0.0 ? in.spacing_y : 1.0;
+    const double isz = in.spacing_z > 0.0 ? in.spacing_z : 1.0;
+    if (spacingX <= 0.0) spacingX = isx;
+    if (spacingY <= 0.0) spacingY = isy;
+    if (spacingZ <= 0.0) spacingZ = isz;
+    if (w == 0 || h == 0 || d == 0 || in.data.size() < w * h * d) {
+        out.clear();
+        return;
+    }
+    const size_t ow = std::max<size_t>(1, static_cast<size_t>(std::lround(w * isx / spacingX)));
+    const size_t oh = std::max<size_t>(1, static_cast<size_t>(std::lround(h * isy / spacingY)));
+    const size_t od = std::max<size_t>(1, static_cast<size_t>(std::lround(d * isz / spacingZ)));
+
+    // Sample centres of both grids cover the same extent
+    auto centred = [](double outSpacing, double inSpacing) {
+        return [=](size_t i) { return (i + 0.5) * outSpacing / inSpacing - 0.5; };
+    };
+    AxisMap mx = makeAxisMap(ow, w, interpolation, centred(spacingX, isx));
+    AxisMap my = makeAxisMap(oh, h, interpolation, centred(spacingY, isy));
+    AxisMap mz = makeAxisMap(od, d, interpolation, centred(spacingZ, isz));
+
+    // x/y per input slice, then z across the resampled slices
+    const size_t planeSize = ow * oh;
+    std::vector<uint16_t> planes;
+    const uint16_t* planeData = in.data.data();
+    if (!(mx.identity && my.identity)) {
+        planes.resize(planeSize * d);
+        Parallel::parallelFor(0, d, [&](size_t first, size_t last) {
+            std::vector<float> tmp;
+            for (size_t z = first; z < last; ++z) {
+                resamplePlane(in.data.data() + z * w * h, w, h, mx, my, planes.data() + z * planeSize, tmp);
+            }
+        }, 1, threads);
+        planeData = planes.data();
+    }
+
+    VolumeData result;
+    result.width = static_cast<unsigned int>(ow);
+    result.height = static_cast<unsigned int>(oh);
+    result.depth = static_cast<unsigned int>(od);
+    result.spacing_x = spacingX;
+    result.spacing_y = spacingY;
+    result.spacing_z = spacingZ;
+    if (mz.identity && !planes.empty()) {
+        result.data.swap(planes);
+    } else {
+        std::vector<const uint16_t*> planePtrs(d);
+        for (size_t z = 0; z < d; ++z) planePtrs[z] = planeData + z * planeSize;
+        result.data.resize(planeSize * od);
+        blendPlanes(planePtrs, planeSize, mz, result.data.data(), threads);
+    }
+    out = std::move(result); // `in` may alias `out`
+}
+
+} // namespace VolumeOps
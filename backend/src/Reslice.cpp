@@ -0,0 +1,169 @@
+// backend/src/Reslice.cpp
+
+#include "../include/VolumeOps.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <cmath>
+
+namespace VolumeOps {
+
+namespace {
+
+// Pixels per block: coordinates and weights of a block are computed in one pass
+// (vectorizable), then gathered and blended in a second.
+constexpr int kBlock = 64;
+
+// Pixel range [first, last) of a row p(i) = start + i * step that lies within half a
+// voxel of the volume on every axis
+void insideRange(const glm::dvec3& start, const glm::dvec3& step, const glm::dvec3& dims, unsigned int width,
+                 int& first, int& last) {
+    double lo = 0.0, hi = static_cast<double>(width) - 1.0;
+    for (int a = 0; a < 3; ++a) {
+        const double minC = -0.5, maxC = dims[a] - 0.5;
+        if (std::fabs(step[a]) < 1e-12) {
+            if (start[a] < minC || start[a] > maxC) { first = last = 0; return; }
+            continue;
+        }
+        double ta = (minC - start[a]) / step[a], tb = (maxC - start[a]) / step[a];
+        if (ta > tb) std::swap(ta, tb);
+        lo = std::max(lo, ta);
+        hi = std::min(hi, tb);
+    }
+    if (hi < lo) { first = last = 0; return; }
+    first = static_cast<int>(std::ceil(lo));
+    last = static_cast<int>(std::floor(hi)) + 1;
+}
+
+template <bool Linear>
+void sampleRow(const VolumeView& vol, const glm::vec3& start, const glm::vec3& step, int first, int last,
+               uint16_t* out) {
+    const float maxX = static_cast<float>(vol.width - 1);
+    const float maxY = static_cast<float>(vol.height - 1);
+    const float maxZ = static_cast<float>(vol.depth - 1);
+    // Lower corner of a trilinear cell; single-voxel axes use offset 0
+    const int maxX0 = std::max(0, static_cast<int>(vol.width) - 2);
+    const int maxY0 = std::max(0, static_cast<int>(vol.height) - 2);
+    const int maxZ0 = std::max(0, static_cast<int>(vol.depth) - 2);
+    const size_t sliceSize = static_cast<size_t>(vol.width) * vol.height;
+    const size_t ox = vol.width > 1 ? 1 : 0;
+    const size_t oy = vol.height > 1 ? vol.width : 0;
+    const size_t oz = vol.depth > 1 ? sliceSize : 0;
+    const uint16_t* data = vol.data;
+
+    size_t base[kBlock];
+    float wx[kBlock], wy[kBlock], wz[kBlock];
+    for (int b0 = first; b0 < last; b0 += kBlock) {
+        const int n = std::min(kBlock, last - b0);
+        for (int k = 0; k < n; ++k) {
+            const float i = static_cast<float>(b0 + k);
+            // Clamped even though the range is inside: guards against rounding at the ends
+            const float fx = std::clamp(start.x + i * step.x, 0.0f, maxX);
+            const float fy = std::clamp(start.y + i * step.y, 0.0f, maxY);
+            const float fz = std::clamp(start.z + i * step.z, 0.0f, maxZ);
+            if (Linear) {
+                const int ix = std::min(static_cast<int>(fx), maxX0);
+                const int iy = std::min(static_cast<int>(fy), maxY0);
+                const int iz = std::min(static_cast<int>(fz), maxZ0);
+                wx[k] = fx - ix;
+                wy[k] = fy - iy;
+                wz[k] = fz - iz;
+                base[k] = static_cast<size_t>(iz) * sliceSize + static_cast<size_t>(iy) * vol.width + ix;
+            } else {
+                const int ix = static_cast<int>(fx + 0.5f);
+                const int iy = static_cast<int>(fy + 0.5f);
+                const int iz = static_cast<int>(fz + 0.5f);
+                base[k] = static_cast<size_t>(iz) * sliceSize + static_cast<size_t>(iy) * vol.width + ix;
+            }
+        }
+        uint16_t* dst = out + b0;
+        if (Linear) {
+            for (int k = 0; k < n; ++k) {
+                const uint16_t* p = data + base[k];
+                const float c00 = p[0] + wx[k] * (static_cast<float>(p[ox]) - p[0]);
+                const float c10 = p[oy] + wx[k] * (static_cast<float>(p[oy + ox]) - p[oy]);
+                const float c01 = p[oz] + wx[k] * (static_cast<float>(p[oz + ox]) - p[oz]);
+                const float c11 = p[oz + oy] + wx[k] * (static_cast<float>(p[oz + oy + ox]) - p[oz + oy]);
+                const float c0 = c00 + wy[k] * (c10 - c00);
+                const float c1 = c01 + wy[k] * (c11 - c01);
+                dst[k] = static_cast<uint16_t>(c0 + wz[k] * (c1 - c0) + 0.5f);
+            }
+        } else {
+            for (int k = 0; k < n; ++k) dst[k] = data[base[k]];
+        }
+    }
+}
+
+} // namespace
+
+glm::dvec3 ObliquePlane::normal() const {
+    return glm::normalize(glm::cross(axisU, axisV));
+}
+
+ObliquePlane planeFromNormal(const glm::dvec3& center, const glm::dvec3& normal, double pixelSpacing) {
+    ObliquePlane plane;
+    plane.center = center;
+    plane.pixelSpacing = pixelSpacing;
+    const glm::dvec3 n = glm::normalize(normal);
+    // Project the volume's y axis (rows) into the plane; fall back to z when n ~ y
+    glm::dvec3 down(0.0, 1.0, 0.0);
+    if (std::fabs(glm::dot(down, n)) > 0.99) down = glm::dvec3(0.0, 0.0, 1.0);
+    plane.axisV = glm::normalize(down - glm::dot(down, n) * n);
+    plane.axisU = glm::cross(plane.axisV, n);  // u x v = n
+    return plane;
+}
+
+std::vector<ObliquePlane> parallelPlanes(const ObliquePlane& plane, unsigned int count, double step) {
+    std::vector<ObliquePlane> planes(count, plane);
+    const glm::dvec3 n = plane.normal();
+    for (unsigned int i = 0; i < count; ++i) {
+        planes[i].center = plane.center + (static_cast<double>(i) - 0.5 * (count - 1.0)) * step * n;
+    }
+    return planes;
+}
+
+void reslicePlanes(const VolumeView& volume, const std::vector<ObliquePlane>& planes,
+                   unsigned int width, unsigned int height, uint16_t* out,
+                   Interpolation interpolation, uint16_t background, unsigned int threads) {
+    const size_t imageSize = static_cast<size_t>(width) * height;
+    if (imageSize == 0 || planes.empty()) return;
+    if (!volume.data || volume.width == 0 || volume.height == 0 || volume.depth == 0) {
+        std::fill(out, out + imageSize * planes.size(), background);
+        return;
+    }
+    const glm::dvec3 spacing = glm::max(volume.spacing, glm::dvec3(1e-9));
+    const glm::dvec3 dims(volume.width, volume.height, volume.depth);
+
+    // Per plane: voxel-space position of pixel (0, 0) and the steps per column and row
+    struct Steps { glm::dvec3 origin, du, dv; };
+    std::vector<Steps> steps(planes.size());
+    for (size_t p = 0; p < planes.size(); ++p) {
+        const ObliquePlane& plane = planes[p];
+        const glm::dvec3 u = glm::normalize(plane.axisU) * plane.pixelSpacing / spacing;
+        const glm::dvec3 v = glm::normalize(plane.axisV) * plane.pixelSpacing / spacing;
+        steps[p].du = u;
+        steps[p].dv = v;
+        steps[p].origin = plane.center / spacing - 0.5 * (width - 1.0) * u - 0.5 * (height - 1.0) * v;
+    }
+
+    const size_t rows = planes.size() * height;
+    Parallel::parallelFor(0, rows, [&](size_t rowBegin, size_t rowEnd) {
+        for (size_t row = rowBegin; row < rowEnd; ++row) {
+            const Steps& s = steps[row / height];
+            const glm::dvec3 start = s.origin + static_cast<double>(row % height) * s.dv;
+            uint16_t* dst = out + row * width;
+            int first = 0, last = 0;
+            insideRange(start, s.du, dims, width, first, last);
+            std::fill(dst, dst + first, background);
+            std::fill(dst + std::max(first, last), dst + width, background);
+            if (first >= last) continue;
+            if (interpolation == Interpolation::Linear) {
+                sampleRow<true>(volume, glm::vec3(start), glm::vec3(s.du), first, last, dst);
+            } else {
+                sampleRow<false>(volume, glm::vec3(start), glm::vec3(s.du), first, last, dst);
+            }
+        }
+    }, 8, threads);
+}
+
+} // namespace VolumeOps
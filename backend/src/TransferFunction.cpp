@@ -0,0 +1,65 @@
+// backend/src/TransferFunction.cpp
+
+#include "../include/VolumeOps.h"
+#include "../include/Parallel.h"
+
+#include <cmath>
+
+namespace VolumeOps {
+
+void buildPreintegrationTable(const std::vector<glm::vec3>& colors, float extinction,
+                              std::vector<float>& out, unsigned int threads) {
+    const int n = static_cast<int>(colors.size());
+    out.assign(static_cast<size_t>(n) * n * 4, 0.0f);
+    if (n < 2) return;
+    auto entry = [&](int front, int back) { return out.data() + (static_cast<size_t>(back) * n + front) * 4; };
+
+    // front == back: a single point sample
+    for (int i = 0; i < n; ++i) {
+        const float s = i / float(n - 1);
+        const float alpha = -std::expm1(-extinction * s * s);
+        float* e = entry(i, i);
+        e[0] = colors[i].r * alpha;
+        e[1] = colors[i].g * alpha;
+        e[2] = colors[i].b * alpha;
+        e[3] = alpha;
+    }
+
+    // A segment spanning `span` entries crosses that many cells between neighbouring
+    // entries; its sub-steps sit at the cell midpoints, so every segment of one span
+    // shares the same per-cell opacities
+    std::vector<glm::vec3> cellColor(n - 1);
+    std::vector<float> cellDensity(n - 1);
+    for (int j = 0; j < n - 1; ++j) {
+        const float s = (j + 0.5f) / float(n - 1);
+        cellColor[j] = 0.5f * (colors[j] + colors[j + 1]);
+        cellDensity[j] = extinction * s * s;
+    }
+
+    Parallel::parallelFor(1, static_cast<size_t>(n), [&](size_t spanBegin, size_t spanEnd) {
+        std::vector<float> alpha(n - 1);
+        for (size_t span = spanBegin; span < spanEnd; ++span) {
+            const int m = static_cast<int>(span);
+            // expm1: a sub-step's opacity can be far below float epsilon of 1
+            for (int j = 0; j < n - 1; ++j) alpha[j] = -std::expm1(-cellDensity[j] / m);
+            for (int lo = 0; lo + m < n; ++lo) {
+                // Rising (lo -> lo + m) and falling (lo + m -> lo) through cells lo .. lo + m - 1
+                glm::vec3 up(0.0f), down(0.0f);
+                float upT = 1.0f, downT = 1.0f;
+                for (int k = 0; k < m; ++k) {
+                    const int ju = lo + k, jd = lo + m - 1 - k;
+                    up += upT * alpha[ju] * cellColor[ju];
+                    upT *= 1.0f - alpha[ju];
+                    down += downT * alpha[jd] * cellColor[jd];
+                    downT *= 1.0f - alpha[jd];
+                }
+                float* e = entry(lo, lo + m);
+                e[0] = up.r; e[1] = up.g; e[2] = up.b; e[3] = 1.0f - upT;
+                e = entry(lo + m, lo);
+                e[0] = down.r; e[1] = down.g; e[2] = down.b; e[3] = 1.0f - downT;
+            }
+        }
+    }, 4, threads);
+}
+
+} // namespace VolumeOps
@@ -0,0 +1,245 @@
+// backend/src/VolumeOps.cpp
+
+#include "../include/VolumeOps.h"
+#include "../include/Parallel.h"
+
+#include <algorithm>
+#include <cmath>
+#include <mutex>
+
+namespace VolumeOps {
+
+namespace {
+
+// Rows per work item; 16 rows of a 512-wide volume are 16 KB per input slice,
+// so the three slices a tile reads fit comfortably in L2.
+constexpr size_t kTileRows = 16;
+
+inline uint8_t toUnorm8(float v) {
+    // [-1,1] -> [0,255]
+    float f = (v * 0.5f + 0.5f) * 255.0f + 0.5f;
+    return static_cast<uint8_t>(std::min(255.0f, std::max(0.0f, f)));
+}
+
+} // namespace
+
+void encodeOctahedral(float nx, float ny, float nz, uint8_t& u, uint8_t& v) {
+    float l1 = std::fabs(nx) + std::fabs(ny) + std::fabs(nz);
+    if (l1 <= 0.0f) { u = toUnorm8(0.0f); v = toUnorm8(0.0f); return; } // +Z
+    float ex = nx / l1;
+    float ey = ny / l1;
+    if (nz < 0.0f) {
+        // Fold the lower hemisphere over the diagonals
+        float fx = (1.0f - std::fabs(ey)) * (ex >= 0.0f ? 1.0f : -1.0f);
+        float fy = (1.0f - std::fabs(ex)) * (ey >= 0.0f ? 1.0f : -1.0f);
+        ex = fx;
+        ey = fy;
+    }
+    u = toUnorm8(ex);
+    v = toUnorm8(ey);
+}
+
+void decodeOctahedral(uint8_t u, uint8_t v, float& nx, float& ny, float& nz) {
+    float ex = u / 255.0f * 2.0f - 1.0f;
+    float ey = v / 255.0f * 2.0f - 1.0f;
+    nz = 1.0f - std::fabs(ex) - std::fabs(ey);
+    if (nz < 0.0f) {
+        float fx = (1.0f - std::fabs(ey)) * (ex >= 0.0f ? 1.0f : -1.0f);
+        float fy = (1.0f - std::fabs(ex)) * (ey >= 0.0f ? 1.0f : -1.0f);
+        ex = fx;
+        ey = fy;
+    }
+    float len = std::sqrt(ex * ex + ey * ey + nz * nz);
+    nx = ex / len;
+    ny = ey / len;
+    nz = nz / len;
+}
+
+void computeGradients(const VolumeData& volume, std::vector<uint8_t>& out, unsigned int threads) {
+    const size_t w = volume.width, h = volume.height, d = volume.depth;
+    const size_t voxels = w * h * d;
+    out.resize(voxels * kGradientBytesPerVoxel);
+    if (voxels == 0 || volume.data.size() < voxels) return;
+
+    const float sx = volume.spacing_x > 0.0 ? static_cast<float>(volume.spacing_x) : 1.0f;
+    const float sy = volume.spacing_y > 0.0 ? static_cast<float>(volume.spacing_y) : 1.0f;
+    const float sz = volume.spacing_z > 0.0 ? static_cast<float>(volume.spacing_z) : 1.0f;
+    // Intensities in [0,1]; a full-range step over two voxels is the reference maximum
+    const float norm = 1.0f / 65535.0f;
+    const float maxGradient = 1.0f / (2.0f * std::min({sx, sy, sz}));
+    const float invMax = 1.0f / maxGradient;
+
+    const uint16_t* src = volume.data.data();
+    uint8_t* dst = out.data();
+    const size_t slice = w * h;
+    const size_t tilesPerSlice = (h + kTileRows - 1) / kTileRows;
+    const float scaleXCentral = norm / (2.0f * sx);
+    const float scaleXEdge = w > 1 ? norm / sx : 0.0f;
+
+    auto kernel = [&](size_t first, size_t last) {
+        for (size_t item = first; item < last; ++item) {
+            const size_t z = item / tilesPerSlice;
+            const size_t y0 = (item % tilesPerSlice) * kTileRows;
+            const size_t y1 = std::min(h, y0 + kTileRows);
+
+            const size_t zm = z > 0 ? z - 1 : z;
+            const size_t zp = z + 1 < d ? z + 1 : z;
+            const float scaleZ = norm / (sz * static_cast<float>(zp - zm > 0 ? zp - zm : 1));
+
+            for (size_t y = y0; y < y1; ++y) {
+                const size_t ym = y > 0 ? y - 1 : y;
+                const size_t yp = y + 1 < h ? y + 1 : y;
+                const float scaleY = norm / (sy * static_cast<float>(yp - ym > 0 ? yp - ym : 1));
+
+                const uint16_t* row   = src + z * slice + y * w;
+                const uint16_t* rowYm = src + z * slice + ym * w;
+                const uint16_t* rowYp = src + z * slice + yp * w;
+                const uint16_t* rowZm = src + zm * slice + y * w;
+                const uint16_t* rowZp = src + zp * slice + y * w;
+                uint8_t* o = dst + (z * slice + y * w) * kGradientBytesPerVoxel;
+
+                for (size_t x = 0; x < w; ++x) {
+                    const size_t xm = x > 0 ? x - 1 : x;
+                    const size_t xp = x + 1 < w ? x + 1 : x;
+                    const float scaleX = (xp - xm == 2) ? scaleXCentral : scaleXEdge;
+
+                    const float gx = (static_cast<float>(row[xp]) - static_cast<float>(row[xm])) * scaleX;
+                    const float gy = (static_cast<float>(rowYp[x]) - static_cast<float>(rowYm[x])) * scaleY;
+                    const float gz = (static_cast<float>(rowZp[x]) - static_cast<float>(rowZm[x])) * scaleZ;
+                    const float mag = std::sqrt(gx * gx + gy * gy + gz * gz);
+
+                    uint8_t* p = o + x * kGradientBytesPerVoxel;
+                    encodeOctahedral(-gx, -gy, -gz, p[0], p[1]);
+                    const float m = std::min(1.0f, std::sqrt(mag * invMax));
+                    p[2] = static_cast<uint8_t>(m * 255.0f + 0.5f);
+                }
+            }
+        }
+    };
+
+    Parallel::parallelFor(0, d * tilesPerSlice, kernel, 1, threads);
+}
+
+void computeAxisProjections(const VolumeData& volume, AxisProjections& out, unsigned int threads) {
+    const size_t w = volume.width, h = volume.height, d = volume.depth;
+    out.width = {volume.width, volume.width, volume.height};
+    out.height = {volume.height, volume.depth, volume.depth};
+    out.image[0].assign(w * h, 0);
+    out.image[1].assign(w * d, 0);
+    out.image[2].assign(h * d, 0);
+    if (w == 0 || h == 0 || d == 0) return;
+
+    const uint16_t* src = volume.data.data();
+    std::mutex mergeMutex;
+    Parallel::parallelFor(0, d, [&](size_t z0, size_t z1) {
+        std::vector<uint16_t> slabZ(w * h, 0);
+        for (size_t z = z0; z < z1; ++z) {
+            uint16_t* rowY = out.image[1].data() + z * w;  // disjoint per z
+            uint16_t* colX = out.image[2].data() + z * h;
+            for (size_t y = 0; y < h; ++y) {
+                const uint16_t* row = src + (z * h + y) * w;
+                uint16_t* accZ = slabZ.data() + y * w;
+                // Separate loops so each one vectorizes; the row is still in L1 for the second
+                for (size_t x = 0; x < w; ++x) {
+                    accZ[x] = std::max(accZ[x], row[x]);
+                    rowY[x] = std::max(rowY[x], row[x]);
+                }
+                uint16_t rowMax = 0;
+                for (size_t x = 0; x < w; ++x) rowMax = std::max(rowMax, row[x]);
+                colX[y] = rowMax;
+            }
+        }
+        std::lock_guard<std::mutex> lock(mergeMutex);
+        uint16_t* dst = out.image[0].data();
+        for (size_t i = 0; i < w * h; ++i) dst[i] = std::max(dst[i], slabZ[i]);
+    }, 1, threads);
+}
+
+void slabRange(unsigned int size, double spacing, int index, double thicknessMm,
+               unsigned int& first, unsigned int& count) {
+    first = count = 0;
+    if (size == 0) return;
+    const int n = std::max(1, static_cast<int>(std::lround(thicknessMm / std::max(spacing, 1e-6))));
+    const int centre = std::clamp(index, 0, static_cast<int>(size) - 1);
+    const int lo = std::max(0, centre - (n - 1) / 2);
+    const int hi = std::min(static_cast<int>(size), centre - (n - 1) / 2 + n);
+    first = static_cast<unsigned int>(lo);
+    count = static_cast<unsigned int>(hi - lo);
+}
+
+namespace {
+
+// acc = op(acc, voxel) over the slab, into an image laid out like AxisProjections
+template <typename Op>
+void reduceSlab(const VolumeData& volume, int axis, size_t first, size_t last, std::vector<uint32_t>& acc,
+                Op op, unsigned int threads) {
+    const size_t w = volume.width, h = volume.height, d = volume.depth;
+    const uint16_t* src = volume.data.data();
+    if (axis == 0) {
+        // Rows of the image are independent; each walks the slab's slices
+        Parallel::parallelFor(0, h, [&](size_t y0, size_t y1) {
+            for (size_t y = y0; y < y1; ++y) {
+                uint32_t* a = acc.data() + y * w;
+                for (size_t z = first; z < last; ++z) {
+                    const uint16_t* row = src + (z * h + y) * w;
+                    for (size_t x = 0; x < w; ++x) a[x] = op(a[x], row[x]);
+                }
+            }
+        }, 16, threads);
+    } else if (axis == 1) {
+        Parallel::parallelFor(0, d, [&](size_t z0, size_t z1) {
+            for (size_t z = z0; z < z1; ++z) {
+                uint32_t* a = acc.data() + z * w;
+                for (size_t y = first; y < last; ++y) {
+                    const uint16_t* row = src + (z * h + y) * w;
+                    for (size_t x = 0; x < w; ++x) a[x] = op(a[x], row[x]);
+                }
+            }
+        }, 1, threads);
+    } else {
+        Parallel::parallelFor(0, d, [&](size_t z0, size_t z1) {
+            for (size_t z = z0; z < z1; ++z) {
+                uint32_t* a = acc.data() + z * h;
+                for (size_t y = 0; y < h; ++y) {
+                    const uint16_t* row = src + (z * h + y) * w;
+                    uint32_t v = a[y];
+                    for (size_t x = first; x < last; ++x) v = op(v, row[x]);
+                    a[y] = v;
+                }
+            }
+        }, 1, threads);
+    }
+}
+
+} // namespace
+
+void computeSlabProjection(const VolumeData& volume, int axis, unsigned int first, unsigned int count,
+                           SlabMode mode, std::vector<uint16_t>& out, unsigned int& width, unsigned int& height,
+                           unsigned int threads) {
+    axis = std::clamp(axis, 0, 2);
+    const unsigned int sizes[3] = {volume.depth, volume.height, volume.width};
+    width = axis == 2 ? volume.height : volume.width;
+    height = axis == 0 ? volume.height : volume.depth;
+    const size_t pixels = static_cast<size_t>(width) * height;
+    const size_t last = std::min<size_t>(sizes[axis], static_cast<size_t>(first) + count);
+    if (pixels == 0 || first >= last) {
+        out.assign(pixels, 0);
+        return;
+    }
+    const uint32_t init = mode == SlabMode::Min ? 0xFFFFu : 0u;
+    std::vector<uint32_t> acc(pixels, init);
+    if (mode == SlabMode::Max) {
+        reduceSlab(volume, axis, first, last, acc, [](uint32_t a, uint16_t v) { return std::max<uint32_t>(a, v); }, threads);
+    } else if (mode == SlabMode::Min) {
+        reduceSlab(volume, axis, first, last, acc, [](uint32_t a, uint16_t v) { return std::min<uint32_t>(a, v); }, threads);
+    } else {
+        reduceSlab(volume, axis, first, last, acc, [](uint32_t a, uint16_t v) { return a + v; }, threads);
+    }
+    out.resize(pixels);
+    const uint32_t n = static_cast<uint32_t>(last - first);
+    for (size_t i = 0; i < pixels; ++i) {
+        out[i] = static_cast<uint16_t>(mode == SlabMode::Mean ? (acc[i] + n / 2) / n : acc[i]);
+    }
+}
+
+} // namespace VolumeOps
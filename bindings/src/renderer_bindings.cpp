@@ -7,10 +7,160 @@
 // bindings/src/renderer_bindings.cpp
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
+#include <pybind11/stl.h>
 #include "../../backend/include/Renderer.h" // From backend/include/
+#include "../../backend/include/VolumeOps.h"
+#include "../../backend/include/FrameReadback.h"
+#include "../../backend/include/ChunkStore.h"
+#include "../../backend/include/MemoryBudget.h"
 
 namespace py = pybind11;
 
+// (vertices (N,3) float32, faces (M,3) uint32, normals (N,3) float32), copied
+static py::tuple meshToNumpy(const TriangleMesh& mesh) {
+    const py::ssize_t nv = static_cast<py::ssize_t>(mesh.vertexCount());
+    const py::ssize_t nt = static_cast<py::ssize_t>(mesh.triangleCount());
+    py::array_t<float> vertices({nv, py::ssize_t(3)});
+    py::array_t<uint32_t> faces({nt, py::ssize_t(3)});
+    py::array_t<float> normals({nv, py::ssize_t(3)});
+    std::copy(mesh.vertices.begin(), mesh.vertices.end(), vertices.mutable_data());
+    std::copy(mesh.indices.begin(), mesh.indices.end(), faces.mutable_data());
+    if (mesh.normals.size() == mesh.vertices.size()) {
+        std::copy(mesh.normals.begin(), mesh.normals.end(), normals.mutable_data());
+    } else {
+        std::fill(normals.mutable_data(), normals.mutable_data() + normals.size(), 0.0f);
+    }
+    return py::make_tuple(vertices, faces, normals);
+}
+
+// (height, width) uint16 copy of a row-major image
+static py::array_t<uint16_t> imageToNumpy(const std::vector<uint16_t>& image, unsigned int width, unsigned int height) {
+    py::array_t<uint16_t> out({static_cast<py::ssize_t>(height), static_cast<py::ssize_t>(width)});
+    std::copy(image.begin(), image.end(), out.mutable_data());
+    return out;
+}
+
+// 4x4 matrix in the usual row-major math layout (glm stores columns)
+static py::array_t<float> matrixToNumpy(const glm::mat4& m) {
+    py::array_t<float> out({py::ssize_t(4), py::ssize_t(4)});
+    auto r = out.mutable_unchecked<2>();
+    for (int row = 0; row < 4; ++row) {
+        for (int col = 0; col < 4; ++col) r(row, col) = m[col][row];
+    }
+    return out;
+}
+
+static glm::mat4 matrixFromNumpy(const py::array_t<float, py::array::c_style | py::array::forcecast>& a) {
+    if (a.ndim() != 2 || a.shape(0) != 4 || a.shape(1) != 4) throw std::invalid_argument("expected a 4x4 matrix");
+    auto r = a.unchecked<2>();
+    glm::mat4 m;
+    for (int row = 0; row < 4; ++row) {
+        for (int col = 0; col < 4; ++col) m[col][row] = r(row, col);
+    }
+    return m;
+}
+
+using PointArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+// Rows of a (3,) or (N, 3) array
+static py::ssize_t pointRows(const PointArray& a, const char* name) {
+    if (a.ndim() == 1 && a.shape(0) == 3) return 1;
+    if (a.ndim() == 2 && a.shape(1) == 3) return a.shape(0);
+    throw std::invalid_argument(std::string(name) + " must have shape (3,) or (N, 3)");
+}
+
+static glm::dvec3 pointAt(const PointArray& a, py::ssize_t row) {
+    const double* p = a.data() + (a.ndim() == 1 || a.shape(0) == 1 ? 0 : row * 3);  // single rows broadcast
+    return glm::dvec3(p[0], p[1], p[2]);
+}
+
+// Reslice planes from centre / axis arrays of shape (3,) or (N, 3), broadcast against each
+// other. Without axes the planes face `normal`. count > 1 expands a single plane into a
+// stack `step` mm apart. `stacked` is set when the result is a stack of images.
+static std::vector<VolumeOps::ObliquePlane> planesFromNumpy(const PointArray& center, const py::object& axis_u,
+                                                            const py::object& axis_v, const py::object& normal,
+                                                            double pixel_spacing, unsigned int count, double step,
+                                                            bool& stacked) {
+    if (pixel_spacing <= 0.0) throw std::invalid_argument("pixel_spacing must be positive");
+    const bool withAxes = !axis_u.is_none() || !axis_v.is_none();
+    if (withAxes == !normal.is_none()) throw std::invalid_argument("give either axis_u and axis_v, or normal");
+    if (withAxes && (axis_u.is_none() || axis_v.is_none())) throw std::invalid_argument("give both axis_u and axis_v");
+    std::vector<PointArray> axes;
+    if (withAxes) {
+        axes = {axis_u.cast<PointArray>(), axis_v.cast<PointArray>()};
+    } else {
+        axes = {normal.cast<PointArray>()};
+    }
+    py::ssize_t rows = pointRows(center, "center");
+    for (const PointArray& a : axes) {
+        const py::ssize_t n = pointRows(a, withAxes ? "axis_u/axis_v" : "normal");
+        if (n != 1 && rows != 1 && n != rows) throw std::invalid_argument("plane arrays have different lengths");
+        rows = std::max(rows, n);
+    }
+    stacked = rows > 1 || center.ndim() == 2 || count > 1;
+    if (count > 1 && rows > 1) throw std::invalid_argument("count > 1 needs a single plane");
+
+    std::vector<VolumeOps::ObliquePlane> planes(static_cast<size_t>(rows));
+    for (py::ssize_t i = 0; i < rows; ++i) {
+        VolumeOps::ObliquePlane& plane = planes[static_cast<size_t>(i)];
+        if (withAxes) {
+            plane.center = pointAt(center, i);
+            plane.axisU = pointAt(axes[0], i);
+            plane.axisV = pointAt(axes[1], i);
+            plane.pixelSpacing = pixel_spacing;
+        } else {
+            plane = VolumeOps::planeFromNormal(pointAt(center, i), pointAt(axes[0], i), pixel_spacing);
+        }
+        if (glm::length(glm::cross(plane.axisU, plane.axisV)) < 1e-9) {
+            throw std::invalid_argument("plane axes must be non-zero and not parallel");
+        }
+    }
+    if (count > 1) planes = VolumeOps::parallelPlanes(planes[0], count, step > 0.0 ? step : pixel_spacing);
+    return planes;
+}
+
+// (height, width) or (planes, height, width) uint16 array for reslice output
+static py::array_t<uint16_t> resliceArray(size_t planes, bool stacked, unsigned int width, unsigned int height) {
+    if (stacked) {
+        return py::array_t<uint16_t>({static_cast<py::ssize_t>(planes), static_cast<py::ssize_t>(height),
+                                      static_cast<py::ssize_t>(width)});
+    }
+    return py::array_t<uint16_t>({static_cast<py::ssize_t>(height), static_cast<py::ssize_t>(width)});
+}
+
+// {"host": {...}, "device": {...}, "categories": {name: bytes}} of a MemoryBudget snapshot
+static py::dict memoryUsageToDict(const MemoryBudget::Usage& usage) {
+    py::dict out;
+    for (int p = 0; p < MemoryBudget::kPoolCount; ++p) {
+        py::dict pool;
+        pool["used"] = usage.used[p];
+        pool["peak"] = usage.peak[p];
+        pool["budget"] = usage.budget[p];
+        out[MemoryBudget::poolName(static_cast<MemoryBudget::Pool>(p))] = pool;
+    }
+    py::dict categories;
+    for (int c = 0; c < MemoryBudget::kCategoryCount; ++c) {
+        categories[MemoryBudget::categoryName(static_cast<MemoryBudget::Category>(c))] = usage.bytes[c];
+    }
+    out["categories"] = categories;
+    return out;
+}
+
+// Wraps a (depth, height, width) uint16 array as VolumeData (copies)
+static VolumeData volumeFromNumpy(const py::array_t<uint16_t, py::array::c_style | py::array::forcecast>& volume,
+                                  double spacing_x, double spacing_y, double spacing_z) {
+    if (volume.ndim() != 3) throw std::invalid_argument("volume must be a 3D (depth, height, width) array");
+    VolumeData vol;
+    vol.depth = static_cast<unsigned int>(volume.shape(0));
+    vol.height = static_cast<unsigned int>(volume.shape(1));
+    vol.width = static_cast<unsigned int>(volume.shape(2));
+    vol.spacing_x = spacing_x;
+    vol.spacing_y = spacing_y;
+    vol.spacing_z = spacing_z;
+    vol.data.assign(volume.data(), volume.data() + volume.size());
+    return vol;
+}
+
 void bind_renderer(py::module_& m) {
 
     py::class_<VolumeData>(m, "VolumeData")
@@ -22,6 +172,438 @@ void bind_renderer(py::module_& m) {
             .def_readonly("spacing_z", &VolumeData::spacing_z);
 
 
+    // CPU kernels, callable without a Renderer (benchmarks / tests)
+    m.def("compute_gradients", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume,
+                                  double spacing_x, double spacing_y, double spacing_z,
+                                  unsigned int threads) -> py::array {
+            VolumeData vol = volumeFromNumpy(volume, spacing_x, spacing_y, spacing_z);
+            std::vector<uint8_t> packed;
+            {
+                py::gil_scoped_release release;
+                VolumeOps::computeGradients(vol, packed, threads);
+            }
+            py::array_t<uint8_t> out({static_cast<py::ssize_t>(vol.depth), static_cast<py::ssize_t>(vol.height),
+                                      static_cast<py::ssize_t>(vol.width),
+                                      static_cast<py::ssize_t>(VolumeOps::kGradientBytesPerVoxel)});
+            std::copy(packed.begin(), packed.end(), out.mutable_data());
+            return out;
+        }, py::arg("volume"), py::arg("spacing_x") = 1.0, py::arg("spacing_y") = 1.0, py::arg("spacing_z") = 1.0,
+        py::arg("threads") = 0,
+        "Packed gradient volume (depth, height, width, 3) uint8: octahedral normal in [...,0:2], sqrt magnitude in [...,2]");
+
+    m.def("axis_projections", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume,
+                                 unsigned int threads) -> py::tuple {
+            VolumeData vol = volumeFromNumpy(volume, 1.0, 1.0, 1.0);
+            VolumeOps::AxisProjections mips;
+            {
+                py::gil_scoped_release release;
+                VolumeOps::computeAxisProjections(vol, mips, threads);
+            }
+            return py::make_tuple(imageToNumpy(mips.image[0], mips.width[0], mips.height[0]),
+                                  imageToNumpy(mips.image[1], mips.width[1], mips.height[1]),
+                                  imageToNumpy(mips.image[2], mips.width[2], mips.height[2]));
+        }, py::arg("volume"), py::arg("threads") = 0,
+        "Axis MIPs of a (depth, height, width) volume in one pass: (along z (height, width), "
+        "along y (depth, width), along x (depth, height)), like volume.max(axis=0/1/2)");
+
+    m.def("memory_usage", []() { return memoryUsageToDict(MemoryBudget::snapshot()); },
+        "Process-wide bytes per category and used/peak/budget of the host and device pools "
+        "(see Renderer.get_memory_usage)");
+    m.def("reset_memory_peaks", []() {
+            MemoryBudget::resetPeak(MemoryBudget::Pool::Host);
+            MemoryBudget::resetPeak(MemoryBudget::Pool::Device);
+        }, "Restart peak tracking from the current usage");
+
+    m.def("slab_projection", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume,
+                                int axis, int index, double thickness_mm, int mode, double spacing_x,
+                                double spacing_y, double spacing_z, unsigned int threads) {
+            if (axis < 0 || axis > 2) throw std::invalid_argument("axis must be 0 (Z), 1 (Y) or 2 (X)");
+            if (mode < 0 || mode > 2) throw std::invalid_argument("mode must be 0 (max), 1 (min) or 2 (mean)");
+            VolumeData vol = volumeFromNumpy(volume, spacing_x, spacing_y, spacing_z);
+            const unsigned int sizes[3] = {vol.depth, vol.height, vol.width};
+            const double spacings[3] = {spacing_z, spacing_y, spacing_x};
+            std::vector<uint16_t> image;
+            unsigned int width = 0, height = 0;
+            {
+                py::gil_scoped_release release;
+                unsigned int first = 0, count = 0;
+                VolumeOps::slabRange(sizes[axis], spacings[axis], index, thickness_mm, first, count);
+                VolumeOps::computeSlabProjection(vol, axis, first, count, static_cast<VolumeOps::SlabMode>(mode),
+                                                 image, width, height, threads);
+            }
+            return imageToNumpy(image, width, height);
+        }, py::arg("volume"), py::arg("axis"), py::arg("index"), py::arg("thickness_mm"), py::arg("mode") = 0,
+        py::arg("spacing_x") = 1.0, py::arg("spacing_y") = 1.0, py::arg("spacing_z") = 1.0, py::arg("threads") = 0,
+        "Thick-slab projection of a (depth, height, width) volume around slice `index` along axis 0 = Z, 1 = Y or "
+        "2 = X: mode 0 = max, 1 = min, 2 = mean (rounded) over round(thickness_mm / spacing) slices, laid out "
+        "like axis_projections");
+
+    m.def("preintegration_table", [](py::array_t<float, py::array::c_style | py::array::forcecast> colors,
+                                     float extinction, unsigned int threads) {
+            if (colors.ndim() != 2 || colors.shape(1) != 3 || colors.shape(0) < 2)
+                throw std::invalid_argument("colors must have shape (N, 3) with N >= 2");
+            const py::ssize_t n = colors.shape(0);
+            std::vector<glm::vec3> lut(n);
+            auto c = colors.unchecked<2>();
+            for (py::ssize_t i = 0; i < n; ++i) lut[i] = glm::vec3(c(i, 0), c(i, 1), c(i, 2));
+            std::vector<float> table;
+            {
+                py::gil_scoped_release release;
+                VolumeOps::buildPreintegrationTable(lut, extinction, table, threads);
+            }
+            py::array_t<float> out({n, n, py::ssize_t(4)});
+            std::copy(table.begin(), table.end(), out.mutable_data());
+            return out;
+        }, py::arg("colors"), py::arg("extinction"), py::arg("threads") = 0,
+        "Pre-integrated table of the shaded mode for an (N, 3) colormap at s = i / (N-1): out[back, front] is the "
+        "premultiplied RGB and opacity of one step from s_front to s_back, where `extinction` is the optical depth "
+        "of a step at s = 1");
+
+    m.def("raycast_mip_slab", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> slab,
+                                 unsigned int slab_z0, unsigned int full_depth, unsigned int z_begin, unsigned int z_end,
+                                 py::array_t<float, py::array::c_style | py::array::forcecast> inv_view_proj,
+                                 std::array<float, 3> camera_pos, unsigned int width, unsigned int height,
+                                 double spacing_x, double spacing_y, double spacing_z, py::object out,
+                                 unsigned int threads) -> py::object {
+            if (slab.ndim() != 3) throw std::invalid_argument("slab must be a 3D (depth, height, width) array");
+            py::array_t<uint32_t, py::array::c_style> image;
+            if (out.is_none()) {
+                image = py::array_t<uint32_t, py::array::c_style>({static_cast<py::ssize_t>(height),
+                                                                   static_cast<py::ssize_t>(width)});
+            } else {
+                // Rendered in place, e.g. into a shared-memory buffer; must not need a copy
+                image = out.cast<py::array_t<uint32_t, py::array::c_style>>();
+                if (!image.is(out) || image.size() != static_cast<py::ssize_t>(width) * height || !image.writeable()) {
+                    throw std::invalid_argument("out must be a writable C-contiguous uint32 array of height*width");
+                }
+            }
+            VolumeOps::MIPSlab view;
+            view.data = slab.data();
+            view.depth = static_cast<unsigned int>(slab.shape(0));
+            view.height = static_cast<unsigned int>(slab.shape(1));
+            view.width = static_cast<unsigned int>(slab.shape(2));
+            view.z0 = slab_z0;
+            view.fullDepth = full_depth;
+            view.spacing = glm::vec3(spacing_x, spacing_y, spacing_z);
+            view.zBegin = z_begin;
+            view.zEnd = z_end;
+            const glm::mat4 invViewProj = matrixFromNumpy(inv_view_proj);
+            const glm::vec3 cameraPos(camera_pos[0], camera_pos[1], camera_pos[2]);
+            bool ok;
+            {
+                py::gil_scoped_release release;
+                ok = VolumeOps::raycastMIPSlab(view, invViewProj, cameraPos, width, height, image.mutable_data(), threads);
+            }
+            if (!ok) throw std::invalid_argument("slab does not hold the slices z_begin-1 .. z_end");
+            return std::move(image);
+        }, py::arg("slab"), py::arg("slab_z0"), py::arg("full_depth"), py::arg("z_begin"), py::arg("z_end"),
+        py::arg("inv_view_proj"), py::arg("camera_pos"), py::arg("width"), py::arg("height"),
+        py::arg("spacing_x") = 1.0, py::arg("spacing_y") = 1.0, py::arg("spacing_z") = 1.0,
+        py::arg("out") = py::none(), py::arg("threads") = 0,
+        "CPU MIP of slices [z_begin, z_end) as sampled by the GPU raycaster; slab holds slices from slab_z0 "
+        "(plus one on each side). Returns (height, width) uint32: 0 = no sample, else 1 + max. "
+        "Partial images of disjoint slabs max-composite into the whole-volume image");
+
+    m.def("marching_cubes", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume,
+                               float iso_value, double spacing_x, double spacing_y, double spacing_z,
+                               bool use_block_index, unsigned int threads) -> py::tuple {
+            VolumeData vol = volumeFromNumpy(volume, spacing_x, spacing_y, spacing_z);
+            TriangleMesh mesh;
+            {
+                py::gil_scoped_release release;
+                VolumeOps::MinMaxBlocks blocks;
+                if (use_block_index) VolumeOps::buildMinMaxBlocks(vol, blocks, 8, threads);
+                VolumeOps::extractIsosurface(vol, iso_value, mesh, use_block_index ? &blocks : nullptr, threads);
+            }
+            return meshToNumpy(mesh);
+        }, py::arg("volume"), py::arg("iso_value"), py::arg("spacing_x") = 1.0, py::arg("spacing_y") = 1.0,
+        py::arg("spacing_z") = 1.0, py::arg("use_block_index") = true, py::arg("threads") = 0,
+        "Marching cubes isosurface; returns (vertices (N,3) float32, faces (M,3) uint32, normals (N,3) float32)");
+    m.def("resample_volume", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume,
+                                double spacing_x, double spacing_y, double spacing_z,
+                                double new_spacing_x, double new_spacing_y, double new_spacing_z,
+                                int interpolation, unsigned int threads) -> py::array {
+            VolumeData vol = volumeFromNumpy(volume, spacing_x, spacing_y, spacing_z);
+            VolumeData out;
+            {
+                py::gil_scoped_release release;
+                VolumeOps::resampleVolume(vol, out, new_spacing_x, new_spacing_y, new_spacing_z,
+                                          static_cast<VolumeOps::Interpolation>(interpolation == 0 ? 0 : 1), threads);
+            }
+            py::array_t<uint16_t> result({static_cast<py::ssize_t>(out.depth), static_cast<py::ssize_t>(out.height),
+                                          static_cast<py::ssize_t>(out.width)});
+            std::copy(out.data.begin(), out.data.end(), result.mutable_data());
+            return result;
+        }, py::arg("volume"), py::arg("spacing_x"), py::arg("spacing_y"), py::arg("spacing_z"),
+        py::arg("new_spacing_x"), py::arg("new_spacing_y"), py::arg("new_spacing_z"),
+        py::arg("interpolation") = 1, py::arg("threads") = 0,
+        "Separable resampling of a (depth, height, width) uint16 volume to new spacing (0 = nearest, 1 = trilinear)");
+    m.def("stack_slices", [](py::list slices, std::vector<double> positions, std::vector<double> pixel_spacing,
+                             bool isotropic, int interpolation, unsigned int threads) -> py::tuple {
+            if (positions.size() != slices.size()) throw std::invalid_argument("need one position per slice");
+            if (!pixel_spacing.empty() && pixel_spacing.size() != 2 * slices.size())
+                throw std::invalid_argument("pixel_spacing must hold (sx, sy) per slice");
+            std::vector<VolumeOps::SliceImage> images(slices.size());
+            for (size_t k = 0; k < images.size(); ++k) {
+                auto arr = py::array_t<uint16_t, py::array::c_style | py::array::forcecast>::ensure(slices[k]);
+                if (!arr || arr.ndim() != 2) throw std::invalid_argument("slices must be 2D arrays");
+                images[k].height = static_cast<unsigned int>(arr.shape(0));
+                images[k].width = static_cast<unsigned int>(arr.shape(1));
+                images[k].pixels.assign(arr.data(), arr.data() + arr.size());
+                images[k].position = positions[k];
+                if (!pixel_spacing.empty()) {
+                    images[k].spacingX = pixel_spacing[2 * k];
+                    images[k].spacingY = pixel_spacing[2 * k + 1];
+                }
+            }
+            std::stable_sort(images.begin(), images.end(), [](const VolumeOps::SliceImage& a,
+                                                              const VolumeOps::SliceImage& b) {
+                return a.position < b.position;
+            });
+            VolumeData out;
+            {
+                py::gil_scoped_release release;
+                VolumeOps::ResampleOptions options;
+                options.isotropic = isotropic;
+                options.interpolation = interpolation == 0 ? VolumeOps::Interpolation::Nearest
+                                                           : VolumeOps::Interpolation::Linear;
+                VolumeOps::stackSlices(images, out, options, threads);
+            }
+            py::array_t<uint16_t> result({static_cast<py::ssize_t>(out.depth), static_cast<py::ssize_t>(out.height),
+                                          static_cast<py::ssize_t>(out.width)});
+            std::copy(out.data.begin(), out.data.end(), result.mutable_data());
+            return py::make_tuple(result, py::make_tuple(out.spacing_x, out.spacing_y, out.spacing_z));
+        }, py::arg("slices"), py::arg("positions"), py::arg("pixel_spacing") = std::vector<double>(),
+        py::arg("isotropic") = false, py::arg("interpolation") = 1, py::arg("threads") = 0,
+        "Stack 2D uint16 slices at the given positions (mm) onto a regular grid, resampling mismatched "
+        "sizes/spacings (pixel_spacing: flat [sx0, sy0, sx1, ...]) and uneven gaps. "
+        "Returns (volume (depth, height, width), (spacing_x, spacing_y, spacing_z))");
+    m.def("write_mesh", [](py::array_t<float, py::array::c_style | py::array::forcecast> vertices,
+                           py::array_t<uint32_t, py::array::c_style | py::array::forcecast> faces,
+                           const std::string& path) -> bool {
+            TriangleMesh mesh;
+            mesh.vertices.assign(vertices.data(), vertices.data() + vertices.size());
+            mesh.indices.assign(faces.data(), faces.data() + faces.size());
+            return MeshIO::write(mesh, path);
+        }, py::arg("vertices"), py::arg("faces"), py::arg("path"),
+        "Write a triangle mesh as binary .ply or .stl (by extension); returns true on success");
+
+    // Asynchronous readback of the bound framebuffer (movie export). GL must be loaded,
+    // i.e. a Renderer has been init()ed, and the context current for every call.
+    py::class_<FrameReadback>(m, "FrameReadback")
+            .def(py::init<>())
+            .def("configure", &FrameReadback::configure, py::arg("width"), py::arg("height"),
+                 py::arg("buffers") = FrameReadback::kDefaultSlots,
+                 "Allocate a ring of pixel-pack buffers for RGBA8 frames of this size (drops pending frames)")
+            .def("release", &FrameReadback::release, "Delete the GL buffers")
+            .def("submit", &FrameReadback::submit, py::arg("tag"),
+                 "Start reading the bound framebuffer into the next buffer; false if the ring is full")
+            .def("retrieve", [](FrameReadback& self) -> py::object {
+                if (self.pending() == 0) return py::none();
+                py::array_t<uint8_t> image({static_cast<py::ssize_t>(self.height()),
+                                            static_cast<py::ssize_t>(self.width()), py::ssize_t(4)});
+                int64_t tag = 0;
+                bool ok;
+                {
+                    py::gil_scoped_release release;
+                    ok = self.retrieve(image.mutable_data(), tag);
+                }
+                if (!ok) throw std::runtime_error("pixel buffer readback failed");
+                return py::make_tuple(tag, image);
+            }, "Oldest pending frame as (tag, (height, width, 4) uint8 RGBA, top row first), or None. "
+               "Waits for the GPU copy if it has not finished")
+            .def("oldest_ready", &FrameReadback::oldestReady,
+                 "True if retrieve() would return without waiting")
+            .def_property_readonly("width", &FrameReadback::width)
+            .def_property_readonly("height", &FrameReadback::height)
+            .def_property_readonly("buffers", &FrameReadback::slots)
+            .def_property_readonly("pending", &FrameReadback::pending)
+            .def_property_readonly("full", &FrameReadback::full);
+
+    // Run-length-encoded segmentation labels (the renderer's overlay storage)
+    py::class_<LabelMap>(m, "LabelMap")
+            .def(py::init<>())
+            .def_static("from_numpy", [](const py::array_t<uint8_t, py::array::c_style | py::array::forcecast>& labels,
+                                         unsigned int threads) {
+                if (labels.ndim() != 3) throw std::invalid_argument("labels must be a 3D (depth, height, width) array");
+                LabelMap map;
+                py::gil_scoped_release release;
+                map.encode(labels.data(), static_cast<unsigned int>(labels.shape(2)),
+                           static_cast<unsigned int>(labels.shape(1)), static_cast<unsigned int>(labels.shape(0)),
+                           threads);
+                return map;
+            }, py::arg("labels"), py::arg("threads") = 0,
+               "Encode a (depth, height, width) uint8 label volume (threads: 0 = all cores)")
+            .def("to_numpy", [](const LabelMap& self) {
+                py::array_t<uint8_t> labels({static_cast<py::ssize_t>(self.depth()),
+                                             static_cast<py::ssize_t>(self.height()),
+                                             static_cast<py::ssize_t>(self.width())});
+                if (self.depth() != 0) {
+                    py::gil_scoped_release release;
+                    self.decodeSlices(0, self.depth(), labels.mutable_data());
+                }
+                return labels;
+            }, "Decode to a (depth, height, width) uint8 array")
+            .def("at", &LabelMap::at, py::arg("x"), py::arg("y"), py::arg("z"), "Label of one voxel")
+            .def("histogram", [](const LabelMap& self) {
+                auto counts = self.histogram();
+                return std::vector<uint64_t>(counts.begin(), counts.end());
+            }, "Voxel count per label value (256 entries)")
+            .def_property_readonly("shape", [](const LabelMap& self) {
+                return py::make_tuple(self.depth(), self.height(), self.width());
+            })
+            .def_property_readonly("run_count", &LabelMap::runCount)
+            .def_property_readonly("memory_bytes", &LabelMap::memoryBytes);
+
+    m.def("reslice", [](py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume, PointArray center,
+                        py::object axis_u, py::object axis_v, py::object normal, unsigned int width,
+                        unsigned int height, double pixel_spacing, unsigned int count, double step,
+                        double spacing_x, double spacing_y, double spacing_z, int interpolation,
+                        uint16_t background, unsigned int threads) {
+            if (volume.ndim() != 3) throw std::invalid_argument("volume must be a 3D (depth, height, width) array");
+            bool stacked = false;
+            const auto planes = planesFromNumpy(center, axis_u, axis_v, normal, pixel_spacing, count, step, stacked);
+            VolumeOps::VolumeView view;
+            view.data = volume.data();
+            view.depth = static_cast<unsigned int>(volume.shape(0));
+            view.height = static_cast<unsigned int>(volume.shape(1));
+            view.width = static_cast<unsigned int>(volume.shape(2));
+            view.spacing = glm::dvec3(spacing_x, spacing_y, spacing_z);
+            py::array_t<uint16_t> out = resliceArray(planes.size(), stacked, width, height);
+            uint16_t* dst = out.mutable_data();
+            {
+                py::gil_scoped_release release;
+                VolumeOps::reslicePlanes(view, planes, width, height, dst,
+                                         static_cast<VolumeOps::Interpolation>(interpolation != 0), background, threads);
+            }
+            return out;
+        }, py::arg("volume"), py::arg("center"), py::arg("axis_u") = py::none(), py::arg("axis_v") = py::none(),
+        py::arg("normal") = py::none(), py::arg("width") = 256, py::arg("height") = 256, py::arg("pixel_spacing") = 1.0,
+        py::arg("count") = 1, py::arg("step") = 0.0, py::arg("spacing_x") = 1.0, py::arg("spacing_y") = 1.0,
+        py::arg("spacing_z") = 1.0, py::arg("interpolation") = 1, py::arg("background") = 0, py::arg("threads") = 0,
+        "Oblique reformat of a (depth, height, width) volume (not copied). Planes are in mm with voxel (i, j, k) at "
+        "(i*spacing_x, j*spacing_y, k*spacing_z); pixel (c, r) lies at center + (c-(width-1)/2)*pixel_spacing*axis_u "
+        "+ (r-(height-1)/2)*pixel_spacing*axis_v. center/axes may be (3,) or (N, 3) (e.g. a curved reformat); "
+        "normal instead of axes picks the in-plane axes; count > 1 makes a stack step mm (default pixel_spacing) "
+        "apart along the normal. Returns (height, width) or (planes, height, width) uint16. "
+        "interpolation: 0 = nearest, 1 = trilinear");
+
+    // Chunked multiscale volume store (.mvrc)
+    m.def("write_chunk_store", [](const std::string& path,
+                                  py::array_t<uint16_t, py::array::c_style | py::array::forcecast> volume,
+                                  double spacing_x, double spacing_y, double spacing_z, unsigned int chunk_size,
+                                  unsigned int levels, int compression, unsigned int threads) -> bool {
+            VolumeData vol = volumeFromNumpy(volume, spacing_x, spacing_y, spacing_z);
+            ChunkStore::WriteOptions options;
+            options.chunkSize = chunk_size;
+            options.levels = levels;
+            options.compression = compression;
+            options.threads = threads;
+            py::gil_scoped_release release;
+            return ChunkStore::write(path, vol, options);
+        }, py::arg("path"), py::arg("volume"), py::arg("spacing_x") = 1.0, py::arg("spacing_y") = 1.0,
+        py::arg("spacing_z") = 1.0, py::arg("chunk_size") = 64, py::arg("levels") = 0, py::arg("compression") = 1,
+        py::arg("threads") = 0,
+        "Write a (depth, height, width) uint16 volume as a chunk store. levels: pyramid levels including full "
+        "resolution (0 = until one chunk); compression: zlib level (0 = raw). Returns true on success");
+
+    py::class_<ChunkStore::Reader>(m, "ChunkStoreReader")
+            .def(py::init([](const std::string& path) {
+                auto reader = std::make_unique<ChunkStore::Reader>();
+                if (!reader->open(path)) throw std::runtime_error("cannot open chunk store: " + path);
+                return reader;
+            }), py::arg("path"), "Opens a chunk store; only the header and chunk index are read")
+            .def_property_readonly("level_count", &ChunkStore::Reader::levelCount)
+            .def_property_readonly("chunk_size", &ChunkStore::Reader::chunkSize)
+            .def_property_readonly("stored_bytes", &ChunkStore::Reader::storedBytes,
+                                   "Total size of the stored (compressed) chunks")
+            .def("level_shape", [](const ChunkStore::Reader& self, unsigned int level) {
+                    if (level >= self.levelCount()) throw py::index_error("level out of range");
+                    const ChunkStore::LevelInfo& l = self.level(level);
+                    return py::make_tuple(l.depth, l.height, l.width);
+            }, py::arg("level") = 0, "(depth, height, width) of a level")
+            .def("level_spacing", [](const ChunkStore::Reader& self, unsigned int level) {
+                    if (level >= self.levelCount()) throw py::index_error("level out of range");
+                    const ChunkStore::LevelInfo& l = self.level(level);
+                    return py::make_tuple(l.spacing_x, l.spacing_y, l.spacing_z);
+            }, py::arg("level") = 0, "(x, y, z) voxel spacing of a level")
+            .def("read_region", [](const ChunkStore::Reader& self, unsigned int z0, unsigned int y0, unsigned int x0,
+                                   unsigned int depth, unsigned int height, unsigned int width, unsigned int level,
+                                   unsigned int threads) {
+                    py::array_t<uint16_t> out({static_cast<py::ssize_t>(depth), static_cast<py::ssize_t>(height),
+                                               static_cast<py::ssize_t>(width)});
+                    uint16_t* dst = out.mutable_data();
+                    bool ok;
+                    {
+                        py::gil_scoped_release release;
+                        ok = self.readRegion(level, x0, y0, z0, width, height, depth, dst, threads);
+                    }
+                    if (!ok) throw std::invalid_argument("region outside the level or unreadable chunk");
+                    return out;
+            }, py::arg("z0"), py::arg("y0"), py::arg("x0"), py::arg("depth"), py::arg("height"), py::arg("width"),
+            py::arg("level") = 0, py::arg("threads") = 0,
+            "(depth, height, width) uint16 box of a level; reads only the chunks it intersects")
+            .def("read_slice", [](const ChunkStore::Reader& self, unsigned int index, int axis, unsigned int level,
+                                  unsigned int threads) {
+                    if (level >= self.levelCount()) throw py::index_error("level out of range");
+                    if (axis < 0 || axis > 2) throw std::invalid_argument("axis must be 0 (z), 1 (y) or 2 (x)");
+                    const ChunkStore::LevelInfo& l = self.level(level);
+                    const unsigned int size[3] = {l.depth, l.height, l.width};
+                    if (index >= size[axis]) throw py::index_error("slice index out of range");
+                    unsigned int box[3] = {l.depth, l.height, l.width};
+                    unsigned int origin[3] = {0, 0, 0};
+                    box[axis] = 1;
+                    origin[axis] = index;
+                    py::array_t<uint16_t> out(axis == 0 ? std::vector<py::ssize_t>{box[1], box[2]}
+                                             : axis == 1 ? std::vector<py::ssize_t>{box[0], box[2]}
+                                                         : std::vector<py::ssize_t>{box[0], box[1]});
+                    uint16_t* dst = out.mutable_data();
+                    bool ok;
+                    {
+                        py::gil_scoped_release release;
+                        ok = self.readRegion(level, origin[2], origin[1], origin[0], box[2], box[1], box[0], dst, threads);
+                    }
+                    if (!ok) throw std::runtime_error("unreadable chunk in " + self.path());
+                    return out;
+            }, py::arg("index"), py::arg("axis") = 0, py::arg("level") = 0, py::arg("threads") = 0,
+            "One slice of a level: axis 0 = z (height, width), 1 = y (depth, width), 2 = x (depth, height)")
+            .def("read_volume", [](const ChunkStore::Reader& self, unsigned int level, unsigned int threads) {
+                    if (level >= self.levelCount()) throw py::index_error("level out of range");
+                    const ChunkStore::LevelInfo& l = self.level(level);
+                    py::array_t<uint16_t> out({static_cast<py::ssize_t>(l.depth), static_cast<py::ssize_t>(l.height),
+                                               static_cast<py::ssize_t>(l.width)});
+                    uint16_t* dst = out.mutable_data();
+                    bool ok;
+                    {
+                        py::gil_scoped_release release;
+                        ok = self.readRegion(level, 0, 0, 0, l.width, l.height, l.depth, dst, threads);
+                    }
+                    if (!ok) throw std::runtime_error("unreadable chunk in " + self.path());
+                    return out;
+            }, py::arg("level") = 0, py::arg("threads") = 0,
+            "Whole level as (depth, height, width) uint16, chunks inflated in parallel")
+            .def_property_readonly("chunks_read", &ChunkStore::Reader::chunksRead,
+                                   "Chunks inflated since opening or reset_counters()")
+            .def_property_readonly("bytes_read", &ChunkStore::Reader::bytesRead,
+                                   "Stored bytes read since opening or reset_counters()")
+            .def("reset_counters", &ChunkStore::Reader::resetCounters);
+
+    // Orbit camera as used by each renderer view (for rendering outside a Renderer)
+    py::class_<Camera>(m, "Camera")
+            .def(py::init<>())
+            .def("frame_box", [](Camera& self, float w, float h, float d) { self.frameBox(w, h, d); },
+                 py::arg("width"), py::arg("height"), py::arg("depth"),
+                 "Frame a box of this size centred at the origin (resets the angles to the default view)")
+            .def("set_angles", &Camera::setAngles, py::arg("azimuth"), py::arg("elevation"))
+            .def("get_angles", [](const Camera& self) { return py::make_tuple(self.getAzimuth(), self.getElevation()); })
+            .def("rotate", &Camera::rotate, py::arg("delta_azimuth"), py::arg("delta_elevation"))
+            .def("zoom", &Camera::zoom, py::arg("delta"))
+            .def("set_aspect_ratio", &Camera::setAspectRatio, py::arg("aspect"))
+            .def("view_matrix", [](const Camera& self) { return matrixToNumpy(self.getViewMatrix()); },
+                 "4x4 world-to-eye matrix (row-major)")
+            .def("projection_matrix", [](const Camera& self) { return matrixToNumpy(self.getProjectionMatrix()); },
+                 "4x4 perspective projection matrix (row-major)");
+
     py::class_<Renderer>(m, "Renderer")
 
              .def(py::init<>())
@@ -35,9 +617,97 @@ void bind_renderer(py::module_& m) {
              .def("get_volume_spacing_z", &Renderer::getVolumeSpacingZ, "Returns the Z spacing of the loaded volume")
 
              .def("load_volume", &Renderer::loadVolume, "Loads a volume from a file path or directory")
+             .def("list_dicom_series", [](Renderer& self, const std::string& path) -> py::list {
+                    py::list out;
+                    for (const auto& series : self.listDICOMSeries(path)) {
+                        py::dict d;
+                        d["key"] = series.key;
+                        d["series_uid"] = series.seriesUID;
+                        d["orientation"] = series.orientation;
+                        d["directory"] = series.directory;
+                        d["width"] = series.width;
+                        d["height"] = series.height;
+                        d["slices"] = series.slices.size();
+                        out.append(d);
+                    }
+                    return out;
+             }, py::arg("path"),
+             "Recursively scans a directory and returns its DICOM series (largest first) as dicts with a 'key'")
+             .def("load_dicom_series", &Renderer::loadDICOMSeries, py::arg("path"), py::arg("series_key"),
+                  "Loads one series (by 'key' from list_dicom_series) from a DICOM directory")
+             .def("set_cache_directory", &Renderer::setCacheDirectory, py::arg("path"),
+                  "Directory for persistent caches such as the DICOM header index (empty disables)")
+             .def("get_cache_directory", &Renderer::getCacheDirectory, "Returns the persistent cache directory")
+            .def("save_chunk_store", &Renderer::saveChunkStore, py::arg("path"), py::arg("chunk_size") = 64,
+                 py::arg("levels") = 0, py::arg("compression") = 1,
+                 "Write the loaded volume as a chunk store (.mvrc) that load_volume reads back; returns true on success")
 
              .def("is_volume_loaded", &Renderer::isVolumeLoaded, "Returns true if a volume is loaded")
 
+             .def("get_load_stats", [](const Renderer& self) -> py::dict {
+                    const LoadStats& stats = self.getLoadStats();
+                    py::dict phases;
+                    for (int i = 0; i < kLoadPhaseCount; ++i) {
+                        phases[LoadStats::phaseName(static_cast<LoadPhase>(i))] = stats.phaseMs[i];
+                    }
+                    py::dict out;
+                    out["path"] = stats.path;
+                    out["format"] = stats.format;
+                    out["data_type"] = stats.dataType;
+                    out["reduction"] = stats.reduction;
+                    out["success"] = stats.success;
+                    out["total_ms"] = stats.totalMs;
+                    out["phases_ms"] = phases;
+                    out["files_scanned"] = stats.filesScanned;
+                    out["files_parsed"] = stats.filesParsed;
+                    out["files_skipped"] = stats.filesSkipped;
+                    out["files_cached"] = stats.filesCached;
+                    out["bytes_read"] = stats.bytesRead;
+                    out["bytes_output"] = stats.bytesOutput;
+                    return out;
+             }, "Returns per-phase timings (ms) and file/byte counts of the most recent load")
+             .def("set_load_verbosity", &Renderer::setLoadVerbosity, py::arg("level"),
+                  "Set loader log verbosity: 0=errors only, 1=summary (default), 2=per-file")
+             .def("get_load_verbosity", &Renderer::getLoadVerbosity, "Returns the loader log verbosity")
+             .def("set_parallel_gzip", &Renderer::setParallelGzip, py::arg("enabled"),
+                  "Enable/disable multi-threaded decompression of .nii.gz files (default on)")
+             .def("get_parallel_gzip", &Renderer::getParallelGzip, "Returns true if parallel gzip decompression is enabled")
+             .def("set_load_threads", &Renderer::setLoadThreads, py::arg("threads"),
+                  "Worker threads used by the loaders (0 = all cores)")
+             .def("get_load_threads", &Renderer::getLoadThreads, "Returns the loader thread count (0 = all cores)")
+             .def("set_resample_interpolation", &Renderer::setResampleInterpolation, py::arg("mode"),
+                  "Interpolation when DICOM slices are regridded: 0 = nearest, 1 = trilinear (default)")
+             .def("get_resample_interpolation", &Renderer::getResampleInterpolation,
+                  "Returns the DICOM resampling interpolation (0 = nearest, 1 = trilinear)")
+             .def("set_resample_isotropic", &Renderer::setResampleIsotropic, py::arg("enabled"),
+                  "Resample DICOM series to cubic voxels of the finest spacing on load (default off)")
+             .def("get_resample_isotropic", &Renderer::getResampleIsotropic,
+                  "Returns true if DICOM series are resampled to cubic voxels")
+
+             .def("get_time_frame_count", &Renderer::getTimeFrameCount,
+                  "Number of time frames of the loaded volume (1 for 3D volumes, 0 if nothing is loaded)")
+             .def("get_time_frame", &Renderer::getTimeFrame, "Returns the displayed time frame")
+             .def("set_time_frame", &Renderer::setTimeFrame, py::arg("frame"),
+                  "Show another frame of a 4D NIfTI volume (decoded on demand, uploaded on the next render)")
+             .def("get_time_frame_interval", &Renderer::getTimeFrameInterval,
+                  "Time between frames from the NIfTI header (pixdim[4]; 0 if unknown)")
+             .def("set_time_frame_cache_size", &Renderer::setTimeFrameCacheSize, py::arg("frames"),
+                  "Number of decoded 4D frames kept in memory (>= 2)")
+             .def("get_time_frame_cache_size", &Renderer::getTimeFrameCacheSize, "Returns the 4D frame cache size")
+             // Live DICOM watch
+             .def("start_dicom_watch", &Renderer::startDicomWatch, py::arg("path"), py::arg("polling") = false,
+                  py::arg("poll_interval_ms") = 250,
+                  "Follow a DICOM series while it is written into a folder (replaces the volume); "
+                  "slices are decoded in the background and inserted by poll_dicom_watch()")
+             .def("stop_dicom_watch", &Renderer::stopDicomWatch,
+                  "Stop following the folder; the slices received so far stay loaded")
+             .def("is_dicom_watching", &Renderer::isDicomWatching, "Returns true while a folder is watched")
+             .def("is_dicom_watch_polling", &Renderer::isDicomWatchPolling,
+                  "Returns true if the watch lists the folder instead of using inotify")
+             .def("poll_dicom_watch", &Renderer::pollDicomWatch,
+                  "Insert the slices decoded since the last call (only their Z-range is re-uploaded); "
+                  "returns how many")
+
             // This exposes the C++ getVolume method, returning a pointer.
             // The 'reference_internal' policy is crucial: it tells Python that the
             // lifetime of the returned VolumeData object is managed by the Renderer.
@@ -70,13 +740,54 @@ void bind_renderer(py::module_& m) {
             
             
             // --- Bind new OpenGL and Camera methods ---
-            .def("init", &Renderer::init, "Initialize OpenGL context")
-            .def("render", &Renderer::render, "Render the scene")
-            .def("resize", &Renderer::resize, "Resize the viewport")
-            .def("camera_rotate", &Renderer::camera_rotate, "Rotate the camera")
-            .def("camera_zoom", &Renderer::camera_zoom, "Zoom the camera")
+            .def("init", &Renderer::init, py::arg("view") = 0, "Initialize OpenGL context")
+            .def("render", &Renderer::render, py::arg("view") = 0, "Render the scene")
+            .def("resize", &Renderer::resize, py::arg("width"), py::arg("height"), py::arg("view") = 0,
+                 "Resize the viewport")
+            .def("camera_rotate", &Renderer::camera_rotate, py::arg("dx"), py::arg("dy"), py::arg("view") = 0,
+                 "Rotate the camera")
+            .def("camera_zoom", &Renderer::camera_zoom, py::arg("delta"), py::arg("view") = 0, "Zoom the camera")
             .def("set_camera_angles", &Renderer::set_camera_angles, py::arg("azimuthDeg"), py::arg("elevationDeg"),
+                 py::arg("view") = 0,
                  "Set camera azimuth/elevation in degrees (elevation clamped to avoid gimbal lock)")
+            .def("get_camera_angles", [](const Renderer& self, int view) {
+                glm::vec2 angles = self.get_camera_angles(view);
+                return py::make_tuple(angles.x, angles.y);
+            }, py::arg("view") = 0, "Returns the camera (azimuth, elevation) in degrees")
+            .def("get_camera", &Renderer::getCamera, py::arg("view") = 0,
+                 "Returns a copy of the view's Camera (matrices for rendering the same view elsewhere)")
+            // Views (one per GL widget; all share the volume texture)
+            .def("create_view", &Renderer::createView,
+                 "Create a view with its own camera and slicer state; returns its id (view 0 always exists)")
+            .def("destroy_view", &Renderer::destroyView, py::arg("view"),
+                 "Destroy a view (call with that view's GL context current)")
+            .def("get_view_count", &Renderer::getViewCount, "Returns the number of live views")
+            .def("needs_redraw", &Renderer::needsRedraw, py::arg("view") = 0,
+                 "Returns true if the view changed since it was last rendered")
+            .def("set_view_orientation", &Renderer::setViewOrientation, py::arg("axis"), py::arg("view") = 0,
+                 "Lock the view camera to an axis (0=Z,1=Y,2=X, -1 = free)")
+            .def("get_texture_memory_bytes", &Renderer::getTextureMemoryBytes,
+                 "Returns the bytes of volume and LUT textures (shared by all views)")
+            // Memory budgets
+            .def("set_host_memory_budget", &Renderer::setHostMemoryBudget, py::arg("bytes"),
+                 "Host memory budget for the process (0 = unlimited); loads over it evict caches, then downsample")
+            .def("get_host_memory_budget", &Renderer::getHostMemoryBudget, "Returns the host budget in bytes")
+            .def("set_device_memory_budget", &Renderer::setDeviceMemoryBudget, py::arg("bytes"),
+                 "VRAM budget (0 = unlimited); a volume texture over it is stored at 8 bits, then at lower resolution")
+            .def("get_device_memory_budget", &Renderer::getDeviceMemoryBudget, "Returns the VRAM budget in bytes")
+            .def("get_memory_usage", [](Renderer& self) {
+                const Renderer::MemoryStatus status = self.getMemoryStatus();
+                py::dict out = memoryUsageToDict(status.usage);
+                py::dict device = out["device"];
+                device["total"] = status.deviceTotalBytes;
+                device["available"] = status.deviceAvailableBytes;
+                out["volume_texture_bits"] = status.volumeTextureBits;
+                out["volume_texture_factor"] = status.volumeTextureFactor;
+                out["actions"] = status.actions;
+                return out;
+            }, "Returns {'host': {used, peak, budget}, 'device': {used, peak, budget, total, available}, "
+               "'categories': {name: bytes}, 'volume_texture_bits', 'volume_texture_factor', 'actions'}; "
+               "total/available are -1 unless the driver reports VRAM")
             // Controls
             .def("set_show_bounding_box", &Renderer::setShowBoundingBox, py::arg("show"), "Show or hide the bounding box")
             .def("set_colormap_preset", &Renderer::setColormapPreset, py::arg("preset_index"), "Set colormap preset (0..9)")
@@ -84,10 +795,211 @@ void bind_renderer(py::module_& m) {
                  "Set background clear color as floats in [0,1]")
             .def("set_bounding_box_scale", &Renderer::setBoundingBoxScale, py::arg("scale"),
                  "Set bounding box scale (default 1.0, clamped to [0.1, 5.0])")
-            .def("frame_camera_to_box", &Renderer::frameCameraToBox, "Frame camera to volume bounding box")
+            .def("frame_camera_to_box", &Renderer::frameCameraToBox, py::arg("view") = 0,
+                 "Frame camera to volume bounding box (the crop box when one is set)")
+            // Region of interest
+            .def("set_crop_box", &Renderer::setCropBox, py::arg("min_x"), py::arg("min_y"), py::arg("min_z"),
+                 py::arg("max_x"), py::arg("max_y"), py::arg("max_z"),
+                 "Render only voxels [min, max) per axis; rays, bounding box, slices and framing follow the crop")
+            .def("clear_crop_box", &Renderer::clearCropBox, "Show the whole volume again")
+            .def("has_crop_box", &Renderer::hasCropBox, "Returns true if a crop box is set")
+            .def("get_crop_box", [](const Renderer& self) {
+                std::array<int, 6> box = self.getCropBox();
+                return py::make_tuple(box[0], box[1], box[2], box[3], box[4], box[5]);
+            }, "Returns (min_x, min_y, min_z, max_x, max_y, max_z); the whole volume when not cropped")
+            .def("set_crop_upload_enabled", &Renderer::setCropUploadEnabled, py::arg("enabled"),
+                 "Keep only the cropped sub-volume in GPU textures (lower VRAM; re-uploads when the crop changes)")
+            .def("get_crop_upload_enabled", &Renderer::getCropUploadEnabled,
+                 "Returns true if textures hold only the crop box")
+            // Segmentation labels
+            .def("load_label_map", [](Renderer& self, const std::string& path) {
+                    py::gil_scoped_release release;
+                    return self.loadLabelMap(path);
+                 }, py::arg("path"),
+                 "Load a NIfTI mask (same dimensions as the volume) as a label overlay; returns true on success")
+            .def("clear_label_map", &Renderer::clearLabelMap, "Remove the label overlay")
+            .def("has_label_map", &Renderer::hasLabelMap, "Returns true if a label map is loaded")
+            .def("get_label_counts", [](const Renderer& self) {
+                py::dict counts;
+                for (const auto& entry : self.getLabelCounts()) counts[py::int_(entry.first)] = entry.second;
+                return counts;
+            }, "Returns {label: voxel count} for every label present (background 0 excluded)")
+            .def("get_label_map_memory_bytes", &Renderer::getLabelMapMemoryBytes,
+                 "Host memory used by the run-length-encoded labels")
+            .def("set_label_color", &Renderer::setLabelColor, py::arg("label"), py::arg("r"), py::arg("g"), py::arg("b"),
+                 "Set a label's colour as floats in [0,1]")
+            .def("get_label_color", [](const Renderer& self, int label) {
+                glm::vec3 c = self.getLabelColor(label);
+                return py::make_tuple(c.r, c.g, c.b);
+            }, py::arg("label"), "Returns a label's colour as (r, g, b)")
+            .def("set_label_visible", &Renderer::setLabelVisible, py::arg("label"), py::arg("visible"),
+                 "Show or hide one label (updates the 256-entry colour table only)")
+            .def("get_label_visible", &Renderer::getLabelVisible, py::arg("label"), "Returns true if the label is shown")
+            .def("set_label_opacity", &Renderer::setLabelOpacity, py::arg("opacity"),
+                 "Blend weight of label colours over the volume (0..1, default 0.5)")
+            .def("get_label_opacity", &Renderer::getLabelOpacity, "Returns the label blend weight")
+            .def("set_show_labels", &Renderer::setShowLabels, py::arg("show"), "Show or hide the whole label overlay")
+            .def("get_show_labels", &Renderer::getShowLabels, "Returns true if the label overlay is shown")
+            // Fusion (second volume)
+            .def("load_fusion_volume", [](Renderer& self, const std::string& path) {
+                    py::gil_scoped_release release;
+                    return self.loadFusionVolume(path);
+                 }, py::arg("path"),
+                 "Load a second volume (NIfTI, DICOM folder or chunk store) drawn fused over the first, "
+                 "e.g. PET over CT; returns true on success")
+            .def("clear_fusion_volume", &Renderer::clearFusionVolume, "Remove the fusion volume")
+            .def("has_fusion_volume", &Renderer::hasFusionVolume, "Returns true if a fusion volume is loaded")
+            .def("get_fusion_dimensions", [](const Renderer& self) {
+                std::array<unsigned int, 3> dims = self.getFusionDimensions();
+                return py::make_tuple(dims[0], dims[1], dims[2]);
+            }, "Returns the fusion volume's (width, height, depth)")
+            .def("get_fusion_spacing", [](const Renderer& self) {
+                glm::vec3 s = self.getFusionSpacing();
+                return py::make_tuple(s.x, s.y, s.z);
+            }, "Returns the fusion volume's voxel spacing (x, y, z) in mm")
+            .def("set_fusion_offset", &Renderer::setFusionOffset, py::arg("x"), py::arg("y"), py::arg("z"),
+                 "Shift the fusion volume's centre from the primary's, in mm (registration translation)")
+            .def("get_fusion_offset", [](const Renderer& self) {
+                glm::vec3 o = self.getFusionOffset();
+                return py::make_tuple(o.x, o.y, o.z);
+            }, "Returns the fusion offset (x, y, z) in mm")
+            .def("set_fusion_colormap_preset", &Renderer::setFusionColormapPreset, py::arg("preset_index"),
+                 "Colormap of the fusion volume (0..9, default 2 = Hot)")
+            .def("get_fusion_colormap_preset", &Renderer::getFusionColormapPreset,
+                 "Returns the fusion colormap preset")
+            .def("set_fusion_opacity", &Renderer::setFusionOpacity, py::arg("opacity"),
+                 "Weight of the fusion volume over the primary (0..1, default 0.5)")
+            .def("get_fusion_opacity", &Renderer::getFusionOpacity, "Returns the fusion opacity")
+            .def("set_layer_window", &Renderer::setLayerWindow, py::arg("layer"), py::arg("low"), py::arg("high"),
+                 "Intensity window of a layer (0 = volume, 1 = fusion) in voxel units 0..65535")
+            .def("get_layer_window", [](const Renderer& self, int layer) {
+                glm::vec2 w = self.getLayerWindow(layer);
+                return py::make_tuple(w.x, w.y);
+            }, py::arg("layer"), "Returns a layer's window as (low, high)")
+            .def("set_layer_visible", &Renderer::setLayerVisible, py::arg("layer"), py::arg("visible"),
+                 "Show or hide a layer (0 = volume, 1 = fusion)")
+            .def("is_layer_visible", &Renderer::isLayerVisible, py::arg("layer"), "Returns true if the layer is shown")
+            // Axis projections
+            .def("set_axis_projections_enabled", &Renderer::setAxisProjectionsEnabled, py::arg("enabled"),
+                 "Draw views at an exact Z/Y/X pose from precomputed axis MIPs instead of raymarching (default on)")
+            .def("get_axis_projections_enabled", &Renderer::getAxisProjectionsEnabled,
+                 "Returns true if axis-aligned views use the precomputed projections")
+            .def("get_axis_projection", [](Renderer& self, int axis) {
+                unsigned int width = 0, height = 0;
+                const std::vector<uint16_t>& image = self.getAxisProjection(axis, width, height);
+                return imageToNumpy(image, width, height);
+            }, py::arg("axis"),
+               "MIP of the loaded volume (or 4D frame) along axis 0 = Z (height, width), 1 = Y (depth, width) "
+               "or 2 = X (depth, height), as uint16; cached per load")
+            .def("has_axis_projections", &Renderer::hasAxisProjections,
+                 "Returns true if the axis MIPs of the loaded volume are cached (get_axis_projection is then a copy)")
+            .def("get_projected_axis", &Renderer::getProjectedAxis, py::arg("view") = 0,
+                 "Axis the view's last frame was drawn from the projections (0 = Z, 1 = Y, 2 = X), or -1 if raymarched")
+            .def("reslice", [](const Renderer& self, PointArray center, py::object axis_u, py::object axis_v,
+                               py::object normal, unsigned int width, unsigned int height, double pixel_spacing,
+                               unsigned int count, double step, int interpolation, uint16_t background) {
+                    bool stacked = false;
+                    const auto planes = planesFromNumpy(center, axis_u, axis_v, normal, pixel_spacing, count, step, stacked);
+                    py::array_t<uint16_t> out = resliceArray(planes.size(), stacked, width, height);
+                    uint16_t* dst = out.mutable_data();
+                    bool ok;
+                    {
+                        py::gil_scoped_release release;
+                        ok = self.reslice(planes, width, height, dst,
+                                          static_cast<VolumeOps::Interpolation>(interpolation != 0), background);
+                    }
+                    if (!ok) throw std::runtime_error("no volume loaded");
+                    return out;
+            }, py::arg("center"), py::arg("axis_u") = py::none(), py::arg("axis_v") = py::none(),
+            py::arg("normal") = py::none(), py::arg("width") = 256, py::arg("height") = 256,
+            py::arg("pixel_spacing") = 1.0, py::arg("count") = 1, py::arg("step") = 0.0, py::arg("interpolation") = 1,
+            py::arg("background") = 0,
+            "Oblique reformat of the loaded volume on the CPU (no GL needed); same planes as volumerenderer.reslice, "
+            "in mm of the loaded volume's spacing")
+            .def("set_shading_enabled", &Renderer::setShadingEnabled, py::arg("enabled"),
+                 "Switch the 3D view between MIP (False) and shaded compositing backed by a gradient volume (True)")
+            .def("is_shading_enabled", &Renderer::isShadingEnabled, "Returns true if shaded rendering is enabled")
+            .def("set_render_quality", &Renderer::setRenderQuality, py::arg("quality"),
+                 "Ray samples relative to the default 256 across the volume diagonal (0.25..2); lower is faster")
+            .def("get_render_quality", &Renderer::getRenderQuality, "Returns the ray sampling rate factor")
+            .def("set_preintegration_enabled", &Renderer::setPreintegrationEnabled, py::arg("enabled"),
+                 "Use the pre-integrated transfer function table in shaded mode (off by default), so colormaps "
+                 "with hard bands do not band at coarse steps; less accurate than point sampling for smooth colormaps")
+            .def("is_preintegration_enabled", &Renderer::isPreintegrationEnabled,
+                 "Returns true if shaded mode uses the pre-integrated table")
+            // Isosurface
+            .def("extract_isosurface", [](Renderer& self, float iso_value, bool use_block_index) {
+                    py::gil_scoped_release release;
+                    return self.extractIsosurface(iso_value, use_block_index);
+                 }, py::arg("iso_value"), py::arg("use_block_index") = true,
+                 "Extract the isosurface at iso_value (voxel units, 0..65535) with marching cubes; returns the triangle count")
+            .def("get_mesh", [](const Renderer& self) { return meshToNumpy(self.getMesh()); },
+                 "Returns the current isosurface as (vertices (N,3), faces (M,3), normals (N,3)) NumPy arrays")
+            .def("clear_mesh", &Renderer::clearMesh, "Discard the current isosurface")
+            .def("export_mesh", &Renderer::exportMesh, py::arg("path"),
+                 "Write the current isosurface as binary .ply or .stl; returns true on success")
+            .def("set_show_mesh", &Renderer::setShowMesh, py::arg("show"), "Show or hide the isosurface in the 3D view")
+            .def("get_show_mesh", &Renderer::getShowMesh, "Returns true if the isosurface is shown")
             // Slicer controls
-            .def("set_slice_mode", &Renderer::setSliceMode, py::arg("enabled"), "Enable/disable slicer view")
-            .def("set_slice_axis", &Renderer::setSliceAxis, py::arg("axis"), "Set slicer axis: 0=Z,1=Y,2=X")
-            .def("set_slice_index", &Renderer::setSliceIndex, py::arg("index"), "Set slice index");
+            .def("set_slice_mode", &Renderer::setSliceMode, py::arg("enabled"), py::arg("view") = 0,
+                 "Enable/disable slicer view")
+            .def("set_slice_axis", &Renderer::setSliceAxis, py::arg("axis"), py::arg("view") = 0,
+                 "Set slicer axis: 0=Z,1=Y,2=X")
+            .def("set_slice_index", &Renderer::setSliceIndex, py::arg("index"), py::arg("view") = 0, "Set slice index")
+            .def("get_slice_index", &Renderer::getSliceIndex, py::arg("view") = 0, "Returns the slice index")
+            .def("set_slab_thickness", &Renderer::setSlabThickness, py::arg("thickness_mm"), py::arg("view") = 0,
+                 "Thick-slab projection in slice mode over this many mm around the slice (0 = single slice)")
+            .def("get_slab_thickness", &Renderer::getSlabThickness, py::arg("view") = 0,
+                 "Returns the slab thickness in mm")
+            .def("set_slab_mode", &Renderer::setSlabMode, py::arg("mode"), py::arg("view") = 0,
+                 "Slab reduction: 0 = MIP, 1 = MinIP, 2 = mean")
+            .def("get_slab_mode", &Renderer::getSlabMode, py::arg("view") = 0, "Returns the slab reduction")
+            .def("get_slab_projection", [](const Renderer& self, int view) -> py::object {
+                std::vector<uint16_t> image;
+                unsigned int width = 0, height = 0;
+                bool ok;
+                {
+                    py::gil_scoped_release release;
+                    ok = self.getSlabProjection(view, image, width, height);
+                }
+                if (!ok) return py::none();
+                return imageToNumpy(image, width, height);
+            }, py::arg("view") = 0,
+               "The view's current slab (or slice when the thickness is 0) computed on the CPU, laid out like "
+               "get_axis_projection; None without a volume")
+            // Frame profiler
+            .def("set_profiling_enabled", &Renderer::setProfilingEnabled, py::arg("enabled"),
+                 "Enable/disable per-phase CPU/GPU frame timing in every view")
+            .def("is_profiling_enabled", &Renderer::isProfilingEnabled, "Returns true if frame profiling is enabled")
+            .def("reset_frame_stats", &Renderer::resetFrameStats, py::arg("view") = 0,
+                 "Clear the view's buffered frame timings")
+            .def("export_frame_trace", &Renderer::exportFrameTrace, py::arg("path"), py::arg("view") = 0,
+                 "Write the view's buffered frame timings as Chrome trace JSON; returns true on success")
+            .def("get_frame_stats", [](const Renderer& self, int view) -> py::dict {
+                    FrameStats stats = self.getFrameStats(view);
+                    auto pct = [](const FrameTimePercentiles& p) {
+                        py::dict d;
+                        d["p50"] = p.p50;
+                        d["p95"] = p.p95;
+                        d["p99"] = p.p99;
+                        return d;
+                    };
+                    py::dict phases;
+                    for (int i = 0; i < kFramePhaseCount; ++i) {
+                        py::dict ph;
+                        ph["cpu_ms"] = stats.phaseCpuMeanMs[i];
+                        ph["gpu_ms"] = stats.phaseGpuMeanMs[i];
+                        phases[FrameProfiler::phaseName(static_cast<FramePhase>(i))] = ph;
+                    }
+                    py::dict out;
+                    out["frames"] = stats.frameCount;
+                    out["gpu_frames"] = stats.gpuFrameCount;
+                    out["cpu_ms"] = pct(stats.cpu);
+                    out["gpu_ms"] = pct(stats.gpu);
+                    out["phases"] = phases;
+                    return out;
+            }, py::arg("view") = 0,
+               "Returns frame time percentiles (p50/p95/p99, ms) and mean per-phase CPU/GPU ms over the view's "
+               "recent frames");
 
 }
\ No newline at end of file
@@ -0,0 +1,44 @@
+import argparse
+import time
+import numpy as np
+import volumerenderer
+
+# Benchmarks the one-pass axis MIP kernel behind the aligned Z/Y/X views (and the
+# batch thumbnails) against NumPy's three separate max reductions.
+#
+# usage: python bench_axis_mip.py [--size 512] [--repeat 3]
+
+
+def best_of(repeat, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark axis MIP projections")
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n = args.size
+    rng = np.random.default_rng(0)
+    volume = rng.integers(0, 60000, size=(n * 3 // 4, n, n), dtype=np.uint16)
+    print(f"volume: {volume.shape[2]}x{volume.shape[1]}x{volume.shape[0]} uint16, {volume.nbytes / 2**20:.0f} MB")
+
+    dt_np, ref = best_of(args.repeat, lambda: tuple(volume.max(axis=a) for a in range(3)))
+    print(f"{'kernel':<22}{'threads':>8}{'ms':>10}{'GB/s':>8}")
+    print(f"{'numpy max x3':<22}{1:>8}{dt_np * 1000.0:>10.1f}{volume.nbytes / dt_np / 1e9:>8.2f}")
+    for threads in (1, 0):
+        dt, mips = best_of(args.repeat, lambda: volumerenderer.axis_projections(volume, threads))
+        print(f"{'axis_projections':<22}{'all' if threads == 0 else threads:>8}{dt * 1000.0:>10.1f}"
+              f"{volume.nbytes / dt / 1e9:>8.2f}")
+    print("matches NumPy:", all(np.array_equal(a, b) for a, b in zip(mips, ref)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import volumerenderer
+
+# Compares reads from a .nii.gz against the chunked store (.mvrc) converted from it:
+# full loads through Renderer.load_volume, and single slices / a region through
+# ChunkStoreReader, which only inflates the chunks they intersect. A .nii.gz has no
+# random access, so a slice from it costs a full load.
+#
+# usage: python bench_chunk_store.py volume.nii.gz [--chunk 64] [--repeat 3] [--threads 0]
+
+
+def best_of(repeat, fn):
+    times, result = [], None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t) * 1000.0)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunk store reads against .nii.gz")
+    parser.add_argument("path")
+    parser.add_argument("--chunk", type=int, default=64)
+    parser.add_argument("--compression", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="loader threads (0 = all cores)")
+    args = parser.parse_args()
+
+    r = volumerenderer.Renderer()
+    r.set_load_verbosity(0)
+    r.set_load_threads(args.threads)
+
+    totals = []
+    for _ in range(args.repeat):
+        if not r.load_volume(args.path):
+            raise SystemExit(f"Failed to load {args.path}")
+        totals.append(r.get_load_stats()["total_ms"])
+    gz_ms = statistics.median(totals)
+    volume = r.get_volume_as_numpy()
+    depth, height, width = volume.shape
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "volume.mvrc")
+        t = time.perf_counter()
+        ok = r.save_chunk_store(store, args.chunk, 0, args.compression)
+        write_ms = (time.perf_counter() - t) * 1000.0
+        if not ok:
+            raise SystemExit("could not write the chunk store")
+        print(f"volume: {width}x{height}x{depth}; .nii.gz {os.path.getsize(args.path) / 2**20:.1f} MB, "
+              f".mvrc {os.path.getsize(store) / 2**20:.1f} MB (chunk {args.chunk}, written in {write_ms:.0f} ms)")
+
+        totals = []
+        for _ in range(args.repeat):
+            if not r.load_volume(store):
+                raise SystemExit("Failed to load the chunk store")
+            totals.append(r.get_load_stats()["total_ms"])
+        mvrc_ms = statistics.median(totals)
+        identical = bool(np.array_equal(r.get_volume_as_numpy(), volume))
+
+        reader = volumerenderer.ChunkStoreReader(store)
+        print(f"{'read':<24}{'.nii.gz ms':>12}{'.mvrc ms':>10}{'speedup':>9}{'chunks':>8}{'MB read':>9}")
+        print(f"{'full volume':<24}{gz_ms:>12.1f}{mvrc_ms:>10.1f}{gz_ms / mvrc_ms:>9.1f}"
+              f"{'all':>8}{reader.stored_bytes / 2**20:>9.1f}")
+
+        center = (depth // 2, height // 2, width // 2)
+        size = min(64, depth, height, width)
+        roi = tuple(max(0, c - size // 2) for c in center)
+        reads = [
+            ("axial slice", lambda: reader.read_slice(center[0], 0, threads=args.threads), volume[center[0]]),
+            ("coronal slice", lambda: reader.read_slice(center[1], 1, threads=args.threads), volume[:, center[1]]),
+            ("sagittal slice", lambda: reader.read_slice(center[2], 2, threads=args.threads), volume[:, :, center[2]]),
+            (f"{size}^3 region", lambda: reader.read_region(*roi, size, size, size, threads=args.threads),
+             volume[roi[0]:roi[0] + size, roi[1]:roi[1] + size, roi[2]:roi[2] + size]),
+        ]
+        for name, fn, expected in reads:
+            reader.reset_counters()
+            ms, data = best_of(args.repeat, fn)
+            identical &= bool(np.array_equal(data, expected))
+            chunks = reader.chunks_read // args.repeat
+            mb = reader.bytes_read / args.repeat / 2**20
+            print(f"{name:<24}{gz_ms:>12.1f}{ms:>10.2f}{gz_ms / ms:>9.0f}{chunks:>8}{mb:>9.2f}")
+        for level in range(1, reader.level_count):
+            ms, _ = best_of(args.repeat, lambda: reader.read_volume(level, args.threads))
+            d, h, w = reader.level_shape(level)
+            print(f"{f'level {level} ({w}x{h}x{d})':<24}{'':>12}{ms:>10.2f}")
+        print("identical output:", identical)
+
+
+if __name__ == "__main__":
+    main()
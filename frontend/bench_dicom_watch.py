@@ -0,0 +1,125 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import volumerenderer
+
+# Benchmarks the live DICOM folder watch (Renderer.start_dicom_watch). The files of a
+# series are copied one at a time into an empty folder, the way a scanner writes them,
+# and after each copy the watch is polled until the slice is in the volume. Reports, per
+# quarter of the series, the latency from copy to insertion and the time poll_dicom_watch
+# takes per slice; both should stay flat as the series grows. With --gl each insertion is
+# also rendered offscreen and the upload time of the changed Z-range is reported. The
+# final volume is compared with a one-shot load_volume of the same folder.
+#
+# usage: python bench_dicom_watch.py SERIES_DIR [--polling] [--interval-ms 250] [--reverse]
+#                                    [--timeout 5] [--gl] [--width 512] [--height 512]
+
+
+def series_files(root):
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        files += [os.path.join(dirpath, f) for f in filenames if not f.startswith(".")]
+    return sorted(files)
+
+
+def offscreen_context(width, height):
+    from PyQt6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext, QSurfaceFormat
+    from PyQt6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    fmt = QSurfaceFormat()
+    fmt.setDepthBufferSize(24)
+    fmt.setVersion(3, 3)
+    fmt.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
+    surface = QOffscreenSurface()
+    surface.setFormat(fmt)
+    surface.create()
+    context = QOpenGLContext()
+    context.setFormat(fmt)
+    if not context.create() or not context.makeCurrent(surface):
+        raise SystemExit("Failed to create an OpenGL 3.3 context")
+    fbo_format = QOpenGLFramebufferObjectFormat()
+    fbo_format.setAttachment(QOpenGLFramebufferObject.Attachment.Depth)
+    target = QOpenGLFramebufferObject(width, height, fbo_format)
+    target.bind()
+    return app, surface, context, target  # kept alive by the caller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the live DICOM folder watch")
+    parser.add_argument("series", help="folder holding one DICOM series")
+    parser.add_argument("--polling", action="store_true", help="list the folder instead of using inotify")
+    parser.add_argument("--interval-ms", type=int, default=250, help="polling interval")
+    parser.add_argument("--reverse", action="store_true", help="write the files in reverse order")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for each slice")
+    parser.add_argument("--gl", action="store_true", help="also render and time the texture uploads")
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    args = parser.parse_args()
+
+    files = series_files(args.series)
+    if args.reverse:
+        files.reverse()
+    reference = volumerenderer.Renderer()
+    reference.set_load_verbosity(0)
+    if not reference.load_volume(args.series):
+        raise SystemExit(f"could not load {args.series}")
+    expected = reference.get_volume_as_numpy()
+
+    gl = offscreen_context(args.width, args.height) if args.gl else None
+    r = volumerenderer.Renderer()
+    r.set_load_verbosity(0)
+    if gl:
+        r.init()
+        r.resize(args.width, args.height)
+        r.set_profiling_enabled(True)
+
+    with tempfile.TemporaryDirectory() as folder:
+        if not r.start_dicom_watch(folder, polling=args.polling, poll_interval_ms=args.interval_ms):
+            raise SystemExit(f"could not watch {folder}")
+        print(f"{len(files)} files, watch mode: {'polling' if r.is_dicom_watch_polling() else 'inotify'}")
+        quarter = max(1, len(files) // 4)
+        print(f"{'slices':>12}{'latency ms':>12}{'poll us':>10}{'upload ms':>11}")
+        latencies, polls, missed = [], [], 0
+        for i, path in enumerate(files):
+            shutil.copyfile(path, os.path.join(folder, f"{i:06d}_{os.path.basename(path)}"))
+            copied = time.perf_counter()
+            added = 0
+            while added == 0 and time.perf_counter() - copied < args.timeout:
+                t = time.perf_counter()
+                added = r.poll_dicom_watch()
+                if added == 0:
+                    time.sleep(0.001)
+            if added == 0:
+                missed += 1  # not an image of the series
+            else:
+                polls.append((time.perf_counter() - t) * 1e6 / added)
+                latencies.append((time.perf_counter() - copied) * 1000.0)
+                if gl:
+                    r.render()
+            if (i + 1) % quarter == 0 or i + 1 == len(files):
+                upload = ""
+                if gl:
+                    upload = f"{r.get_frame_stats()['phases']['deferred_setup']['cpu_ms']:>11.2f}"
+                    r.reset_frame_stats()
+                if latencies:
+                    print(f"{i + 1 - quarter + 1:>5}-{i + 1:<6}{np.median(latencies):>12.1f}{np.median(polls):>10.1f}"
+                          f"{upload}")
+                latencies, polls = [], []
+        r.stop_dicom_watch()
+
+    got = r.get_volume_as_numpy()
+    print(f"files not inserted (not slices of the series): {missed}")
+    if got.shape != expected.shape:
+        print(f"shape {got.shape} vs load_volume {expected.shape} (uneven or mismatched slices are resampled there)")
+    else:
+        print("identical to load_volume:", bool(np.array_equal(got, expected)))
+
+
+if __name__ == "__main__":
+    main()
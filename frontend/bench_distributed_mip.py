@@ -0,0 +1,98 @@
+import argparse
+import os
+import numpy as np
+import volumerenderer
+from distributed_mip import DistributedMIP, camera_rays, to_gray
+
+# Scaling benchmark for sort-last distributed MIP (distributed_mip.py): renders a short
+# turntable with 1..N worker processes on this machine and checks every composite
+# against a single-process render of the whole volume.
+#
+# usage: python bench_distributed_mip.py [volume.nii.gz] [--size 256] [--workers 1,2,4,8]
+#                                        [--frames 8] [--width 512] [--height 512] [--save out.png]
+
+
+def synthetic_volume(n, rng):
+    # Bright blobs in a noisy background so every slab contributes to the image
+    z, y, x = np.mgrid[0:n, 0:n, 0:n].astype(np.float32) / n
+    vol = 4000.0 * rng.random((n, n, n), dtype=np.float32)
+    for _ in range(12):
+        c = rng.uniform(0.15, 0.85, size=3)
+        r = rng.uniform(0.04, 0.12)
+        vol += 50000.0 * np.exp(-((z - c[0]) ** 2 + (y - c[1]) ** 2 + (x - c[2]) ** 2) / (2 * r * r))
+    return np.clip(vol, 0, 65535).astype(np.uint16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sort-last distributed MIP scaling")
+    parser.add_argument("volume", nargs="?", help="NIfTI file or DICOM folder (default: synthetic)")
+    parser.add_argument("--size", type=int, default=256, help="synthetic volume edge length")
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts (default 1,2,4..cores)")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    parser.add_argument("--save", default=None, help="write the last composite as a grayscale PNG")
+    args = parser.parse_args()
+
+    if args.volume:
+        renderer = volumerenderer.Renderer()
+        if not renderer.load_volume(args.volume):
+            raise SystemExit(f"could not load {args.volume}")
+        volume = renderer.get_volume_as_numpy()
+        spacing = (renderer.get_volume_spacing_x(), renderer.get_volume_spacing_y(), renderer.get_volume_spacing_z())
+        del renderer
+    else:
+        volume = synthetic_volume(args.size, np.random.default_rng(0))
+        spacing = (1.0, 1.0, 1.0)
+    spacing = tuple(s if s > 0 else 1.0 for s in spacing)
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(c) for c in args.workers.split(",")]
+    else:
+        counts = [1]
+        while counts[-1] * 2 <= cores:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != cores:
+            counts.append(cores)
+    print(f"volume: {volume.shape[2]}x{volume.shape[1]}x{volume.shape[0]}, {volume.nbytes / 2**20:.0f} MB; "
+          f"image {args.width}x{args.height}; {args.frames} frames; {cores} cores")
+
+    angles = [(360.0 * i / args.frames, 20.0) for i in range(args.frames)]
+    w, h = args.width, args.height
+    base_ms = None
+    composite = None
+    print(f"{'workers':>8}{'ms/frame':>10}{'worker ms':>11}{'comp ms':>9}{'speedup':>9}{'eff':>7}{'identical':>11}")
+    for count in counts:
+        with DistributedMIP(volume, spacing, workers=count) as mip:
+            # Reference: the whole volume in this process, same camera
+            references = []
+            for az, el in angles:
+                cam = mip.frame_camera(az, el, w, h)
+                inv_vp, pos = camera_rays(cam)
+                references.append(volumerenderer.raycast_mip_slab(volume, 0, volume.shape[0], 0, volume.shape[0],
+                                                                  inv_vp, pos, w, h, *spacing, threads=1))
+            mip.render(mip.frame_camera(0.0, 20.0, w, h), w, h)  # warm-up: workers import and attach
+            identical = True
+            total = worker = comp = 0.0
+            for (az, el), ref in zip(angles, references):
+                composite, stats = mip.render(mip.frame_camera(az, el, w, h), w, h)
+                total += stats["total_ms"]
+                worker += max(stats["worker_ms"])
+                comp += stats["composite_ms"]
+                identical &= bool(np.array_equal(composite, ref))
+            ms = total / len(angles)
+            if base_ms is None:
+                base_ms = ms * mip.workers  # first row: assume it scaled linearly from one worker
+            speedup = base_ms / ms
+            print(f"{mip.workers:>8}{ms:>10.1f}{worker / len(angles):>11.1f}{comp / len(angles):>9.2f}"
+                  f"{speedup:>9.2f}{speedup / mip.workers:>7.2f}{str(identical):>11}")
+
+    if args.save and composite is not None:
+        from mvr_batch import write_png
+        write_png(args.save, to_gray(composite))
+        print(f"wrote {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import volumerenderer
+
+# Benchmarks the CPU gradient kernel used for shaded rendering and checks it against
+# a NumPy reference (np.gradient uses the same central/one-sided differences).
+#
+# usage: python bench_gradients.py [volume.nii.gz] [--size 256] [--repeat 3]
+#
+# Without a path, a synthetic volume (noisy sphere) of --size^3 voxels is used. The
+# benchmarked volume and a small synthetic one with anisotropic spacing must both match
+# the reference within the tolerances below, on one thread and on all of them; the exit
+# status is 1 otherwise.
+
+MAG_TOLERANCE_LSB = 1.0     # magnitude byte vs the rounded reference (float rounding)
+NORMAL_TOLERANCE_DEG = 1.5  # 8-bit octahedral normals are within about 1 degree
+CHECK_SIZE = 40
+CHECK_SPACING = (0.8, 1.0, 2.5)
+
+
+def synthetic_volume(n):
+    z, y, x = np.mgrid[0:n, 0:n, 0:n].astype(np.float32)
+    c = (n - 1) / 2.0
+    r = np.sqrt((x - c) ** 2 + (y - c) ** 2 + (z - c) ** 2)
+    vol = 65535.0 / (1.0 + np.exp((r - n * 0.3) / 2.0))
+    vol += np.random.default_rng(0).normal(0.0, 500.0, vol.shape)
+    return np.clip(vol, 0, 65535).astype(np.uint16)
+
+
+def decode_octahedral(u, v):
+    ex = u.astype(np.float32) / 255.0 * 2.0 - 1.0
+    ey = v.astype(np.float32) / 255.0 * 2.0 - 1.0
+    nz = 1.0 - np.abs(ex) - np.abs(ey)
+    fold = nz < 0.0
+    fx = (1.0 - np.abs(ey)) * np.where(ex >= 0.0, 1.0, -1.0)
+    fy = (1.0 - np.abs(ex)) * np.where(ey >= 0.0, 1.0, -1.0)
+    ex = np.where(fold, fx, ex)
+    ey = np.where(fold, fy, ey)
+    n = np.stack([ex, ey, nz], axis=-1)
+    return n / np.linalg.norm(n, axis=-1, keepdims=True)
+
+
+def check(vol, packed, spacing):
+    sx, sy, sz = spacing
+    gz, gy, gx = np.gradient(vol.astype(np.float32) / 65535.0, sz, sy, sx)
+    mag = np.sqrt(gx * gx + gy * gy + gz * gz)
+    max_grad = 1.0 / (2.0 * min(spacing))
+    ref_b = np.round(np.minimum(1.0, np.sqrt(mag / max_grad)) * 255.0)
+    mag_err = np.abs(ref_b - packed[..., 2].astype(np.float32)).max()
+
+    # Normals are only meaningful where there is an edge
+    mask = packed[..., 2] >= 32
+    n = decode_octahedral(packed[..., 0][mask], packed[..., 1][mask])
+    ref = -np.stack([gx[mask], gy[mask], gz[mask]], axis=-1)
+    ref /= np.linalg.norm(ref, axis=-1, keepdims=True)
+    cos = np.clip((n * ref).sum(axis=-1), -1.0, 1.0)
+    worst_deg = float(np.degrees(np.arccos(cos.min()))) if cos.size else 0.0
+    return mag_err, worst_deg, int(mask.sum())
+
+
+def verify(name, vol, spacing, packed_by_threads):
+    """Prints the errors of the packed gradients and returns the list of failures."""
+    failures = []
+    packed = packed_by_threads[0]
+    if any(not np.array_equal(p, packed) for p in packed_by_threads.values()):
+        failures.append("results differ across thread counts")
+    mag_err, worst_deg, edges = check(vol, packed, spacing)
+    print(f"{name}: magnitude max error {mag_err:.0f} LSB, normal max error {worst_deg:.2f} deg "
+          f"over {edges} edge voxels")
+    if mag_err > MAG_TOLERANCE_LSB:
+        failures.append(f"magnitude error {mag_err:.0f} LSB > {MAG_TOLERANCE_LSB:.0f}")
+    if worst_deg > NORMAL_TOLERANCE_DEG:
+        failures.append(f"normal error {worst_deg:.2f} deg > {NORMAL_TOLERANCE_DEG}")
+    if edges == 0:
+        failures.append("no edge voxels to check normals on")
+    return [f"{name}: {f}" for f in failures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the gradient volume kernel")
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spacing = (1.0, 1.0, 1.0)
+    if args.path:
+        r = volumerenderer.Renderer()
+        r.set_load_verbosity(0)
+        if not r.load_volume(args.path):
+            raise SystemExit(f"Failed to load {args.path}")
+        vol = r.get_volume_as_numpy()
+        spacing = (r.get_volume_spacing_x(), r.get_volume_spacing_y(), r.get_volume_spacing_z())
+        name = os.path.basename(args.path)
+    else:
+        vol = synthetic_volume(args.size)
+        name = f"synthetic {args.size}^3"
+
+    print(f"{name}: {vol.shape[2]}x{vol.shape[1]}x{vol.shape[0]}, spacing {spacing}")
+    print(f"{'threads':<10}{'ms':>10}{'Mvox/s':>10}")
+    results = {}
+    for threads in (1, 0):
+        best = None
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            packed = volumerenderer.compute_gradients(vol, *spacing, threads=threads)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        results[threads] = packed
+        label = "all" if threads == 0 else str(threads)
+        print(f"{label:<10}{best * 1000.0:>10.1f}{vol.size / best / 1e6:>10.1f}")
+
+    print("identical across thread counts:", bool((results[1] == results[0]).all()))
+    print(f"texture size: {results[0].nbytes / 2**20:.1f} MiB (RGB8) vs {vol.size * 12 / 2**20:.1f} MiB as float3")
+
+    small = synthetic_volume(CHECK_SIZE)
+    small_results = {threads: volumerenderer.compute_gradients(small, *CHECK_SPACING, threads=threads)
+                     for threads in (1, 0)}
+    failures = verify(name, vol, spacing, results)
+    failures += verify(f"synthetic {CHECK_SIZE}^3, spacing {CHECK_SPACING}", small, CHECK_SPACING, small_results)
+    for failure in failures:
+        print("FAIL:", failure)
+    if failures:
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
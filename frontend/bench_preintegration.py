@@ -0,0 +1,194 @@
+import argparse
+import sys
+import time
+import numpy as np
+import volumerenderer
+
+# Benchmarks the pre-integrated transfer function of the shaded mode. On the CPU it times
+# the table build (volumerenderer.preintegration_table) and composites synthetic rays the
+# way vol_fullscreen.frag does, with a point-sampled LUT and with the table, at several
+# render qualities (ray steps), against a 16x finer point-sampled reference. With --gl it
+# also renders shaded frames of a volume offscreen and reports GPU frame times.
+#
+# usage: python bench_preintegration.py [--lut 256] [--rays 4000] [--threads 0] [--repeat 3]
+#                                       [--gl volume.nii.gz] [--frames 30] [--width 512] [--height 512]
+
+SAMPLES_PER_DIAGONAL = 256   # Renderer: ray samples across the volume diagonal at quality 1
+OPTICAL_DEPTH = 64.0         # Renderer: shaded optical depth across the diagonal at s = 1
+QUALITIES = (2.0, 1.0, 0.5, 0.25)
+
+
+def colormaps(n):
+    s = np.linspace(0.0, 1.0, n)
+    smooth = np.stack([s, s, s], axis=1)
+    # Eight hard bands: the case that bands with a point-sampled LUT
+    rng = np.random.default_rng(1)
+    bands = rng.random((8, 3))[np.minimum((s * 8).astype(int), 7)]
+    return {"smooth": smooth.astype(np.float32), "banded": bands.astype(np.float32)}
+
+
+def ray_signals(rays, rng):
+    """s(t) for t in [0, 1] along each ray: a few random sines, clipped to [0, 1]."""
+    freq = rng.uniform(1.0, 12.0, size=(rays, 4))
+    phase = rng.uniform(0.0, 2.0 * np.pi, size=(rays, 4))
+    amp = rng.uniform(0.1, 0.4, size=(rays, 4))
+    offset = rng.uniform(0.0, 0.6, size=rays)
+
+    def signal(t):
+        return np.clip(offset + (amp * np.sin(2.0 * np.pi * freq * t + phase)).sum(axis=1), 0.0, 1.0)
+    return signal
+
+
+def composite_point(signal, colors, quality):
+    """Front-to-back like shade() without lighting: LUT colour and 1 - exp(-s^2 density step)."""
+    steps = int(SAMPLES_PER_DIAGONAL * quality)
+    extinction = OPTICAL_DEPTH / steps
+    grid = np.arange(len(colors))
+    acc_rgb, acc_a = 0.0, 0.0
+    for k in range(steps):
+        s = signal((k + 0.5) / steps)
+        a = 1.0 - np.exp(-s * s * extinction)
+        c = np.stack([np.interp(s * (len(colors) - 1), grid, colors[:, i]) for i in range(3)], axis=1)
+        acc_rgb = acc_rgb + ((1.0 - acc_a) * a)[:, None] * c
+        acc_a = acc_a + (1.0 - acc_a) * a
+    return acc_rgb
+
+
+def bilinear(table, front, back):
+    n = table.shape[0]
+    x, y = front * (n - 1), back * (n - 1)
+    x0 = np.minimum(x.astype(int), n - 2)
+    y0 = np.minimum(y.astype(int), n - 2)
+    fx, fy = (x - x0)[:, None], (y - y0)[:, None]
+    top = table[y0, x0] * (1 - fx) + table[y0, x0 + 1] * fx
+    bottom = table[y0 + 1, x0] * (1 - fx) + table[y0 + 1, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def composite_preintegrated(signal, table, quality):
+    """Like shade() with the table: steps between samples on step boundaries from the entry."""
+    steps = int(SAMPLES_PER_DIAGONAL * quality)
+    prev = signal(0.0)
+    acc_rgb, acc_a = 0.0, np.zeros_like(prev)
+    for k in range(1, steps + 1):
+        s = signal(k / steps)
+        seg = bilinear(table, prev, s)
+        prev = s
+        acc_rgb = acc_rgb + (1.0 - acc_a)[:, None] * seg[:, :3]
+        acc_a = acc_a + (1.0 - acc_a) * seg[:, 3]
+    return acc_rgb
+
+
+def reference_entry(colors, extinction, front, back, substeps=2048):
+    n = len(colors)
+    u = (np.arange(substeps) + 0.5) / substeps
+    s = (front + (back - front) * u) / (n - 1)
+    c = np.stack([np.interp(s * (n - 1), np.arange(n), colors[:, i]) for i in range(3)], axis=1)
+    a = 1.0 - np.exp(-extinction * s * s / substeps)
+    transmittance = np.concatenate([[1.0], np.cumprod(1.0 - a)[:-1]])
+    return np.append(((transmittance * a)[:, None] * c).sum(axis=0), 1.0 - np.prod(1.0 - a))
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000.0
+
+
+def gl_frame_times(path, frames, width, height):
+    from PyQt6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext, QSurfaceFormat
+    from PyQt6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    fmt = QSurfaceFormat()
+    fmt.setDepthBufferSize(24)
+    fmt.setVersion(3, 3)
+    fmt.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
+    surface = QOffscreenSurface()
+    surface.setFormat(fmt)
+    surface.create()
+    context = QOpenGLContext()
+    context.setFormat(fmt)
+    if not context.create() or not context.makeCurrent(surface):
+        raise SystemExit("Failed to create an OpenGL 3.3 context")
+    fbo_format = QOpenGLFramebufferObjectFormat()
+    fbo_format.setAttachment(QOpenGLFramebufferObject.Attachment.Depth)
+    target = QOpenGLFramebufferObject(width, height, fbo_format)
+
+    r = volumerenderer.Renderer()
+    r.set_load_verbosity(0)
+    r.set_shading_enabled(True)
+    r.set_colormap_preset(8)
+    if not r.load_volume(path):
+        raise SystemExit(f"could not load {path}")
+    r.init()
+    r.resize(width, height)
+    r.set_profiling_enabled(True)
+    target.bind()
+    print(f"{'quality':>8}{'preint':>8}{'gpu p50 ms':>12}{'volume ms':>11}")
+    for quality in QUALITIES:
+        for preintegrated in (False, True):
+            r.set_render_quality(quality)
+            r.set_preintegration_enabled(preintegrated)
+            r.render()  # table build and uploads happen here, outside the timed frames
+            r.reset_frame_stats()
+            for i in range(frames):
+                r.set_camera_angles(360.0 * i / frames, 20.0)
+                r.render()
+            stats = r.get_frame_stats()
+            print(f"{quality:>8.2f}{'on' if preintegrated else 'off':>8}{stats['gpu_ms']['p50']:>12.2f}"
+                  f"{stats['phases']['volume_draw']['gpu_ms']:>11.2f}")
+    target.release()
+    context.doneCurrent()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pre-integrated transfer function")
+    parser.add_argument("--lut", type=int, default=256, help="colormap entries (table is lut x lut)")
+    parser.add_argument("--rays", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--gl", metavar="VOLUME", help="also time shaded frames of this volume on the GPU")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    args = parser.parse_args()
+
+    maps = colormaps(args.lut)
+    rng = np.random.default_rng(0)
+
+    # Table build and accuracy against a finely integrated NumPy reference
+    extinction = OPTICAL_DEPTH / SAMPLES_PER_DIAGONAL
+    ms = best_of(args.repeat, lambda: volumerenderer.preintegration_table(maps["banded"], extinction,
+                                                                          threads=args.threads))
+    table = volumerenderer.preintegration_table(maps["banded"], extinction, threads=args.threads)
+    entries = rng.integers(0, args.lut, size=(200, 2))
+    error = max(float(np.abs(table[b, f] - reference_entry(maps["banded"], extinction, f, b)).max())
+                for f, b in entries)
+    print(f"table {args.lut}x{args.lut}: {ms:.2f} ms, max error vs NumPy integral {error:.2e}")
+    print("diagonal equals point sampling:", bool(np.allclose(
+        table[np.arange(args.lut), np.arange(args.lut), 3],
+        1.0 - np.exp(-extinction * np.linspace(0.0, 1.0, args.lut) ** 2), atol=1e-6)))
+
+    # Ray compositing error at each quality, relative to a 16x finer point-sampled reference
+    signal = ray_signals(args.rays, rng)
+    print(f"{'colormap':<10}{'quality':>8}{'steps':>7}{'point err':>11}{'preint err':>12}")
+    for name, colors in maps.items():
+        reference = composite_point(signal, colors, 16.0)
+        for quality in QUALITIES:
+            steps = int(SAMPLES_PER_DIAGONAL * quality)
+            table = volumerenderer.preintegration_table(colors, OPTICAL_DEPTH / steps, threads=args.threads)
+            point = composite_point(signal, colors, quality)
+            pre = composite_preintegrated(signal, table, quality)
+            rms = lambda img: float(np.sqrt(((img - reference) ** 2).mean()))
+            print(f"{name:<10}{quality:>8.2f}{steps:>7}{rms(point):>11.4f}{rms(pre):>12.4f}")
+
+    if args.gl:
+        gl_frame_times(args.gl, args.frames, args.width, args.height)
+
+
+if __name__ == "__main__":
+    main()
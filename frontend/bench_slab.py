@@ -0,0 +1,84 @@
+import argparse
+import math
+import time
+import numpy as np
+import volumerenderer
+
+# Benchmarks CPU thick-slab projections (volumerenderer.slab_projection) for a range of
+# slab thicknesses along each axis, against the same reduction in NumPy. Only the slab
+# is read, so time should grow with the thickness rather than the volume depth.
+#
+# usage: python bench_slab.py [volume.nii.gz] [--size 256] [--threads 0] [--repeat 3]
+
+
+def synthetic_volume(n, rng):
+    z, y, x = np.mgrid[0:n, 0:n, 0:n].astype(np.float32) / n
+    vol = 20000.0 * (1.0 + np.sin(9.0 * x) * np.cos(7.0 * y) * np.sin(5.0 * z)) + 3000.0 * rng.random((n, n, n))
+    return np.clip(vol, 0, 65535).astype(np.uint16)
+
+
+def numpy_slab(volume, axis, index, thickness, spacing, mode):
+    """Same slab as VolumeOps::slabRange: round(thickness / spacing) slices centred on index, clipped."""
+    size = volume.shape[axis]
+    n = max(1, math.floor(thickness / spacing + 0.5))
+    centre = min(max(index, 0), size - 1)
+    lo = centre - (n - 1) // 2
+    slab = np.take(volume, range(max(0, lo), min(size, lo + n)), axis=axis)
+    if mode == 0:
+        return slab.max(axis=axis)
+    if mode == 1:
+        return slab.min(axis=axis)
+    count = slab.shape[axis]
+    return ((slab.sum(axis=axis, dtype=np.uint64) + count // 2) // count).astype(np.uint16)
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU thick-slab projections")
+    parser.add_argument("volume", nargs="?", help="NIfTI file or DICOM folder (default: synthetic)")
+    parser.add_argument("--size", type=int, default=256, help="synthetic volume edge length")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.volume:
+        r = volumerenderer.Renderer()
+        r.set_load_verbosity(0)
+        if not r.load_volume(args.volume):
+            raise SystemExit(f"could not load {args.volume}")
+        volume = r.get_volume_as_numpy()
+        spacing = (r.get_volume_spacing_x(), r.get_volume_spacing_y(), r.get_volume_spacing_z())
+    else:
+        volume = synthetic_volume(args.size, np.random.default_rng(0))
+        spacing = (1.0, 1.0, 1.0)
+    d, h, w = volume.shape
+    print(f"volume {w}x{h}x{d}, spacing {spacing[0]:.2f} x {spacing[1]:.2f} x {spacing[2]:.2f} mm")
+    common = dict(spacing_x=spacing[0], spacing_y=spacing[1], spacing_z=spacing[2], threads=args.threads)
+
+    identical = True
+    print(f"{'axis':<6}{'mm':>7}{'mode':>6}{'slab ms':>10}{'numpy ms':>10}{'speedup':>9}")
+    for axis, name in ((0, "Z"), (1, "Y"), (2, "X")):
+        axis_spacing = spacing[2 - axis]
+        index = volume.shape[axis] // 2
+        for thickness in (1.0, 5.0, 20.0, 80.0):
+            mm = thickness * axis_spacing
+            for mode, label in ((0, "max"), (1, "min"), (2, "mean")):
+                ms = best_of(args.repeat, lambda: volumerenderer.slab_projection(
+                    volume, axis, index, mm, mode, **common))
+                ref_ms = best_of(args.repeat, lambda: numpy_slab(volume, axis, index, mm, axis_spacing, mode))
+                got = volumerenderer.slab_projection(volume, axis, index, mm, mode, **common)
+                identical &= bool(np.array_equal(got, numpy_slab(volume, axis, index, mm, axis_spacing, mode)))
+                print(f"{name:<6}{mm:>7.1f}{label:>6}{ms:>10.2f}{ref_ms:>10.2f}{ref_ms / ms:>9.1f}")
+    print("identical to NumPy:", identical)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# frontend/distributed_mip.py
+#
+# Sort-last distributed MIP rendering on one machine.
+#
+# A maximum intensity projection composites with a per-pixel max, so it splits cleanly
+# by depth. The coordinator copies the volume into shared memory once and splits it
+# into Z-slabs, one per worker process. For every frame it sends the shared camera
+# (inverse view-projection and position) over a pipe. Each worker raycasts only its
+# slab on the CPU (volumerenderer.raycast_mip_slab, the same sampling as the GPU
+# raycaster) into its own shared-memory partial image. The coordinator then combines
+# the partials with np.maximum. The slabs take disjoint sample sets, so the composite
+# is identical to rendering the whole volume in one process.
+#
+# Workers only read their slab (plus one ghost slice on each side for interpolation);
+# nothing but the camera and a timing travel through the pipes.
+
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import volumerenderer
+
+
+def partition_slabs(depth, parts):
+    """Splits [0, depth) into `parts` contiguous (z_begin, z_end) slabs of near-equal size."""
+    parts = max(1, min(parts, depth))
+    bounds = [round(i * depth / parts) for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
+def camera_rays(camera):
+    """(inverse view-projection 4x4, camera position) of a volumerenderer.Camera."""
+    view = camera.view_matrix().astype(np.float64)
+    projection = camera.projection_matrix().astype(np.float64)
+    inv_view_proj = np.linalg.inv(projection @ view).astype(np.float32)
+    position = np.linalg.inv(view)[:3, 3].astype(np.float32)
+    return inv_view_proj, position
+
+
+def to_gray(composite):
+    """8-bit grayscale of a composite (0 = background, as the GPU view's clear colour)."""
+    return np.where(composite > 0, (np.maximum(composite, 1) - 1) >> 8, 0).astype(np.uint8)
+
+
+def _worker(conn, volume_name, shape, spacing, z_begin, z_end, threads):
+    volume_shm = shared_memory.SharedMemory(name=volume_name)
+    out_shm = None
+    try:
+        depth = shape[0]
+        volume = np.ndarray(shape, dtype=np.uint16, buffer=volume_shm.buf)
+        lo, hi = max(0, z_begin - 1), min(depth, z_end + 1)
+        slab = volume[lo:hi]  # a view into shared memory, no copy
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            inv_view_proj, position, width, height, out_name = msg
+            if out_shm is None or out_shm.name != out_name:
+                if out_shm is not None:
+                    out_shm.close()
+                out_shm = shared_memory.SharedMemory(name=out_name)
+            out = np.ndarray((height, width), dtype=np.uint32, buffer=out_shm.buf)
+            t0 = time.perf_counter()
+            volumerenderer.raycast_mip_slab(slab, lo, depth, z_begin, z_end, inv_view_proj, position,
+                                            width, height, *spacing, out=out, threads=threads)
+            del out
+            conn.send(time.perf_counter() - t0)
+    finally:
+        slab = volume = None
+        if out_shm is not None:
+            out_shm.close()
+        volume_shm.close()
+
+
+class DistributedMIP:
+    """Coordinator for sort-last MIP over worker processes on this machine.
+
+    volume: (depth, height, width) uint16; spacing: (x, y, z) voxel size as the renderer
+    uses it. threads_per_worker defaults to 1 so N workers use N cores.
+    """
+
+    def __init__(self, volume, spacing=(1.0, 1.0, 1.0), workers=None, threads_per_worker=1):
+        volume = np.ascontiguousarray(volume, dtype=np.uint16)
+        self.shape = volume.shape
+        self.spacing = tuple(float(s) for s in spacing)
+        self.slabs = partition_slabs(self.shape[0], workers or multiprocessing.cpu_count())
+        self._volume_shm = shared_memory.SharedMemory(create=True, size=max(1, volume.nbytes))
+        np.ndarray(self.shape, dtype=np.uint16, buffer=self._volume_shm.buf)[...] = volume
+        self._partials = []  # one shared (height, width) uint32 image per worker
+        self._size = None
+
+        ctx = multiprocessing.get_context("spawn")
+        self._conns, self._procs = [], []
+        for z_begin, z_end in self.slabs:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child, self._volume_shm.name, self.shape, self.spacing,
+                                     z_begin, z_end, threads_per_worker))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    @property
+    def workers(self):
+        return len(self._procs)
+
+    def frame_camera(self, azimuth, elevation, width, height):
+        """A Camera framing the whole volume like a freshly loaded renderer view."""
+        camera = volumerenderer.Camera()
+        d, h, w = self.shape
+        sx, sy, sz = self.spacing
+        camera.frame_box(w * sx, h * sy, d * sz)
+        camera.set_angles(azimuth, elevation)
+        camera.set_aspect_ratio(width / max(1, height))
+        return camera
+
+    def _ensure_partials(self, width, height):
+        if self._size == (width, height):
+            return
+        self._release_partials()
+        nbytes = width * height * 4
+        self._partials = [shared_memory.SharedMemory(create=True, size=max(1, nbytes)) for _ in self._procs]
+        self._size = (width, height)
+
+    def _release_partials(self):
+        for shm in self._partials:
+            shm.close()
+            shm.unlink()
+        self._partials = []
+        self._size = None
+
+    def render(self, camera, width, height):
+        """Renders one frame; returns (composite (height, width) uint32, stats dict).
+
+        Composite values are 0 where no ray hit the volume, else 1 + the MIP value.
+        stats: total_ms, worker_ms (per worker), composite_ms.
+        """
+        t0 = time.perf_counter()
+        self._ensure_partials(width, height)
+        inv_view_proj, position = camera_rays(camera)
+        for conn, shm in zip(self._conns, self._partials):
+            conn.send((inv_view_proj, position, width, height, shm.name))
+        worker_s = [conn.recv() for conn in self._conns]
+        t1 = time.perf_counter()
+        images = [np.ndarray((height, width), dtype=np.uint32, buffer=shm.buf) for shm in self._partials]
+        composite = images[0].copy()
+        for image in images[1:]:
+            np.maximum(composite, image, out=composite)
+        del images
+        t2 = time.perf_counter()
+        return composite, {"total_ms": (t2 - t0) * 1000.0, "worker_ms": [s * 1000.0 for s in worker_s],
+                           "composite_ms": (t2 - t1) * 1000.0}
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._conns, self._procs = [], []
+        self._release_partials()
+        if self._volume_shm is not None:
+            self._volume_shm.close()
+            self._volume_shm.unlink()
+            self._volume_shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
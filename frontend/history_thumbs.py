@@ -0,0 +1,215 @@
+# frontend/history_thumbs.py
+#
+# Preview thumbnails for the History dropdown, cached in .mvr/thumbs/ next to
+# history.json. After a load the GUI thread copies the renderer's axial MIP (computed
+# during the load, so this costs no extra pass over the volume); a background worker
+# scales it to a small 8-bit PNG, records dims, spacing, datatype and source size in
+# index.json and evicts the least recently loaded entries beyond the size cap. The
+# dropdown then reads only the index and the PNGs, without loading the volume.
+#
+# An entry is dropped once its source changes: the size/mtime of a file, or the entry
+# count and newest folder mtime of a DICOM folder (adding, removing or renaming a file
+# updates its folder's mtime; rewriting a file in place does not). The check runs on the
+# worker, never on the GUI thread: the dropdown shows what the index holds and the
+# worker removes stale entries afterwards. A folder is walked once per session and
+# again only when its own mtime changes.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mvr_batch import correct_aspect, to_uint8, write_png
+
+THUMB_SIZE = 128  # pixels on the longer side
+
+
+def source_fingerprint(path):
+    """Cheap change detector for a volume file or DICOM folder; None if it is gone."""
+    try:
+        if not os.path.isdir(path):
+            st = os.stat(path)
+            return f"{st.st_size}:{st.st_mtime_ns}"
+        count, mtime = 0, 0
+        for dirpath, _, filenames in os.walk(path):
+            count += len(filenames)
+            mtime = max(mtime, os.stat(dirpath).st_mtime_ns)
+        return f"{count}:{mtime}"
+    except OSError:
+        return None
+
+
+def source_size(path):
+    """Bytes on disk of a file, or of all files under a folder."""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def make_thumbnail(mip, spacing_x, spacing_y, size=THUMB_SIZE):
+    """Axial MIP (height, width) as uint8 with square millimetre pixels, at most `size`
+    pixels on the longer side."""
+    image = correct_aspect(mip, spacing_y, spacing_x)
+    scale = size / max(image.shape)
+    if scale < 1.0:
+        rows = max(1, int(round(image.shape[0] * scale)))
+        cols = max(1, int(round(image.shape[1] * scale)))
+        # Nearest neighbour on the MIP; windowing below works on the small image
+        r = ((np.arange(rows) + 0.5) * image.shape[0] / rows).astype(np.intp)
+        c = ((np.arange(cols) + 0.5) * image.shape[1] / cols).astype(np.intp)
+        image = image[np.ix_(r, c)]
+    return to_uint8(image)
+
+
+def describe(meta):
+    """One line for a tooltip: dims, spacing, datatype and size on disk."""
+    parts = []
+    if meta.get("dims"):
+        parts.append("x".join(str(d) for d in meta["dims"]))
+    if meta.get("spacing"):
+        parts.append(" x ".join(f"{s:.2f}" for s in meta["spacing"]) + " mm")
+    if meta.get("data_type"):
+        parts.append(meta["data_type"])
+    if meta.get("bytes"):
+        parts.append(f"{meta['bytes'] / 2**20:.1f} MB")
+    return ", ".join(parts)
+
+
+class ThumbnailCache:
+    """Thumbnails and metadata by source path, capped at max_bytes of PNGs (LRU by load).
+
+    lookup() is meant for the GUI thread and touches only the cache folder. generate()
+    and validate() run on a single worker thread and call `done(path)` from it when an
+    entry is stored or removed.
+    """
+
+    def __init__(self, directory, max_bytes=8 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+        self._fingerprints = {}  # path -> (mtime_ns of the path itself, fingerprint); worker only
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f).get("entries", {})
+        except Exception:
+            self._entries = {}
+
+    def lookup(self, path):
+        """The entry for path with "png" (file path) and "meta", or None. The source is
+        not checked here; see validate()."""
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return None
+        png = os.path.join(self.directory, entry["file"])
+        if not os.path.exists(png):
+            return None
+        return {"png": png, "meta": entry.get("meta", {})}
+
+    def validate(self, paths, done=None):
+        """Queues a check of the entries for paths against their sources; stale entries
+        are removed and reported through `done(path)`."""
+        return self._pool.submit(self._validate, list(paths), done)
+
+    def _validate(self, paths, done):
+        for path in paths:
+            with self._lock:
+                entry = self._entries.get(path)
+            if entry is None:
+                continue
+            png_exists = os.path.exists(os.path.join(self.directory, entry["file"]))
+            if png_exists and entry.get("fingerprint") == self._fingerprint(path):
+                continue
+            with self._lock:
+                if self._entries.get(path) is not entry:
+                    continue  # replaced by a newer thumbnail meanwhile
+                del self._entries[path]
+                self._remove_file(entry["file"])
+                self._save()
+            if done:
+                done(path)
+
+    def _fingerprint(self, path, fresh=False):
+        """source_fingerprint, reused while the path's own mtime is unchanged."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._fingerprints.pop(path, None)
+            return None
+        cached = self._fingerprints.get(path)
+        if not fresh and cached and cached[0] == mtime:
+            return cached[1]
+        fingerprint = source_fingerprint(path)
+        self._fingerprints[path] = (mtime, fingerprint)
+        return fingerprint
+
+    def generate(self, path, mip, meta, done=None):
+        """Queues a thumbnail of `mip` (uint16 axial MIP, copied by the caller) for path."""
+        return self._pool.submit(self._generate, path, mip, dict(meta), done)
+
+    def _generate(self, path, mip, meta, done):
+        try:
+            fingerprint = self._fingerprint(path, fresh=True)
+            if fingerprint is None:
+                return
+            meta["bytes"] = source_size(path)
+            sx, sy = meta.get("spacing", (1.0, 1.0, 1.0))[:2]
+            # Named after path and fingerprint, so a new thumbnail never overwrites the file
+            # an older index entry still names
+            name = hashlib.sha1(f"{path}\0{fingerprint}".encode("utf-8")).hexdigest()[:20] + ".png"
+            png = os.path.join(self.directory, name)
+            write_png(png, make_thumbnail(mip, sx, sy))
+            with self._lock:
+                old = self._entries.get(path)
+                if old and old["file"] != name:
+                    self._remove_file(old["file"])
+                self._entries[path] = {"file": name, "fingerprint": fingerprint, "meta": meta,
+                                       "bytes": os.path.getsize(png), "used": time.time()}
+                self._evict(keep=path)
+                self._save()
+        except Exception as e:  # a preview must never break loading
+            print(f"Python: Thumbnail for {path} failed: {e}")
+            return
+        if done:
+            done(path)
+
+    # --- Under self._lock ---
+    def _evict(self, keep):
+        total = sum(e.get("bytes", 0) for e in self._entries.values())
+        for path, entry in sorted(self._entries.items(), key=lambda item: item[1].get("used", 0.0)):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= entry.get("bytes", 0)
+            del self._entries[path]
+            self._remove_file(entry["file"])
+
+    def _remove_file(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def _save(self):
+        tmp = self._index_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"entries": self._entries}, f, indent=2)
+            os.replace(tmp, self._index_path)
+        except OSError:
+            pass
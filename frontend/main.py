@@ -1,18 +1,27 @@
 import sys
 import os
+import time
+_STARTUP_T0 = time.perf_counter()  # before the Qt/renderer imports, for --profile-startup
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QFileDialog, QCheckBox,
                              QComboBox, QLabel, QSizePolicy, QSpacerItem, QColorDialog,
-                             QSlider, QSpinBox, QInputDialog)
-from PyQt6.QtGui import QSurfaceFormat, QShortcut
-from PyQt6.QtCore import Qt, QTimer
+                             QSlider, QSpinBox, QDoubleSpinBox, QInputDialog, QGridLayout, QProgressDialog,
+                             QListWidget, QListWidgetItem)
+from PyQt6.QtGui import QSurfaceFormat, QShortcut, QColor, QIcon
+from PyQt6.QtCore import Qt, QTimer, QSize, pyqtSignal
+import html
 import json
+import math
 from PyQt6.QtGui import QSurfaceFormat  # <-- Import QSurfaceFormat
 
 import volumerenderer
-from opengl_widget import OpenGLWidget
+from opengl_widget import OpenGLWidget, SliceViewWidget
+from history_thumbs import ThumbnailCache, describe
 
 class MainWindow(QMainWindow):
+    # Emitted from the thumbnail worker thread; delivered on the GUI thread
+    thumbnail_ready = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Medical Volume Renderer- v0")
@@ -20,16 +29,35 @@ class MainWindow(QMainWindow):
         self.resize(1600, 900)
 
         self.renderer = volumerenderer.Renderer()
+        # Persistent caches (DICOM header index) live next to the history in .mvr/
+        self.renderer.set_cache_directory(self._history_dir())
+        # Optional memory budgets in MB (see README, Memory budgets)
+        for var, setter in (("MVR_HOST_BUDGET_MB", self.renderer.set_host_memory_budget),
+                            ("MVR_VRAM_BUDGET_MB", self.renderer.set_device_memory_budget)):
+            try:
+                mb = float(os.environ.get(var, "0"))
+                if not math.isfinite(mb) or mb < 0:
+                    raise ValueError(mb)
+                setter(int(mb * 2**20))
+            except (ValueError, TypeError, OverflowError):
+                print(f"Python: Ignoring {var}={os.environ[var]!r} (expected a number of MB >= 0)")
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         root = QHBoxLayout(central_widget)
 
-        # Left: OpenGL view (resizes with window)
+        # Left: OpenGL view (resizes with window). The grid holds the 3D view at (0,0)
+        # and, in MPR layout, the axial/coronal/sagittal views in the other cells.
+        self.view_grid_widget = QWidget()
+        self.view_grid = QGridLayout(self.view_grid_widget)
+        self.view_grid.setContentsMargins(0, 0, 0, 0)
+        self.view_grid.setSpacing(2)
         self.gl_widget = OpenGLWidget(self.renderer)
         self.gl_widget.setMinimumSize(800, 600)
         self.gl_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        root.addWidget(self.gl_widget, 1)
+        self.view_grid.addWidget(self.gl_widget, 0, 0)
+        self.slice_views = []  # created on first use of the MPR layout
+        root.addWidget(self.view_grid_widget, 1)
 
         # Right: controls panel
         controls = QWidget()
@@ -40,13 +68,29 @@ class MainWindow(QMainWindow):
         self.load_button = QPushButton("Load NIfTI/DICOM File")
         self.load_button.clicked.connect(self.load_file)
         controls_layout.addWidget(self.load_button)
+        # Live DICOM watch: polled from the GUI thread while a folder is followed
+        self.watch_stop_btn = QPushButton("Stop Watching Folder")
+        self.watch_stop_btn.clicked.connect(self.stop_dicom_watch)
+        self.watch_stop_btn.setVisible(False)
+        controls_layout.addWidget(self.watch_stop_btn)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.timeout.connect(self.poll_dicom_watch)
 
         # History (last 10 files) — placed right under Load
         hist_row = QHBoxLayout()
         hist_row.addWidget(QLabel("History"))
         self.history_combo = QComboBox()
         self.history_paths = []  # maintain full paths in parallel
+        self.history_paths_shown = []  # paths of the combo items, as last filled
         self.history_combo.setMinimumWidth(220)
+        self.history_combo.setIconSize(QSize(40, 40))
+        # Preview thumbnails for the dropdown, written in the background after each load
+        try:
+            thumb_cap = int(float(os.environ.get("MVR_THUMB_CACHE_MB", "8")) * 2**20)
+        except ValueError:
+            thumb_cap = 8 * 2**20
+        self.thumbs = ThumbnailCache(os.path.join(self._history_dir(), "thumbs"), max_bytes=thumb_cap)
+        self.thumbnail_ready.connect(lambda _path: self.refresh_history_combo())
         hist_row.addWidget(self.history_combo)
         self.history_load_btn = QPushButton("Load")
         self.history_load_btn.setToolTip("Load the selected file from history")
@@ -93,6 +137,62 @@ class MainWindow(QMainWindow):
         self.overlay_checkbox.stateChanged.connect(lambda s: self.gl_widget.set_overlay_visible(bool(s)))
         controls_layout.addWidget(self.overlay_checkbox)
 
+        # Shaded rendering (lighting from a precomputed gradient volume) instead of MIP
+        self.shading_checkbox = QCheckBox("Shaded Rendering (Lighting)")
+        self.shading_checkbox.setChecked(False)
+        self.shading_checkbox.toggled.connect(lambda on: self.renderer.set_shading_enabled(bool(on)))
+        controls_layout.addWidget(self.shading_checkbox)
+
+        # Ray sampling rate; pre-integration keeps banded colormaps from banding at coarser steps
+        quality_row = QHBoxLayout()
+        self.quality_label = QLabel("Quality: 100%")
+        quality_row.addWidget(self.quality_label)
+        self.quality_slider = QSlider(Qt.Orientation.Horizontal)
+        self.quality_slider.setRange(25, 200)
+        self.quality_slider.setSingleStep(25)
+        self.quality_slider.setPageStep(25)
+        self.quality_slider.setValue(100)
+        self.quality_slider.setToolTip("Ray samples relative to 256 across the volume; lower is faster")
+        self.quality_slider.valueChanged.connect(self.on_quality_changed)
+        quality_row.addWidget(self.quality_slider)
+        self.preintegration_checkbox = QCheckBox("Pre-integrated")
+        self.preintegration_checkbox.setChecked(False)
+        self.preintegration_checkbox.setToolTip("Shaded mode: integrate the colormap between samples. Removes banding "
+                                                "with hard-edged colormaps; less accurate for smooth ones")
+        self.preintegration_checkbox.toggled.connect(
+            lambda on: self.renderer.set_preintegration_enabled(bool(on)))
+        quality_row.addWidget(self.preintegration_checkbox)
+        controls_layout.addLayout(quality_row)
+
+        # Isosurface (marching cubes) extraction, display and export
+        iso_row = QHBoxLayout()
+        self.iso_label = QLabel("Iso: 50%")
+        iso_row.addWidget(self.iso_label)
+        self.iso_slider = QSlider(Qt.Orientation.Horizontal)
+        self.iso_slider.setRange(1, 99)
+        self.iso_slider.setValue(50)
+        self.iso_slider.valueChanged.connect(lambda v: self.iso_label.setText(f"Iso: {v}%"))
+        iso_row.addWidget(self.iso_slider)
+        self.iso_extract_btn = QPushButton("Extract Surface")
+        self.iso_extract_btn.setToolTip("Extract an isosurface mesh at the selected intensity")
+        self.iso_extract_btn.clicked.connect(self.extract_isosurface)
+        iso_row.addWidget(self.iso_extract_btn)
+        self.iso_export_btn = QPushButton("Export Mesh")
+        self.iso_export_btn.setToolTip("Save the isosurface as binary PLY or STL")
+        self.iso_export_btn.clicked.connect(self.export_mesh)
+        iso_row.addWidget(self.iso_export_btn)
+        controls_layout.addLayout(iso_row)
+        self.mesh_checkbox = QCheckBox("Show Surface Mesh")
+        self.mesh_checkbox.setChecked(True)
+        self.mesh_checkbox.toggled.connect(lambda on: self.renderer.set_show_mesh(bool(on)))
+        controls_layout.addWidget(self.mesh_checkbox)
+
+        # MPR layout: 3D view plus axial/coronal/sagittal slices (one shared volume texture)
+        self.mpr_checkbox = QCheckBox("MPR Layout (3D + 3 planes)")
+        self.mpr_checkbox.setChecked(False)
+        self.mpr_checkbox.toggled.connect(self.toggle_mpr_layout)
+        controls_layout.addWidget(self.mpr_checkbox)
+
         # Colormap selector
         controls_layout.addWidget(QLabel("Pick Colormap"))
         self.cmap_combo = QComboBox()
@@ -133,59 +233,33 @@ class MainWindow(QMainWindow):
         self.slicer_toggle_btn.toggled.connect(self.toggle_slicer_panel)
         controls_layout.addWidget(self.slicer_toggle_btn)
 
-        self.slicer_panel = QWidget()
-        self.slicer_panel_layout = QVBoxLayout(self.slicer_panel)
-        self.slicer_panel.setVisible(False)
-
-        # Enable checkbox
-        self.slicer_enable = QCheckBox("Enable Slicer View")
-        self.slicer_enable.setChecked(False)
-        self.slicer_enable.stateChanged.connect(lambda s: self.renderer.set_slice_mode(bool(s)))
-        self.slicer_panel_layout.addWidget(self.slicer_enable)
-
-        # Auto sweep controls
-        auto_row = QHBoxLayout()
-        self.slicer_auto = QCheckBox("Auto Sweep")
-        self.slicer_auto.setChecked(False)
-        self.slicer_auto.stateChanged.connect(self.toggle_auto_sweep)
-        auto_row.addWidget(self.slicer_auto)
-        auto_row.addWidget(QLabel("Speed"))
-        self.slicer_speed = QSlider(Qt.Orientation.Horizontal)
-        self.slicer_speed.setMinimum(1)   # 1 step/sec
-        self.slicer_speed.setMaximum(20)  # 20 steps/sec
-        self.slicer_speed.setValue(5)
-        self.slicer_speed.setFixedWidth(120)
-        self.slicer_speed.valueChanged.connect(self.on_slicer_speed_changed)
-        auto_row.addWidget(self.slicer_speed)
-        self.slicer_panel_layout.addLayout(auto_row)
-
-        # Axis selector
-        axis_row = QHBoxLayout()
-        axis_row.addWidget(QLabel("Axis"))
-        self.slicer_axis = QComboBox()
-        self.slicer_axis.addItems(["Z (depth)", "Y (row)", "X (col)"])
-        self.slicer_axis.currentIndexChanged.connect(self.on_slicer_axis_changed)
-        axis_row.addWidget(self.slicer_axis)
-        self.slicer_panel_layout.addLayout(axis_row)
-
-        # Slice slider + spin
-        slice_row = QHBoxLayout()
-        self.slice_label = QLabel("Slice: 0")
-        slice_row.addWidget(self.slice_label)
-        self.slicer_slider = QSlider(Qt.Orientation.Horizontal)
-        self.slicer_slider.setMinimum(0)
-        self.slicer_slider.setMaximum(0)
-        self.slicer_slider.setValue(0)
-        self.slicer_slider.valueChanged.connect(self.on_slicer_index_changed)
-        slice_row.addWidget(self.slicer_slider)
-        self.slicer_spin = QSpinBox()
-        self.slicer_spin.setMinimum(0)
-        self.slicer_spin.setMaximum(0)
-        self.slicer_spin.valueChanged.connect(self.on_slicer_index_changed)
-        slice_row.addWidget(self.slicer_spin)
-        self.slicer_panel_layout.addLayout(slice_row)
-
-        controls_layout.addWidget(self.slicer_panel)
+        # The panel itself is built on first expand (see _build_slicer_panel)
+        self.slicer_panel = None
+        self.controls_layout = controls_layout
+
+        # --- Region of interest crop (collapsible, built on first expand) ---
+        self.crop_toggle_btn = QPushButton("Crop ▸")
+        self.crop_toggle_btn.setCheckable(True)
+        self.crop_toggle_btn.setChecked(False)
+        self.crop_toggle_btn.toggled.connect(self.toggle_crop_panel)
+        controls_layout.addWidget(self.crop_toggle_btn)
+        self.crop_panel = None
+
+        # --- Segmentation label overlay (collapsible, built on first expand) ---
+        self.labels_toggle_btn = QPushButton("Labels ▸")
+        self.labels_toggle_btn.setCheckable(True)
+        self.labels_toggle_btn.setChecked(False)
+        self.labels_toggle_btn.toggled.connect(self.toggle_labels_panel)
+        controls_layout.addWidget(self.labels_toggle_btn)
+        self.labels_panel = None
+
+        # --- Fusion with a second volume (collapsible, built on first expand) ---
+        self.fusion_toggle_btn = QPushButton("Fusion ▸")
+        self.fusion_toggle_btn.setCheckable(True)
+        self.fusion_toggle_btn.setChecked(False)
+        self.fusion_toggle_btn.toggled.connect(self.toggle_fusion_panel)
+        controls_layout.addWidget(self.fusion_toggle_btn)
+        self.fusion_panel = None
 
         # Timer for auto sweep
         self.slicer_timer = QTimer(self)
@@ -205,6 +279,11 @@ class MainWindow(QMainWindow):
         self.btn_save_screen.setToolTip("Save a screenshot of the entire application window")
         self.btn_save_screen.clicked.connect(self.save_full_screenshot)
         save_bottom.addWidget(self.btn_save_screen)
+
+        self.btn_export_movie = QPushButton("Export Movie")
+        self.btn_export_movie.setToolTip("Render a turntable, elevation or slice sweep to MP4 or a PNG sequence")
+        self.btn_export_movie.clicked.connect(self.export_movie)
+        save_bottom.addWidget(self.btn_export_movie)
         controls_layout.addLayout(save_bottom)
 
         # View alignment row: Reset View + Z/Y/X normals in one line
@@ -251,7 +330,8 @@ class MainWindow(QMainWindow):
             self,
             "Load Data",
             "Select input type",
-            ["NIfTI file (.nii/.nii.gz)", "DICOM folder (recursively)"],
+            ["NIfTI or chunk store file (.nii/.nii.gz/.mvrc)", "DICOM folder (recursively)",
+             "DICOM folder (live watch while it is written)"],
             0,
             False,
         )
@@ -262,9 +342,10 @@ class MainWindow(QMainWindow):
         if choice.startswith("NIfTI"):
             path, _ = QFileDialog.getOpenFileName(
                 self,
-                "Open NIfTI File",
+                "Open Volume File",
                 "",
-                "NIfTI Files (*.nii *.nii.gz);;All Files (*)",
+                "Volume Files (*.nii *.nii.gz *.mvrc);;NIfTI Files (*.nii *.nii.gz);;"
+                "Chunk Stores (*.mvrc);;All Files (*)",
             )
         else:
             path = QFileDialog.getExistingDirectory(
@@ -276,27 +357,28 @@ class MainWindow(QMainWindow):
 
         if not path:
             return
+        if choice.startswith("DICOM folder (live"):
+            self.start_dicom_watch(path)
+            return
+
+        # A DICOM folder may hold several series; let the user pick one
+        series_key = None
+        if os.path.isdir(path):
+            series_key = self.pick_dicom_series(path)
+            if series_key is False:
+                return
 
         print(f"Python: Loading {path}")
-        if self.renderer.load_volume(path):
+        if series_key:
+            loaded = self.renderer.load_dicom_series(path, series_key)
+        else:
+            loaded = self.renderer.load_volume(path)
+        if loaded:
             print("Python: Load successful.")
-            # Update overlay with dataset name
-            try:
-                name = os.path.basename(path)
-                self.gl_widget.set_dataset_name(name)
-                self.gl_widget.set_dataset_path(path)
-            except Exception:
-                self.gl_widget.set_dataset_name("")
+            self.log_load_stats()
             # Add to history (unique, max 10)
             self.push_history(path)
-            # Ensure current UI state is applied post-load
-            self.renderer.set_show_bounding_box(self.bbox_checkbox.isChecked())
-            self.renderer.set_colormap_preset(self.cmap_combo.currentIndex())
-            # Apply current bbox scale
-            self.on_bbox_scale_changed(self.bbox_slider.value())
-            # Initialize slicer limits using volume dims
-            self.init_slicer_limits()
-            self.gl_widget.update()  # Trigger repaint to show bounding box
+            self.apply_loaded_volume(path)
         else:
             print("Python: Load failed.")
             # Show alert banner
@@ -305,12 +387,112 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
 
+    def apply_loaded_volume(self, path: str):
+        """Bring the overlay and controls in line with a newly loaded volume."""
+        # Update overlay with dataset name
+        try:
+            name = os.path.basename(path)
+            self.gl_widget.set_dataset_name(name)
+            self.gl_widget.set_dataset_path(path)
+        except Exception:
+            self.gl_widget.set_dataset_name("")
+        # Ensure current UI state is applied post-load
+        self.renderer.set_show_bounding_box(self.bbox_checkbox.isChecked())
+        self.renderer.set_colormap_preset(self.cmap_combo.currentIndex())
+        # Apply current bbox scale
+        self.on_bbox_scale_changed(self.bbox_slider.value())
+        # Initialize slicer limits using volume dims
+        self.init_slicer_limits()
+        self.init_time_limits()
+        self.init_crop_limits()
+        self.refresh_label_list()
+        self.reset_mpr_views()
+        self.gl_widget.update()  # Trigger repaint to show bounding box
+        if not self.renderer.is_dicom_watching():
+            self.cache_thumbnail(path)
+
+    # --- Live DICOM watch ---
+    def start_dicom_watch(self, path: str):
+        polling = os.environ.get("MVR_WATCH_POLLING", "") not in ("", "0")
+        if not self.renderer.start_dicom_watch(path, polling=polling):
+            self.gl_widget.show_alert("Cannot watch " + path, 5000)
+            return
+        mode = "polling" if self.renderer.is_dicom_watch_polling() else "inotify"
+        print(f"Python: Watching {path} for DICOM slices ({mode})")
+        self.watch_path = path
+        self.push_history(path)
+        self.watch_stop_btn.setVisible(True)
+        self.gl_widget.show_alert("Watching folder for new slices", 3000)
+        self.gl_widget.update()
+        self.watch_timer.start(200)
+
+    def poll_dicom_watch(self):
+        if not self.renderer.is_dicom_watching():
+            # Another load replaced the watched series
+            self.watch_timer.stop()
+            self.watch_stop_btn.setVisible(False)
+            return
+        was_loaded = self.renderer.is_volume_loaded()
+        added = self.renderer.poll_dicom_watch()
+        if added == 0:
+            return
+        if not was_loaded:
+            self.log_load_stats()
+            self.apply_loaded_volume(self.watch_path)
+        else:
+            # Same grid, more slices: only the ranges along Z change
+            self.init_slicer_limits()
+            self.init_crop_limits()
+            self.gl_widget.update()
+            for view in self.slice_views:
+                view.refresh_slice_count()
+        for view in self.slice_views:
+            view.update()
+        depth = self.renderer.get_volume_depth()
+        self.gl_widget.show_alert(f"+{added} slice(s), {depth} in total", 1500)
+
+    def stop_dicom_watch(self):
+        self.watch_timer.stop()
+        self.renderer.stop_dicom_watch()
+        self.watch_stop_btn.setVisible(False)
+        if self.renderer.is_volume_loaded():
+            self.init_slicer_limits()
+            self.init_crop_limits()
+            for view in self.slice_views:
+                view.refresh_slice_count()  # the final poll may have added slices
+                view.update()
+            self.cache_thumbnail(self.watch_path)
+        self.gl_widget.update()
+
+    def pick_dicom_series(self, path: str):
+        """Return the chosen series key, None to load the largest series, or False if cancelled."""
+        try:
+            series = self.renderer.list_dicom_series(path)
+        except Exception as e:
+            print(f"Python: DICOM series scan failed: {e}")
+            return None
+        if len(series) <= 1:
+            return series[0]["key"] if series else None
+        labels = [
+            f"{s['slices']} slices, {s['width']}x{s['height']} - {os.path.relpath(s['directory'], path)} [{s['series_uid'][-12:]}]"
+            for s in series
+        ]
+        choice, ok = QInputDialog.getItem(self, "Select DICOM Series", "Series", labels, 0, False)
+        if not ok:
+            return False
+        return series[labels.index(choice)]["key"]
+
     def on_bbox_scale_changed(self, slider_value: int):
         scale = max(0.1, min(5.0, slider_value / 100.0))
         self.renderer.set_bounding_box_scale(scale)
         self.bbox_label.setText(f"Bounding Box Scale: {scale:.2f}x")
         self.gl_widget.update()
 
+    def on_quality_changed(self, slider_value: int):
+        self.renderer.set_render_quality(slider_value / 100.0)
+        self.quality_label.setText(f"Quality: {slider_value}%")
+        self.gl_widget.update()
+
     def reset_defaults(self):
         # Defaults
         default_bg = (0.1, 0.1, 0.2)
@@ -329,13 +511,37 @@ class MainWindow(QMainWindow):
         self.bbox_slider.setValue(default_bbox_scale)
         self.bbox_checkbox.setChecked(default_show_bbox)
         self.overlay_checkbox.setChecked(default_show_overlay)
+        self.shading_checkbox.setChecked(False)
+        self.quality_slider.setValue(100)
+        self.preintegration_checkbox.setChecked(False)
+        self.mesh_checkbox.setChecked(True)
+        self.iso_slider.setValue(50)
         self.slicer_toggle_btn.setChecked(False)
-        self.slicer_enable.setChecked(default_slicer_enabled)
-        self.slicer_axis.setCurrentIndex(default_slicer_axis)
-        self.slicer_slider.setValue(default_slicer_index)
-        self.slicer_spin.setValue(default_slicer_index)
-        self.slicer_auto.setChecked(default_slicer_auto)
-        self.slicer_speed.setValue(default_slicer_speed)
+        if self.slicer_panel is not None:
+            self.slicer_enable.setChecked(default_slicer_enabled)
+            self.slicer_axis.setCurrentIndex(default_slicer_axis)
+            self.slicer_slider.setValue(default_slicer_index)
+            self.slicer_spin.setValue(default_slicer_index)
+            self.slicer_auto.setChecked(default_slicer_auto)
+            self.slicer_speed.setValue(default_slicer_speed)
+            self.time_play.setChecked(False)
+        self.crop_toggle_btn.setChecked(False)
+        self.renderer.clear_crop_box()
+        if self.crop_panel is not None:
+            self.crop_upload.setChecked(False)
+            self.init_crop_limits()
+        self.labels_toggle_btn.setChecked(False)
+        if self.labels_panel is not None:
+            self.labels_show.setChecked(True)
+            self.labels_opacity.setValue(50)
+        self.fusion_toggle_btn.setChecked(False)
+        if self.fusion_panel is not None:
+            self.fusion_cmap.setCurrentIndex(2)
+            self.fusion_opacity.setValue(50)
+            for visible, lo, hi in self.fusion_layer_controls:
+                visible.setChecked(True)
+                lo.setValue(0)
+                hi.setValue(65535)
 
         # Apply to renderer explicitly for background color
         r, g, b = default_bg
@@ -351,6 +557,25 @@ class MainWindow(QMainWindow):
         self.gl_widget.set_overlay_visible(default_show_overlay)
         self.gl_widget.update()
 
+    def log_load_stats(self):
+        """Print a one-line summary of the last load's phase timings."""
+        try:
+            stats = self.renderer.get_load_stats()
+        except Exception:
+            return
+        phases = {k: v for k, v in stats.get("phases_ms", {}).items() if v > 0.0}
+        if not phases:
+            return
+        slowest = max(phases, key=phases.get)
+        breakdown = ", ".join(f"{k}={v:.1f}" for k, v in phases.items())
+        mb = stats.get("bytes_read", 0) / (1024 * 1024)
+        print(f"Python: Load took {stats['total_ms']:.1f} ms ({breakdown} ms); "
+              f"{stats['files_parsed']} file(s), {mb:.1f} MB read; slowest phase: {slowest}")
+        # Tell the user when the memory budget changed what they see
+        actions = self.renderer.get_memory_usage()["actions"]
+        if actions:
+            self.gl_widget.show_alert("Memory budget: " + "; ".join(actions), 6000)
+
     # --- History helpers ---
     def push_history(self, path: str):
         # Keep unique entries; newest first; max 10
@@ -358,13 +583,55 @@ class MainWindow(QMainWindow):
             self.history_paths.remove(path)
         self.history_paths.insert(0, path)
         self.history_paths = self.history_paths[:10]
-        # Update combo
+        # Update combo, selecting the entry just added
+        self.refresh_history_combo(select=path)
+        # Persist
+        self.save_history()
+
+    def refresh_history_combo(self, select=None):
+        """Fill the History dropdown: name, cached preview icon and a metadata tooltip.
+        Selects `select`, or else keeps the selected path."""
+        if select is None:
+            idx = self.history_combo.currentIndex()
+            items = self.history_combo.count()
+            if 0 <= idx < items and items == len(self.history_paths_shown):
+                select = self.history_paths_shown[idx]
+        self.history_paths_shown = list(self.history_paths)
         self.history_combo.blockSignals(True)
         self.history_combo.clear()
-        self.history_combo.addItems([os.path.basename(p) for p in self.history_paths])
+        for i, p in enumerate(self.history_paths):
+            entry = self.thumbs.lookup(p)
+            if entry:
+                self.history_combo.addItem(QIcon(entry["png"]), os.path.basename(p))
+                tip = (f"<img src='{html.escape(entry['png'])}'><br>{html.escape(describe(entry['meta']))}"
+                       f"<br>{html.escape(p)}")
+            else:
+                self.history_combo.addItem(os.path.basename(p))
+                tip = p
+            self.history_combo.setItemData(i, tip, Qt.ItemDataRole.ToolTipRole)
+        if select in self.history_paths:
+            self.history_combo.setCurrentIndex(self.history_paths.index(select))
         self.history_combo.blockSignals(False)
-        # Persist
-        self.save_history()
+        # Sources are checked on the thumbnail worker; stale previews come back through
+        # thumbnail_ready and are redrawn without an icon
+        self.thumbs.validate(self.history_paths, self.thumbnail_ready.emit)
+
+    def cache_thumbnail(self, path: str):
+        """Queue a History preview of the volume just loaded from path."""
+        # Only from the MIP the load computed: never an extra pass over the volume on the
+        # GUI thread (e.g. after a DICOM watch, or with projections deferred)
+        if not self.renderer.has_axis_projections():
+            return
+        mip = self.renderer.get_axis_projection(0)  # a copy
+        if mip is None or mip.size == 0:
+            return
+        r = self.renderer
+        meta = {
+            "dims": [r.get_volume_width(), r.get_volume_height(), r.get_volume_depth()],
+            "spacing": [r.get_volume_spacing_x(), r.get_volume_spacing_y(), r.get_volume_spacing_z()],
+            "data_type": r.get_load_stats().get("data_type", ""),
+        }
+        self.thumbs.generate(path, mip, meta, self.thumbnail_ready.emit)
 
     def load_from_history(self):
         idx = self.history_combo.currentIndex()
@@ -376,18 +643,8 @@ class MainWindow(QMainWindow):
         print(f"Python: Loading {path} from history")
         if self.renderer.load_volume(path):
             print("Python: Load successful.")
-            try:
-                name = os.path.basename(path)
-                self.gl_widget.set_dataset_name(name)
-                self.gl_widget.set_dataset_path(path)
-            except Exception:
-                self.gl_widget.set_dataset_name("")
-            # Re-apply current UI state
-            self.renderer.set_show_bounding_box(self.bbox_checkbox.isChecked())
-            self.renderer.set_colormap_preset(self.cmap_combo.currentIndex())
-            self.on_bbox_scale_changed(self.bbox_slider.value())
-            self.init_slicer_limits()
-            self.gl_widget.update()
+            self.log_load_stats()
+            self.apply_loaded_volume(path)
         else:
             print("Python: Load failed.")
             try:
@@ -419,10 +676,7 @@ class MainWindow(QMainWindow):
         except Exception:
             self.history_paths = []
         # Populate combo
-        self.history_combo.blockSignals(True)
-        self.history_combo.clear()
-        self.history_combo.addItems([os.path.basename(p) for p in self.history_paths])
-        self.history_combo.blockSignals(False)
+        self.refresh_history_combo()
 
     def save_history(self):
         try:
@@ -431,12 +685,407 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
+    # --- MPR layout ---
+    def toggle_mpr_layout(self, checked: bool):
+        if checked and not self.slice_views:
+            # Axial (Z), coronal (Y), sagittal (X) around the 3D view
+            for axis, cell in ((0, (0, 1)), (1, (1, 0)), (2, (1, 1))):
+                view = SliceViewWidget(self.renderer, axis)
+                view.setMinimumSize(200, 150)
+                view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+                self.view_grid.addWidget(view, *cell)
+                self.slice_views.append(view)
+            if self.renderer.is_volume_loaded():
+                self.reset_mpr_views()
+            self.apply_slab_settings()
+        for view in self.slice_views:
+            view.setVisible(checked)
+        self.gl_widget.setMinimumSize(*((400, 300) if checked else (800, 600)))
+
+    def reset_mpr_views(self):
+        for view in self.slice_views:
+            view.reset_slices()
+
     # --- Slicer helpers ---
+    def _build_slicer_panel(self):
+        """Create the slicer controls the first time the panel is expanded."""
+        self.slicer_panel = QWidget()
+        self.slicer_panel_layout = QVBoxLayout(self.slicer_panel)
+
+        # Enable checkbox
+        self.slicer_enable = QCheckBox("Enable Slicer View")
+        self.slicer_enable.setChecked(False)
+        self.slicer_enable.stateChanged.connect(lambda s: self.renderer.set_slice_mode(bool(s)))
+        self.slicer_panel_layout.addWidget(self.slicer_enable)
+
+        # Auto sweep controls
+        auto_row = QHBoxLayout()
+        self.slicer_auto = QCheckBox("Auto Sweep")
+        self.slicer_auto.setChecked(False)
+        self.slicer_auto.stateChanged.connect(self.toggle_auto_sweep)
+        auto_row.addWidget(self.slicer_auto)
+        auto_row.addWidget(QLabel("Speed"))
+        self.slicer_speed = QSlider(Qt.Orientation.Horizontal)
+        self.slicer_speed.setMinimum(1)   # 1 step/sec
+        self.slicer_speed.setMaximum(20)  # 20 steps/sec
+        self.slicer_speed.setValue(5)
+        self.slicer_speed.setFixedWidth(120)
+        self.slicer_speed.valueChanged.connect(self.on_slicer_speed_changed)
+        auto_row.addWidget(self.slicer_speed)
+        self.slicer_panel_layout.addLayout(auto_row)
+
+        # Axis selector
+        axis_row = QHBoxLayout()
+        axis_row.addWidget(QLabel("Axis"))
+        self.slicer_axis = QComboBox()
+        self.slicer_axis.addItems(["Z (depth)", "Y (row)", "X (col)"])
+        self.slicer_axis.currentIndexChanged.connect(self.on_slicer_axis_changed)
+        axis_row.addWidget(self.slicer_axis)
+        self.slicer_panel_layout.addLayout(axis_row)
+
+        # Slice slider + spin
+        slice_row = QHBoxLayout()
+        self.slice_label = QLabel("Slice: 0")
+        slice_row.addWidget(self.slice_label)
+        self.slicer_slider = QSlider(Qt.Orientation.Horizontal)
+        self.slicer_slider.setMinimum(0)
+        self.slicer_slider.setMaximum(0)
+        self.slicer_slider.setValue(0)
+        self.slicer_slider.valueChanged.connect(self.on_slicer_index_changed)
+        slice_row.addWidget(self.slicer_slider)
+        self.slicer_spin = QSpinBox()
+        self.slicer_spin.setMinimum(0)
+        self.slicer_spin.setMaximum(0)
+        self.slicer_spin.valueChanged.connect(self.on_slicer_index_changed)
+        slice_row.addWidget(self.slicer_spin)
+        self.slicer_panel_layout.addLayout(slice_row)
+
+        # Thick slab: MIP / MinIP / mean over a thickness in mm around the slice
+        slab_row = QHBoxLayout()
+        slab_row.addWidget(QLabel("Slab"))
+        self.slab_mode = QComboBox()
+        self.slab_mode.addItems(["Off", "MIP", "MinIP", "Mean"])
+        self.slab_mode.currentIndexChanged.connect(self.apply_slab_settings)
+        slab_row.addWidget(self.slab_mode)
+        self.slab_thickness = QDoubleSpinBox()
+        self.slab_thickness.setRange(0.5, 200.0)
+        self.slab_thickness.setSingleStep(1.0)
+        self.slab_thickness.setValue(10.0)
+        self.slab_thickness.setSuffix(" mm")
+        self.slab_thickness.setEnabled(False)
+        self.slab_thickness.valueChanged.connect(self.apply_slab_settings)
+        slab_row.addWidget(self.slab_thickness)
+        self.slicer_panel_layout.addLayout(slab_row)
+
+        # Time frames of 4D volumes (hidden for 3D); playback shares the sweep timer and speed
+        self.time_row = QWidget()
+        time_layout = QHBoxLayout(self.time_row)
+        time_layout.setContentsMargins(0, 0, 0, 0)
+        self.time_play = QCheckBox("Play Frames")
+        self.time_play.setChecked(False)
+        self.time_play.stateChanged.connect(self.toggle_auto_sweep)
+        time_layout.addWidget(self.time_play)
+        self.time_label = QLabel("Frame: 0")
+        time_layout.addWidget(self.time_label)
+        self.time_slider = QSlider(Qt.Orientation.Horizontal)
+        self.time_slider.setMinimum(0)
+        self.time_slider.setMaximum(0)
+        self.time_slider.valueChanged.connect(self.on_time_frame_changed)
+        time_layout.addWidget(self.time_slider)
+        self.time_row.setVisible(False)
+        self.slicer_panel_layout.addWidget(self.time_row)
+
+        # Insert right below the toggle button
+        index = self.controls_layout.indexOf(self.slicer_toggle_btn)
+        self.controls_layout.insertWidget(index + 1, self.slicer_panel)
+        if self.renderer.is_volume_loaded():
+            self.init_slicer_limits()
+            self.init_time_limits()
+
     def toggle_slicer_panel(self, checked: bool):
-        self.slicer_panel.setVisible(checked)
+        if checked and self.slicer_panel is None:
+            self._build_slicer_panel()
+        if self.slicer_panel is not None:
+            self.slicer_panel.setVisible(checked)
         self.slicer_toggle_btn.setText("Slicer ▾" if checked else "Slicer ▸")
 
+    def _build_crop_panel(self):
+        """Create the crop box controls the first time the panel is expanded."""
+        self.crop_panel = QWidget()
+        layout = QGridLayout(self.crop_panel)
+        layout.addWidget(QLabel("Axis"), 0, 0)
+        layout.addWidget(QLabel("First"), 0, 1)
+        layout.addWidget(QLabel("Last"), 0, 2)
+        # Inclusive voxel indices per axis (X, Y, Z); the renderer takes [min, max)
+        self.crop_spins = []
+        for row, name in enumerate(("X", "Y", "Z"), start=1):
+            lo, hi = QSpinBox(), QSpinBox()
+            lo.valueChanged.connect(self.on_crop_changed)
+            hi.valueChanged.connect(self.on_crop_changed)
+            layout.addWidget(QLabel(name), row, 0)
+            layout.addWidget(lo, row, 1)
+            layout.addWidget(hi, row, 2)
+            self.crop_spins.append((lo, hi))
+        self.crop_upload = QCheckBox("GPU holds crop only")
+        self.crop_upload.setToolTip("Upload only the cropped sub-volume (lower VRAM; re-uploads when the crop changes)")
+        self.crop_upload.stateChanged.connect(
+            lambda s: (self.renderer.set_crop_upload_enabled(bool(s)), self.gl_widget.update()))
+        layout.addWidget(self.crop_upload, 4, 0, 1, 2)
+        reset_btn = QPushButton("Full Volume")
+        reset_btn.clicked.connect(self.reset_crop)
+        layout.addWidget(reset_btn, 4, 2)
+
+        index = self.controls_layout.indexOf(self.crop_toggle_btn)
+        self.controls_layout.insertWidget(index + 1, self.crop_panel)
+        self.init_crop_limits()
+
+    def toggle_crop_panel(self, checked: bool):
+        if checked and self.crop_panel is None:
+            self._build_crop_panel()
+        if self.crop_panel is not None:
+            self.crop_panel.setVisible(checked)
+        self.crop_toggle_btn.setText("Crop ▾" if checked else "Crop ▸")
+
+    def init_crop_limits(self):
+        """Set the spin box ranges to the volume and show the renderer's current crop."""
+        if self.crop_panel is None:
+            return
+        dims = (self.renderer.get_volume_width(), self.renderer.get_volume_height(),
+                self.renderer.get_volume_depth())
+        box = self.renderer.get_crop_box()
+        for axis, (lo, hi) in enumerate(self.crop_spins):
+            for spin in (lo, hi):
+                spin.blockSignals(True)
+                spin.setRange(0, max(0, dims[axis] - 1))
+            lo.setValue(box[axis])
+            hi.setValue(max(box[axis], box[axis + 3] - 1))
+            lo.blockSignals(False)
+            hi.blockSignals(False)
+
+    def on_crop_changed(self, _value=None):
+        if not self.renderer.is_volume_loaded():
+            return
+        first = [lo.value() for lo, _ in self.crop_spins]
+        last = [max(lo.value(), hi.value()) for lo, hi in self.crop_spins]
+        self.renderer.set_crop_box(first[0], first[1], first[2], last[0] + 1, last[1] + 1, last[2] + 1)
+        self.gl_widget.update()
+
+    def reset_crop(self):
+        self.renderer.clear_crop_box()
+        self.init_crop_limits()
+        self.gl_widget.update()
+
+    # --- Segmentation labels ---
+    def _build_labels_panel(self):
+        """Create the label overlay controls the first time the panel is expanded."""
+        self.labels_panel = QWidget()
+        layout = QVBoxLayout(self.labels_panel)
+        layout.setContentsMargins(0, 0, 0, 0)
+        row = QHBoxLayout()
+        load_btn = QPushButton("Load Labels")
+        load_btn.setToolTip("Load a NIfTI segmentation mask with the same dimensions as the volume")
+        load_btn.clicked.connect(self.load_label_map)
+        row.addWidget(load_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear_label_map)
+        row.addWidget(clear_btn)
+        layout.addLayout(row)
+        self.labels_show = QCheckBox("Show Labels")
+        self.labels_show.setChecked(self.renderer.get_show_labels())
+        self.labels_show.toggled.connect(lambda on: (self.renderer.set_show_labels(bool(on)), self.gl_widget.update()))
+        layout.addWidget(self.labels_show)
+        opacity_row = QHBoxLayout()
+        self.labels_opacity_label = QLabel("Opacity: 50%")
+        opacity_row.addWidget(self.labels_opacity_label)
+        self.labels_opacity = QSlider(Qt.Orientation.Horizontal)
+        self.labels_opacity.setRange(0, 100)
+        self.labels_opacity.setValue(int(round(self.renderer.get_label_opacity() * 100)))
+        self.labels_opacity.valueChanged.connect(self.on_label_opacity_changed)
+        opacity_row.addWidget(self.labels_opacity)
+        layout.addLayout(opacity_row)
+        # One checkable row per label present; double-click to change its colour
+        self.labels_list = QListWidget()
+        self.labels_list.setMaximumHeight(160)
+        self.labels_list.itemChanged.connect(self.on_label_item_changed)
+        self.labels_list.itemDoubleClicked.connect(self.pick_label_color)
+        layout.addWidget(self.labels_list)
+
+        index = self.controls_layout.indexOf(self.labels_toggle_btn)
+        self.controls_layout.insertWidget(index + 1, self.labels_panel)
+        self.refresh_label_list()
+
+    def toggle_labels_panel(self, checked: bool):
+        if checked and self.labels_panel is None:
+            self._build_labels_panel()
+        if self.labels_panel is not None:
+            self.labels_panel.setVisible(checked)
+        self.labels_toggle_btn.setText("Labels ▾" if checked else "Labels ▸")
+
+    def load_label_map(self):
+        if not self.renderer.is_volume_loaded():
+            self.gl_widget.show_alert("Load a volume first", 3000)
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Open Label Map", "",
+                                              "NIfTI Files (*.nii *.nii.gz);;All Files (*)")
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            loaded = self.renderer.load_label_map(path)
+        finally:
+            QApplication.restoreOverrideCursor()
+        if not loaded:
+            self.gl_widget.show_alert("Label map loading failed", 5000)
+            return
+        kib = self.renderer.get_label_map_memory_bytes() / 1024
+        print(f"Python: Loaded {len(self.renderer.get_label_counts())} label(s) from {path} ({kib:.0f} KiB encoded)")
+        self.refresh_label_list()
+        self.gl_widget.update()
+
+    def clear_label_map(self):
+        self.renderer.clear_label_map()
+        self.refresh_label_list()
+        self.gl_widget.update()
+
+    def refresh_label_list(self):
+        """List the labels of the current label map with their colour and visibility."""
+        if self.labels_panel is None:
+            return
+        self.labels_list.blockSignals(True)
+        self.labels_list.clear()
+        for label, count in sorted(self.renderer.get_label_counts().items()):
+            item = QListWidgetItem(f"Label {label} ({count} voxels)")
+            item.setData(Qt.ItemDataRole.UserRole, label)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            visible = self.renderer.get_label_visible(label)
+            item.setCheckState(Qt.CheckState.Checked if visible else Qt.CheckState.Unchecked)
+            r, g, b = self.renderer.get_label_color(label)
+            item.setBackground(QColor.fromRgbF(r, g, b, 0.6))
+            self.labels_list.addItem(item)
+        self.labels_list.blockSignals(False)
+
+    def on_label_item_changed(self, item):
+        label = item.data(Qt.ItemDataRole.UserRole)
+        self.renderer.set_label_visible(label, item.checkState() == Qt.CheckState.Checked)
+        self.gl_widget.update()
+
+    def pick_label_color(self, item):
+        label = item.data(Qt.ItemDataRole.UserRole)
+        r, g, b = self.renderer.get_label_color(label)
+        color = QColorDialog.getColor(QColor.fromRgbF(r, g, b), self, f"Label {label} Colour")
+        if not color.isValid():
+            return
+        self.renderer.set_label_color(label, color.redF(), color.greenF(), color.blueF())
+        self.labels_list.blockSignals(True)
+        item.setBackground(QColor.fromRgbF(color.redF(), color.greenF(), color.blueF(), 0.6))
+        self.labels_list.blockSignals(False)
+        self.gl_widget.update()
+
+    def on_label_opacity_changed(self, value: int):
+        self.labels_opacity_label.setText(f"Opacity: {value}%")
+        self.renderer.set_label_opacity(value / 100.0)
+        self.gl_widget.update()
+
+    # --- Fusion ---
+    def _build_fusion_panel(self):
+        """Create the fusion controls the first time the panel is expanded."""
+        self.fusion_panel = QWidget()
+        layout = QVBoxLayout(self.fusion_panel)
+        layout.setContentsMargins(0, 0, 0, 0)
+        row = QHBoxLayout()
+        load_btn = QPushButton("Load Fusion")
+        load_btn.setToolTip("Load a second volume (e.g. PET) drawn over the current one (e.g. CT)")
+        load_btn.clicked.connect(self.load_fusion_volume)
+        row.addWidget(load_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear_fusion_volume)
+        row.addWidget(clear_btn)
+        layout.addLayout(row)
+        self.fusion_cmap = QComboBox()
+        self.fusion_cmap.addItems(self.cmap_presets)
+        self.fusion_cmap.setCurrentIndex(self.renderer.get_fusion_colormap_preset())
+        self.fusion_cmap.currentIndexChanged.connect(
+            lambda idx: (self.renderer.set_fusion_colormap_preset(int(idx)), self.gl_widget.update()))
+        layout.addWidget(self.fusion_cmap)
+        opacity_row = QHBoxLayout()
+        self.fusion_opacity_label = QLabel("Opacity: 50%")
+        opacity_row.addWidget(self.fusion_opacity_label)
+        self.fusion_opacity = QSlider(Qt.Orientation.Horizontal)
+        self.fusion_opacity.setRange(0, 100)
+        self.fusion_opacity.setValue(int(round(self.renderer.get_fusion_opacity() * 100)))
+        self.fusion_opacity.valueChanged.connect(self.on_fusion_opacity_changed)
+        opacity_row.addWidget(self.fusion_opacity)
+        layout.addLayout(opacity_row)
+        # Per-layer visibility and intensity window (voxel units)
+        grid = QGridLayout()
+        self.fusion_layer_controls = []
+        for layer, name in enumerate(("Volume", "Fusion")):
+            visible = QCheckBox(name)
+            visible.setChecked(self.renderer.is_layer_visible(layer))
+            low, high = self.renderer.get_layer_window(layer)
+            lo, hi = QSpinBox(), QSpinBox()
+            for spin, value in ((lo, low), (hi, high)):
+                spin.setRange(0, 65535)
+                spin.setValue(int(value))
+            lo.setToolTip("Window low (voxel value)")
+            hi.setToolTip("Window high (voxel value)")
+            visible.toggled.connect(lambda on, layer=layer: (self.renderer.set_layer_visible(layer, bool(on)),
+                                                            self.gl_widget.update()))
+            lo.valueChanged.connect(lambda _, layer=layer: self.on_layer_window_changed(layer))
+            hi.valueChanged.connect(lambda _, layer=layer: self.on_layer_window_changed(layer))
+            grid.addWidget(visible, layer, 0)
+            grid.addWidget(lo, layer, 1)
+            grid.addWidget(hi, layer, 2)
+            self.fusion_layer_controls.append((visible, lo, hi))
+        layout.addLayout(grid)
+
+        index = self.controls_layout.indexOf(self.fusion_toggle_btn)
+        self.controls_layout.insertWidget(index + 1, self.fusion_panel)
+
+    def toggle_fusion_panel(self, checked: bool):
+        if checked and self.fusion_panel is None:
+            self._build_fusion_panel()
+        if self.fusion_panel is not None:
+            self.fusion_panel.setVisible(checked)
+        self.fusion_toggle_btn.setText("Fusion ▾" if checked else "Fusion ▸")
+
+    def load_fusion_volume(self):
+        if not self.renderer.is_volume_loaded():
+            self.gl_widget.show_alert("Load a volume first", 3000)
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Open Fusion Volume", "",
+                                              "NIfTI Files (*.nii *.nii.gz);;All Files (*)")
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            loaded = self.renderer.load_fusion_volume(path)
+        finally:
+            QApplication.restoreOverrideCursor()
+        if not loaded:
+            self.gl_widget.show_alert("Fusion volume loading failed", 5000)
+            return
+        w, h, d = self.renderer.get_fusion_dimensions()
+        print(f"Python: Loaded fusion volume {w}x{h}x{d} from {path}")
+        self.gl_widget.update()
+
+    def clear_fusion_volume(self):
+        self.renderer.clear_fusion_volume()
+        self.gl_widget.update()
+
+    def on_fusion_opacity_changed(self, value: int):
+        self.fusion_opacity_label.setText(f"Opacity: {value}%")
+        self.renderer.set_fusion_opacity(value / 100.0)
+        self.gl_widget.update()
+
+    def on_layer_window_changed(self, layer: int):
+        _, lo, hi = self.fusion_layer_controls[layer]
+        self.renderer.set_layer_window(layer, lo.value(), max(hi.value(), lo.value() + 1))
+        self.gl_widget.update()
+
     def init_slicer_limits(self):
+        if self.slicer_panel is None:
+            return
         # Get volume dims from backend
         w = self.renderer.get_volume_width()
         h = self.renderer.get_volume_height()
@@ -457,11 +1106,51 @@ class MainWindow(QMainWindow):
         if self.slicer_auto.isChecked():
             self.toggle_auto_sweep(True)
 
+    def init_time_limits(self):
+        """Show the frame controls for 4D volumes and rewind to the first frame."""
+        if self.slicer_panel is None:
+            return
+        frames = self.renderer.get_time_frame_count()
+        self.time_slider.blockSignals(True)
+        self.time_slider.setMaximum(max(0, frames - 1))
+        self.time_slider.setValue(0)
+        self.time_slider.blockSignals(False)
+        self.time_label.setText(f"Frame: 0/{max(0, frames - 1)}")
+        self.time_row.setVisible(frames > 1)
+        if frames <= 1:
+            self.time_play.setChecked(False)
+        self.toggle_auto_sweep(self.time_play.isChecked())
+
+    def on_time_frame_changed(self, value: int):
+        if not self.renderer.set_time_frame(int(value)):
+            return
+        self.time_label.setText(f"Frame: {value}/{self.time_slider.maximum()}")
+        self.gl_widget.update()
+
+    def step_time_frame(self):
+        frames = self.renderer.get_time_frame_count()
+        if frames > 1:
+            self.time_slider.setValue((self.time_slider.value() + 1) % frames)
+
     def on_slicer_axis_changed(self, idx: int):
         self.renderer.set_slice_axis(int(idx))
         self.init_slicer_limits()
         self.gl_widget.update()
 
+    def apply_slab_settings(self, *_):
+        """Send the slab mode and thickness to the main view and the MPR views."""
+        if self.slicer_panel is None:
+            return
+        mode = self.slab_mode.currentIndex()
+        thickness = self.slab_thickness.value() if mode > 0 else 0.0
+        for view_id in [0] + [view.view_id for view in self.slice_views]:
+            self.renderer.set_slab_mode(max(0, mode - 1), view_id)
+            self.renderer.set_slab_thickness(thickness, view_id)
+        self.slab_thickness.setEnabled(mode > 0)
+        self.gl_widget.update()
+        for view in self.slice_views:
+            view.update()
+
     def on_slicer_index_changed(self, value: int):
         # Keep slider and spin synchronized
         sender = self.sender()
@@ -473,6 +1162,35 @@ class MainWindow(QMainWindow):
         self.renderer.set_slice_index(int(value))
         self.gl_widget.update()
 
+    # --- Isosurface ---
+    def extract_isosurface(self):
+        if not self.renderer.is_volume_loaded():
+            self.gl_widget.show_alert("Load a volume first", 3000)
+            return
+        iso = self.iso_slider.value() / 100.0 * 65535.0
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            triangles = self.renderer.extract_isosurface(iso)
+        finally:
+            QApplication.restoreOverrideCursor()
+        if triangles == 0:
+            self.gl_widget.show_alert("No surface at this iso value", 3000)
+        self.gl_widget.update()
+
+    def export_mesh(self):
+        vertices, faces, _ = self.renderer.get_mesh()
+        if len(faces) == 0:
+            self.gl_widget.show_alert("Extract a surface first", 3000)
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Mesh", "surface.ply",
+                                              "PLY Mesh (*.ply);;STL Mesh (*.stl)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".ply"
+        if not self.renderer.export_mesh(path):
+            self.gl_widget.show_alert("Mesh export failed", 5000)
+
     # --- Save handlers ---
     def _pick_save_path(self, caption: str, default_name: str = "image.png") -> str:
         path, _ = QFileDialog.getSaveFileName(self, caption, default_name, "PNG Image (*.png);;JPEG Image (*.jpg *.jpeg)")
@@ -549,6 +1267,76 @@ class MainWindow(QMainWindow):
             self.gl_widget.set_overlay_visible(prev_overlay)
             self.gl_widget.update()
 
+    def export_movie(self):
+        """Render a camera path or slice sweep to a video file or a PNG sequence."""
+        if not self.renderer.is_volume_loaded():
+            self.gl_widget.show_alert("Load a volume first", 3000)
+            return
+        from movie_export import MovieExporter, PngSequenceWriter, FfmpegWriter, camera_path
+        kinds = ["Turntable (360°)", "Elevation sweep", "Slice sweep"]
+        choice, ok = QInputDialog.getItem(self, "Export Movie", "Path", kinds, 0, False)
+        if not ok:
+            return
+        kind = ("turntable", "elevation", "slices")[kinds.index(choice)]
+        slice_count = self.get_slicer_max_index() + 1 if self.slicer_panel is not None else \
+            max(1, self.renderer.get_volume_depth())
+        default_frames = slice_count if kind == "slices" else 360
+        frames, ok = QInputDialog.getInt(self, "Export Movie", "Frames", default_frames, 2, 100000, 1)
+        if not ok:
+            return
+        res = self._pick_export_resolution()
+        if not res:
+            return
+        exp_w, exp_h = res
+        path, selected = QFileDialog.getSaveFileName(self, "Export Movie", f"{kind}.mp4",
+                                                     "MP4 Video (*.mp4);;PNG Sequence (*.png)")
+        if not path:
+            return
+        stem, ext = os.path.splitext(path)
+        try:
+            if ext.lower() == ".png" or (not ext and selected.startswith("PNG")):
+                # frames go to <stem>/<name>_00000.png ...
+                writer = PngSequenceWriter(stem, prefix=os.path.basename(stem))
+            else:
+                writer = FfmpegWriter(path if ext else path + ".mp4", exp_w, exp_h, fps=30)
+        except (OSError, RuntimeError) as e:
+            self.gl_widget.show_alert(f"Movie export failed: {e}", 5000)
+            return
+
+        # Slice sweeps need slice mode on the current slicer axis for the duration
+        slice_mode_was = self.slicer_panel is not None and self.slicer_enable.isChecked()
+        if kind == "slices" and not slice_mode_was:
+            self.renderer.set_slice_axis(self.slicer_axis.currentIndex() if self.slicer_panel is not None else 0)
+            self.renderer.set_slice_mode(True)
+        azimuth, elevation = self.renderer.get_camera_angles()
+        steps = camera_path(kind, frames, azimuth=azimuth, elevation=elevation, slice_count=slice_count)
+
+        dialog = QProgressDialog("Rendering frames...", "Cancel", 0, len(steps), self)
+        dialog.setWindowTitle("Export Movie")
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+
+        def progress(done, total):
+            dialog.setValue(done)
+            if done % 8 == 0 or done == total:
+                QApplication.processEvents()
+            return not dialog.wasCanceled()
+
+        try:
+            stats = MovieExporter(self.gl_widget, self.renderer).run(steps, writer, exp_w, exp_h, progress=progress)
+        except (OSError, RuntimeError) as e:
+            self.gl_widget.show_alert(f"Movie export failed: {e}", 5000)
+            return
+        finally:
+            dialog.close()
+            if kind == "slices" and not slice_mode_was:
+                self.renderer.set_slice_mode(False)
+            self.gl_widget.update()
+        print(f"Python: movie export {stats['frames']} frames in {stats['seconds']:.1f}s "
+              f"({stats['fps']:.1f} fps, render {stats['render_ms']:.1f} ms/frame, stalls {stats['stall_ms']:.0f} ms)")
+        state = "cancelled after" if stats["cancelled"] else "exported"
+        self.gl_widget.show_alert(f"Movie {state} {stats['frames']} frames ({stats['fps']:.1f} fps)", 4000)
+
     def reset_view(self):
         """Reset only the camera/view to the initial framing of the current volume."""
         try:
@@ -591,14 +1379,25 @@ class MainWindow(QMainWindow):
             interval = max(10, int(1000 / max(1, value)))
             self.slicer_timer.start(interval)
 
+    def _slice_sweep_active(self) -> bool:
+        return self.slicer_auto.isChecked() and self.slicer_enable.isChecked()
+
+    def _frame_playback_active(self) -> bool:
+        return self.time_play.isChecked() and self.renderer.get_time_frame_count() > 1
+
     def toggle_auto_sweep(self, checked: bool):
-        if checked and self.slicer_enable.isChecked():
+        # One timer drives both the slice sweep and 4D frame playback
+        if self._slice_sweep_active() or self._frame_playback_active():
             interval = max(10, int(1000 / max(1, self.slicer_speed.value())))
             self.slicer_timer.start(interval)
         else:
             self.slicer_timer.stop()
 
     def step_slicer(self):
+        if self._frame_playback_active():
+            self.step_time_frame()
+        if not self._slice_sweep_active():
+            return
         # Move slice by +1 and wrap around
         current = self.slicer_slider.value()
         max_idx = self.get_slicer_max_index()
@@ -637,7 +1436,46 @@ class MainWindow(QMainWindow):
         else:
             self.showMaximized()
 
+class StartupProfile:
+    """Prints startup milestones (ms since the first line of main.py) for --profile-startup."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.marks = []
+
+    def mark(self, name: str):
+        if self.enabled:
+            self.marks.append((name, (time.perf_counter() - _STARTUP_T0) * 1000.0))
+
+    def watch(self, window):
+        """Record time-to-window (first event loop turn after show) and time-to-first-frame."""
+        if not self.enabled:
+            return
+        QTimer.singleShot(0, lambda: self.mark("window shown"))
+
+        def first_frame():
+            window.gl_widget.frameSwapped.disconnect(first_frame)
+            self.mark("first frame")
+            self.report()
+        window.gl_widget.frameSwapped.connect(first_frame)
+
+    def report(self):
+        print("Python: Startup profile (ms since main.py start; excludes interpreter startup)")
+        prev = 0.0
+        for name, t in self.marks:
+            print(f"  {name:<16}{t:>9.1f}  (+{t - prev:.1f})")
+            prev = t
+
+
 if __name__ == '__main__':
+    profile = StartupProfile("--profile-startup" in sys.argv)
+    if profile.enabled:
+        sys.argv.remove("--profile-startup")  # leave the rest to Qt
+    profile.mark("imports")
+
+    # The MPR views share one volume texture, so all GL widgets must share contexts.
+    # This must be set BEFORE the QApplication is created.
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
 
     # --- CRITICAL: Set the Default OpenGL Surface Format ---
@@ -649,9 +1487,10 @@ if __name__ == '__main__':
     format.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
     QSurfaceFormat.setDefaultFormat(format)
     # ----------------------------------------------------
+    profile.mark("application")
 
     window = MainWindow()
+    profile.mark("window built")
+    profile.watch(window)
     window.show()
     sys.exit(app.exec())
-
-    
\ No newline at end of file
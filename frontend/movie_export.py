@@ -0,0 +1,237 @@
+# frontend/movie_export.py
+#
+# Turntable / elevation-sweep / slice-sweep export to a PNG sequence or a video file.
+#
+# Frames are rendered into an offscreen FBO and read back asynchronously through a ring
+# of pixel-pack buffers (volumerenderer.FrameReadback): frame k is copied on the GPU
+# while frame k+1 renders, and only frame k-buffers is mapped on the CPU. Mapped frames
+# go to encoder workers (zlib PNG writers on a thread pool, or a local ffmpeg fed
+# through a pipe by a writer thread). Both writers accept a bounded number of frames
+# and block the render loop when full, so memory stays at roughly
+# (buffers + max_pending) frames however long the movie is.
+
+import math
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+import volumerenderer
+from mvr_batch import write_png
+
+PATHS = ("turntable", "elevation", "slices")
+
+
+def camera_path(kind, frames, azimuth=0.0, elevation=20.0, slice_count=0):
+    """Per-frame renderer state for an export path.
+
+    Returns a list of ("angles", azimuth, elevation) or ("slice", index) steps.
+    turntable: one full turn around the vertical axis at a fixed elevation.
+    elevation: one up-down cycle within +/-80 degrees at a fixed azimuth.
+    slices: the slicer index from first to last slice (frames <= 0 = one per slice).
+    """
+    if kind == "turntable":
+        return [("angles", (azimuth + 360.0 * i / frames) % 360.0, elevation) for i in range(frames)]
+    if kind == "elevation":
+        return [("angles", azimuth, 80.0 * math.sin(2.0 * math.pi * i / frames)) for i in range(frames)]
+    if kind == "slices":
+        if slice_count <= 0:
+            return []
+        frames = slice_count if frames <= 0 else frames
+        last = slice_count - 1
+        return [("slice", int(round(i * last / max(1, frames - 1)))) for i in range(frames)]
+    raise ValueError(f"unknown camera path {kind!r}; expected one of {PATHS}")
+
+
+class PngSequenceWriter:
+    """Writes frames as numbered RGB PNGs on a pool of encoder threads.
+
+    zlib.compress releases the GIL, so the workers encode in parallel with each other
+    and with the render loop. write() blocks while max_pending frames are queued.
+    """
+
+    def __init__(self, out_dir, prefix="frame", workers=None, max_pending=None):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.workers = workers or max(1, os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="png-encoder")
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * self.workers)
+        self._futures = []
+        self.frames = 0
+
+    def write(self, index, rgba):
+        self._slots.acquire()
+        path = os.path.join(self.out_dir, f"{self.prefix}_{index:05d}.png")
+        future = self._pool.submit(write_png, path, rgba[:, :, :3])
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        self.frames += 1
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for future in self._futures:
+            future.result()  # re-raise the first encoder error
+        self._futures.clear()
+
+
+class FfmpegWriter:
+    """Pipes raw RGB frames to a local ffmpeg process (H.264 unless codec is given).
+
+    A writer thread feeds the pipe so the render loop only waits when max_pending
+    frames are already queued; ffmpeg does its own multithreaded encoding.
+    """
+
+    def __init__(self, path, width, height, fps=30, codec="libx264", crf=18, max_pending=8, ffmpeg=None):
+        self.ffmpeg = ffmpeg or shutil.which("ffmpeg")
+        if not self.ffmpeg:
+            raise RuntimeError("ffmpeg not found on PATH")
+        # yuv420p needs even dimensions; crop the odd row/column instead of failing
+        cmd = [self.ffmpeg, "-y", "-loglevel", "error",
+               "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+               "-vf", "crop=trunc(iw/2)*2:trunc(ih/2)*2", "-c:v", codec]
+        if codec in ("libx264", "libx265"):
+            cmd += ["-crf", str(crf), "-pix_fmt", "yuv420p"]
+        cmd.append(path)
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._feed, name="ffmpeg-writer", daemon=True)
+        self._thread.start()
+        self.frames = 0
+
+    def _feed(self):
+        while True:
+            rgb = self._queue.get()
+            if rgb is None:
+                break
+            if self._error is not None:
+                continue  # drain so write() never blocks after a failure
+            try:
+                self._proc.stdin.write(np.ascontiguousarray(rgb).data)
+            except OSError as e:
+                self._error = e
+
+    def write(self, index, rgba):
+        if self._error is not None:
+            raise RuntimeError(f"ffmpeg stopped accepting frames: {self._error}")
+        self._queue.put(rgba[:, :, :3])
+        self.frames += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        stderr = self._proc.stderr.read().decode(errors="replace").strip()
+        if self._proc.wait() != 0 or self._error is not None:
+            raise RuntimeError(f"ffmpeg failed: {stderr or self._error}")
+
+
+class MovieExporter:
+    """Drives the renderer through a camera path and feeds the frames to a writer.
+
+    Runs on the GUI thread (it needs the widget's GL context). "slice" steps move the
+    slice index along the view's current slicer axis, so slice mode must be on. The
+    view's camera angles and slice index are restored afterwards.
+    """
+
+    def __init__(self, widget, renderer):
+        self.widget = widget
+        self.renderer = renderer
+        self.view = widget.view_id
+
+    def _apply(self, step):
+        if step[0] == "angles":
+            self.renderer.set_camera_angles(step[1], step[2], self.view)
+        else:
+            self.renderer.set_slice_index(step[1], self.view)
+
+    def run(self, steps, writer, width, height, buffers=2, progress=None):
+        """Renders `steps` (see camera_path) at width x height into `writer`.
+
+        progress(done, total) is called after each frame and may return False to cancel.
+        Returns a stats dict: frames, seconds, fps, render_ms and stall_ms (time spent
+        waiting on readback or on a full writer), and cancelled.
+        """
+        r, view = self.renderer, self.view
+        saved_angles = r.get_camera_angles(view)
+        saved_slice = r.get_slice_index(view)
+        uses_slices = any(step[0] == "slice" for step in steps)
+
+        self.widget.makeCurrent()
+        fmt = QOpenGLFramebufferObjectFormat()
+        fmt.setAttachment(QOpenGLFramebufferObject.Attachment.Depth)
+        fbo = QOpenGLFramebufferObject(width, height, fmt)
+        if not fbo.isValid():
+            self.widget.doneCurrent()
+            writer.close()
+            raise RuntimeError(f"could not create a {width}x{height} framebuffer")
+        readback = volumerenderer.FrameReadback()
+        readback.configure(width, height, buffers)
+
+        render_s = stall_s = 0.0
+        done = 0
+        cancelled = False
+        t0 = time.perf_counter()
+        try:
+            for i, step in enumerate(steps):
+                # progress() may process events and repaint the widget, which rebinds its
+                # own framebuffer and viewport, so both are re-established every frame
+                self.widget.makeCurrent()
+                fbo.bind()
+                r.resize(width, height, view)
+                self._apply(step)
+                t = time.perf_counter()
+                r.render(view)
+                render_s += time.perf_counter() - t
+                t = time.perf_counter()
+                if readback.full:
+                    writer.write(*readback.retrieve())
+                readback.submit(i)
+                stall_s += time.perf_counter() - t
+                done += 1
+                if progress is not None and progress(done, len(steps)) is False:
+                    cancelled = True
+                    break
+            self.widget.makeCurrent()
+            t = time.perf_counter()
+            while readback.pending:
+                writer.write(*readback.retrieve())
+            stall_s += time.perf_counter() - t
+        except BaseException:
+            try:
+                writer.close()
+            except Exception:
+                pass  # the render error is the one worth reporting
+            raise
+        finally:
+            self.widget.makeCurrent()
+            readback.release()
+            fbo.release()
+            r.resize(self.widget.width(), self.widget.height(), view)
+            self.widget.doneCurrent()
+            r.set_camera_angles(saved_angles[0], saved_angles[1], view)
+            if uses_slices:
+                r.set_slice_index(saved_slice, view)
+            self.widget.update()
+        t = time.perf_counter()
+        writer.close()
+        stall_s += time.perf_counter() - t
+        seconds = time.perf_counter() - t0
+        return {
+            "frames": done,
+            "seconds": seconds,
+            "fps": done / seconds if seconds > 0 else 0.0,
+            "render_ms": render_s * 1000.0 / max(1, done),
+            "stall_ms": stall_s * 1000.0,
+            "cancelled": cancelled,
+        }
@@ -0,0 +1,319 @@
+import argparse
+import json
+import multiprocessing
+import os
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+# mvr-batch: headless thumbnail generation for a directory tree of NIfTI files and
+# DICOM series. For every volume it writes axis MIPs, mean projections and middle
+# slices as 8-bit PNGs plus a meta.json, and a manifest.json over the whole run.
+#
+# usage: python mvr_batch.py INPUT_DIR OUTPUT_DIR [--workers N] [--force]
+#
+# Volumes are spread over a pool of worker processes (one loader thread each, so the
+# pool does not oversubscribe the cores). Each worker holds one volume at a time and
+# reduces it in z-slabs of at most --chunk-mb, and workers are replaced after
+# --tasks-per-worker volumes. Inputs whose outputs are newer than the source (same
+# size/mtime fingerprint) are skipped unless --force is given.
+#
+# For 4D NIfTI only the first frame is used.
+
+VIEWS = ("axial", "coronal", "sagittal")
+KINDS = ("mip", "mean", "slice")
+NIFTI_SUFFIXES = (".nii", ".nii.gz")
+
+_renderer = None  # one Renderer per worker process
+
+
+# --- PNG output (grayscale, 8-bit) ---
+
+def write_png(path, image):
+    """Writes a uint8 array as PNG: (h, w) grayscale, (h, w, 3) RGB or (h, w, 4) RGBA
+    (zlib only, no imaging dependency)."""
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    channels = image.shape[2] if image.ndim == 3 else 1
+    color_type = {1: 0, 3: 2, 4: 6}[channels]
+    # Each row is prefixed with filter type 0 (none)
+    raw = np.empty((height, width * channels + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = image.reshape(height, width * channels)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+    os.replace(tmp, path)  # a killed run never leaves a truncated PNG behind
+
+
+def to_uint8(image, low_pct=0.5, high_pct=99.5):
+    """Windows an image to its own [low, high] percentiles and scales to 0..255."""
+    lo, hi = np.percentile(image, (low_pct, high_pct))
+    if hi <= lo:
+        hi = lo + 1.0
+    out = (image.astype(np.float32) - lo) * (255.0 / (hi - lo))
+    return np.clip(out, 0, 255).astype(np.uint8)
+
+
+def correct_aspect(image, row_spacing, col_spacing):
+    """Nearest-neighbour row resampling so pixels are square in millimetres."""
+    if row_spacing <= 0 or col_spacing <= 0:
+        return image
+    rows = max(1, int(round(image.shape[0] * row_spacing / col_spacing)))
+    if rows == image.shape[0]:
+        return image
+    idx = np.minimum((np.arange(rows) + 0.5) * image.shape[0] / rows, image.shape[0] - 1).astype(np.intp)
+    return image[idx]
+
+
+# --- Projections ---
+
+def project(volume, chunk_bytes, mips=None):
+    """Axis MIPs, mean projections and middle slices of a (depth, height, width) uint16 volume.
+
+    The volume is reduced in z-slabs so temporaries stay below `chunk_bytes`; the max
+    projections stay in uint16 and the means accumulate in float64 per slab.
+    `mips` (axial, coronal, sagittal), e.g. the renderer's cached axis projections,
+    replaces the max reductions.
+    """
+    depth, height, width = volume.shape
+    slab = max(1, int(chunk_bytes // max(1, height * width * 8)))
+
+    if mips is None:
+        mip_axial = np.zeros((height, width), dtype=np.uint16)
+        mip_coronal = np.empty((depth, width), dtype=np.uint16)
+        mip_sagittal = np.empty((depth, height), dtype=np.uint16)
+    else:
+        mip_axial, mip_coronal, mip_sagittal = mips
+    sum_axial = np.zeros((height, width), dtype=np.float64)
+    mean_coronal = np.empty((depth, width), dtype=np.float32)
+    mean_sagittal = np.empty((depth, height), dtype=np.float32)
+
+    for z0 in range(0, depth, slab):
+        block = volume[z0:z0 + slab]
+        if mips is None:
+            np.maximum(mip_axial, block.max(axis=0), out=mip_axial)
+            mip_coronal[z0:z0 + slab] = block.max(axis=1)
+            mip_sagittal[z0:z0 + slab] = block.max(axis=2)
+        sum_axial += block.sum(axis=0, dtype=np.float64)
+        mean_coronal[z0:z0 + slab] = block.mean(axis=1, dtype=np.float64)
+        mean_sagittal[z0:z0 + slab] = block.mean(axis=2, dtype=np.float64)
+
+    return {
+        "axial": {"mip": mip_axial, "mean": sum_axial / depth, "slice": volume[depth // 2]},
+        "coronal": {"mip": mip_coronal, "mean": mean_coronal, "slice": volume[:, height // 2, :]},
+        "sagittal": {"mip": mip_sagittal, "mean": mean_sagittal, "slice": volume[:, :, width // 2]},
+    }
+
+
+# --- Inputs ---
+
+def fingerprint_paths(paths):
+    """Cheap change detector: file count, total size and newest mtime."""
+    count, size, mtime = 0, 0, 0
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        count += 1
+        size += st.st_size
+        mtime = max(mtime, st.st_mtime_ns)
+    return f"{count}:{size}:{mtime}"
+
+
+def output_name(rel):
+    return rel.replace(os.sep, "__").replace(":", "_") or "root"
+
+
+def discover(input_dir, cache_dir):
+    """Returns jobs for every NIfTI file and every DICOM series under input_dir."""
+    import volumerenderer
+
+    jobs = []
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(NIFTI_SUFFIXES):
+                path = os.path.join(dirpath, name)
+                rel = os.path.relpath(path, input_dir)
+                jobs.append({"kind": "nifti", "source": path, "series_key": None, "name": output_name(rel),
+                             "fingerprint": fingerprint_paths([path]), "size": os.path.getsize(path)})
+
+    r = volumerenderer.Renderer()
+    r.set_load_verbosity(0)
+    if cache_dir:
+        r.set_cache_directory(cache_dir)
+    for series in r.list_dicom_series(input_dir):
+        directory = series["directory"]
+        files = [os.path.join(directory, f) for f in os.listdir(directory)]
+        rel = os.path.relpath(directory, input_dir)
+        name = output_name(rel if rel != "." else "") + "__" + output_name(series["key"])[-16:]
+        jobs.append({"kind": "dicom", "source": directory, "series_key": series["key"], "name": name,
+                     "fingerprint": fingerprint_paths(files),
+                     "size": 2 * series["width"] * series["height"] * series["slices"]})
+    return jobs
+
+
+def output_paths(out_dir, name):
+    folder = os.path.join(out_dir, name)
+    pngs = {f"{view}_{kind}": os.path.join(folder, f"{view}_{kind}.png") for view in VIEWS for kind in KINDS}
+    return folder, pngs, os.path.join(folder, "meta.json")
+
+
+def up_to_date(job, out_dir):
+    _, pngs, meta_path = output_paths(out_dir, job["name"])
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("fingerprint") != job["fingerprint"] or meta.get("status") != "ok":
+        return None
+    if not all(os.path.exists(p) for p in pngs.values()):
+        return None
+    return meta
+
+
+# --- Worker ---
+
+def init_worker(cache_dir, loader_threads):
+    global _renderer
+    import volumerenderer
+
+    _renderer = volumerenderer.Renderer()
+    _renderer.set_load_verbosity(0)
+    _renderer.set_load_threads(loader_threads)
+    if cache_dir:
+        _renderer.set_cache_directory(cache_dir)
+
+
+def process(args):
+    job, out_dir, chunk_bytes = args
+    folder, pngs, meta_path = output_paths(out_dir, job["name"])
+    meta = {"source": job["source"], "series_key": job["series_key"], "kind": job["kind"],
+            "fingerprint": job["fingerprint"], "pid": os.getpid()}
+    t0 = time.perf_counter()
+    try:
+        if job["kind"] == "dicom":
+            # The renderer keeps the series list of the last scanned root, so a worker
+            # scans the tree once and then loads series by key
+            ok = _renderer.load_dicom_series(job["root"], job["series_key"])
+        else:
+            ok = _renderer.load_volume(job["source"])
+        if not ok:
+            raise RuntimeError("load failed")
+        load_ms = (time.perf_counter() - t0) * 1000.0
+        volume = _renderer.get_volume_as_numpy()
+        spacing = (_renderer.get_volume_spacing_x(), _renderer.get_volume_spacing_y(),
+                   _renderer.get_volume_spacing_z())
+        sx, sy, sz = spacing
+
+        t1 = time.perf_counter()
+        # The renderer computes the axis MIPs in one pass during the load
+        mips = tuple(_renderer.get_axis_projection(axis) for axis in range(3))
+        images = project(volume, chunk_bytes, mips)
+        os.makedirs(folder, exist_ok=True)
+        outputs = {}
+        for view, by_kind in images.items():
+            for kind, image in by_kind.items():
+                if view == "axial":
+                    image = correct_aspect(image, sy, sx)
+                else:
+                    # z runs up the screen for coronal/sagittal views
+                    image = correct_aspect(image[::-1], sz, sx if view == "coronal" else sy)
+                key = f"{view}_{kind}"
+                write_png(pngs[key], to_uint8(image))
+                outputs[key] = os.path.relpath(pngs[key], out_dir)
+        meta.update({"status": "ok", "shape": list(volume.shape), "spacing": list(spacing),
+                     "outputs": outputs, "load_ms": round(load_ms, 2),
+                     "project_ms": round((time.perf_counter() - t1) * 1000.0, 2)})
+        del volume, images
+    except Exception as e:  # one bad input must not stop the batch
+        meta.update({"status": "error", "error": str(e)})
+    meta["total_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+
+    os.makedirs(folder, exist_ok=True)
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, meta_path)
+    return job["name"], meta
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="mvr-batch",
+                                     description="Write MIP/mean/slice PNG thumbnails for a tree of volumes")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--loader-threads", type=int, default=1, help="loader threads per worker")
+    parser.add_argument("--chunk-mb", type=float, default=64.0, help="max temporary memory per reduction slab")
+    parser.add_argument("--tasks-per-worker", type=int, default=16,
+                        help="volumes a worker processes before it is replaced (returns memory to the OS)")
+    parser.add_argument("--cache-dir", default=None, help="DICOM header index cache (default OUTPUT_DIR/.cache)")
+    parser.add_argument("--force", action="store_true", help="regenerate outputs even if up to date")
+    args = parser.parse_args()
+
+    input_dir = os.path.abspath(args.input_dir)
+    out_dir = os.path.abspath(args.output_dir)
+    cache_dir = args.cache_dir or os.path.join(out_dir, ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    jobs = discover(input_dir, cache_dir)
+    for job in jobs:
+        job["root"] = input_dir
+    entries, todo = {}, []
+    for job in jobs:
+        meta = None if args.force else up_to_date(job, out_dir)
+        if meta is not None:
+            entries[job["name"]] = dict(meta, skipped=True)
+        else:
+            todo.append(job)
+    # Largest first so a big volume does not start last and leave the pool idle
+    todo.sort(key=lambda j: j["size"], reverse=True)
+    print(f"mvr-batch: {len(jobs)} inputs, {len(jobs) - len(todo)} up to date, {len(todo)} to process "
+          f"({time.perf_counter() - t0:.1f}s scan)")
+
+    failed = 0
+    t1 = time.perf_counter()
+    if todo:
+        ctx = multiprocessing.get_context("spawn")
+        workers = max(1, min(args.workers, len(todo)))
+        with ctx.Pool(workers, initializer=init_worker, initargs=(cache_dir, args.loader_threads),
+                      maxtasksperchild=max(1, args.tasks_per_worker)) as pool:
+            work = [(job, out_dir, int(args.chunk_mb * (1 << 20))) for job in todo]
+            for done, (name, meta) in enumerate(pool.imap_unordered(process, work), 1):
+                entries[name] = meta
+                if meta["status"] != "ok":
+                    failed += 1
+                print(f"[{done}/{len(todo)}] {meta['status']:<5} {meta['total_ms']:>9.1f} ms  {name}"
+                      + (f"  ({meta['error']})" if meta["status"] != "ok" else ""))
+    elapsed = time.perf_counter() - t1
+
+    manifest = {"input_dir": input_dir, "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "entries": [dict(entries[k], name=k) for k in sorted(entries)]}
+    tmp = os.path.join(out_dir, "manifest.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, "manifest.json"))
+
+    if todo:
+        print(f"mvr-batch: {len(todo) - failed} ok, {failed} failed in {elapsed:.1f}s "
+              f"({len(todo) / elapsed:.2f} volumes/s with {workers} workers)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
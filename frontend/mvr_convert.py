@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+
+import volumerenderer
+
+# mvr-convert: converts NIfTI files and DICOM series to the chunked multiscale store
+# (.mvrc, see backend/include/ChunkStore.h), which reads single slices and regions
+# without inflating the whole volume.
+#
+# usage: python mvr_convert.py INPUT [INPUT ...] OUTPUT [--chunk 64] [--levels 0]
+#                              [--compression 1] [--series KEY] [--threads 0]
+#
+# INPUT is a .nii/.nii.gz file or a DICOM directory (its largest series unless --series
+# is given). With one INPUT, OUTPUT may be a .mvrc path; otherwise OUTPUT is a directory
+# and each volume is written there as <name>.mvrc. 4D NIfTI files store their first frame.
+
+
+def output_name(path):
+    name = os.path.basename(os.path.normpath(path))
+    for suffix in (".nii.gz", ".nii"):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="mvr-convert", description="Convert NIfTI/DICOM volumes to .mvrc chunk stores")
+    parser.add_argument("inputs", nargs="+", metavar="INPUT")
+    parser.add_argument("output", metavar="OUTPUT")
+    parser.add_argument("--chunk", type=int, default=64, help="chunk edge length in voxels")
+    parser.add_argument("--levels", type=int, default=0,
+                        help="pyramid levels including full resolution (0 = down to one chunk, 1 = none)")
+    parser.add_argument("--compression", type=int, default=1, help="zlib level per chunk (0 = raw, 9 = smallest)")
+    parser.add_argument("--series", default=None, help="DICOM series key (see Renderer.list_dicom_series)")
+    parser.add_argument("--threads", type=int, default=0, help="loader/compression threads (0 = all cores)")
+    args = parser.parse_args()
+
+    single = len(args.inputs) == 1 and args.output.endswith(".mvrc")
+    if not single:
+        os.makedirs(args.output, exist_ok=True)
+
+    r = volumerenderer.Renderer()
+    r.set_load_verbosity(0)
+    r.set_load_threads(args.threads)
+    failed = 0
+    for path in args.inputs:
+        out = args.output if single else os.path.join(args.output, output_name(path) + ".mvrc")
+        t0 = time.perf_counter()
+        if args.series and os.path.isdir(path):
+            loaded = r.load_dicom_series(path, args.series)
+        else:
+            loaded = r.load_volume(path)
+        if not loaded:
+            print(f"{path}: could not load", file=sys.stderr)
+            failed += 1
+            continue
+        t1 = time.perf_counter()
+        if not r.save_chunk_store(out, args.chunk, args.levels, args.compression):
+            print(f"{path}: could not write {out}", file=sys.stderr)
+            failed += 1
+            continue
+        t2 = time.perf_counter()
+        reader = volumerenderer.ChunkStoreReader(out)
+        depth, height, width = reader.level_shape(0)
+        raw = width * height * depth * 2
+        size = os.path.getsize(out)
+        print(f"{path} -> {out}: {width}x{height}x{depth}, {reader.level_count} levels, "
+              f"{size / 2**20:.1f} MB ({raw / max(1, size):.2f}x of raw), "
+              f"load {(t1 - t0) * 1000:.0f} ms, write {(t2 - t1) * 1000:.0f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import math
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.widgets import Slider
+
+import volumerenderer
+
+# Oblique slice viewer on the CPU: the plane is resampled by Renderer.reslice (no GL),
+# so it runs on machines without a GPU. Tilt the plane with the two angle sliders and
+# scroll along its normal with the offset slider or the mouse wheel.
+#
+# usage: python oblique_slicer.py volume.nii.gz [--size 512] [--nearest]
+
+
+def plane_normal(tilt_x, tilt_y):
+    """z axis tilted by tilt_x degrees about x, then tilt_y degrees about y."""
+    ax, ay = math.radians(tilt_x), math.radians(tilt_y)
+    n = np.array([0.0, -math.sin(ax), math.cos(ax)])
+    return np.array([n[0] * math.cos(ay) + n[2] * math.sin(ay), n[1], -n[0] * math.sin(ay) + n[2] * math.cos(ay)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU oblique slice viewer")
+    parser.add_argument("path", help="NIfTI file, chunk store or DICOM folder")
+    parser.add_argument("--size", type=int, default=512, help="displayed image edge length in pixels")
+    parser.add_argument("--nearest", action="store_true", help="nearest-neighbour instead of trilinear")
+    args = parser.parse_args()
+
+    r = volumerenderer.Renderer()
+    r.set_load_verbosity(0)
+    if not r.load_volume(args.path):
+        raise SystemExit(f"could not load {args.path}")
+    spacing = np.array([r.get_volume_spacing_x(), r.get_volume_spacing_y(), r.get_volume_spacing_z()])
+    dims = np.array([r.get_volume_width(), r.get_volume_height(), r.get_volume_depth()])
+    center = (dims - 1) / 2.0 * spacing
+    extent = dims * spacing
+    half_diagonal = float(np.linalg.norm(extent)) / 2.0
+    pixel = 2.0 * half_diagonal / args.size  # the plane covers the volume at any tilt
+    interpolation = 0 if args.nearest else 1
+    window = float(np.percentile(r.get_volume_as_numpy()[::4, ::4, ::4], 99.5)) or 1.0
+
+    fig, ax = plt.subplots()
+    plt.subplots_adjust(bottom=0.3)
+    image = ax.imshow(np.zeros((args.size, args.size)), cmap="gray", vmin=0, vmax=window)
+    ax.set_axis_off()
+    sliders = {
+        "tilt_x": Slider(plt.axes([0.25, 0.17, 0.6, 0.03]), "Tilt X", -90, 90, valinit=0),
+        "tilt_y": Slider(plt.axes([0.25, 0.12, 0.6, 0.03]), "Tilt Y", -90, 90, valinit=0),
+        "offset": Slider(plt.axes([0.25, 0.07, 0.6, 0.03]), "Offset (mm)", -half_diagonal, half_diagonal, valinit=0),
+    }
+
+    def update(_=None):
+        normal = plane_normal(sliders["tilt_x"].val, sliders["tilt_y"].val)
+        t = time.perf_counter()
+        plane = r.reslice(center + sliders["offset"].val * normal, normal=normal, width=args.size, height=args.size,
+                          pixel_spacing=pixel, interpolation=interpolation)
+        ms = (time.perf_counter() - t) * 1000.0
+        image.set_data(plane)
+        ax.set_title(f"offset {sliders['offset'].val:.1f} mm - reslice {ms:.1f} ms")
+        fig.canvas.draw_idle()
+
+    def on_scroll(event):
+        s = sliders["offset"]
+        s.set_val(float(np.clip(s.val + (pixel if event.button == "up" else -pixel), s.valmin, s.valmax)))
+
+    for s in sliders.values():
+        s.on_changed(update)
+    fig.canvas.mpl_connect("scroll_event", on_scroll)
+    update()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,22 +6,91 @@ from PyQt6.QtCore import Qt, QPoint, QTimer
 from PyQt6.QtWidgets import QLabel
 import shutil
 import subprocess
+import threading
 import time
 import os
 
+
+class _GpuProbe:
+    """GPU memory for the overlay, shared by all views.
+
+    pynvml is imported and initialized on the first query (not at startup) and kept
+    open. Without it, nvidia-smi runs on a background thread at most every 2 s so the
+    GUI thread never waits on a subprocess; until it answers the overlay shows N/A.
+    """
+
+    def __init__(self):
+        self._nvml = None
+        self._handle = None
+        self._name = ""
+        self._nvml_tried = False
+        self._smi_result = None
+        self._smi_started = 0.0
+        self._smi_running = False
+        self._lock = threading.Lock()
+
+    def info(self):
+        if not self._nvml_tried:
+            self._nvml_tried = True
+            try:
+                import pynvml  # type: ignore
+                pynvml.nvmlInit()
+                self._handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+                name = pynvml.nvmlDeviceGetName(self._handle) if hasattr(pynvml, 'nvmlDeviceGetName') else ""
+                self._name = name.decode('utf-8') if isinstance(name, bytes) else name
+                self._nvml = pynvml
+            except Exception:
+                self._handle = None
+        if self._handle is not None:
+            try:
+                mem = self._nvml.nvmlDeviceGetMemoryInfo(self._handle)
+                return (int(mem.used / (1024 * 1024)), int(mem.total / (1024 * 1024)), self._name)
+            except Exception:
+                return None
+        # Fallback: nvidia-smi if available
+        now = time.monotonic()
+        with self._lock:
+            if not self._smi_running and now - self._smi_started >= 2.0 and shutil.which("nvidia-smi"):
+                self._smi_running = True
+                self._smi_started = now
+                threading.Thread(target=self._query_smi, daemon=True).start()
+            return self._smi_result
+
+    def _query_smi(self):
+        result = None
+        try:
+            out = subprocess.check_output([
+                "nvidia-smi", "--query-gpu=memory.used,memory.total,name", "--format=csv,noheader,nounits"
+            ], stderr=subprocess.DEVNULL, text=True, timeout=2.0)
+            first = out.strip().splitlines()[0].strip()
+            parts = [p.strip() for p in first.split(',')]
+            if len(parts) >= 3:
+                result = (int(parts[0]), int(parts[1]), parts[2])
+            elif len(parts) >= 2:
+                result = (int(parts[0]), int(parts[1]), "")
+        except Exception:
+            result = None
+        with self._lock:
+            self._smi_result = result
+            self._smi_running = False
+
+
+_gpu_probe = _GpuProbe()
+
 class OpenGLWidget(QOpenGLWidget):
-    def __init__(self, renderer, parent=None):
+    def __init__(self, renderer, parent=None, view_id=0):
         super().__init__(parent)
         self.renderer = renderer
+        # Renderer view driven by this widget (own camera/slice state, shared textures)
+        self.view_id = view_id
         self.last_pos = QPoint()
         # FPS tracking
         self._frame_count = 0
         self._last_fps_time = time.time()
         self._base_title = None
-        # Drive continuous rendering for FPS updates
+        # Poll at ~60 FPS, but only repaint when this view's state changed
         self._timer = QTimer(self)
-        self._timer.timeout.connect(self.update)
-        self._timer.start(16)  # ~60 FPS target
+        self._timer.timeout.connect(self._tick)  # started once GL is up (initializeGL)
 
         # Small overlay label (dataset name + FPS)
         self.dataset_name = ""
@@ -67,13 +136,18 @@ class OpenGLWidget(QOpenGLWidget):
         self._alert_timer.setSingleShot(True)
         self._alert_timer.timeout.connect(lambda: self.alert_label.setVisible(False))
 
+    def _tick(self):
+        if self.renderer.needs_redraw(self.view_id):
+            self.update()
+
     def initializeGL(self):
         """Called once to initialize OpenGL."""
-        self.renderer.init()
+        self.renderer.init(self.view_id)
+        self._timer.start(16)
 
     def resizeGL(self, w, h):
         """Called whenever the widget is resized."""
-        self.renderer.resize(w, h)
+        self.renderer.resize(w, h, self.view_id)
         # Keep overlay at top-left
         self.info_label.move(10, 10)
         # If alert is visible, keep it centered on resize
@@ -82,7 +156,7 @@ class OpenGLWidget(QOpenGLWidget):
 
     def paintGL(self):
         """Called whenever the widget needs to be repainted."""
-        self.renderer.render()
+        self.renderer.render(self.view_id)
         # Update FPS once per second in window title
         self._frame_count += 1
         now = time.time()
@@ -99,7 +173,14 @@ class OpenGLWidget(QOpenGLWidget):
             # Update overlay text: File (short name), FPS, GPU
             file_line = os.path.basename(self.dataset_path) if self.dataset_path else (self.dataset_name if self.dataset_name else "-")
             gpu_line = self._gpu_usage_text()
-            self.info_label.setText(f"FILE: {file_line}\nFPS: {fps:.1f}\nGPU: {gpu_line}")
+            text = f"FILE: {file_line}\nFPS: {fps:.1f}\nGPU: {gpu_line}"
+            memory_line = self._memory_text()
+            if memory_line:
+                text += "\n" + memory_line
+            frame_lines = self._frame_stats_text()
+            if frame_lines:
+                text += "\n" + frame_lines
+            self.info_label.setText(text)
             self.info_label.adjustSize()
 
     # --- Mouse Event Handlers ---
@@ -114,7 +195,7 @@ class OpenGLWidget(QOpenGLWidget):
         if event.buttons() & Qt.MouseButton.LeftButton:
             # Sensitivity factor for rotation
             sensitivity = 0.25
-            self.renderer.camera_rotate(dx * sensitivity, dy * sensitivity)
+            self.renderer.camera_rotate(dx * sensitivity, dy * sensitivity, self.view_id)
             self.update()  # Trigger a repaint
 
         self.last_pos = event.pos()
@@ -127,7 +208,7 @@ class OpenGLWidget(QOpenGLWidget):
         # Hold Shift to zoom even faster
         if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
             sensitivity *= 2.0
-        self.renderer.camera_zoom(delta * sensitivity)
+        self.renderer.camera_zoom(delta * sensitivity, self.view_id)
         self.update() # Trigger a repaint
 
     # --- Helpers ---
@@ -186,16 +267,54 @@ class OpenGLWidget(QOpenGLWidget):
             old_w = self.width()
             old_h = self.height()
             # Tell renderer to render at the requested size
-            self.renderer.resize(width, height)
-            self.renderer.render()
+            self.renderer.resize(width, height, self.view_id)
+            self.renderer.render(self.view_id)
             img = fbo.toImage()
             # Restore renderer size
-            self.renderer.resize(old_w, old_h)
+            self.renderer.resize(old_w, old_h, self.view_id)
         finally:
             fbo.release()
             self.doneCurrent()
         return img
 
+    # --- Frame profiler helper ---
+    def _frame_stats_text(self) -> str:
+        """Return 'P95: ...' and 'TOP: ...' overlay lines from the renderer profiler, or '' if unavailable."""
+        try:
+            stats = self.renderer.get_frame_stats(self.view_id)
+        except Exception:
+            return ""
+        if not stats or stats.get("frames", 0) == 0:
+            return ""
+        cpu_p95 = stats["cpu_ms"]["p95"]
+        has_gpu = stats.get("gpu_frames", 0) > 0
+        p95_line = f"P95: {cpu_p95:.2f} ms CPU"
+        if has_gpu:
+            p95_line += f" / {stats['gpu_ms']['p95']:.2f} ms GPU"
+        # Where the time goes: the most expensive phase (GPU time if available)
+        key = "gpu_ms" if has_gpu else "cpu_ms"
+        phases = stats.get("phases", {})
+        if not phases:
+            return p95_line
+        top_name, top = max(phases.items(), key=lambda kv: kv[1][key])
+        return f"{p95_line}\nTOP: {top_name} {top[key]:.2f} ms"
+
+    def _memory_text(self) -> str:
+        """Return 'MEM: host X[/budget] MB, VRAM Y[/budget] MB' from the renderer's accounting, or ''."""
+        try:
+            usage = self.renderer.get_memory_usage()
+        except Exception:
+            return ""
+
+        def pool(p):
+            used = p["used"] / 2**20
+            return f"{used:.0f}/{p['budget'] / 2**20:.0f} MB" if p["budget"] else f"{used:.0f} MB"
+
+        line = f"MEM: host {pool(usage['host'])}, VRAM {pool(usage['device'])}"
+        if usage["volume_texture_bits"] != 16 or usage["volume_texture_factor"] != 1:
+            line += f" [{usage['volume_texture_bits']}-bit, 1/{usage['volume_texture_factor']}]"
+        return line
+
     # --- GPU usage helper ---
     def _gpu_usage_text(self) -> str:
         """Return GPU text as 'X MB [Name YGB]' or 'N/A' if unavailable."""
@@ -211,39 +330,7 @@ class OpenGLWidget(QOpenGLWidget):
 
     def _gpu_info(self):
         """Return (used_mb, total_mb, name) or None."""
-        # Try pynvml first (NVIDIA)
-        try:
-            import pynvml  # type: ignore
-            pynvml.nvmlInit()
-            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-            mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
-            name = pynvml.nvmlDeviceGetName(handle).decode('utf-8') if hasattr(pynvml, 'nvmlDeviceGetName') else ""
-            used_mb = int(mem.used / (1024 * 1024))
-            total_mb = int(mem.total / (1024 * 1024))
-            pynvml.nvmlShutdown()
-            return (used_mb, total_mb, name)
-        except Exception:
-            pass
-        # Fallback: nvidia-smi if available
-        if shutil.which("nvidia-smi"):
-            try:
-                out = subprocess.check_output([
-                    "nvidia-smi", "--query-gpu=memory.used,memory.total,name", "--format=csv,noheader,nounits"
-                ], stderr=subprocess.DEVNULL, text=True, timeout=0.4)
-                first = out.strip().splitlines()[0].strip()
-                parts = [p.strip() for p in first.split(',')]
-                if len(parts) >= 3:
-                    used_mb = int(parts[0])
-                    total_mb = int(parts[1])
-                    name = parts[2]
-                    return (used_mb, total_mb, name)
-                elif len(parts) >= 2:
-                    used_mb = int(parts[0])
-                    total_mb = int(parts[1])
-                    return (used_mb, total_mb, "")
-            except Exception:
-                return None
-        return None
+        return _gpu_probe.info()
 
     # --- Alert banner helpers ---
     def _center_alert(self):
@@ -263,4 +350,68 @@ class OpenGLWidget(QOpenGLWidget):
         QTimer.singleShot(0, self._center_alert)
         self.alert_label.raise_()
         self.alert_label.setVisible(True)
-        self._alert_timer.start(max(0, int(duration_ms)))
\ No newline at end of file
+        self._alert_timer.start(max(0, int(duration_ms)))
+
+
+class SliceViewWidget(OpenGLWidget):
+    """A 2D slice viewport (axial/coronal/sagittal) sharing the renderer's volume texture.
+
+    Each instance owns a renderer view locked to one axis. The wheel pages through
+    slices (Ctrl+wheel zooms) and dragging does not orbit.
+    """
+
+    AXIS_NAMES = {0: "Axial", 1: "Coronal", 2: "Sagittal"}
+
+    def __init__(self, renderer, axis, parent=None):
+        super().__init__(renderer, parent, view_id=renderer.create_view())
+        self.axis = axis
+        self.slice_count = 1
+        self.info_label.setText(self.AXIS_NAMES.get(axis, ""))
+        self.info_label.adjustSize()
+
+    def initializeGL(self):
+        self.renderer.init(self.view_id)
+        self._timer.start(16)
+        self.renderer.set_slice_mode(True, self.view_id)
+        self.renderer.set_slice_axis(self.axis, self.view_id)
+        self.renderer.set_view_orientation(self.axis, self.view_id)
+
+    def paintGL(self):
+        # No FPS/GPU polling here; the label only changes with the slice
+        self.renderer.render(self.view_id)
+
+    def _axis_slice_count(self) -> int:
+        dims = {0: self.renderer.get_volume_depth(),
+                1: self.renderer.get_volume_height(),
+                2: self.renderer.get_volume_width()}
+        return max(1, dims[self.axis])
+
+    def reset_slices(self):
+        """Center the slice after a load (volume dimensions may have changed)."""
+        self.slice_count = self._axis_slice_count()
+        self.renderer.set_view_orientation(self.axis, self.view_id)
+        self.set_slice(self.slice_count // 2)
+
+    def refresh_slice_count(self):
+        """Pick up a changed slice range (e.g. slices appended by a live DICOM watch),
+        keeping the current slice."""
+        self.slice_count = self._axis_slice_count()
+        self.set_slice(self.renderer.get_slice_index(self.view_id))
+
+    def set_slice(self, index: int):
+        index = max(0, min(self.slice_count - 1, int(index)))
+        self.renderer.set_slice_index(index, self.view_id)
+        self.info_label.setText(f"{self.AXIS_NAMES.get(self.axis, '')} {index + 1}/{self.slice_count}")
+        self.info_label.adjustSize()
+
+    def mouseMoveEvent(self, event):
+        self.last_pos = event.pos()
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            super().wheelEvent(event)
+            return
+        steps = int(event.angleDelta().y() / 120)
+        if steps == 0:
+            return
+        self.set_slice(self.renderer.get_slice_index(self.view_id) + steps)
@@ -0,0 +1,185 @@
+# frontend/render_loadtest.py
+#
+# Load test for render_server.py: opens N sessions, each with a sender thread that posts
+# rotate commands at a fixed rate and a receiver thread that long-polls frames.
+# Reports frames/s and command-to-frame latency (time from sending command #k until the
+# first frame whose X-Command-Seq >= k arrives) per session and in aggregate.
+#
+# usage: python render_loadtest.py [--url http://127.0.0.1:8765] [--sessions 4] [--seconds 10]
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100.0 * (len(values) - 1)))))
+    return values[k]
+
+
+class Client:
+    def __init__(self, url, width, height, fmt, quality):
+        u = urlparse(url)
+        self.host, self.port = u.hostname, u.port or 80
+        self.width, self.height, self.format, self.quality = width, height, fmt, quality
+        self.sent = {}            # command seq -> send time
+        self.sent_lock = threading.Lock()
+        self.latencies = []       # ms
+        self.frames = 0
+        self.bytes = 0
+        self.render_ms = []
+        self.encode_ms = []
+        self.errors = 0
+
+    def _conn(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def _request(self, conn, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        conn.request(method, path, body=data, headers=headers)
+        resp = conn.getresponse()
+        return resp, resp.read()
+
+    def open(self):
+        conn = self._conn()
+        resp, data = self._request(conn, "POST", "/sessions", {
+            "width": self.width, "height": self.height, "format": self.format, "quality": self.quality})
+        conn.close()
+        if resp.status != 200:
+            raise RuntimeError(f"open session failed: {resp.status} {data!r}")
+        self.sid = json.loads(data)["session"]
+
+    def close(self):
+        conn = self._conn()
+        self._request(conn, "DELETE", f"/sessions/{self.sid}")
+        conn.close()
+
+    def send_loop(self, rate, stop):
+        conn = self._conn()
+        seq = 0
+        period = 1.0 / rate
+        next_t = time.perf_counter()
+        while not stop.is_set():
+            seq += 1
+            with self.sent_lock:
+                self.sent[seq] = time.perf_counter()
+            try:
+                resp, _ = self._request(conn, "POST", f"/sessions/{self.sid}/commands",
+                                        {"seq": seq, "commands": [{"rotate": [4.0, 1.0]}]})
+                if resp.status != 200:
+                    self.errors += 1
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = self._conn()
+            next_t += period
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                next_t = time.perf_counter()  # fell behind; do not burst to catch up
+        conn.close()
+
+    def receive_loop(self, stop, measuring):
+        conn = self._conn()
+        after = 0
+        acked = 0
+        while not stop.is_set():
+            try:
+                resp, data = self._request(conn, "GET", f"/sessions/{self.sid}/frame?after={after}&timeout=1")
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = self._conn()
+                continue
+            if resp.status == 204:
+                continue
+            if resp.status != 200:
+                self.errors += 1
+                break
+            now = time.perf_counter()
+            after = int(resp.getheader("X-Frame-Seq"))
+            command_seq = int(resp.getheader("X-Command-Seq"))
+            if not measuring.is_set():
+                acked = max(acked, command_seq)
+                continue
+            self.frames += 1
+            self.bytes += len(data)
+            self.render_ms.append(float(resp.getheader("X-Render-Ms")))
+            self.encode_ms.append(float(resp.getheader("X-Encode-Ms")))
+            # Every command up to command_seq is now visible; commands coalesced into
+            # this frame each get their own latency
+            with self.sent_lock:
+                for k in range(acked + 1, command_seq + 1):
+                    t = self.sent.pop(k, None)
+                    if t is not None:
+                        self.latencies.append((now - t) * 1000.0)
+            acked = max(acked, command_seq)
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for render_server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--rate", type=float, default=60.0, help="commands per second per session")
+    parser.add_argument("--size", type=int, nargs=2, default=[512, 512], metavar=("W", "H"))
+    parser.add_argument("--format", choices=["jpeg", "png"], default="jpeg")
+    parser.add_argument("--quality", type=int, default=80)
+    args = parser.parse_args()
+
+    clients = [Client(args.url, args.size[0], args.size[1], args.format, args.quality) for _ in range(args.sessions)]
+    for c in clients:
+        c.open()
+
+    stop = threading.Event()
+    measuring = threading.Event()
+    threads = []
+    for c in clients:
+        threads.append(threading.Thread(target=c.send_loop, args=(args.rate, stop), daemon=True))
+        threads.append(threading.Thread(target=c.receive_loop, args=(stop, measuring), daemon=True))
+    for t in threads:
+        t.start()
+    time.sleep(args.warmup)
+    measuring.set()
+    t0 = time.perf_counter()
+    time.sleep(args.seconds)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in threads:
+        t.join(timeout=5)
+    for c in clients:
+        c.close()
+
+    print(f"{args.sessions} sessions, {args.size[0]}x{args.size[1]} {args.format}, "
+          f"{args.rate:g} commands/s each, {elapsed:.1f}s")
+    print(f"{'session':<10} {'fps':>7} {'KB/frame':>9} {'render ms':>10} {'encode ms':>10} "
+          f"{'lat p50':>8} {'lat p95':>8} {'errors':>7}")
+    all_lat = []
+    for i, c in enumerate(clients):
+        all_lat.extend(c.latencies)
+        kb = c.bytes / max(1, c.frames) / 1024.0
+        print(f"{i:<10} {c.frames / elapsed:>7.1f} {kb:>9.1f} {percentile(c.render_ms, 50):>10.2f} "
+              f"{percentile(c.encode_ms, 50):>10.2f} {percentile(c.latencies, 50):>8.1f} "
+              f"{percentile(c.latencies, 95):>8.1f} {c.errors:>7}")
+    total = sum(c.frames for c in clients)
+    print(f"{'total':<10} {total / elapsed:>7.1f} {'':>9} {'':>10} {'':>10} "
+          f"{percentile(all_lat, 50):>8.1f} {percentile(all_lat, 95):>8.1f}")
+
+    conn = http.client.HTTPConnection(clients[0].host, clients[0].port, timeout=5)
+    conn.request("GET", "/stats")
+    print("server:", json.loads(conn.getresponse().read()))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
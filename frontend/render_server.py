@@ -0,0 +1,465 @@
+# frontend/render_server.py
+#
+# Headless render server: one Renderer (one GPU copy of the volume) shared by many
+# thin-client sessions over HTTP. Each session gets its own renderer view (camera and
+# slice state, see Renderer::createView) and receives JPEG/PNG encoded frames.
+#
+# usage: python render_server.py volume.nii.gz [--host 127.0.0.1] [--port 8765] [--encoders 4]
+#
+# Protocol (JSON bodies, binds to localhost by default):
+#   POST   /sessions                      {"width":512,"height":512,"format":"jpeg","quality":80}
+#                                         -> {"session": "<id>"}
+#   POST   /sessions/<id>/commands        {"seq": 7, "commands": [{"rotate": [dx, dy]}, ...]}
+#                                         -> {"accepted": 7}
+#          commands: rotate [dx,dy] | zoom d | angles [az,el] | size [w,h] | colormap i
+#                    | slice {"enabled": bool, "axis": 0..2, "index": k} | quality q
+#   GET    /sessions/<id>/frame?after=N&timeout=2
+#                                         -> 200 image bytes with X-Frame-Seq, X-Command-Seq,
+#                                            X-Render-Ms, X-Encode-Ms headers; 204 if no newer
+#                                            frame arrived within the timeout
+#   DELETE /sessions/<id>
+#   GET    /stats                         -> counters (rendered, encoded, skipped_stale, ...)
+#
+# Commands that arrive while a frame renders are coalesced (rotations and zooms add up,
+# everything else keeps the latest value) and applied together before the next frame.
+# Frames are read back on the render thread and encoded on a worker pool; a frame that
+# is superseded by a newer render before its encode starts or finishes is dropped.
+#
+# The colormap is a renderer-wide setting, so a colormap command affects every session.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MAX_SIZE = 4096
+MAX_IN_FLIGHT = 2  # encodes per session before the render thread stops rendering it
+
+
+class Session:
+    def __init__(self, view, width, height, fmt, quality):
+        self.id = uuid.uuid4().hex[:12]
+        self.view = view
+        self.width = width
+        self.height = height
+        self.format = fmt
+        self.quality = quality
+        self.lock = threading.Lock()
+        self.frame_ready = threading.Condition(self.lock)
+        # Coalesced commands not yet applied (guarded by lock)
+        self.pending = {}
+        self.pending_seq = 0       # highest command seq received
+        # Render state (render thread only)
+        self.applied_seq = 0       # highest command seq applied to the view
+        self.needs_frame = True    # first frame, size changes, etc.
+        self.target = None         # offscreen framebuffer of the session's size
+        # Frames (guarded by lock)
+        self.rendered_seq = 0      # latest frame rendered
+        self.published_seq = 0     # latest frame available to the client
+        self.frame = None          # (bytes, content type, command seq, render ms, encode ms)
+        self.in_flight = 0
+        self.last_seen = time.monotonic()
+        self.closed = False
+
+    def merge(self, seq, commands):
+        """Fold commands into the pending set (called from HTTP threads). The batch is
+        parsed into a copy first, so a bad command leaves the pending set untouched."""
+        with self.lock:
+            p = dict(self.pending)
+            for cmd in commands:
+                if not isinstance(cmd, dict):
+                    raise TypeError("a command must be a JSON object")
+                for key, value in cmd.items():
+                    if key == "rotate":
+                        dx, dy = p.get("rotate", (0.0, 0.0))
+                        p["rotate"] = (dx + float(value[0]), dy + float(value[1]))
+                    elif key == "zoom":
+                        p["zoom"] = p.get("zoom", 0.0) + float(value)
+                    elif key == "angles":
+                        p.pop("rotate", None)  # absolute angles replace earlier deltas
+                        p["angles"] = (float(value[0]), float(value[1]))
+                    elif key == "size":
+                        p["size"] = (max(16, min(MAX_SIZE, int(value[0]))), max(16, min(MAX_SIZE, int(value[1]))))
+                    elif key == "slice":
+                        merged = dict(p.get("slice", {}))
+                        if "enabled" in value:
+                            merged["enabled"] = bool(value["enabled"])
+                        merged.update({k: int(value[k]) for k in ("axis", "index") if k in value})
+                        p["slice"] = merged
+                    elif key == "colormap":
+                        p["colormap"] = int(value)
+                    elif key == "quality":
+                        p["quality"] = max(1, min(100, int(value)))
+                    else:
+                        raise ValueError(f"unknown command '{key}'")
+            pending_seq = max(self.pending_seq, int(seq)) if seq is not None else self.pending_seq + 1
+            self.pending = p
+            self.pending_seq = pending_seq
+            self.last_seen = time.monotonic()
+            return self.pending_seq
+
+    def take_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            return pending, self.pending_seq
+
+
+class RenderServer:
+    """Owns the GL context and the Renderer; everything GL runs on the thread calling run()."""
+
+    def __init__(self, volume_path, encoders=4, idle_timeout=120.0):
+        self.volume_path = volume_path
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = True
+        self.pool = ThreadPoolExecutor(max_workers=max(1, encoders), thread_name_prefix="encode")
+        self.stats = {"rendered": 0, "encoded": 0, "skipped_stale": 0, "coalesced_commands": 0,
+                      "sessions_opened": 0, "sessions_closed": 0}
+        self.stats_lock = threading.Lock()
+        self._new_sessions = []   # (args, reply) created on the render thread
+        self._closed_sessions = []
+
+    def count(self, key, n=1):
+        with self.stats_lock:
+            self.stats[key] += n
+
+    # --- Called from HTTP threads ---
+    def open_session(self, width, height, fmt, quality, timeout=5.0):
+        reply = {"event": threading.Event(), "session": None, "cancelled": False}
+        with self.sessions_lock:
+            self._new_sessions.append(((width, height, fmt, quality), reply))
+        self.wakeup.set()
+        reply["event"].wait(timeout)
+        with self.sessions_lock:
+            if reply["session"] is None:
+                reply["cancelled"] = True  # nobody will learn the id; the render thread drops it
+            return reply["session"]
+
+    def close_session(self, sid):
+        with self.sessions_lock:
+            session = self.sessions.pop(sid, None)
+            if session is not None:
+                self._closed_sessions.append(session)
+        if session is not None:
+            with session.lock:
+                session.closed = True
+                session.frame_ready.notify_all()
+            self.wakeup.set()
+        return session is not None
+
+    def get_session(self, sid):
+        with self.sessions_lock:
+            return self.sessions.get(sid)
+
+    # --- Render thread ---
+    def run(self):
+        from PyQt6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext, QSurfaceFormat
+        import volumerenderer
+
+        self.app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+        fmt = QSurfaceFormat()
+        fmt.setDepthBufferSize(24)
+        fmt.setVersion(3, 3)
+        fmt.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
+        self.surface = QOffscreenSurface()
+        self.surface.setFormat(fmt)
+        self.surface.create()
+        self.context = QOpenGLContext()
+        self.context.setFormat(fmt)
+        if not self.context.create() or not self.context.makeCurrent(self.surface):
+            raise SystemExit("Failed to create an OpenGL 3.3 context")
+
+        self.renderer = volumerenderer.Renderer()
+        self.renderer.set_load_verbosity(1)
+        if not self.renderer.load_volume(self.volume_path):
+            raise SystemExit(f"Failed to load {self.volume_path}")
+        self.renderer.init()
+
+        while self.running:
+            self.wakeup.wait(0.05)
+            self.wakeup.clear()
+            self._service_sessions()
+            self._expire_idle()
+        self.pool.shutdown(wait=True)
+
+    def _service_sessions(self):
+        with self.sessions_lock:
+            new, self._new_sessions = self._new_sessions, []
+            closed, self._closed_sessions = self._closed_sessions, []
+        for (width, height, fmt, quality), reply in new:
+            with self.sessions_lock:
+                if reply["cancelled"]:
+                    continue
+            view = self.renderer.create_view()
+            self.renderer.init(view)
+            session = Session(view, width, height, fmt, quality)
+            with self.sessions_lock:
+                # The client may have given up while the view was created
+                cancelled = reply["cancelled"]
+                if not cancelled:
+                    self.sessions[session.id] = session
+            if cancelled:
+                self.renderer.destroy_view(view)
+                continue
+            self.count("sessions_opened")
+            reply["session"] = session
+            reply["event"].set()
+        for session in closed:
+            session.target = None
+            self.renderer.destroy_view(session.view)
+            self.count("sessions_closed")
+
+        with self.sessions_lock:
+            active = list(self.sessions.values())
+        for session in active:
+            with session.lock:
+                busy = session.in_flight >= MAX_IN_FLIGHT
+            if busy:
+                continue  # backpressure: the encoders have not caught up with this session
+            pending, seq = session.take_pending()
+            if pending:
+                self._apply(session, pending)
+                self.count("coalesced_commands", max(0, seq - session.applied_seq - 1))
+                session.applied_seq = seq
+            if session.needs_frame or self.renderer.needs_redraw(session.view):
+                self._render(session)
+
+    def _apply(self, session, pending):
+        r, view = self.renderer, session.view
+        if "size" in pending:
+            session.width, session.height = pending["size"]
+        if "angles" in pending:
+            r.set_camera_angles(*pending["angles"], view=view)
+        if "rotate" in pending:
+            r.camera_rotate(*pending["rotate"], view=view)
+        if "zoom" in pending:
+            r.camera_zoom(pending["zoom"], view=view)
+        if "slice" in pending:
+            s = pending["slice"]
+            if "enabled" in s:
+                r.set_slice_mode(bool(s["enabled"]), view=view)
+            if "axis" in s:
+                r.set_slice_axis(int(s["axis"]), view=view)
+            if "index" in s:
+                r.set_slice_index(int(s["index"]), view=view)
+        if "colormap" in pending:
+            r.set_colormap_preset(pending["colormap"])
+        if "quality" in pending:
+            session.quality = pending["quality"]
+        session.needs_frame = True
+
+    def _render(self, session):
+        from PyQt6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+        size_changed = session.target is None or (session.target.width(), session.target.height()) != (
+            session.width, session.height)
+        if size_changed:
+            fmt = QOpenGLFramebufferObjectFormat()
+            fmt.setAttachment(QOpenGLFramebufferObject.Attachment.Depth)
+            session.target = QOpenGLFramebufferObject(session.width, session.height, fmt)
+
+        t0 = time.perf_counter()
+        session.target.bind()
+        # Sessions share one context, so the viewport must be set for every frame
+        self.renderer.resize(session.width, session.height, session.view)
+        self.renderer.render(session.view)
+        image = session.target.toImage()  # synchronous readback
+        session.target.release()
+        render_ms = (time.perf_counter() - t0) * 1000.0
+        session.needs_frame = False
+        self.count("rendered")
+
+        with session.lock:
+            session.rendered_seq += 1
+            frame_seq = session.rendered_seq
+            session.in_flight += 1
+        self.pool.submit(self._encode, session, image, frame_seq, session.applied_seq, render_ms)
+
+    def _encode(self, session, image, frame_seq, command_seq, render_ms):
+        from PyQt6.QtCore import QBuffer, QIODevice
+
+        try:
+            with session.lock:
+                stale = session.closed or frame_seq < session.rendered_seq
+            if stale:
+                self.count("skipped_stale")
+                return
+            t0 = time.perf_counter()
+            buf = QBuffer()
+            buf.open(QIODevice.OpenModeFlag.WriteOnly)
+            if session.format == "png":
+                image.save(buf, "PNG")
+                ctype = "image/png"
+            else:
+                image.save(buf, "JPG", session.quality)
+                ctype = "image/jpeg"
+            data = bytes(buf.data())
+            encode_ms = (time.perf_counter() - t0) * 1000.0
+            with session.lock:
+                if frame_seq <= session.published_seq:
+                    self.count("skipped_stale")  # a newer frame finished first
+                    return
+                session.published_seq = frame_seq
+                session.frame = (data, ctype, command_seq, render_ms, encode_ms)
+                session.frame_ready.notify_all()
+            self.count("encoded")
+        finally:
+            with session.lock:
+                session.in_flight -= 1
+            self.wakeup.set()
+
+    def _expire_idle(self):
+        now = time.monotonic()
+        with self.sessions_lock:
+            idle = [sid for sid, s in self.sessions.items() if now - s.last_seen > self.idle_timeout]
+        for sid in idle:
+            self.close_session(sid)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for the clients
+    disable_nagle_algorithm = True  # headers and body go out separately; avoid the delayed-ACK stall
+    server_version = "MVRRenderServer/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b"", ctype="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _json(self, status, obj):
+        self._send(status, json.dumps(obj).encode())
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > 1 << 20:
+            raise ValueError("request body too large")
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        session = None
+        if len(parts) >= 2 and parts[0] == "sessions":
+            session = self.server.render.get_session(parts[1])
+        return parts, session
+
+    def do_GET(self):
+        parts, session = self._route()
+        if parts == ["stats"]:
+            render = self.server.render
+            with render.stats_lock:
+                stats = dict(render.stats)
+            with render.sessions_lock:
+                stats["sessions"] = len(render.sessions)
+            return self._json(HTTPStatus.OK, stats)
+        if len(parts) == 3 and parts[2] == "frame":
+            if session is None:
+                return self._json(HTTPStatus.NOT_FOUND, {"error": "no such session"})
+            query = parse_qs(urlparse(self.path).query)
+            try:
+                after = int(query.get("after", ["0"])[0])
+                timeout = max(0.0, min(30.0, float(query.get("timeout", ["2"])[0])))
+            except ValueError as e:
+                return self._json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            with session.lock:
+                session.last_seen = time.monotonic()
+                session.frame_ready.wait_for(lambda: session.published_seq > after or session.closed, timeout)
+                if session.published_seq <= after or session.frame is None:
+                    frame = None
+                else:
+                    frame, seq = session.frame, session.published_seq
+            if frame is None:
+                return self._send(HTTPStatus.NO_CONTENT)
+            data, ctype, command_seq, render_ms, encode_ms = frame
+            return self._send(HTTPStatus.OK, data, ctype, {
+                "X-Frame-Seq": str(seq), "X-Command-Seq": str(command_seq),
+                "X-Render-Ms": f"{render_ms:.2f}", "X-Encode-Ms": f"{encode_ms:.2f}"})
+        self._json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self):
+        parts, session = self._route()
+        try:
+            body = self._body()
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+        except ValueError as e:
+            return self._json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        if parts == ["sessions"]:
+            try:
+                width = max(16, min(MAX_SIZE, int(body.get("width", 512))))
+                height = max(16, min(MAX_SIZE, int(body.get("height", 512))))
+                quality = max(1, min(100, int(body.get("quality", 80))))
+            except (ValueError, TypeError) as e:
+                return self._json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            fmt = "png" if body.get("format") == "png" else "jpeg"
+            session = self.server.render.open_session(width, height, fmt, quality)
+            if session is None:
+                return self._json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "render thread busy"})
+            return self._json(HTTPStatus.OK, {"session": session.id})
+        if len(parts) == 3 and parts[2] == "commands":
+            if session is None:
+                return self._json(HTTPStatus.NOT_FOUND, {"error": "no such session"})
+            commands = body.get("commands")
+            if commands is None:
+                commands = [{k: v for k, v in body.items() if k != "seq"}]
+            try:
+                seq = session.merge(body.get("seq"), commands)
+            except (ValueError, TypeError, IndexError, KeyError) as e:
+                return self._json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            self.server.render.wakeup.set()
+            return self._json(HTTPStatus.OK, {"accepted": seq})
+        self._json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) == 2 and parts[0] == "sessions" and self.server.render.close_session(parts[1]):
+            return self._json(HTTPStatus.OK, {"closed": parts[1]})
+        self._json(HTTPStatus.NOT_FOUND, {"error": "no such session"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve rendered frames of a volume over HTTP")
+    parser.add_argument("volume", help="NIfTI file or DICOM folder")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--encoders", type=int, default=os.cpu_count() or 4, help="encoder threads")
+    parser.add_argument("--idle-timeout", type=float, default=120.0, help="close sessions idle this long (s)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    render = RenderServer(args.volume, encoders=args.encoders, idle_timeout=args.idle_timeout)
+    httpd = ThreadingHTTPServer((args.host, args.port), Handler)
+    httpd.daemon_threads = True
+    httpd.render = render
+    httpd.verbose = args.verbose
+    threading.Thread(target=httpd.serve_forever, name="http", daemon=True).start()
+    print(f"      MVR INFO: Render server on http://{args.host}:{args.port}/ ({args.encoders} encoders)")
+    try:
+        render.run()  # GL must stay on this thread
+    except KeyboardInterrupt:
+        pass
+    finally:
+        render.running = False
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()